@@ -14,6 +14,10 @@ import sqlite3
 import re
 import threading
 import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import Optional, Dict, List, Any, Tuple
 from urllib.parse import urlparse
@@ -23,6 +27,14 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 
+# 공용 엑셀 읽기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet
+
+from database.bulk_load import BulkLoad
+
 
 # ========================================================
 # 툴팁 클래스
@@ -67,6 +79,67 @@ class ToolTip:
 # SQLite DB 관리 클래스
 # ========================================================
 class SQLiteDBManager:
+    # 기록해야 할 컬럼 목록 (정확한 컬럼명)
+    REQUIRED_COLUMNS = [
+        # 기본 정보
+        "상품코드",
+        "카테고리명",
+        "원본상품명",
+        # Stage 1
+        "ST1_정제상품명",
+        "ST1_판매형태",
+        # Stage 2~4 및 이미지/프롬프트/URL (가공 결과 컬럼들)
+        "ST2_JSON",
+        "ST3_결과상품명",
+        "ST4_최종결과",
+        "IMG_S1_휴먼라벨",
+        "IMG_S1_휴먼노트",
+        "IMG_S1_AI라벨",
+        "view_point",
+        "subject_position",
+        "subject_size",
+        "lighting_condition",
+        "color_tone",
+        "shadow_presence",
+        "background_simplicity",
+        "is_flat_lay",
+        "bg_layout_hint_en",
+        "bg_positive_en",
+        "bg_negative_en",
+        "video_motion_prompt_en",
+        "video_full_prompt_en",
+        "누끼url",
+        "믹스url"
+    ]
+
+    # "가공된 정보" 컬럼 목록 (이 중 하나라도 값이 있어야 입고/업데이트 대상이 됨)
+    PROCESSED_COLUMNS = [
+        # Stage 1 결과도 가공 데이터로 인정
+        "ST1_정제상품명",
+        "ST1_판매형태",
+        "ST2_JSON",
+        "ST3_결과상품명",
+        "ST4_최종결과",
+        "IMG_S1_휴먼라벨",
+        "IMG_S1_휴먼노트",
+        "IMG_S1_AI라벨",
+        "view_point",
+        "subject_position",
+        "subject_size",
+        "lighting_condition",
+        "color_tone",
+        "shadow_presence",
+        "background_simplicity",
+        "is_flat_lay",
+        "bg_layout_hint_en",
+        "bg_positive_en",
+        "bg_negative_en",
+        "video_motion_prompt_en",
+        "video_full_prompt_en",
+        "누끼url",
+        "믹스url",
+    ]
+    
     def __init__(self, db_path: str):
         self.db_path = db_path
         self.conn = None
@@ -297,101 +370,26 @@ class SQLiteDBManager:
         is_valid = len(critical_errors) == 0
         return is_valid, critical_errors, warnings
     
-    def insert_products(self, products_df: pd.DataFrame, excel_filename: str, 
-                       progress_callback=None, error_log_callback=None):
+    def prepare_products(self, products_df: pd.DataFrame) -> Dict[str, Any]:
         """
-        상품 데이터 삽입 (지정된 컬럼만 기록)
+        상품 데이터 변환 + 검증 (DB 사용 안 함 - 프로세스 풀에서 파일별로 병렬 실행 가능)
         
-        Args:
-            products_df: 상품 데이터프레임
-            excel_filename: 엑셀 파일명
-            progress_callback: 진행률 콜백 함수 (current, total)
-            error_log_callback: 에러 로그 콜백 함수 (row_index, error_message)
+        Returns:
+            {"total_rows": int, "outcomes": [행별 결과, ...]} (행 순서 유지)
+            - ("invalid", idx, error_msg): 치명적 검증 오류
+            - ("error", idx, error_msg): 처리 중 예외
+            - ("skip", idx, warning_msg): 가공 컬럼이 모두 비어 있음
+            - ("row", idx, product_code, product_data, warning_msg): 입고/업데이트 대상
         """
-        cursor = self.conn.cursor()
-        
-        # 기록해야 할 컬럼 목록 (정확한 컬럼명)
-        required_columns = [
-            # 기본 정보
-            "상품코드",
-            "카테고리명",
-            "원본상품명",
-            # Stage 1
-            "ST1_정제상품명",
-            "ST1_판매형태",
-            # Stage 2~4 및 이미지/프롬프트/URL (가공 결과 컬럼들)
-            "ST2_JSON",
-            "ST3_결과상품명",
-            "ST4_최종결과",
-            "IMG_S1_휴먼라벨",
-            "IMG_S1_휴먼노트",
-            "IMG_S1_AI라벨",
-            "view_point",
-            "subject_position",
-            "subject_size",
-            "lighting_condition",
-            "color_tone",
-            "shadow_presence",
-            "background_simplicity",
-            "is_flat_lay",
-            "bg_layout_hint_en",
-            "bg_positive_en",
-            "bg_negative_en",
-            "video_motion_prompt_en",
-            "video_full_prompt_en",
-            "누끼url",
-            "믹스url"
-        ]
-
-        # "가공된 정보" 컬럼 목록 (이 중 하나라도 값이 있어야 입고/업데이트 대상이 됨)
-        processed_columns = [
-            # Stage 1 결과도 가공 데이터로 인정
-            "ST1_정제상품명",
-            "ST1_판매형태",
-            "ST2_JSON",
-            "ST3_결과상품명",
-            "ST4_최종결과",
-            "IMG_S1_휴먼라벨",
-            "IMG_S1_휴먼노트",
-            "IMG_S1_AI라벨",
-            "view_point",
-            "subject_position",
-            "subject_size",
-            "lighting_condition",
-            "color_tone",
-            "shadow_presence",
-            "background_simplicity",
-            "is_flat_lay",
-            "bg_layout_hint_en",
-            "bg_positive_en",
-            "bg_negative_en",
-            "video_motion_prompt_en",
-            "video_full_prompt_en",
-            "누끼url",
-            "믹스url",
-        ]
-        
-        # 기존 상품코드 조회 (중복 체크용)
-        cursor.execute("SELECT 상품코드 FROM products WHERE 상품코드 IS NOT NULL AND 상품코드 != ''")
-        existing_product_codes = {row[0] for row in cursor.fetchall()}
+        required_columns = self.REQUIRED_COLUMNS
+        processed_columns = self.PROCESSED_COLUMNS
         
         # 엑셀 파일 내 상품코드 중복 체크용
         excel_product_codes = {}  # {상품코드: 행번호}
-        
-        inserted_count = 0  # 신규 추가
-        updated_count = 0   # 업데이트
-        skipped_count = 0
-        validation_error_count = 0  # 검증 오류
-        updated_columns = set()  # 업데이트된 컬럼 추적
-        error_log = []  # 에러 로그
-        
-        total_rows = len(products_df)
+        outcomes = []
         
         for idx, row in products_df.iterrows():
             try:
-                # 진행률 업데이트
-                if progress_callback:
-                    progress_callback(idx + 1, total_rows)
                 # 상품코드 추출
                 product_code = ""
                 if "상품코드" in products_df.columns:
@@ -436,20 +434,14 @@ class SQLiteDBManager:
                 is_valid, critical_errors, warnings = self.validate_product_data(product_data, idx, excel_product_codes)
                 if not is_valid:
                     # 치명적 오류 (상품코드 없음, 중복 등) - 입고 불가
-                    validation_error_count += 1
-                    error_msg = f"행 {idx + 2}: {', '.join(critical_errors)}"
-                    error_log.append(error_msg)
-                    if error_log_callback:
-                        error_log_callback(idx + 2, error_msg)
-                    skipped_count += 1
+                    outcomes.append(("invalid", idx, f"행 {idx + 2}: {', '.join(critical_errors)}"))
                     continue
                 
                 # 경고 메시지가 있으면 로그에 기록 (입고는 계속 진행)
                 # ST2_JSON이 불완전한 경우 빈 문자열로 저장하도록 설정
+                warning_msg = None
                 if warnings:
                     warning_msg = f"행 {idx + 2}: [경고] {', '.join(warnings[:3])}"  # 처음 3개만 표시
-                    if error_log_callback:
-                        error_log_callback(idx + 2, warning_msg)
                     
                     # ST2_JSON 불완전 경고가 있으면 빈 문자열로 저장
                     if any("ST2_JSON이 불완전" in w for w in warnings):
@@ -472,13 +464,75 @@ class SQLiteDBManager:
 
                 # 모든 가공 컬럼이 비어 있으면 입고/업데이트 대상이 아님 → 스킵
                 if not has_processed_value:
-                    skipped_count += 1
+                    outcomes.append(("skip", idx, warning_msg))
                     continue
                 
                 # 검증 통과 후 엑셀 내 상품코드 추적 (중복 체크용)
                 if product_code:
                     excel_product_codes[product_code] = idx
                 
+                outcomes.append(("row", idx, product_code, product_data, warning_msg))
+                
+            except Exception as e:
+                outcomes.append(("error", idx, f"행 {idx + 2}: {str(e)}"))
+        
+        return {"total_rows": len(products_df), "outcomes": outcomes}
+    
+    def apply_prepared_products(self, prepared: Dict[str, Any], excel_filename: str,
+                                progress_callback=None, error_log_callback=None):
+        """
+        prepare_products 결과를 DB에 기록 (행 순서대로, 파일 1개 = 트랜잭션 1개)
+        
+        Returns:
+            insert_products 와 동일
+        """
+        cursor = self.conn.cursor()
+        required_columns = self.REQUIRED_COLUMNS
+        processed_columns = self.PROCESSED_COLUMNS
+        
+        # 기존 상품코드 조회 (중복 체크용)
+        cursor.execute("SELECT 상품코드 FROM products WHERE 상품코드 IS NOT NULL AND 상품코드 != ''")
+        existing_product_codes = {row[0] for row in cursor.fetchall()}
+        
+        inserted_count = 0  # 신규 추가
+        updated_count = 0   # 업데이트
+        skipped_count = 0
+        validation_error_count = 0  # 검증 오류
+        updated_columns = set()  # 업데이트된 컬럼 추적
+        error_log = []  # 에러 로그
+        
+        total_rows = prepared["total_rows"]
+        
+        for outcome in prepared["outcomes"]:
+            kind, idx = outcome[0], outcome[1]
+            # 진행률 업데이트
+            if progress_callback:
+                progress_callback(idx + 1, total_rows)
+            
+            if kind == "invalid":
+                # 치명적 오류 (상품코드 없음, 중복 등) - 입고 불가
+                validation_error_count += 1
+                error_log.append(outcome[2])
+                if error_log_callback:
+                    error_log_callback(idx + 2, outcome[2])
+                skipped_count += 1
+                continue
+            if kind == "error":
+                skipped_count += 1
+                error_log.append(outcome[2])
+                if error_log_callback:
+                    error_log_callback(idx + 2, outcome[2])
+                continue
+            
+            warning_msg = outcome[-1]
+            if warning_msg and error_log_callback:
+                error_log_callback(idx + 2, warning_msg)
+            if kind == "skip":
+                skipped_count += 1
+                continue
+            
+            product_code, product_data = outcome[2], outcome[3]
+            try:
                 # 기존 상품인지 확인
                 is_existing = product_code and product_code in existing_product_codes
                 
@@ -573,6 +627,120 @@ class SQLiteDBManager:
         self.conn.commit()
         return inserted_count, updated_count, skipped_count, validation_error_count, updated_columns, error_log
     
+    def insert_products(self, products_df: pd.DataFrame, excel_filename: str, 
+                       progress_callback=None, error_log_callback=None):
+        """
+        상품 데이터 삽입 (지정된 컬럼만 기록)
+        
+        Args:
+            products_df: 상품 데이터프레임
+            excel_filename: 엑셀 파일명
+            progress_callback: 진행률 콜백 함수 (current, total)
+            error_log_callback: 에러 로그 콜백 함수 (row_index, error_message)
+        """
+        prepared = self.prepare_products(products_df)
+        return self.apply_prepared_products(prepared, excel_filename, progress_callback, error_log_callback)
+    
+    def insert_excel_files(self, excel_paths: List[str], max_workers: Optional[int] = None,
+                           file_callback=None) -> List[Dict[str, Any]]:
+        """
+        여러 엑셀 파일 입고 (파일 읽기/검증은 프로세스 풀에서 병렬, DB 기록은 호출한 스레드 하나에서 순서대로)
+        - 파일 순서대로 기록하므로 같은 상품코드가 여러 파일에 있어도 순차 처리와 결과 동일
+          (앞 파일이 신규 추가, 뒤 파일이 업데이트)
+        - 파일 1개 = 트랜잭션 1개, 이미 입고된 파일명은 거부
+        
+        Args:
+            excel_paths: 엑셀 파일 경로 목록 (이 순서대로 DB에 기록)
+            max_workers: 프로세스 수 (None이면 CPU 수 - 1, 파일이 1개면 풀 사용 안 함)
+            file_callback: 파일 1개 기록 후 호출 (index, result)
+        
+        Returns:
+            파일별 결과 리스트 [{"filename", "status", "inserted", "updated", "skipped",
+                               "validation_errors", "total_rows", "parse_sec", "validate_sec",
+                               "insert_sec", "error"}, ...]
+            status: "ok" / "duplicate" / "error"
+        """
+        results = []
+        pending = []
+        for excel_path in excel_paths:
+            # 이미 입고된 파일은 읽지도 않음 (기록 직전에 한 번 더 확인)
+            if self.check_excel_filename_exists(os.path.basename(excel_path)):
+                pending.append(None)
+            else:
+                pending.append(excel_path)
+        
+        if max_workers is None:
+            max_workers = max(1, (os.cpu_count() or 2) - 1)
+        to_parse = [p for p in pending if p]
+        max_workers = min(max_workers, len(to_parse))
+        
+        executor = None
+        futures = {}
+        if max_workers > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=max_workers)
+                for excel_path in to_parse:
+                    futures[excel_path] = executor.submit(_prepare_excel_file, excel_path)
+            except Exception:
+                # 프로세스 풀 사용 불가 (실행 환경 제약 등) → 순차 처리
+                if executor:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                executor = None
+                futures = {}
+        
+        try:
+            with ExitStack() as stack:
+                # 파일 여러 개 → 대량 적재 모드 (products 보조 인덱스는 끝난 뒤 한 번에 생성 + ANALYZE,
+                # 다른 대량 적재가 진행 중이면 일반 모드로 기록)
+                if len(to_parse) > 1:
+                    try:
+                        stack.enter_context(BulkLoad(self.conn, self.db_path, ["products"]))
+                    except RuntimeError:
+                        pass
+                
+                for index, excel_path in enumerate(excel_paths):
+                    excel_filename = os.path.basename(excel_path)
+                    result = {"filename": excel_filename, "path": excel_path, "status": "ok",
+                              "inserted": 0, "updated": 0, "skipped": 0, "validation_errors": 0, "total_rows": 0,
+                              "parse_sec": 0.0, "validate_sec": 0.0, "insert_sec": 0.0, "error": ""}
+                    try:
+                        if pending[index] is None or self.check_excel_filename_exists(excel_filename):
+                            result["status"] = "duplicate"
+                        else:
+                            future = futures.get(excel_path)
+                            try:
+                                parsed = future.result() if future else _prepare_excel_file(excel_path)
+                            except BrokenProcessPool:
+                                parsed = _prepare_excel_file(excel_path)
+                            result.update(parse_sec=parsed["parse_sec"], validate_sec=parsed["validate_sec"],
+                                          total_rows=parsed["prepared"]["total_rows"])
+                        
+                            t0 = time.perf_counter()
+                            inserted, updated, skipped, validation_errors, _, _ = self.apply_prepared_products(
+                                parsed["prepared"], excel_filename
+                            )
+                            self.insert_metadata(
+                                excel_filename=excel_filename,
+                                excel_path=excel_path,
+                                total_rows=parsed["prepared"]["total_rows"],
+                                processed_rows=inserted + updated,
+                                notes="배치 처리"
+                            )
+                            result.update(inserted=inserted, updated=updated, skipped=skipped,
+                                          validation_errors=validation_errors,
+                                          insert_sec=time.perf_counter() - t0)
+                    except Exception as e:
+                        self.conn.rollback()
+                        result["status"] = "error"
+                        result["error"] = str(e)
+                    results.append(result)
+                    if file_callback:
+                        file_callback(index, result)
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+        return results
+    
     def check_excel_filename_exists(self, excel_filename: str) -> bool:
         """동일한 excel_filename이 metadata 테이블에 존재하는지 확인"""
         cursor = self.conn.cursor()
@@ -590,6 +758,21 @@ class SQLiteDBManager:
         self.conn.commit()
 
 
+def _prepare_excel_file(excel_path: str) -> Dict[str, Any]:
+    """
+    엑셀 파일 1개 읽기 + 변환/검증 (프로세스 풀 작업 - DB 연결 없음)
+    
+    Returns:
+        {"path", "parse_sec", "validate_sec", "prepared"}
+    """
+    t0 = time.perf_counter()
+    df = read_sheet(excel_path)
+    t1 = time.perf_counter()
+    prepared = SQLiteDBManager("").prepare_products(df)  # 검증만 사용 (DB 연결 안 함)
+    t2 = time.perf_counter()
+    return {"path": excel_path, "parse_sec": t1 - t0, "validate_sec": t2 - t1, "prepared": prepared}
+
+
 # ========================================================
 # GUI Class
 # ========================================================
@@ -961,12 +1144,12 @@ class SQLiteConverterGUI(tk.Tk):
         try:
             self.excel_file_path.set(path)
             # 엑셀 파일 미리 읽어서 컬럼 확인
-            self.df = pd.read_excel(path, nrows=0)  # 헤더만 읽기
+            self.df = read_sheet(path, nrows=0)  # 헤더만 읽기
             self._log(f"엑셀 파일 선택됨: {os.path.basename(path)}")
             self._log(f"컬럼 수: {len(self.df.columns)}개")
             
             # 미리보기 데이터 로드 (최대 10행)
-            self.preview_df = pd.read_excel(path, nrows=10)
+            self.preview_df = read_sheet(path, nrows=10)
             self._update_preview()
             # 미리보기 프레임 표시
             self.preview_frame.pack(fill='both', expand=True, pady=(0, 10), before=self.log_frame)
@@ -1093,7 +1276,7 @@ class SQLiteConverterGUI(tk.Tk):
             self.after(0, lambda: self.progress_label_var.set("엑셀 파일 읽는 중..."))
             self._log("엑셀 파일 읽는 중...")
             
-            df = pd.read_excel(excel_path)
+            df = read_sheet(excel_path)
             total_rows = len(df)
             self._log(f"엑셀 총 행 수: {total_rows}건")
             
@@ -1331,7 +1514,7 @@ class SQLiteConverterGUI(tk.Tk):
             # 1. 엑셀 파일 읽기
             self.after(0, lambda: self.progress_label_var.set("엑셀 파일 읽는 중..."))
             self._log("엑셀 파일 읽는 중...")
-            self.df = pd.read_excel(excel_path)
+            self.df = read_sheet(excel_path)
             total_rows = len(self.df)
             self._log(f"총 {total_rows}행 읽기 완료")
             
@@ -1561,48 +1744,43 @@ class SQLiteConverterGUI(tk.Tk):
             db_manager.connect()
             db_manager.create_tables()
             
+            # 파일별 결과 로그 (파일 읽기/검증은 프로세스 풀에서 병렬, DB 기록은 이 스레드에서 파일 순서대로)
+            total_files = len(self.excel_files)
+            
+            def file_callback(idx, result):
+                nonlocal total_inserted, total_updated, total_skipped, total_errors
+                excel_filename = result["filename"]
+                self._log(f"\n[{idx + 1}/{total_files}] {excel_filename}")
+                self.after(0, lambda p=((idx + 1) / total_files) * 100: self.progress_var.set(p))
+                self.after(0, lambda f=excel_filename: self.progress_label_var.set(f"처리 완료: {f}"))
+                
+                if result["status"] == "duplicate":
+                    self._log(f"❌ 입고 거부: {excel_filename} (동일한 파일명이 이미 존재함)")
+                    total_errors += 1
+                elif result["status"] == "error":
+                    self._log(f"❌ 오류: {result['error']}")
+                    total_errors += 1
+                else:
+                    total_inserted += result["inserted"]
+                    total_updated += result["updated"]
+                    total_skipped += result["skipped"]
+                    total_errors += result["validation_errors"]
+                    self._log(f"✅ 완료: 신규 {result['inserted']}건, 업데이트 {result['updated']}건")
+                    self._log(f"   ⏱ 읽기 {result['parse_sec']:.2f}초 / 검증 {result['validate_sec']:.2f}초 / "
+                              f"DB 기록 {result['insert_sec']:.2f}초 ({result['total_rows']}행)")
+            
+            batch_start = time.perf_counter()
             try:
-                for idx, excel_path in enumerate(self.excel_files):
-                    excel_filename = os.path.basename(excel_path)
-                    self._log(f"\n[{idx + 1}/{len(self.excel_files)}] {excel_filename} 처리 중...")
-                    self.after(0, lambda p=((idx + 1) / len(self.excel_files)) * 100: self.progress_var.set(p))
-                    self.after(0, lambda f=excel_filename: self.progress_label_var.set(f"처리 중: {f}"))
-                    
-                    try:
-                        # 중복 파일명 체크
-                        if db_manager.check_excel_filename_exists(excel_filename):
-                            self._log(f"❌ 입고 거부: {excel_filename} (동일한 파일명이 이미 존재함)")
-                            total_errors += 1
-                            continue
-                        
-                        df = pd.read_excel(excel_path)
-                        
-                        inserted, updated, skipped, validation_errors, _, _ = db_manager.insert_products(
-                            df, excel_filename
-                        )
-                        
-                        total_inserted += inserted
-                        total_updated += updated
-                        total_skipped += skipped
-                        total_errors += validation_errors
-                        
-                        db_manager.insert_metadata(
-                            excel_filename=excel_filename,
-                            excel_path=excel_path,
-                            total_rows=len(df),
-                            processed_rows=inserted + updated,
-                            notes="배치 처리"
-                        )
-                        
-                        self._log(f"✅ 완료: 신규 {inserted}건, 업데이트 {updated}건")
-                        
-                    except Exception as e:
-                        self._log(f"❌ 오류: {e}")
-                        total_errors += 1
+                results = db_manager.insert_excel_files(self.excel_files, file_callback=file_callback)
             finally:
                 # 모든 파일 처리 후 DB 연결 종료
                 db_manager.close()
             
+            self._log(f"\n⏱ 전체 소요 {time.perf_counter() - batch_start:.2f}초 "
+                      f"(읽기 합계 {sum(r['parse_sec'] for r in results):.2f}초, "
+                      f"검증 합계 {sum(r['validate_sec'] for r in results):.2f}초, "
+                      f"DB 기록 합계 {sum(r['insert_sec'] for r in results):.2f}초)")
+            
             self.after(0, lambda: self.progress_var.set(100))
             self.after(0, lambda: self.progress_label_var.set("완료"))
             
@@ -1690,6 +1868,8 @@ class SQLiteConverterGUI(tk.Tk):
 
 if __name__ == "__main__":
     import sys
+    import multiprocessing
+    multiprocessing.freeze_support()  # 배치 입고 프로세스 풀 (exe 빌드 시 필요)
     app = SQLiteConverterGUI()
     app.mainloop()
 
@@ -0,0 +1,403 @@
+"""
+database/bulk_load.py
+
+대량 적재 모드 (초기 조합 생성 / 대량 입고 / 마이그레이션)
+- 적재 대상 테이블의 보조 인덱스를 적재 전에 지우고, 끝난 뒤 한 번에 다시 만들고 ANALYZE
+  (행마다 인덱스 여러 개를 갱신하는 대신 적재 후 정렬 한 번으로 생성)
+- 적재 중 연결 설정: synchronous=OFF, 큰 페이지 캐시, temp_store=MEMORY (끝나면 원래 값으로 복원)
+- 그대로 두는 인덱스
+  - UNIQUE 제약 인덱스(sqlite_autoindex_*): INSERT OR IGNORE 중복 방지에 필요
+  - keep 으로 지정한 인덱스 (기본: idx_products_code - 입고 중 상품코드 조회/업데이트에 사용)
+- 중단 대비
+  - 지울 인덱스의 CREATE 문을 bulk_load_deferred_indexes 에 먼저 커밋한 뒤 DROP
+  - 적재 중 예외 → with 블록을 나가면서 바로 재생성
+  - 프로세스가 죽음 → 다음 DBHandler 연결(create_tables) 때 recover_bulk_load 가 재생성
+  - 진행 중인 적재는 <DB경로>.bulk_load.lock 파일 잠금으로 표시 (다른 연결이 적재 도중에 복구하지 않음,
+    프로세스가 죽으면 OS가 잠금을 풀어줌)
+  - 적재 중 다른 연결의 create_tables 는 인덱스 생성을 건너뜀 (bulk_load_guard - 지운 인덱스를 다시 만들지 않음)
+- 주의: synchronous=OFF 동안 OS 다운/정전이 나면 적재 중이던 데이터가 손상될 수 있음 (앱 종료/예외는 안전)
+
+사용 예시:
+    with db_handler.bulk_load(["product_combinations", "combination_assignments"]):
+        db_handler.generate_and_save_product_combinations()
+
+검증 / 벤치마크:
+    python -m database.bulk_load --check
+    python -m database.bulk_load --bench 20000
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+# 적재 중에도 유지할 인덱스 (적재 코드가 조회에 사용)
+BULK_LOAD_KEEP_INDEXES = ("idx_products_code",)
+
+# 적재 중 페이지 캐시 크기 (KiB → PRAGMA cache_size=-KiB)
+BULK_LOAD_CACHE_KIB = 256 * 1024
+
+STATE_TABLE = "bulk_load_deferred_indexes"
+
+
+# =========================
+# 진행 중 표시 (파일 잠금)
+# =========================
+
+class _BulkLoadLock:
+    """<DB경로>.bulk_load.lock 배타 잠금 (비차단). 프로세스가 죽으면 OS가 해제"""
+
+    def __init__(self, db_path: str):
+        self.path = f"{db_path}.bulk_load.lock" if db_path and db_path != ":memory:" else None
+        self._file = None
+
+    def acquire(self) -> bool:
+        if self.path is None:
+            return True
+        f = open(self.path, "a+b")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if os.name == "nt":
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        except OSError:
+            pass
+        self._file.close()
+        self._file = None
+
+
+# =========================
+# 인덱스 보류 / 재생성
+# =========================
+
+def _ensure_state_table(conn: sqlite3.Connection) -> None:
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            name TEXT PRIMARY KEY,
+            tbl_name TEXT NOT NULL,
+            sql TEXT NOT NULL,
+            deferred_at TEXT
+        )
+    """)
+
+
+def _has_deferred(conn: sqlite3.Connection) -> bool:
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (STATE_TABLE,))
+    if cursor.fetchone() is None:
+        return False
+    cursor.execute(f"SELECT 1 FROM {STATE_TABLE} LIMIT 1")
+    return cursor.fetchone() is not None
+
+
+def defer_indexes(conn: sqlite3.Connection, tables: Iterable[str], keep: Iterable[str] = BULK_LOAD_KEEP_INDEXES) -> List[str]:
+    """tables 의 보조 인덱스 CREATE 문을 기록(커밋)한 뒤 DROP. 지운 인덱스 이름 반환"""
+    tables = list(tables)
+    if not tables:
+        return []
+    keep = set(keep)
+    cursor = conn.cursor()
+    placeholders = ", ".join("?" * len(tables))
+    cursor.execute(f"""
+        SELECT name, tbl_name, sql FROM sqlite_master
+        WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+        ORDER BY tbl_name, name
+    """, tables)
+    indexes = [row for row in cursor.fetchall() if row[0] not in keep]
+    if not indexes:
+        return []
+
+    _ensure_state_table(conn)
+    now = datetime.now().isoformat()
+    cursor.executemany(f"INSERT OR REPLACE INTO {STATE_TABLE} (name, tbl_name, sql, deferred_at) VALUES (?, ?, ?, ?)",
+                       [(name, tbl_name, sql, now) for name, tbl_name, sql in indexes])
+    conn.commit()  # 기록이 먼저 남아야 DROP 후 중단돼도 복구 가능
+
+    for name, _, _ in indexes:
+        cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+    conn.commit()
+    return [name for name, _, _ in indexes]
+
+
+def rebuild_deferred_indexes(conn: sqlite3.Connection, analyze: bool = True) -> List[str]:
+    """기록된 인덱스 중 없는 것을 다시 만들고 해당 테이블 ANALYZE 후 기록 삭제. 만든 인덱스 이름 반환"""
+    if not _has_deferred(conn):
+        return []
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT name, tbl_name, sql FROM {STATE_TABLE} ORDER BY tbl_name, name")
+    deferred = cursor.fetchall()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    existing = {row[0] for row in cursor.fetchall()}
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    tables = {row[0] for row in cursor.fetchall()}
+
+    created = []
+    analyzed = set()
+    for name, tbl_name, sql in deferred:
+        if tbl_name not in tables:
+            continue  # 적재 중 테이블이 없어졌으면 기록만 정리
+        if name not in existing:
+            cursor.execute(sql)
+            created.append(name)
+        analyzed.add(tbl_name)
+    if analyze:
+        for tbl_name in sorted(analyzed):
+            cursor.execute(f'ANALYZE "{tbl_name}"')
+    cursor.execute(f"DELETE FROM {STATE_TABLE}")
+    conn.commit()
+    return created
+
+
+@contextmanager
+def bulk_load_guard(db_path: str):
+    """
+    대량 적재 중인지 확인하고, 아니면 with 블록 동안 잠금을 잡음 (그 사이 적재가 시작되지 않음)
+    - as 값: True = 적재 중 아님 (블록 안에서 인덱스를 만들어도 됨), False = 다른 연결이 적재 중
+    """
+    lock = _BulkLoadLock(db_path)
+    idle = lock.acquire()
+    try:
+        yield idle
+    finally:
+        if idle:
+            lock.release()
+
+
+def recover_bulk_load(conn: sqlite3.Connection, db_path: str) -> List[str]:
+    """
+    중단된 대량 적재 복구 (DBHandler.create_tables 에서 호출)
+    - 보류 기록이 없으면 바로 반환 (조회 1~2번)
+    - 다른 연결이 적재 중이면(잠금) 건드리지 않음
+    """
+    if not _has_deferred(conn):
+        return []
+    lock = _BulkLoadLock(db_path)
+    if not lock.acquire():
+        return []
+    try:
+        return rebuild_deferred_indexes(conn)
+    finally:
+        lock.release()
+
+
+# =========================
+# 대량 적재 모드
+# =========================
+
+class BulkLoad:
+    """
+    with 문으로 쓰는 대량 적재 모드
+    - 들어갈 때: 이전 중단분 복구 → 인덱스 보류 → 연결 설정 변경
+    - 나갈 때 (예외 포함): 미커밋 작업 커밋(예외면 롤백) → 연결 설정 복원 → 인덱스 재생성 + ANALYZE
+    - 적재 코드의 커밋 단위는 그대로 (synchronous=OFF 라 커밋 비용이 작고, 적재 중에도 다른 연결이 쓸 수 있음)
+    """
+
+    def __init__(self, conn: sqlite3.Connection, db_path: str, tables: Iterable[str],
+                 keep: Iterable[str] = BULK_LOAD_KEEP_INDEXES, cache_kib: int = BULK_LOAD_CACHE_KIB):
+        self.conn = conn
+        self.db_path = db_path
+        self.tables = list(tables)
+        self.keep = tuple(keep)
+        self.cache_kib = cache_kib
+        self.deferred: List[str] = []
+        self.rebuilt: List[str] = []
+        self._lock = _BulkLoadLock(db_path)
+        self._saved_pragmas: Optional[dict] = None
+
+    def __enter__(self) -> "BulkLoad":
+        if not self._lock.acquire():
+            raise RuntimeError("다른 대량 적재가 진행 중입니다 (잠시 후 다시 시도하세요)")
+        try:
+            self.conn.commit()
+            rebuild_deferred_indexes(self.conn, analyze=False)  # 이전에 중단된 적재가 있으면 먼저 정리
+            self.deferred = defer_indexes(self.conn, self.tables, self.keep)
+            cursor = self.conn.cursor()
+            self._saved_pragmas = {
+                name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in ("synchronous", "cache_size", "temp_store")
+            }
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute(f"PRAGMA cache_size=-{int(self.cache_kib)}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+        except Exception:
+            try:
+                rebuild_deferred_indexes(self.conn, analyze=False)
+            finally:
+                self._lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+            if self._saved_pragmas:
+                cursor = self.conn.cursor()
+                for name, value in self._saved_pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={int(value)}")
+            self.rebuilt = rebuild_deferred_indexes(self.conn)
+        finally:
+            self._lock.release()
+        return False
+
+
+# =========================
+# 검증 / 벤치마크
+# =========================
+
+def _populate_named(handler, rows: int, names: int = 5, seed: int = 5) -> None:
+    """조합 생성용 products (상품명 names개 + 누끼/믹스 URL)"""
+    import json
+    import random
+
+    rng = random.Random(seed)
+    name_json = json.dumps([f"상품명 {i}" for i in range(names)], ensure_ascii=False)
+    cursor = handler.conn.cursor()
+    cursor.executemany(
+        """INSERT INTO products (상품코드, 카테고리명, product_status, product_names_json, 누끼url, 믹스url)
+           VALUES (?, ?, 'ACTIVE', ?, ?, ?)""",
+        [(f"P{i:07d}", f"대{rng.randrange(12)}>중{rng.randrange(10)}>소0", name_json,
+          f"http://n/{i}" if rng.random() > 0.2 else "", f"http://m/{i}" if rng.random() > 0.2 else "")
+         for i in range(rows)],
+    )
+    handler.conn.commit()
+
+
+def _index_names(conn: sqlite3.Connection, table: str) -> List[str]:
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name = ? ORDER BY name",
+                   (table,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _run(rows: int, bench: bool) -> None:
+    import shutil
+    import subprocess
+    import sys
+    import tempfile
+    import time
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database.db_handler import DBHandler
+
+    tmp_dir = tempfile.mkdtemp(prefix="bulk_load_")
+    base_path = os.path.join(tmp_dir, "base.db")
+    handler = DBHandler(base_path)
+    handler.connect()
+    t0 = time.time()
+    _populate_named(handler, rows)
+    expected_indexes = _index_names(handler.conn, "product_combinations")
+    handler.close()
+    print(f"[준비] products {rows:,}행 {time.time() - t0:.1f}초 / product_combinations 보조 인덱스 {len(expected_indexes)}개")
+
+    def combos(conn):
+        cursor = conn.cursor()
+        cursor.execute("""SELECT product_code, combination_index, url_type, line_index, product_name, nukki_url, mix_url
+                          FROM product_combinations ORDER BY product_code, combination_index""")
+        return cursor.fetchall()
+
+    timings = {}
+    results = {}
+    for mode in ("normal", "bulk"):
+        db_path = os.path.join(tmp_dir, f"{mode}.db")
+        shutil.copy(base_path, db_path)
+        h = DBHandler(db_path)
+        h.connect()
+        t0 = time.time()
+        if mode == "bulk":
+            with h.bulk_load(["product_combinations", "combination_assignments"]) as load:
+                total = h.generate_and_save_product_combinations()
+            assert sorted(load.rebuilt) == sorted(load.deferred), "보류한 인덱스가 모두 다시 만들어지지 않음"
+        else:
+            total = h.generate_and_save_product_combinations()
+        timings[mode] = time.time() - t0
+        results[mode] = combos(h.conn)
+        assert _index_names(h.conn, "product_combinations") == expected_indexes, f"{mode}: 인덱스 목록 불일치"
+        if mode == "bulk":
+            stat = h.conn.execute("SELECT COUNT(*) FROM sqlite_stat1 WHERE tbl = 'product_combinations'").fetchone()[0]
+            assert stat > 0, "ANALYZE 결과 없음"
+            assert h.conn.execute("PRAGMA synchronous").fetchone()[0] == 1, "synchronous 복원 안 됨"
+            assert h.conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        h.close()
+        print(f"[{mode}] 조합 {total:,}개 생성 {timings[mode]:.2f}초")
+    assert results["normal"] == results["bulk"], "일반/대량 적재 결과 불일치"
+    print("[검증] 조합 결과 동일, 인덱스 재생성 + ANALYZE + 설정 복원 OK")
+
+    # 적재 도중 프로세스 강제 종료 → 다음 연결에서 인덱스 복구
+    crash_path = os.path.join(tmp_dir, "crash.db")
+    shutil.copy(base_path, crash_path)
+    db_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = (
+        "import os, sys; sys.path.insert(0, sys.argv[2]);"
+        "from database.db_handler import DBHandler;"
+        "h = DBHandler(sys.argv[1]); h.connect();"
+        "load = h.bulk_load(['product_combinations']); load.__enter__();"
+        "h.conn.execute(\"INSERT INTO product_combinations (product_code, combination_index, url_type, line_index, product_name) "
+        "VALUES ('X', 0, 'mix', 0, 'x')\"); h.conn.commit();"
+        "print('ready', flush=True); sys.stdin.readline(); os._exit(1)"
+    )
+    proc = subprocess.Popen([sys.executable, "-c", script, crash_path, db_dir],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    while proc.stdout.readline().strip() != "ready":  # import 시 안내 메시지는 건너뜀
+        assert proc.poll() is None, "적재 프로세스 실패"
+    # 적재 중인 동안 다른 연결은 복구하지 않고, create_tables 도 보류된 인덱스를 다시 만들지 않음
+    other = sqlite3.connect(crash_path)
+    assert recover_bulk_load(other, crash_path) == [], "적재 중인데 복구가 실행됨"
+    assert _has_deferred(other), "보류 기록이 없음"
+    other.close()
+    during = _index_names(sqlite3.connect(crash_path), "product_combinations")
+    other_handler = DBHandler(crash_path)
+    other_handler.connect()  # create_tables
+    assert _index_names(other_handler.conn, "product_combinations") == during, "적재 중 create_tables 가 인덱스를 다시 만듦"
+    assert _has_deferred(other_handler.conn), "적재 중 create_tables 가 보류 기록을 지움"
+    other_handler.close()
+    proc.stdin.write("\n")
+    proc.stdin.flush()
+    proc.wait()
+    h = DBHandler(crash_path)
+    h.connect()  # create_tables → recover_bulk_load
+    assert _index_names(h.conn, "product_combinations") == expected_indexes, "강제 종료 후 인덱스 복구 안 됨"
+    assert not _has_deferred(h.conn), "보류 기록이 남아 있음"
+    assert h.conn.execute("SELECT COUNT(*) FROM product_combinations WHERE product_code = 'X'").fetchone()[0] == 1
+    h.close()
+    print("[검증] 적재 중 강제 종료 → 적재 중에는 복구/인덱스 생성 안 함, 다음 연결에서 인덱스 복구 OK")
+
+    if bench:
+        print(f"[BENCH] 조합 전체 생성: 일반 {timings['normal']:.2f}초 / 대량 적재 모드 {timings['bulk']:.2f}초 "
+              f"(x{timings['normal'] / max(timings['bulk'], 1e-9):.1f})")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="대량 적재 모드 검증 / 벤치마크")
+    parser.add_argument("--check", action="store_true", help="일반 적재와 결과 비교 + 강제 종료 복구 (작은 임시 DB)")
+    parser.add_argument("--bench", type=int, default=0, metavar="ROWS", help="products ROWS행으로 조합 생성 시간 측정")
+    args = parser.parse_args()
+    if not args.check and not args.bench:
+        parser.print_help()
+    else:
+        _run(rows=args.bench or 2000, bench=bool(args.bench))
@@ -0,0 +1,311 @@
+"""
+database/category_paths.py
+
+카테고리 경로 인덱스 + 메모리 트라이
+- category_paths : products.카테고리명 의 고유 값 사전 (대/중 컬럼 인덱스 포함)
+                   products INSERT / 카테고리명 UPDATE 트리거로 추가 (순수 SQL, data_entry 연결도 반영)
+- CategoryTrie   : '대>중>소>세부' 를 단계별로 나눈 트라이
+                   '대 > 중' 같은 접두 경로를 정확한 카테고리명 목록으로 바꿔
+                   LIKE '%...%' 전체 스캔 대신 idx_products_category_status 인덱스 탐색으로 조회
+
+쿼리 플랜 확인 / 벤치마크:
+    python -m database.category_paths --check
+    python -m database.category_paths --bench 1000000
+"""
+
+import json
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database.category_stats import large_category_sql, medium_category_sql
+
+# products 조회에서 카테고리 조건으로 쓰는 SQL (파라미터 1개 = 카테고리명 JSON 배열)
+CATEGORY_IN_SQL = "카테고리명 IN (SELECT value FROM json_each(?))"
+
+# DBHandler 카테고리 조회 SQL (쿼리 플랜 확인도 같은 SQL 사용)
+# get_products_by_category: (카테고리 JSON, 상태)
+PRODUCTS_BY_CATEGORY_SQL = f"""
+    SELECT * FROM products 
+    WHERE {CATEGORY_IN_SQL} AND product_status = ?
+"""
+# get_products_for_upload: (카테고리 JSON, 상태) - 같은 값의 행은 하나로 (대표 id = 가장 작은 id)
+UPLOAD_PRODUCTS_SQL = f"""
+    SELECT p.상품코드, p.원본상품명, p.ST3_결과상품명, p.ST1_정제상품명, p.카테고리명, MIN(p.id)
+    FROM products p
+    WHERE p.{CATEGORY_IN_SQL} 
+    AND p.product_status = ?
+    AND p.product_names_json IS NOT NULL 
+    AND p.product_names_json != '' 
+    AND p.product_names_json != '[]'
+    GROUP BY p.상품코드, p.원본상품명, p.ST3_결과상품명, p.ST1_정제상품명, p.카테고리명
+    ORDER BY p.카테고리명, MIN(p.id)
+"""
+# get_incomplete_products: (상태) - 누끼url, 믹스url, product_names_json 중 1개라도 누락이면 미완료
+INCOMPLETE_PRODUCTS_SQL = """
+    SELECT * FROM products 
+    WHERE product_status = ?
+    AND (
+        (누끼url IS NULL OR 누끼url = '')
+        OR (믹스url IS NULL OR 믹스url = '')
+        OR (product_names_json IS NULL OR product_names_json = '' OR product_names_json = '[]')
+    )
+"""
+
+
+def with_category_filter(sql: str) -> str:
+    """첫 WHERE 에 카테고리 조건 추가 (파라미터 맨 앞에 카테고리 JSON 추가 필요)"""
+    return sql.replace("WHERE", f"WHERE {CATEGORY_IN_SQL} AND", 1)
+
+
+def split_category_path(category: str) -> Tuple[str, ...]:
+    """'대>중>소>세부' / '대 > 중' → ('대', '중', ...) (빈 단계 제외)"""
+    return tuple(part.strip() for part in (category or "").split(">") if part.strip())
+
+
+def category_param(categories: Iterable[str]) -> str:
+    """CATEGORY_IN_SQL 에 넘길 JSON 배열 파라미터"""
+    return json.dumps(list(categories), ensure_ascii=False)
+
+
+# =========================
+# 트라이
+# =========================
+
+class _TrieNode:
+    __slots__ = ("children", "categories")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.categories: List[str] = []  # 이 노드에서 끝나는 카테고리명 (원문 그대로)
+
+
+class CategoryTrie:
+    """카테고리 경로 트라이 (단계 단위 접두 검색)"""
+
+    def __init__(self, categories: Iterable[str] = ()):
+        self.root = _TrieNode()
+        self.size = 0
+        self._resolve_cache: Dict[Tuple[str, ...], List[str]] = {}
+        for category in categories:
+            self.add(category)
+
+    def add(self, category: str) -> None:
+        levels = split_category_path(category)
+        if not levels:
+            return
+        node = self.root
+        for level in levels:
+            node = node.children.setdefault(level, _TrieNode())
+        node.categories.append(category)
+        self.size += 1
+        self._resolve_cache.clear()
+
+    def resolve(self, prefix: str) -> List[str]:
+        """
+        접두 경로 아래의 모든 카테고리명
+        - '대 > 중' → '대>중', '대>중>소>세부', ... (단계가 정확히 같은 것만, 비슷한 이름은 제외)
+        """
+        levels = split_category_path(prefix)
+        if not levels:
+            return []
+        cached = self._resolve_cache.get(levels)
+        if cached is not None:
+            return cached
+        node = self.root
+        for level in levels:
+            node = node.children.get(level)
+            if node is None:
+                self._resolve_cache[levels] = []
+                return []
+        result: List[str] = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            result.extend(current.categories)
+            stack.extend(current.children.values())
+        result.sort()
+        self._resolve_cache[levels] = result
+        return result
+
+    def large_medium_tree(self, only: Optional[set] = None) -> Dict[str, Dict[str, List[str]]]:
+        """{대: {중: [카테고리명, ...]}} (only 가 있으면 그 카테고리만)"""
+        tree: Dict[str, Dict[str, List[str]]] = {}
+        for large, large_node in self.root.children.items():
+            for medium, medium_node in large_node.children.items():
+                names = [c for c in self.resolve(f"{large}>{medium}") if only is None or c in only]
+                if names:
+                    tree.setdefault(large, {})[medium] = names
+        return tree
+
+
+# =========================
+# 테이블 / 트리거
+# =========================
+
+def ensure_category_paths(conn: sqlite3.Connection) -> bool:
+    """
+    category_paths 테이블/트리거 생성
+    Returns: 이번에 새로 만들어 기존 products 로 채웠으면 True
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'category_paths'")
+    existed = cursor.fetchone() is not None
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS category_paths (
+            카테고리명 TEXT PRIMARY KEY,
+            large_category TEXT NOT NULL,
+            medium_category TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_category_paths_large_medium
+        ON category_paths(large_category, medium_category)
+    """)
+    add_new = f"""
+        INSERT OR IGNORE INTO category_paths (카테고리명, large_category, medium_category)
+        SELECT NEW.카테고리명, {large_category_sql("NEW.카테고리명")}, {medium_category_sql("NEW.카테고리명")}
+        WHERE COALESCE(NEW.카테고리명, '') != '';
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_category_paths_products_insert
+        AFTER INSERT ON products
+        BEGIN
+            {add_new}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_category_paths_products_update
+        AFTER UPDATE OF 카테고리명 ON products
+        BEGIN
+            {add_new}
+        END
+    """)
+    if not existed:
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO category_paths (카테고리명, large_category, medium_category)
+            SELECT 카테고리명, {large_category_sql("카테고리명")}, {medium_category_sql("카테고리명")}
+            FROM (SELECT DISTINCT 카테고리명 FROM products WHERE COALESCE(카테고리명, '') != '')
+        """)
+    conn.commit()
+    return not existed
+
+
+def load_category_trie(conn: sqlite3.Connection) -> Tuple[CategoryTrie, int]:
+    """category_paths 전체로 트라이 생성. Returns: (트라이, 행 수 = 변경 감지용 스탬프)"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT 카테고리명 FROM category_paths")
+    names = [row[0] for row in cursor.fetchall()]
+    return CategoryTrie(names), len(names)
+
+
+def category_paths_stamp(conn: sqlite3.Connection) -> int:
+    """category_paths 행 수 (추가만 되므로 바뀌었으면 트라이를 다시 읽음)"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM category_paths")
+    return cursor.fetchone()[0]
+
+
+# =========================
+# 쿼리 플랜 확인 / 벤치마크
+# =========================
+
+def _query_plans(handler) -> Dict[str, str]:
+    """DBHandler 카테고리 조회 SQL 의 EXPLAIN QUERY PLAN"""
+    param = category_param(handler.resolve_categories("대1 > 중2"))
+    queries = {
+        "get_products_by_category": (PRODUCTS_BY_CATEGORY_SQL, [param, "ACTIVE"]),
+        "get_products_for_upload": (UPLOAD_PRODUCTS_SQL, [param, "ACTIVE"]),
+        "get_incomplete_products": (with_category_filter(INCOMPLETE_PRODUCTS_SQL), [param, "ACTIVE"]),
+    }
+    plans = {}
+    cursor = handler.conn.cursor()
+    for name, (sql, params) in queries.items():
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        plans[name] = " | ".join(row[3] for row in cursor.fetchall())
+    return plans
+
+
+def _populate(handler, rows: int, seed: int = 3) -> None:
+    import random
+
+    rng = random.Random(seed)
+    categories = [f"대{a}>중{b}>소{c}>세부{d}" for a in range(12) for b in range(10) for c in range(6) for d in range(3)]
+    # 비슷한 이름 (LIKE '%대1%>%중2%' 는 이것들까지 잡음)
+    categories += [f"대1{a}>중2{b}>소0" for a in range(3) for b in range(3)]
+    cursor = handler.conn.cursor()
+    batch = []
+    for i in range(rows):
+        batch.append((f"P{i:07d}", rng.choice(categories), "ACTIVE" if rng.random() > 0.05 else "DELETED",
+                      '["상품명"]' if rng.random() > 0.2 else "", "http://n" if rng.random() > 0.3 else "", "http://m"))
+        if len(batch) >= 50000:
+            cursor.executemany("""INSERT INTO products (상품코드, 카테고리명, product_status, product_names_json, 누끼url, 믹스url)
+                                  VALUES (?, ?, ?, ?, ?, ?)""", batch)
+            batch.clear()
+    if batch:
+        cursor.executemany("""INSERT INTO products (상품코드, 카테고리명, product_status, product_names_json, 누끼url, 믹스url)
+                              VALUES (?, ?, ?, ?, ?, ?)""", batch)
+    handler.conn.commit()
+
+
+def _run(check_rows: int, bench_rows: int) -> None:
+    import os
+    import sys
+    import tempfile
+    import time
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database.db_handler import DBHandler
+
+    rows = bench_rows or check_rows
+    handler = DBHandler(os.path.join(tempfile.mkdtemp(prefix="category_paths_"), "bench.db"))
+    handler.connect()
+    t0 = time.time()
+    _populate(handler, rows)
+    print(f"[준비] products {rows:,}행 삽입 {time.time() - t0:.1f}초, 카테고리 {category_paths_stamp(handler.conn):,}개")
+
+    plans = _query_plans(handler)
+    for name, plan in plans.items():
+        print(f"[PLAN] {name}: {plan}")
+        assert "SEARCH" in plan and "idx_products_category_status" in plan, f"{name}: 인덱스 탐색이 아님"
+    print("[PLAN] OK  모든 카테고리 조회가 idx_products_category_status 인덱스 탐색")
+
+    # 결과 비교: 트라이 해석은 단계가 정확히 같은 카테고리만 (LIKE 는 '대1x>중2y' 도 포함)
+    resolved = set(handler.resolve_categories("대1 > 중2"))
+    assert resolved and all(c.startswith("대1>중2>") for c in resolved)
+    cursor = handler.conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM products WHERE 카테고리명 LIKE ? AND product_status = 'ACTIVE'", ("%대1%>%중2%",))
+    like_count = cursor.fetchone()[0]
+    new_count = len(handler.get_products_by_category("대1 > 중2"))
+    print(f"[결과] LIKE '%대1%>%중2%' {like_count:,}행 (비슷한 이름 포함) → 경로 인덱스 {new_count:,}행")
+
+    if bench_rows:
+        keys = [f"대{a} > 중{b}" for a in range(12) for b in range(10)][:40]
+        t0 = time.time()
+        for key in keys:
+            cursor.execute("SELECT COUNT(*) FROM products WHERE 카테고리명 LIKE ? AND product_status = 'ACTIVE'",
+                           ("%{}%>%{}%".format(*split_category_path(key)),))
+            cursor.fetchone()
+        t_like = time.time() - t0
+        t0 = time.time()
+        for key in keys:
+            cursor.execute(f"SELECT COUNT(*) FROM products WHERE {CATEGORY_IN_SQL} AND product_status = 'ACTIVE'",
+                           (category_param(handler.resolve_categories(key)),))
+            cursor.fetchone()
+        t_idx = time.time() - t0
+        print(f"[BENCH] 대>중 {len(keys)}개 조회: LIKE {t_like:.2f}초 / 경로 인덱스 {t_idx:.2f}초 "
+              f"(x{t_like / max(t_idx, 1e-9):.1f})")
+    handler.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="카테고리 경로 인덱스 쿼리 플랜 확인 / 벤치마크")
+    parser.add_argument("--check", action="store_true", help="EXPLAIN QUERY PLAN 확인 (작은 임시 DB)")
+    parser.add_argument("--bench", type=int, default=0, metavar="ROWS", help="products ROWS행으로 LIKE 대비 시간 측정")
+    args = parser.parse_args()
+    if not args.check and not args.bench:
+        parser.print_help()
+    else:
+        _run(check_rows=20000, bench_rows=args.bench)
@@ -0,0 +1,397 @@
+"""
+database/category_stats.py
+
+카테고리별 상품 수 집계 테이블 (트리거로 증분 유지)
+- category_product_stats : (카테고리명, 상품코드)별 ACTIVE 행 수 / 상품명·누끼·믹스 보유 행 수
+- category_stats         : 카테고리명별 집계 (행 수, 상품코드 수, 상품명/누끼/믹스 보유 상품코드 수)
+                           + 대/중 카테고리 컬럼 (대>중 롤업 조회용 인덱스)
+- products 의 INSERT / UPDATE / DELETE 트리거로 유지되므로 DBHandler 외 연결(data_entry 등)에서
+  넣은 데이터도 그대로 반영됨 (트리거는 순수 SQL만 사용)
+
+정합성 검사 / 재구축:
+    python -m database.category_stats <DB경로> --check
+    python -m database.category_stats <DB경로> --rebuild
+"""
+
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# IN (...) / VALUES 조회 시 한 번에 넣는 대>중 키 수 (SQLite 변수 개수 제한 고려)
+QUERY_CHUNK_SIZE = 400
+
+# 트리거가 참조하는 products 컬럼 (오래된 DB에 없으면 추가)
+_REQUIRED_PRODUCT_COLUMNS = ("카테고리명", "상품코드", "product_status", "product_names_json", "누끼url", "믹스url")
+
+_WS = "' ' || char(9) || char(10) || char(13)"
+
+
+def large_category_sql(col: str) -> str:
+    """'대>중>소' 에서 대 카테고리 (SQL 식)"""
+    return (f"trim(CASE WHEN instr({col}, '>') > 0 THEN substr({col}, 1, instr({col}, '>') - 1) "
+            f"ELSE {col} END, {_WS})")
+
+
+def medium_category_sql(col: str) -> str:
+    """'대>중>소' 에서 중 카테고리, 없으면 '' (SQL 식)"""
+    rest = f"(CASE WHEN instr({col}, '>') > 0 THEN substr({col}, instr({col}, '>') + 1) ELSE '' END)"
+    return (f"trim(CASE WHEN instr({rest}, '>') > 0 THEN substr({rest}, 1, instr({rest}, '>') - 1) "
+            f"ELSE {rest} END, {_WS})")
+
+
+def _row_flags_sql(r: str) -> Tuple[str, str, str, str]:
+    """products 행(NEW/OLD)의 (ACTIVE 여부, 상품명 보유, 누끼 보유, 믹스 보유) SQL 식"""
+    active = f"({r}.product_status = 'ACTIVE' AND COALESCE({r}.카테고리명, '') != '')"
+    named = f"(COALESCE({r}.product_names_json, '') NOT IN ('', '[]'))"
+    nukki = f"(COALESCE({r}.누끼url, '') != '')"
+    mix = f"(COALESCE({r}.믹스url, '') != '')"
+    return active, named, nukki, mix
+
+
+def split_large_medium(category: str) -> Tuple[str, str]:
+    """'대>중>소>세부' 또는 '대 > 중' → (대, 중) (중이 없으면 '')"""
+    parts = [part.strip() for part in (category or "").split(">")]
+    large = parts[0] if parts else ""
+    medium = parts[1] if len(parts) >= 2 else ""
+    return large, medium
+
+
+# =========================
+# 테이블 / 트리거
+# =========================
+
+def _create_tables(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS category_product_stats (
+            카테고리명 TEXT NOT NULL,
+            상품코드 TEXT NOT NULL,
+            active_rows INTEGER NOT NULL DEFAULT 0,
+            named_rows INTEGER NOT NULL DEFAULT 0,
+            nukki_rows INTEGER NOT NULL DEFAULT 0,
+            mix_rows INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (카테고리명, 상품코드)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS category_stats (
+            카테고리명 TEXT PRIMARY KEY,
+            large_category TEXT NOT NULL,
+            medium_category TEXT NOT NULL,
+            active_rows INTEGER NOT NULL DEFAULT 0,
+            product_count INTEGER NOT NULL DEFAULT 0,
+            named_count INTEGER NOT NULL DEFAULT 0,
+            nukki_count INTEGER NOT NULL DEFAULT 0,
+            mix_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_category_stats_large_medium
+        ON category_stats(large_category, medium_category)
+    """)
+
+
+def _create_triggers(cursor: sqlite3.Cursor) -> None:
+    new_active, new_named, new_nukki, new_mix = _row_flags_sql("NEW")
+    old_active, old_named, old_nukki, old_mix = _row_flags_sql("OLD")
+
+    add_new = f"""
+        INSERT INTO category_product_stats (카테고리명, 상품코드, active_rows, named_rows, nukki_rows, mix_rows)
+        SELECT NEW.카테고리명, COALESCE(NEW.상품코드, ''), 1, {new_named}, {new_nukki}, {new_mix}
+        WHERE {new_active}
+        ON CONFLICT(카테고리명, 상품코드) DO UPDATE SET
+            active_rows = active_rows + 1,
+            named_rows = named_rows + excluded.named_rows,
+            nukki_rows = nukki_rows + excluded.nukki_rows,
+            mix_rows = mix_rows + excluded.mix_rows;
+    """
+    remove_old = f"""
+        UPDATE category_product_stats SET
+            active_rows = active_rows - 1,
+            named_rows = named_rows - {old_named},
+            nukki_rows = nukki_rows - {old_nukki},
+            mix_rows = mix_rows - {old_mix}
+        WHERE {old_active} AND 카테고리명 = OLD.카테고리명 AND 상품코드 = COALESCE(OLD.상품코드, '');
+        DELETE FROM category_product_stats
+        WHERE 카테고리명 = OLD.카테고리명 AND 상품코드 = COALESCE(OLD.상품코드, '') AND active_rows <= 0;
+    """
+
+    # 1) products → category_product_stats
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_category_stats_products_insert
+        AFTER INSERT ON products
+        BEGIN
+            {add_new}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_category_stats_products_delete
+        AFTER DELETE ON products
+        BEGIN
+            {remove_old}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_category_stats_products_update
+        AFTER UPDATE OF 카테고리명, 상품코드, product_status, product_names_json, 누끼url, 믹스url ON products
+        BEGIN
+            {remove_old}
+            {add_new}
+        END
+    """)
+
+    # 2) category_product_stats → category_stats (상품코드 수는 보유 행이 1 이상인 상품코드 수)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_category_stats_codes_insert
+        AFTER INSERT ON category_product_stats
+        BEGIN
+            INSERT INTO category_stats (카테고리명, large_category, medium_category,
+                                        active_rows, product_count, named_count, nukki_count, mix_count)
+            VALUES (NEW.카테고리명, {large_category_sql("NEW.카테고리명")}, {medium_category_sql("NEW.카테고리명")},
+                    NEW.active_rows, 1, NEW.named_rows > 0, NEW.nukki_rows > 0, NEW.mix_rows > 0)
+            ON CONFLICT(카테고리명) DO UPDATE SET
+                active_rows = active_rows + excluded.active_rows,
+                product_count = product_count + 1,
+                named_count = named_count + excluded.named_count,
+                nukki_count = nukki_count + excluded.nukki_count,
+                mix_count = mix_count + excluded.mix_count;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_category_stats_codes_update
+        AFTER UPDATE ON category_product_stats
+        BEGIN
+            UPDATE category_stats SET
+                active_rows = active_rows + NEW.active_rows - OLD.active_rows,
+                named_count = named_count + (NEW.named_rows > 0) - (OLD.named_rows > 0),
+                nukki_count = nukki_count + (NEW.nukki_rows > 0) - (OLD.nukki_rows > 0),
+                mix_count = mix_count + (NEW.mix_rows > 0) - (OLD.mix_rows > 0)
+            WHERE 카테고리명 = NEW.카테고리명;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_category_stats_codes_delete
+        AFTER DELETE ON category_product_stats
+        BEGIN
+            UPDATE category_stats SET
+                active_rows = active_rows - OLD.active_rows,
+                product_count = product_count - 1,
+                named_count = named_count - (OLD.named_rows > 0),
+                nukki_count = nukki_count - (OLD.nukki_rows > 0),
+                mix_count = mix_count - (OLD.mix_rows > 0)
+            WHERE 카테고리명 = OLD.카테고리명;
+            DELETE FROM category_stats WHERE 카테고리명 = OLD.카테고리명 AND product_count <= 0;
+        END
+    """)
+
+
+def ensure_category_stats(conn: sqlite3.Connection) -> bool:
+    """
+    집계 테이블/트리거 생성 (products 테이블이 있어야 함)
+    Returns: 이번에 새로 만들어 전체 재구축했으면 True
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'category_stats'")
+    existed = cursor.fetchone() is not None
+
+    cursor.execute("PRAGMA table_info(products)")
+    existing_cols = {row[1] for row in cursor.fetchall()}
+    for col in _REQUIRED_PRODUCT_COLUMNS:
+        if col not in existing_cols:
+            cursor.execute(f'ALTER TABLE products ADD COLUMN "{col}" TEXT')
+
+    _create_tables(cursor)
+    _create_triggers(cursor)
+    if not existed:
+        rebuild_category_stats(conn, commit=False)
+    conn.commit()
+    return not existed
+
+
+# =========================
+# 재구축 / 정합성 검사
+# =========================
+
+def _expected_code_stats_sql() -> str:
+    active, named, nukki, mix = _row_flags_sql("p")
+    return f"""
+        SELECT p.카테고리명 AS 카테고리명, COALESCE(p.상품코드, '') AS 상품코드,
+               COUNT(*) AS active_rows, SUM({named}) AS named_rows,
+               SUM({nukki}) AS nukki_rows, SUM({mix}) AS mix_rows
+        FROM products p
+        WHERE {active}
+        GROUP BY p.카테고리명, COALESCE(p.상품코드, '')
+    """
+
+
+def _expected_category_stats_sql() -> str:
+    return f"""
+        SELECT 카테고리명, {large_category_sql("카테고리명")} AS large_category, {medium_category_sql("카테고리명")} AS medium_category,
+               SUM(active_rows), COUNT(*), SUM(named_rows > 0), SUM(nukki_rows > 0), SUM(mix_rows > 0)
+        FROM ({_expected_code_stats_sql()})
+        GROUP BY 카테고리명
+    """
+
+
+def rebuild_category_stats(conn: sqlite3.Connection, commit: bool = True) -> int:
+    """products 전체로 집계 테이블 다시 계산. Returns: 카테고리 수"""
+    cursor = conn.cursor()
+    # 재구축 중에는 집계 트리거가 이중으로 더하지 않도록 category_stats 를 마지막에 직접 채움
+    cursor.execute("DROP TRIGGER IF EXISTS trg_category_stats_codes_insert")
+    cursor.execute("DELETE FROM category_product_stats")
+    cursor.execute("DELETE FROM category_stats")
+    cursor.execute(f"""
+        INSERT INTO category_product_stats (카테고리명, 상품코드, active_rows, named_rows, nukki_rows, mix_rows)
+        {_expected_code_stats_sql()}
+    """)
+    cursor.execute(f"""
+        INSERT INTO category_stats (카테고리명, large_category, medium_category,
+                                    active_rows, product_count, named_count, nukki_count, mix_count)
+        {_expected_category_stats_sql()}
+    """)
+    _create_triggers(cursor)
+    if commit:
+        conn.commit()
+    cursor.execute("SELECT COUNT(*) FROM category_stats")
+    return cursor.fetchone()[0]
+
+
+def check_category_stats(conn: sqlite3.Connection) -> List[Tuple[str, tuple, tuple]]:
+    """
+    집계 테이블과 products 재계산 결과 비교
+    Returns: 불일치 목록 [(카테고리명, 집계값, 재계산값)] (빈 리스트면 정상)
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT 카테고리명, large_category, medium_category,
+               active_rows, product_count, named_count, nukki_count, mix_count
+        FROM category_stats
+    """)
+    stored = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+    cursor.execute(_expected_category_stats_sql())
+    expected = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+    mismatches = []
+    for category in sorted(set(stored) | set(expected), key=lambda c: c or ""):
+        if stored.get(category) != expected.get(category):
+            mismatches.append((category, stored.get(category), expected.get(category)))
+    return mismatches
+
+
+# =========================
+# 조회
+# =========================
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _key_filter(keys: List[Tuple[str, str]], alias: str = "") -> Tuple[str, list]:
+    """(대, 중) 키 목록 → WHERE 조건 (중이 ''이면 대 카테고리 전체)"""
+    prefix = f"{alias}." if alias else ""
+    clauses, params = [], []
+    for large, medium in keys:
+        if medium:
+            clauses.append(f"({prefix}large_category = ? AND {prefix}medium_category = ?)")
+            params.extend([large, medium])
+        else:
+            clauses.append(f"{prefix}large_category = ?")
+            params.append(large)
+    return " OR ".join(clauses), params
+
+
+def get_rollup_counts(
+    conn: sqlite3.Connection,
+    categories: Optional[Iterable[str]] = None,
+    column: str = "named_count",
+) -> Dict[str, int]:
+    """
+    대>중 롤업 상품 수 {'대 > 중': 수}
+    - categories 가 None 이면 전체 대>중, 아니면 주어진 카테고리(전체 경로 또는 '대 > 중')만
+    - column: named_count(상품명 보유, 기본) / product_count / nukki_count / mix_count
+    """
+    if column not in ("named_count", "product_count", "nukki_count", "mix_count", "active_rows"):
+        raise ValueError(f"지원하지 않는 집계 컬럼: {column}")
+    cursor = conn.cursor()
+    result: Dict[str, int] = {}
+    if categories is None:
+        cursor.execute(f"""
+            SELECT large_category, medium_category, SUM({column})
+            FROM category_stats
+            GROUP BY large_category, medium_category
+        """)
+        for large, medium, count in cursor.fetchall():
+            result[f"{large} > {medium}" if medium else large] = count or 0
+        return result
+
+    wanted: Dict[Tuple[str, str], List[str]] = {}
+    for category in categories:
+        wanted.setdefault(split_large_medium(category), []).append(category)
+    for chunk in _chunks(list(wanted), QUERY_CHUNK_SIZE):
+        where, params = _key_filter(chunk)
+        cursor.execute(f"""
+            SELECT large_category, medium_category, SUM({column})
+            FROM category_stats
+            WHERE {where}
+            GROUP BY large_category, medium_category
+        """, params)
+        sums: Dict[Tuple[str, str], int] = {}
+        for large, medium, count in cursor.fetchall():
+            sums[(large, medium)] = count or 0
+        for key in chunk:
+            if key[1]:
+                total = sums.get(key, 0)
+            else:
+                total = sum(v for (large, _m), v in sums.items() if large == key[0])
+            for category in wanted[key]:
+                result[category] = total
+    return result
+
+
+def count_distinct_products(conn: sqlite3.Connection, categories: Iterable[str]) -> int:
+    """주어진 대>중 카테고리들에 걸친 상품명 보유 상품코드 수 (카테고리 간 중복 상품코드는 1개로)"""
+    keys = list(dict.fromkeys(split_large_medium(c) for c in categories))
+    if not keys:
+        return 0
+    cursor = conn.cursor()
+    codes = set()
+    for chunk in _chunks(keys, QUERY_CHUNK_SIZE):
+        where, params = _key_filter(chunk, alias="cs")
+        cursor.execute(f"""
+            SELECT DISTINCT cps.상품코드
+            FROM category_stats cs
+            JOIN category_product_stats cps ON cps.카테고리명 = cs.카테고리명
+            WHERE cps.named_rows > 0 AND ({where})
+        """, params)
+        codes.update(row[0] for row in cursor.fetchall() if row[0])
+    return len(codes)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="카테고리 집계 테이블(category_stats) 정합성 검사 / 재구축")
+    parser.add_argument("db_path")
+    parser.add_argument("--check", action="store_true", help="products 재계산 결과와 비교")
+    parser.add_argument("--rebuild", action="store_true", help="집계 테이블 전체 재구축")
+    args = parser.parse_args()
+
+    db = sqlite3.connect(args.db_path)
+    try:
+        if ensure_category_stats(db):
+            print("[category_stats] 새로 생성 후 재구축 완료")
+        if args.rebuild:
+            t0 = time.time()
+            n = rebuild_category_stats(db)
+            print(f"[category_stats] 재구축 완료: 카테고리 {n}개 ({time.time() - t0:.2f}초)")
+        if args.check or not args.rebuild:
+            t0 = time.time()
+            bad = check_category_stats(db)
+            if bad:
+                for category, stored, expected in bad[:50]:
+                    print(f"  불일치: {category}  집계={stored}  재계산={expected}")
+                print(f"[category_stats] 불일치 {len(bad)}건 → --rebuild 로 복구")
+                raise SystemExit(1)
+            print(f"[category_stats] 정합성 OK ({time.time() - t0:.2f}초)")
+    finally:
+        db.close()
@@ -0,0 +1,421 @@
+"""
+database/combination_allocator.py
+
+스토어별 순환식 조합 배정 (메모리 커서)
+- DBHandler.get_next_combination_for_store 와 같은 순서로 조합을 배정하되,
+  상품별 product_combinations / store_combination_state 를 출고 1회당 한 번만 읽음
+- 조합은 상품별 압축 배열(조합 인덱스, url_type 코드, URL 유무 비트)로 보관하고
+  누끼/믹스 번갈아 배정은 메모리에서 계산
+- 변경된 스토어 상태는 flush() 에서 executemany 한 번으로 기록 (커밋은 호출부에서 처리)
+  호출부는 커밋/롤백 뒤에 on_commit() / on_rollback() 을 호출
+  (롤백이면 메모리 커서를 버리고 DB 상태를 다시 읽음 → 롤백된 배정이 다음 배정에 반영되지 않음)
+
+재생 검증 (기존 get_next_combination_for_store 와 배정 순서 비교):
+    python -m database.combination_allocator --check
+"""
+
+import sqlite3
+from array import array
+from bisect import bisect_left
+from typing import Optional, Dict, List, Tuple, Iterable
+
+# url_type 코드 (압축 배열용)
+URL_TYPE_MIX = 0
+URL_TYPE_NUKKI = 1
+URL_TYPE_OTHER = 2  # name_only 등
+
+# URL 유무 비트
+HAS_NUKKI = 1
+HAS_MIX = 2
+
+# IN (...) 조회 시 한 번에 넣는 상품코드 수 (SQLite 변수 개수 제한 고려)
+LOAD_CHUNK_SIZE = 500
+
+
+def _url_type_code(url_type: str) -> int:
+    if url_type == "mix":
+        return URL_TYPE_MIX
+    if url_type == "nukki":
+        return URL_TYPE_NUKKI
+    return URL_TYPE_OTHER
+
+
+class _ProductCombinations:
+    """한 상품의 조합 목록 (combination_index 오름차순)"""
+
+    __slots__ = ("indexes", "type_codes", "url_bits", "rows", "order_cache")
+
+    def __init__(self):
+        self.indexes = array("l")       # combination_index
+        self.type_codes = array("b")    # URL_TYPE_*
+        self.url_bits = array("B")      # HAS_NUKKI | HAS_MIX
+        # 선택된 조합 반환/중복 키 계산용 원본 값
+        # (product_id, url_type, line_index, product_name, nukki_url, mix_url, st2_json)
+        self.rows: List[tuple] = []
+        # (시작 combination_index, 직전 url_type 이 mix 인지) → 우선순위 정렬된 후보 위치 목록
+        self.order_cache: Dict[Tuple[int, bool], List[int]] = {}
+
+    def append(self, row: tuple) -> None:
+        product_id, combination_index, url_type, line_index, product_name, nukki_url, mix_url, st2_json = row
+        nukki_url = nukki_url or ""
+        mix_url = mix_url or ""
+        self.indexes.append(combination_index)
+        self.type_codes.append(_url_type_code(url_type))
+        self.url_bits.append((HAS_NUKKI if nukki_url else 0) | (HAS_MIX if mix_url else 0))
+        self.rows.append((product_id, url_type, line_index, product_name, nukki_url, mix_url, st2_json or ""))
+
+    @property
+    def max_index(self) -> int:
+        return self.indexes[-1] if self.indexes else -1
+
+    def is_valid(self, pos: int) -> bool:
+        """url_type 에 맞는 URL 이 있는지 (name_only 는 항상 유효)"""
+        code = self.type_codes[pos]
+        if code == URL_TYPE_NUKKI:
+            return bool(self.url_bits[pos] & HAS_NUKKI)
+        if code == URL_TYPE_MIX:
+            return bool(self.url_bits[pos] & HAS_MIX)
+        return True
+
+    def ordered_candidates(self, start_index: int, last_was_mix: bool) -> List[int]:
+        """
+        배정 후보 위치 목록 (get_next_combination_for_store 의 4~5단계와 동일)
+        - start_index 이상 조합, 없으면 전체 조합 (처음부터 다시)
+        - 유효한 조합만, 직전이 mix 면 누끼 → 믹스 → 기타, 아니면 믹스 → 누끼 → 기타 순
+        - 같은 우선순위 안에서는 combination_index 오름차순
+        """
+        key = (start_index, last_was_mix)
+        cached = self.order_cache.get(key)
+        if cached is not None:
+            return cached
+
+        begin = bisect_left(self.indexes, start_index)
+        if begin >= len(self.indexes):
+            begin = 0
+        first, second = (URL_TYPE_NUKKI, URL_TYPE_MIX) if last_was_mix else (URL_TYPE_MIX, URL_TYPE_NUKKI)
+        buckets: Dict[int, List[int]] = {first: [], second: [], URL_TYPE_OTHER: []}
+        for pos in range(begin, len(self.indexes)):
+            if self.is_valid(pos):
+                buckets[self.type_codes[pos]].append(pos)
+        ordered = buckets[first] + buckets[second] + buckets[URL_TYPE_OTHER]
+        self.order_cache[key] = ordered
+        return ordered
+
+
+class StoreCombinationAllocator:
+    """
+    출고 1회 동안 쓰는 순환식 조합 배정기
+
+    사용 순서:
+        allocator = db_handler.create_combination_allocator()
+        allocator.preload(sheet_name, business_number, product_codes)   # 스토어마다
+        combo = allocator.next_combination(product_code, sheet_name, business_number, ...)
+        allocator.flush()   # 스토어 처리 끝에 (커밋은 호출부에서)
+        conn.commit(); allocator.on_commit()      # 또는 conn.rollback(); allocator.on_rollback()
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._combos: Dict[str, _ProductCombinations] = {}
+        # (sheet_name, business_number) → {product_code: (last_index, last_url_type)}
+        self._states: Dict[Tuple[str, str], Dict[str, Tuple[int, str]]] = {}
+        # 아직 DB에 기록하지 않은 상태 변경 {(sheet, business, product_code): (index, url_type)}
+        self._dirty: Dict[Tuple[str, str, str], Tuple[int, str]] = {}
+        # flush() 로 기록했지만 아직 커밋/롤백 전인 스토어 {(sheet, business)}
+        self._unconfirmed: set = set()
+        self._state_table_error: Optional[Exception] = None
+
+    # ----------------------------------------------------
+    # 로드
+    # ----------------------------------------------------
+    def preload(self, sheet_name: str, business_number: str, product_codes: Iterable[str]) -> None:
+        """스토어 처리 전에 상품 조합 + 스토어 상태를 한 번에 읽어 둠 (이미 읽은 상품은 건너뜀)"""
+        self._load_combinations([pc for pc in product_codes if pc not in self._combos])
+        self._load_states(sheet_name, business_number)
+
+    def _load_combinations(self, product_codes: List[str]) -> None:
+        if not product_codes:
+            return
+        cursor = self.conn.cursor()
+        for start in range(0, len(product_codes), LOAD_CHUNK_SIZE):
+            chunk = product_codes[start:start + LOAD_CHUNK_SIZE]
+            for pc in chunk:
+                self._combos[pc] = _ProductCombinations()
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT product_code, product_id, combination_index, url_type, line_index,
+                       product_name, nukki_url, mix_url, st2_json
+                FROM product_combinations
+                WHERE product_code IN ({placeholders})
+                ORDER BY product_code, combination_index ASC
+            """, chunk)
+            for row in cursor.fetchall():
+                self._combos[row[0]].append(tuple(row[1:]))
+
+    def _load_states(self, sheet_name: str, business_number: str) -> None:
+        key = (sheet_name, business_number)
+        if key in self._states or self._state_table_error is not None:
+            return
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT product_code, last_used_combination_index, last_used_url_type
+                FROM store_combination_state
+                WHERE sheet_name = ? AND business_number = ?
+            """, (sheet_name, business_number))
+        except sqlite3.Error as e:
+            # 기존 구현도 상태 테이블이 없으면 모든 상품에서 None 을 반환
+            self._state_table_error = e
+            print(f"⚠️ store_combination_state 조회 실패: {e}")
+            return
+        self._states[key] = {
+            row[0]: (row[1] if row[1] is not None else -1, row[2] or "mix")
+            for row in cursor.fetchall()
+        }
+
+    # ----------------------------------------------------
+    # 배정
+    # ----------------------------------------------------
+    def next_combination(
+        self,
+        product_code: str,
+        sheet_name: str,
+        business_number: str,
+        exclude_assigned: bool = False,
+        global_used_combinations: set = None,
+        store_used_combinations: set = None
+    ) -> Optional[Dict]:
+        """
+        스토어별 다음 조합 반환 (순환식) - DBHandler.get_next_combination_for_store 와 같은 규칙/반환 형식
+        상태 변경은 메모리에 반영되고 flush() 때 DB에 기록됨
+        """
+        if product_code not in self._combos:
+            self._load_combinations([product_code])
+        self._load_states(sheet_name, business_number)
+        if self._state_table_error is not None:
+            return None
+
+        combos = self._combos[product_code]
+        store_states = self._states[(sheet_name, business_number)]
+        last_index, last_url_type = store_states.get(product_code, (-1, "mix"))
+
+        # 존재하지 않는 인덱스를 가리키면 0부터 시작
+        if last_index > combos.max_index:
+            start_index = 0
+            last_url_type = "mix"
+        else:
+            start_index = last_index + 1
+
+        selected_pos = None
+        for pos in combos.ordered_candidates(start_index, last_url_type == "mix"):
+            _product_id, url_type, line_index, final_name, nukki_url, mix_url, _st2 = combos.rows[pos]
+            if url_type == "mix":
+                used_url = mix_url
+            elif url_type == "nukki":
+                used_url = nukki_url
+            else:  # "name_only"
+                used_url = ""
+
+            # 전체 시트에서 사용된 조합이면 건너뛰기
+            if global_used_combinations and (product_code, url_type, line_index, final_name, used_url) in global_used_combinations:
+                continue
+            # exclude_assigned=False일 때, 해당 스토어에서 이미 사용한 조합은 건너뛰기
+            if not exclude_assigned and store_used_combinations:
+                if (product_code, url_type, final_name, used_url) in store_used_combinations:
+                    continue
+            selected_pos = pos
+            break
+
+        if selected_pos is None:
+            return None
+
+        combination_index = combos.indexes[selected_pos]
+        product_id, url_type, line_index, final_name, nukki_url, mix_url, st2_json = combos.rows[selected_pos]
+        store_states[product_code] = (combination_index, url_type)
+        self._dirty[(sheet_name, business_number, product_code)] = (combination_index, url_type)
+
+        return {
+            "상품코드": product_code,
+            "누끼url": nukki_url,
+            "믹스url": mix_url,
+            "ST4_최종결과": final_name,
+            "product_id": product_id,
+            "product_names_json": "",  # 조합 테이블에는 저장 안 함
+            "ST2_JSON": st2_json,
+            "url_type": url_type,
+            "line_index": line_index,
+            "combination_index": combination_index
+        }
+
+    # ----------------------------------------------------
+    # 기록
+    # ----------------------------------------------------
+    def flush(self) -> int:
+        """
+        메모리의 상태 변경을 store_combination_state 에 일괄 기록 (트랜잭션은 호출부에서 처리)
+        기록한 스토어는 호출부가 on_commit() / on_rollback() 을 부를 때까지 미확정으로 남음
+        """
+        if not self._dirty:
+            return 0
+        rows = [
+            (sheet_name, business_number, product_code, combination_index, url_type)
+            for (sheet_name, business_number, product_code), (combination_index, url_type) in self._dirty.items()
+        ]
+        self.conn.cursor().executemany("""
+            INSERT OR REPLACE INTO store_combination_state
+            (sheet_name, business_number, product_code,
+             last_used_combination_index, last_used_url_type,
+             last_used_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        """, rows)
+        self._unconfirmed.update((sheet_name, business_number) for sheet_name, business_number, _ in self._dirty)
+        self._dirty.clear()
+        return len(rows)
+
+    def on_commit(self) -> None:
+        """호출부 커밋 후: 기록한 상태 확정"""
+        self._unconfirmed.clear()
+
+    def on_rollback(self) -> None:
+        """
+        호출부 롤백 후: 기록했거나 기록 전인 상태 변경을 버리고
+        해당 스토어 상태는 다음 배정 때 DB에서 다시 읽음
+        """
+        stores = self._unconfirmed | {(sheet_name, business_number) for sheet_name, business_number, _ in self._dirty}
+        for key in stores:
+            self._states.pop(key, None)
+        self._unconfirmed.clear()
+        self._dirty.clear()
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty)
+
+
+# =========================
+# 재생 검증
+# =========================
+
+def _replay_check(products: int = 40, stores: int = 6, rounds: int = 8, seed: int = 7) -> None:
+    """
+    임시 DB 두 개에 같은 조합/배정 이력을 만들고
+    기존 get_next_combination_for_store 와 메모리 배정기의 배정 순서를 비교
+    """
+    import os
+    import random
+    import sys
+    import tempfile
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database.db_handler import DBHandler
+    from migrate_to_circular_combinations import create_store_combination_state_table
+
+    rng = random.Random(seed)
+    tmp_dir = tempfile.mkdtemp(prefix="combo_replay_")
+
+    combos = []
+    for p in range(products):
+        pc = f"P{p:04d}"
+        for ci in range(rng.randint(0, 9)):
+            url_type = rng.choice(["nukki", "mix", "mix", "name_only"])
+            nukki = f"https://img/{pc}/n{ci}" if rng.random() > 0.15 else ""
+            mix = f"https://img/{pc}/m{ci}" if rng.random() > 0.15 else ""
+            combos.append((pc, None, ci * rng.choice([1, 1, 2]), url_type, ci % 3,
+                           f"{pc} 상품명 {ci % 4}", nukki, mix, "{}"))
+    # combination_index 중복 제거 (UNIQUE 제약)
+    combos = list({(c[0], c[2]): c for c in combos}.values())
+    stale_states = [(f"시트{s % 2}", f"BN{s}", f"P{p:04d}", rng.choice([-1, 0, 3, 50]), rng.choice(["mix", "nukki", None]))
+                    for s in range(stores) for p in range(0, products, 3)]
+
+    def make_db(name: str) -> DBHandler:
+        handler = DBHandler(os.path.join(tmp_dir, name))
+        handler.connect()
+        create_store_combination_state_table(handler)
+        cur = handler.conn.cursor()
+        cur.executemany("""
+            INSERT INTO product_combinations
+            (product_code, product_id, combination_index, url_type, line_index, product_name, nukki_url, mix_url, st2_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, combos)
+        cur.executemany("""
+            INSERT OR REPLACE INTO store_combination_state
+            (sheet_name, business_number, product_code, last_used_combination_index, last_used_url_type)
+            VALUES (?, ?, ?, ?, ?)
+        """, stale_states)
+        handler.conn.commit()
+        return handler
+
+    legacy_db = make_db("legacy.db")
+    fast_db = make_db("fast.db")
+    allocator = StoreCombinationAllocator(fast_db.conn)
+    product_codes = [f"P{p:04d}" for p in range(products)]
+
+    legacy_seq, fast_seq = [], []
+    legacy_global, fast_global = set(), set()
+    for r in range(rounds):
+        for s in range(stores):
+            sheet, bn = f"시트{s % 2}", f"BN{s}"
+            exclude_assigned = (r + s) % 3 == 0
+            legacy_store, fast_store = set(), set()
+            allocator.preload(sheet, bn, product_codes)
+            for pc in product_codes:
+                kwargs = dict(product_code=pc, sheet_name=sheet, business_number=bn, exclude_assigned=exclude_assigned)
+                a = legacy_db.get_next_combination_for_store(
+                    global_used_combinations=legacy_global,
+                    store_used_combinations=legacy_store if not exclude_assigned else None, **kwargs)
+                legacy_db.conn.commit()
+                b = allocator.next_combination(
+                    global_used_combinations=fast_global,
+                    store_used_combinations=fast_store if not exclude_assigned else None, **kwargs)
+                legacy_seq.append(a)
+                fast_seq.append(b)
+                for found, g, st in ((a, legacy_global, legacy_store), (b, fast_global, fast_store)):
+                    if not found:
+                        continue
+                    used_url = {"mix": found["믹스url"], "nukki": found["누끼url"]}.get(found["url_type"], "")
+                    # 일부 라운드만 전체 시트 중복 추적 (후보 건너뛰기 경로 검증)
+                    if (r * stores + s) % 5 == 0:
+                        g.add((pc, found["url_type"], found["line_index"], found["ST4_최종결과"], used_url))
+                    st.add((pc, found["url_type"], found["ST4_최종결과"], used_url))
+            allocator.flush()
+            fast_db.conn.commit()
+            allocator.on_commit()
+
+    assert legacy_seq == fast_seq, "배정 순서 불일치"
+    state_sql = """SELECT sheet_name, business_number, product_code, last_used_combination_index, last_used_url_type
+                   FROM store_combination_state ORDER BY 1, 2, 3"""
+    legacy_state = [tuple(r) for r in legacy_db.conn.execute(state_sql)]
+    fast_state = [tuple(r) for r in fast_db.conn.execute(state_sql)]
+    assert legacy_state == fast_state, "store_combination_state 불일치"
+
+    assigned = sum(1 for x in fast_seq if x)
+    print(f"[재생 검증] OK  호출 {len(fast_seq)}회, 배정 {assigned}건, 상태 {len(fast_state)}행 일치")
+
+    # 롤백: 기록 후 롤백하면 다음 배정은 롤백 전 DB 상태 기준 (새 배정기와 같은 결과)
+    sheet, bn = "시트0", "BN0"
+    before = [tuple(r) for r in fast_db.conn.execute(state_sql)]
+    for pc in product_codes:
+        allocator.next_combination(pc, sheet, bn)
+    allocator.flush()
+    fast_db.conn.rollback()
+    allocator.on_rollback()
+    assert [tuple(r) for r in fast_db.conn.execute(state_sql)] == before
+    fresh = StoreCombinationAllocator(fast_db.conn)
+    after_rollback = [allocator.next_combination(pc, sheet, bn) for pc in product_codes]
+    expected = [fresh.next_combination(pc, sheet, bn) for pc in product_codes]
+    assert after_rollback == expected, "롤백 후 배정이 DB 상태와 다름"
+    print(f"[롤백 검증] OK  롤백 후 {sum(1 for x in expected if x)}건 배정이 DB 상태 기준과 일치")
+    legacy_db.close()
+    fast_db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="스토어별 순환식 조합 배정기")
+    parser.add_argument("--check", action="store_true", help="기존 구현과 배정 순서 재생 비교")
+    args = parser.parse_args()
+    if args.check:
+        _replay_check()
+    else:
+        parser.print_help()
@@ -13,10 +13,38 @@ import json
 import sqlite3
 import re
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Any, Sequence
 
 import pandas as pd
 
+from database.category_stats import (
+    ensure_category_stats,
+    rebuild_category_stats,
+    check_category_stats,
+    get_rollup_counts,
+    count_distinct_products,
+)
+from database.category_paths import (
+    INCOMPLETE_PRODUCTS_SQL,
+    PRODUCTS_BY_CATEGORY_SQL,
+    UPLOAD_PRODUCTS_SQL,
+    category_param,
+    with_category_filter,
+    ensure_category_paths,
+    load_category_trie,
+    category_paths_stamp,
+)
+from database.product_snapshot import ProductSnapshot, ensure_product_snapshot_log
+from database.bulk_load import BULK_LOAD_KEEP_INDEXES, BulkLoad, bulk_load_guard, recover_bulk_load
+from database.write_buffer import WriteBuffer
+from database.product_seasons import (
+    SeasonDecisions,
+    classify_pending,
+    ensure_product_seasons,
+    season_config_hash,
+)
+
 # 시즌 필터링 통합
 # season_filter_manager_gui.py에서 함수 import
 try:
@@ -24,7 +52,7 @@ try:
     season_filter_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     if season_filter_path not in sys.path:
         sys.path.insert(0, season_filter_path)
-    from season_filter_manager_gui import load_season_config, filter_products_by_season
+    from season_filter_manager_gui import load_season_config
     SEASON_FILTER_AVAILABLE = True
 except ImportError:
     SEASON_FILTER_AVAILABLE = False
@@ -35,13 +63,37 @@ _season_config_cache = None
 _season_config_cache_path = None
 
 
+# 쓰기 버퍼로 기록하는 INSERT (DBHandler.log_upload(s) / assign_combination(s))
+UPLOAD_LOG_INSERT_SQL = """
+    INSERT INTO upload_logs (
+        business_number, market_id, market_name, product_id, product_code,
+        used_product_name, used_nukki_url, used_mix_url,
+        product_name_index, image_nukki_index, image_mix_index,
+        upload_strategy, upload_status, notes, uploaded_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+ASSIGN_COMBINATION_INSERT_SQL = """
+    INSERT OR IGNORE INTO combination_assignments 
+    (sheet_name, business_number, product_code, combination_index)
+    VALUES (?, ?, ?, ?)
+"""
+
+
 class DBHandler:
     """SQLite 데이터베이스 핸들러"""
     
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.write_buffer = WriteBuffer()  # 업로드 로그 / 조합 할당 그룹 커밋 (INSERT 는 바로, 커밋만 모아서)
         self.conn = None
         self._last_season_filter_info = None  # 마지막 시즌 필터링 정보 저장
+        self._category_trie = None  # 카테고리 경로 트라이 (category_paths 로 생성)
+        self._category_trie_stamp = -1
+        self._product_snapshot = None  # products 컬럼형 스냅샷 (use_product_snapshot 으로 활성화)
+        self._product_snapshot_enabled = False
+        self._season_decisions = None  # 저장된 시즌 분류 기반 판정 (날짜/설정/다른 연결 쓰기 기준으로 캐시)
+        self._season_decisions_key = None
     
     def connect(self):
         """데이터베이스 연결 및 테이블 생성"""
@@ -67,10 +119,45 @@ class DBHandler:
         return self.conn
     
     def close(self):
-        """데이터베이스 연결 종료"""
+        """데이터베이스 연결 종료 (커밋 안 된 버퍼 행은 커밋 후)"""
         if self.conn:
-            self.conn.close()
-            self.conn = None
+            try:
+                if self.write_buffer.pending:
+                    self.write_buffer.flush(self.conn)
+            finally:
+                self.conn.close()
+                self.conn = None
+    
+    def flush_writes(self) -> int:
+        """버퍼 행 커밋 (커밋한 행 수 반환)"""
+        if self.conn is None:
+            return 0
+        return self.write_buffer.flush(self.conn)
+    
+    @contextmanager
+    def write_transaction(self):
+        """
+        구간 안의 쓰기를 한 트랜잭션으로: 임계값 커밋을 보류하고 끝나면 커밋, 예외면 롤백 후 다시 발생
+        (버퍼 행 + 같은 연결로 한 다른 쓰기 모두 포함)
+        """
+        try:
+            with self.write_buffer.hold():
+                yield
+        except BaseException:
+            self.conn.rollback()
+            self.write_buffer.discard()
+            raise
+        self.write_buffer.flush(self.conn)
+    
+    def _buffer_write(self, sql: str, params: Sequence):
+        """INSERT 실행 (오류는 이 호출에서 발생), 커밋은 버퍼 임계값에 도달했을 때만"""
+        if self.write_buffer.add(self.conn, sql, params):
+            self.write_buffer.flush(self.conn)
+    
+    def _buffer_write_many(self, sql: str, rows: Sequence[Sequence]):
+        """여러 행 INSERT (executemany 한 번), 커밋은 버퍼 임계값에 도달했을 때만"""
+        if self.write_buffer.add_many(self.conn, sql, rows):
+            self.write_buffer.flush(self.conn)
     
     def create_tables(self):
         """필요한 테이블 생성"""
@@ -220,6 +307,30 @@ class DBHandler:
         """)
         
         # 8. 성능 최적화를 위한 인덱스 생성 (대용량 데이터 처리용)
+        #    다른 연결이 대량 적재 중이면 건너뜀 (적재가 보류한 인덱스는 적재가 끝날 때 다시 만듦)
+        with bulk_load_guard(self.db_path) as idle:
+            if idle:
+                self._create_indexes(cursor)
+        
+        self.conn.commit()
+        
+        # 9. 카테고리별 상품 수 집계 테이블 (products 트리거로 증분 유지, 처음 만들 때만 전체 계산)
+        ensure_category_stats(self.conn)
+        
+        # 10. 카테고리 경로 사전 (LIKE '%...%' 대신 트라이 + 인덱스 탐색으로 카테고리 조회)
+        ensure_category_paths(self.conn)
+        
+        # 11. products 변경 로그 (컬럼형 스냅샷 증분 갱신용 트리거)
+        ensure_product_snapshot_log(self.conn)
+        
+        # 12. 상품별 시즌 분류 (입고 시 / 시즌 설정 변경 시 한 번만 키워드 매칭)
+        ensure_product_seasons(self.conn)
+        
+        # 13. 중단된 대량 적재가 있으면 보류된 인덱스 재생성
+        recover_bulk_load(self.conn, self.db_path)
+    
+    def _create_indexes(self, cursor):
+        """조회 최적화 인덱스 생성 (create_tables 에서 대량 적재 중이 아닐 때만 호출)"""
         # 카테고리명 검색 최적화 (LIKE 쿼리 성능 향상)
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_products_category_status 
@@ -303,8 +414,18 @@ class DBHandler:
             CREATE INDEX IF NOT EXISTS idx_combination_assignments_sheet_store 
             ON combination_assignments(sheet_name, business_number, product_code)
         """)
+    
+    def bulk_load(self, tables: List[str] = ("products", "product_combinations"),
+                  keep: List[str] = BULK_LOAD_KEEP_INDEXES) -> BulkLoad:
+        """
+        대량 적재 모드 (with 문)
+        - tables 의 보조 인덱스를 지우고 synchronous=OFF / 큰 캐시로 적재 → 끝나면 인덱스 재생성 + ANALYZE
+        - 중간에 죽어도 다음 connect() 때 인덱스 복구
         
-        self.conn.commit()
+        예: with db_handler.bulk_load(["product_combinations"]):
+                db_handler.generate_and_save_product_combinations()
+        """
+        return BulkLoad(self.conn, self.db_path, tables, keep)
     
     def insert_market(self, market_data: Dict[str, Any]) -> int:
         """마켓 정보 삽입 (중복 체크 후)"""
@@ -418,6 +539,14 @@ class DBHandler:
                 continue
         
         self.conn.commit()
+        # 컬럼이 추가됐을 수 있으므로 스냅샷은 다음 조회 때 스키마까지 다시 확인
+        if self._product_snapshot is not None:
+            self._product_snapshot.invalidate()
+        # 새 상품 시즌 분류 (설정 파일이 없으면 건너뜀, 출고 시 다시 확인)
+        try:
+            self.classify_product_seasons()
+        except Exception:
+            pass
         return inserted_count, skipped_count
     
     def insert_metadata(self, excel_filename: str, excel_path: str, total_rows: int, processed_rows: int, notes: str = ""):
@@ -430,26 +559,121 @@ class DBHandler:
         self.conn.commit()
     
     def get_all_categories(self) -> List[str]:
-        """모든 카테고리 조회"""
+        """모든 카테고리 조회 (ACTIVE 상품이 있는 카테고리, category_stats 집계 테이블)"""
         cursor = self.conn.cursor()
-        cursor.execute("SELECT DISTINCT 카테고리명 FROM products WHERE 카테고리명 IS NOT NULL AND 카테고리명 != '' AND product_status = 'ACTIVE'")
+        cursor.execute("SELECT 카테고리명 FROM category_stats WHERE active_rows > 0")
         rows = cursor.fetchall()
         return [row[0] for row in rows]
     
+    def _load_season_config(self) -> Optional[Dict]:
+        """시즌 설정 로드 (파일 경로/수정 시각이 같으면 캐시 사용)"""
+        global _season_config_cache, _season_config_cache_path
+        
+        if not SEASON_FILTER_AVAILABLE:
+            return None
+        script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        excel_path = os.path.join(script_dir, "Season_Filter_Seasons_Keywords.xlsx")
+        json_path = os.path.join(script_dir, "season_filters.json")
+        mtimes = tuple(os.path.getmtime(p) if os.path.exists(p) else 0 for p in (excel_path, json_path))
+        cache_path = (excel_path, json_path, mtimes)
+        if _season_config_cache is None or _season_config_cache_path != cache_path:
+            _season_config_cache = load_season_config(excel_path, json_path)
+            _season_config_cache_path = cache_path
+        return _season_config_cache
+    
+    def classify_product_seasons(self, season_config: Dict = None, progress_callback=None) -> int:
+        """
+        아직 분류 안 된 상품 / 시즌 설정(해시)이 바뀐 뒤 분류된 상품만 시즌 분류해서 product_seasons 에 저장
+        Returns: 분류한 상품 수
+        """
+        if season_config is None:
+            season_config = self._load_season_config()
+        classified = classify_pending(self.conn, season_config, progress_callback)
+        if classified:
+            self._season_decisions_key = None
+        return classified
+    
+    def get_season_decisions(self, season_config: Dict, current_date: datetime = None) -> SeasonDecisions:
+        """
+        저장된 시즌 분류 + 오늘 기준 유효성(SQL 날짜 조건)으로 만든 판정
+        - 같은 날짜 / 설정 / DB 상태면 재사용 (출고 중 카테고리·스토어마다 다시 계산하지 않음)
+        """
+        if current_date is None:
+            current_date = datetime.now()
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA data_version")  # 다른 연결이 커밋하면 바뀜
+        key = (season_config_hash(season_config), id(season_config), current_date.date(), cursor.fetchone()[0])
+        if self._season_decisions is None or self._season_decisions_key != key:
+            self.classify_product_seasons(season_config)
+            self._season_decisions = SeasonDecisions(self.conn, season_config, current_date)
+            self._season_decisions_key = key
+        return self._season_decisions
+    
+    def get_product_snapshot(self) -> ProductSnapshot:
+        """
+        products 컬럼형 스냅샷 (DB 파일 옆 캐시 파일, 바뀐 행만 증분 반영)
+        - 호출할 때마다 변경 로그 워터마크를 확인하므로 다른 연결의 쓰기도 반영됨
+        """
+        if self._product_snapshot is None:
+            self._product_snapshot = ProductSnapshot(self.db_path)
+        self._product_snapshot.refresh(self.conn)
+        return self._product_snapshot
+    
+    def use_product_snapshot(self, enabled: bool = True) -> Optional[ProductSnapshot]:
+        """
+        출고 조회(get_products_for_upload)를 스냅샷으로 처리할지 설정
+        Returns: 활성화했으면 최신화된 스냅샷
+        """
+        self._product_snapshot_enabled = enabled
+        return self.get_product_snapshot() if enabled else None
+    
+    def resolve_categories(self, category: str) -> List[str]:
+        """
+        '대 > 중' / '대>중>소>세부' 같은 카테고리 접두 경로 → 해당하는 전체 카테고리명 목록
+        - 단계가 정확히 같은 카테고리만 (LIKE '%대%>%중%' 처럼 비슷한 이름까지 잡지 않음)
+        - category_paths 가 바뀌었을 때만 트라이를 다시 읽음
+        """
+        stamp = category_paths_stamp(self.conn)
+        if self._category_trie is None or stamp != self._category_trie_stamp:
+            self._category_trie, self._category_trie_stamp = load_category_trie(self.conn)
+        return self._category_trie.resolve(category)
+    
     def get_category_product_counts(self) -> Dict[str, int]:
-        """카테고리별 상품 수 조회"""
+        """카테고리별 상품 수 조회 (ACTIVE 행 수, category_stats 집계 테이블)"""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT 카테고리명, COUNT(*) as count 
-            FROM products 
-            WHERE 카테고리명 IS NOT NULL 
-            AND 카테고리명 != '' 
-            AND product_status = 'ACTIVE'
-            GROUP BY 카테고리명
-        """)
+        cursor.execute("SELECT 카테고리명, active_rows FROM category_stats WHERE active_rows > 0")
         rows = cursor.fetchall()
         return {row[0]: row[1] for row in rows}
     
+    def get_category_named_counts(self) -> Dict[str, int]:
+        """카테고리별 상품명 보유(product_names_json) ACTIVE 상품코드 수 (category_stats 집계 테이블)"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT 카테고리명, named_count FROM category_stats
+            WHERE named_count > 0
+            ORDER BY named_count DESC
+        """)
+        return {row[0]: row[1] for row in cursor.fetchall()}
+    
+    def get_category_rollup_counts(self, categories: List[str] = None, column: str = "named_count") -> Dict[str, int]:
+        """대>중 롤업 상품 수 {카테고리: 수} (category_stats 집계 테이블, 대>중 인덱스 조회)"""
+        return get_rollup_counts(self.conn, categories, column=column)
+    
+    def count_products_in_categories(self, categories: List[str]) -> int:
+        """여러 대>중 카테고리에 걸친 상품명 보유 상품코드 수 (카테고리 간 중복 제거)"""
+        return count_distinct_products(self.conn, categories)
+    
+    def check_category_stats(self, repair: bool = False) -> List[tuple]:
+        """
+        category_stats 정합성 검사 (products 재계산과 비교)
+        - repair=True 이면 불일치가 있을 때 전체 재구축
+        Returns: 불일치 목록 [(카테고리명, 집계값, 재계산값)]
+        """
+        mismatches = check_category_stats(self.conn)
+        if mismatches and repair:
+            rebuild_category_stats(self.conn)
+        return mismatches
+    
     def get_category_tree(self) -> Dict[str, Any]:
         """
         카테고리 트리 구조 생성 (대>중 형식)
@@ -463,37 +687,16 @@ class DBHandler:
                 ...
             }
         """
-        categories = self.get_all_categories()
-        tree = {}
-        
-        for category in categories:
-            if not category:
-                continue
-            
-            # '대>중>소>세부' 형식 파싱
-            parts = [part.strip() for part in category.split('>')]
-            if len(parts) >= 2:
-                large = parts[0]
-                medium = parts[1]
-                
-                if large not in tree:
-                    tree[large] = {}
-                if medium not in tree[large]:
-                    tree[large][medium] = []
-                
-                tree[large][medium].append(category)
-        
-        return tree
+        active_categories = set(self.get_all_categories())
+        self.resolve_categories("")  # 트라이 최신화
+        return self._category_trie.large_medium_tree(only=active_categories)
     
     def get_products_by_category(self, category: str, market_ids: List[int] = None, status: str = 'ACTIVE') -> List[Dict]:
         """카테고리로 상품 조회"""
         cursor = self.conn.cursor()
         
-        query = """
-            SELECT * FROM products 
-            WHERE 카테고리명 LIKE ? AND product_status = ?
-        """
-        params = [f"%{category}%", status]
+        query = PRODUCTS_BY_CATEGORY_SQL
+        params = [category_param(self.resolve_categories(category)), status]
         
         if market_ids:
             placeholders = ",".join(["?"] * len(market_ids))
@@ -530,14 +733,8 @@ class DBHandler:
         """
         cursor = self.conn.cursor()
         
-        # 1. 카테고리 패턴 생성
-        category_parts = [part.strip() for part in category.split('>')]
-        if len(category_parts) >= 2:
-            large_cat = category_parts[0].strip()
-            medium_cat = category_parts[1].strip()
-            category_pattern = f"%{large_cat}%>%{medium_cat}%"
-        else:
-            category_pattern = f"%{category}%"
+        # 1. 카테고리 경로 → 전체 카테고리명 목록 (트라이, 인덱스 탐색용)
+        category_names = category_param(self.resolve_categories(category))
         
         # 2. 이미 할당된 조합 인덱스 조회 (시트 전체) - 캐싱된 데이터가 없으면 조회
         if sheet_used_combinations is None:
@@ -570,18 +767,17 @@ class DBHandler:
         
         # 4. 카테고리로 상품 조회 (상품명과 카테고리 포함하여 조회 - 시즌 필터링용)
         # 출력 가능 기준: 상품명(product_names_json)만 있어도 가능
-        cursor.execute("""
-            SELECT DISTINCT p.상품코드, p.원본상품명, p.ST3_결과상품명, p.ST1_정제상품명, p.카테고리명
-            FROM products p
-            WHERE p.카테고리명 LIKE ? 
-            AND p.product_status = ?
-            AND p.product_names_json IS NOT NULL 
-            AND p.product_names_json != '' 
-            AND p.product_names_json != '[]'
-        """, (category_pattern, status))
+        # 스냅샷 사용 시: 같은 조건을 컬럼형 스냅샷에서 필터링 (행 단위 변환 없음)
+        upload_rows = None
+        if self._product_snapshot_enabled:
+            upload_rows = self.get_product_snapshot().upload_rows(self.resolve_categories(category), status)
+        if upload_rows is None:
+            # 같은 값의 행은 하나로 (대표 id = 가장 작은 id, 저장된 시즌 분류 조회용)
+            cursor.execute(UPLOAD_PRODUCTS_SQL, (category_names, status))
+            upload_rows = cursor.fetchall()
         
         products_with_info = []
-        for row in cursor.fetchall():
+        for row in upload_rows:
             product_code = row[0]
             if product_code:
                 # 상품명 추출 (시즌 필터링용)
@@ -593,6 +789,7 @@ class DBHandler:
                 product_name = 원본상품명 or ST3_결과상품명 or ST1_정제상품명
                 
                 products_with_info.append({
+                    "id": row[5],  # products.id (저장된 시즌 분류 조회용)
                     "상품코드": product_code,
                     "상품명": product_name,
                     "product_name": product_name,  # 시즌 필터링 함수 호환성
@@ -633,29 +830,17 @@ class DBHandler:
         
         if season_filter_enabled and SEASON_FILTER_AVAILABLE:
             try:
-                # 시즌 설정 파일 경로
-                script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                excel_path = os.path.join(script_dir, "Season_Filter_Seasons_Keywords.xlsx")
-                json_path = os.path.join(script_dir, "season_filters.json")
-                
                 # 시즌 설정 로드 (캐싱 적용 - 성능 최적화)
-                global _season_config_cache, _season_config_cache_path
-                
-                # 캐시 경로가 변경되었거나 캐시가 없으면 로드
-                cache_path = (excel_path, json_path)
-                if _season_config_cache is None or _season_config_cache_path != cache_path:
-                    _season_config_cache = load_season_config(excel_path, json_path)
-                    _season_config_cache_path = cache_path
-                
-                season_config = _season_config_cache
+                season_config = self._load_season_config()
                 
                 if season_config:
                     # 원본 상품 수 저장
                     original_count = len(products_with_info)
                     
-                    # 시즌 필터링 적용
-                    filtered_products, excluded_count, excluded_seasons, included_seasons, season_stats = filter_products_by_season(
-                        products_with_info, season_config
+                    # 시즌 필터링 적용 (저장된 시즌 분류 + SQL 날짜 조건 - 상품별 키워드 매칭 없음)
+                    season_decisions = self.get_season_decisions(season_config)
+                    filtered_products, excluded_count, excluded_seasons, included_seasons, season_stats = season_decisions.filter(
+                        products_with_info
                     )
                     
                     # 필터링된 상품코드만 추출
@@ -806,6 +991,14 @@ class DBHandler:
         
         return result
     
+    def create_combination_allocator(self):
+        """
+        출고 1회용 순환식 조합 배정기 생성 (get_next_combination_for_store 의 메모리 버전)
+        - 상품 조합/스토어 상태를 한 번만 읽고, 상태 변경은 flush() 에서 일괄 기록
+        """
+        from database.combination_allocator import StoreCombinationAllocator
+        return StoreCombinationAllocator(self.conn)
+    
     def get_next_combination_for_store(
         self, 
         product_code: str, 
@@ -1026,20 +1219,12 @@ class DBHandler:
         cursor = self.conn.cursor()
         
         # 미완료 기준: 누끼url, 믹스url, product_names_json 중 1개라도 누락이면 미완료
-        query = """
-            SELECT * FROM products 
-            WHERE product_status = ?
-            AND (
-                (누끼url IS NULL OR 누끼url = '')
-                OR (믹스url IS NULL OR 믹스url = '')
-                OR (product_names_json IS NULL OR product_names_json = '' OR product_names_json = '[]')
-            )
-        """
+        query = INCOMPLETE_PRODUCTS_SQL
         params = [status]
         
         if category:
-            query = query.replace("WHERE", "WHERE 카테고리명 LIKE ? AND")
-            params.insert(0, f"%{category}%")
+            query = with_category_filter(query)
+            params.insert(0, category_param(self.resolve_categories(category)))
         
         cursor.execute(query, params)
         rows = cursor.fetchall()
@@ -1100,23 +1285,24 @@ class DBHandler:
             upload_strategy: 업로드 전략 (JSON)
             upload_status: 업로드 상태 (SUCCESS/FAILED)
             notes: 추가 메모
+        
+        쓰기 버퍼로 기록 (같은 연결 조회에는 바로 보임, 커밋은 flush_writes() / 임계값 도달 시)
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO upload_logs (
-                business_number, market_id, market_name, product_id, product_code,
-                used_product_name, used_nukki_url, used_mix_url,
-                product_name_index, image_nukki_index, image_mix_index,
-                upload_strategy, upload_status, notes, uploaded_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        self._buffer_write(UPLOAD_LOG_INSERT_SQL, (
             business_number, market_id, market_name, product_id, product_code,
             used_product_name, used_nukki_url, used_mix_url,
             product_name_index, image_nukki_index, image_mix_index,
             upload_strategy, upload_status, notes, datetime.now().isoformat()
         ))
-        self.conn.commit()
+    
+    def log_uploads(self, rows: Sequence[Sequence]):
+        """
+        업로드 로그 여러 건 기록 (쓰기 버퍼, executemany 한 번)
+        
+        Args:
+            rows: UPLOAD_LOG_INSERT_SQL 컬럼 순서의 튜플 목록 (uploaded_at 포함)
+        """
+        self._buffer_write_many(UPLOAD_LOG_INSERT_SQL, rows)
     
     def get_upload_logs_by_product_code(self, product_code: str, sheet_name: str = None) -> List[Dict]:
         """
@@ -1640,14 +1826,19 @@ class DBHandler:
             combination_index: 조합 인덱스
             sheet_name: 시트명
             business_number: 사업자번호
+        
+        쓰기 버퍼로 기록 (같은 연결 조회에는 바로 보임, 커밋은 flush_writes() / 임계값 도달 시)
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT OR IGNORE INTO combination_assignments 
-            (sheet_name, business_number, product_code, combination_index)
-            VALUES (?, ?, ?, ?)
-        """, (sheet_name, business_number, product_code, combination_index))
-        self.conn.commit()
+        self._buffer_write(ASSIGN_COMBINATION_INSERT_SQL, (sheet_name, business_number, product_code, combination_index))
+    
+    def assign_combinations(self, rows: Sequence[Sequence]):
+        """
+        조합 할당 여러 건 기록 (쓰기 버퍼, executemany 한 번)
+        
+        Args:
+            rows: (sheet_name, business_number, product_code, combination_index) 튜플 목록
+        """
+        self._buffer_write_many(ASSIGN_COMBINATION_INSERT_SQL, rows)
     
     def sync_combinations_for_new_products(self, progress_callback=None):
         """
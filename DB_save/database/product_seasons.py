@@ -0,0 +1,463 @@
+"""
+database/product_seasons.py
+
+상품별 시즌 분류 저장 (입고 시 / 시즌 설정 변경 시 한 번만 키워드 매칭)
+- product_seasons           : (상품 id, 시즌 id, 점수, 순위) - 감지된 시즌만 저장
+- product_season_classified : 분류 완료 표시 (분류에 쓴 설정 해시, 공통 제외 키워드 포함 여부)
+- 설정 해시(시즌 감지에 쓰이는 키워드/설정만)가 바뀐 상품, 아직 분류 안 된 상품만 다시 분류 (증분)
+- 상품명/카테고리 UPDATE, DELETE 트리거가 해당 상품의 분류를 지움 (순수 SQL, 다른 연결도 반영)
+- 시즌 유효성(ACTIVE/SOURCING/EXPIRED)은 오늘 기준 시즌 기간(TEMP season_windows)과 비교하는 SQL 날짜 조건으로 계산
+  → filter_products_by_season 과 같은 결과를 상품별 키워드 매칭 없이 반환
+
+검증:
+    python -m database.product_seasons --check
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    _season_filter_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _season_filter_path not in sys.path:
+        sys.path.insert(0, _season_filter_path)
+    from season_filter_manager_gui import _detect_seasons_from_product, _parse_date_string
+    SEASON_DETECT_AVAILABLE = True
+except ImportError:
+    SEASON_DETECT_AVAILABLE = False
+
+# 분류 결과 INSERT 배치 크기
+CLASSIFY_BATCH_SIZE = 5000
+
+# 분류에 쓰는 상품명 (get_products_for_upload 와 같은 우선순위: 원본상품명 > ST3_결과상품명 > ST1_정제상품명)
+_PRODUCT_NAME_SQL = ("COALESCE(NULLIF(p.원본상품명, ''), NULLIF(p.ST3_결과상품명, ''), "
+                     "NULLIF(p.ST1_정제상품명, ''), '')")
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# =========================
+# 테이블 / 트리거
+# =========================
+
+def ensure_product_seasons(conn: sqlite3.Connection) -> None:
+    """product_seasons / product_season_classified 테이블과 products 트리거 생성"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_seasons (
+            product_id INTEGER NOT NULL,
+            season_id TEXT NOT NULL,
+            score NOT NULL,  -- 타입 지정 없음: 설정의 가중치 값(int/float) 그대로 보관
+            rank INTEGER NOT NULL,
+            PRIMARY KEY (product_id, season_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_season_classified (
+            product_id INTEGER PRIMARY KEY,
+            config_hash TEXT NOT NULL,
+            has_exclude_keyword INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    forget_old = """
+        DELETE FROM product_seasons WHERE product_id = OLD.id;
+        DELETE FROM product_season_classified WHERE product_id = OLD.id;
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_product_seasons_products_update
+        AFTER UPDATE OF 원본상품명, ST3_결과상품명, ST1_정제상품명, 카테고리명 ON products
+        BEGIN
+            {forget_old}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_product_seasons_products_delete
+        AFTER DELETE ON products
+        BEGIN
+            {forget_old}
+        END
+    """)
+    conn.commit()
+
+
+def season_config_hash(season_config: Optional[Dict]) -> str:
+    """시즌 감지 결과에 영향을 주는 설정(시즌 id/키워드, 대소문자, 공통 제외 키워드)만의 해시"""
+    if not season_config:
+        return ""
+    settings = season_config.get("settings", {})
+    detect_part = {
+        "case_sensitive": settings.get("case_sensitive", False),
+        "common_exclude_keywords": settings.get("common_exclude_keywords", []),
+        "seasons": [[s.get("id"), s.get("keywords", {})] for s in season_config.get("seasons", [])],
+        "keywords": season_config.get("keywords", {}),
+    }
+    raw = json.dumps(detect_part, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+# =========================
+# 분류 (키워드 매칭)
+# =========================
+
+def _exclude_keywords(season_config: Dict) -> List[str]:
+    keywords = []
+    for kw in season_config.get("settings", {}).get("common_exclude_keywords", []):
+        if isinstance(kw, dict):
+            kw_str = kw.get("keyword", kw.get("key", "")).lower()
+        else:
+            kw_str = str(kw).lower()
+        if kw_str:
+            keywords.append(kw_str)
+    return keywords
+
+
+def classify_product(product_name: str, category_name: str, season_config: Dict,
+                     exclude_keywords: List[str]) -> Tuple[List[tuple], bool]:
+    """
+    상품 1개 분류 (filter_products_by_season 의 감지 단계와 동일)
+    Returns: ([(season_id, score), ...] 점수순, 공통 제외 키워드 포함 여부)
+    """
+    product_name = str(product_name or "").lower()
+    if not product_name:
+        return [], False
+    search_text = f"{product_name} {category_name}" if category_name else product_name
+    search_text = search_text.lower()
+    has_exclude = any(kw in search_text for kw in exclude_keywords)
+    return _detect_seasons_from_product(product_name, season_config, category_name), has_exclude
+
+
+def classify_pending(conn: sqlite3.Connection, season_config: Optional[Dict], progress_callback=None) -> int:
+    """
+    분류 안 된 상품 / 다른 설정 해시로 분류된 상품만 다시 분류
+    Returns: 분류한 상품 수
+    """
+    if not season_config or not SEASON_DETECT_AVAILABLE:
+        return 0
+    config_hash = season_config_hash(season_config)
+    exclude_keywords = _exclude_keywords(season_config)
+
+    read_cursor = conn.cursor()
+    read_cursor.row_factory = None
+    read_cursor.execute(f"""
+        SELECT p.id, {_PRODUCT_NAME_SQL}, COALESCE(p.카테고리명, '')
+        FROM products p
+        LEFT JOIN product_season_classified c ON c.product_id = p.id
+        WHERE c.product_id IS NULL OR c.config_hash != ?
+    """, (config_hash,))
+    pending = read_cursor.fetchall()
+    if not pending:
+        return 0
+
+    write_cursor = conn.cursor()
+    for start in range(0, len(pending), CLASSIFY_BATCH_SIZE):
+        chunk = pending[start:start + CLASSIFY_BATCH_SIZE]
+        season_rows = []
+        classified_rows = []
+        for product_id, product_name, category_name in chunk:
+            detected, has_exclude = classify_product(product_name, category_name, season_config, exclude_keywords)
+            for rank, (season_id, score) in enumerate(detected):
+                season_rows.append((product_id, season_id, score, rank))
+            classified_rows.append((product_id, config_hash, int(has_exclude)))
+        ids = [(row[0],) for row in chunk]
+        write_cursor.executemany("DELETE FROM product_seasons WHERE product_id = ?", ids)
+        write_cursor.executemany("INSERT OR IGNORE INTO product_seasons (product_id, season_id, score, rank) "
+                                 "VALUES (?, ?, ?, ?)", season_rows)
+        write_cursor.executemany("INSERT OR REPLACE INTO product_season_classified "
+                                 "(product_id, config_hash, has_exclude_keyword) VALUES (?, ?, ?)", classified_rows)
+        conn.commit()
+        if progress_callback:
+            progress_callback(min(start + CLASSIFY_BATCH_SIZE, len(pending)), len(pending))
+    return len(pending)
+
+
+# =========================
+# 유효성 (SQL 날짜 조건)
+# =========================
+
+def season_window(season_info: Dict, current_date: datetime) -> Optional[Tuple[datetime, datetime, datetime]]:
+    """
+    _check_season_validity 와 같은 기준의 (소싱 시작, 출력 시작, 출력 종료)
+    날짜가 없거나 잘못되면 None (유효성 'EXCLUDE')
+    """
+    try:
+        start_date_str = season_info.get("start_date", "")
+        end_date_str = season_info.get("end_date", "")
+        if not start_date_str or not end_date_str:
+            return None
+        start_date = _parse_date_string(start_date_str)
+        end_date = _parse_date_string(end_date_str)
+        if start_date is None or end_date is None:
+            return None
+
+        year = current_date.year
+        if season_info.get("cross_year", False) and end_date.month < start_date.month:
+            # 연도넘김 (예: 12월 ~ 2월): 시작 월 전이면 작년 시작, 아니면 올해 시작
+            if current_date.month < start_date.month:
+                start_date, end_date = start_date.replace(year=year - 1), end_date.replace(year=year)
+            else:
+                start_date, end_date = start_date.replace(year=year), end_date.replace(year=year + 1)
+        else:
+            start_date, end_date = start_date.replace(year=year), end_date.replace(year=year)
+
+        sourcing_start_days = season_info.get("sourcing_start_days", season_info.get("prep_days", 30))
+        processing_end_days = season_info.get("processing_end_days", season_info.get("grace_days", 21))
+        sourcing_start = start_date - timedelta(days=int(sourcing_start_days))
+        active_end = end_date - timedelta(days=int(processing_end_days))
+        return sourcing_start, start_date, active_end
+    except Exception:
+        return None
+
+
+# season_windows 한 행의 유효성 (파라미터 1개 = 현재 시각 'YYYY-MM-DD HH:MM:SS')
+VALIDITY_SQL = """
+    CASE
+        WHEN w.active_start IS NULL THEN 'EXCLUDE'
+        WHEN :now >= w.sourcing_start AND :now < w.active_start THEN 'SOURCING'
+        WHEN :now >= w.active_start AND :now <= w.active_end THEN 'ACTIVE'
+        ELSE 'EXPIRED'
+    END
+"""
+
+
+def load_season_windows(conn: sqlite3.Connection, season_config: Dict, current_date: datetime) -> None:
+    """현재 날짜 기준 시즌 기간을 연결 전용 TEMP 테이블에 기록 (시즌 수만큼, 매번 새로)"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS season_windows (
+            season_id TEXT PRIMARY KEY,
+            season_name TEXT,
+            season_type TEXT NOT NULL,
+            score_min NOT NULL,
+            sourcing_start TEXT,
+            active_start TEXT,
+            active_end TEXT
+        )
+    """)
+    cursor.execute("DELETE FROM temp.season_windows")
+    rows = []
+    for season in season_config.get("seasons", []):
+        season_id = season.get("id")
+        if not season_id:
+            continue
+        window = season_window(season, current_date)
+        sourcing_start, active_start, active_end = (
+            [d.strftime(_TIME_FORMAT) for d in window] if window else (None, None, None))
+        rows.append((season_id, season.get("name", season_id), season.get("type", "").strip().upper(),
+                     season.get("score_min", 1), sourcing_start, active_start, active_end))
+    # 같은 id 가 여러 개면 첫 번째 (filter_products_by_season 의 next(...) 와 동일)
+    cursor.executemany("INSERT OR IGNORE INTO temp.season_windows VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+class SeasonDecisions:
+    """
+    저장된 분류 + 오늘 기준 유효성으로 계산한 상품별 시즌 판정
+    filter(products) 는 filter_products_by_season 과 같은 형식의 결과를 반환
+    """
+
+    def __init__(self, conn: sqlite3.Connection, season_config: Dict, current_date: Optional[datetime] = None):
+        if current_date is None:
+            current_date = datetime.now()
+        self.current_date = current_date
+        load_season_windows(conn, season_config, current_date)
+        now = current_date.strftime(_TIME_FORMAT)
+        cursor = conn.cursor()
+        cursor.row_factory = None
+
+        # 시즌별 유효성 / 이름 / 타입 / 최소 점수
+        cursor.execute(f"SELECT w.season_id, w.season_name, w.season_type, w.score_min, {VALIDITY_SQL} "
+                       f"FROM temp.season_windows w", {"now": now})
+        self.seasons = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        # 감지된 시즌 (시즌 상품만)
+        self.detected: Dict[int, List[Tuple[str, float]]] = {}
+        cursor.execute("SELECT product_id, season_id, score FROM product_seasons ORDER BY product_id, rank")
+        for product_id, season_id, score in cursor.fetchall():
+            self.detected.setdefault(product_id, []).append((season_id, score))
+
+        cursor.execute("""
+            SELECT c.product_id FROM product_season_classified c
+            WHERE c.has_exclude_keyword = 1
+            AND EXISTS (SELECT 1 FROM product_seasons ps WHERE ps.product_id = c.product_id)
+        """)
+        self.has_exclude: Set[int] = {row[0] for row in cursor.fetchall()}
+
+        # 상품별 판정: 점수순으로 처음 '결정되는' 시즌 (유효 처리 또는 EXPIRED 비Event 중단)이 최소 점수를 넘으면 포함
+        cursor.execute(f"""
+            WITH w AS (
+                SELECT w.season_id, w.season_type, w.score_min, {VALIDITY_SQL} AS validity
+                FROM temp.season_windows w
+            ),
+            deciding AS (
+                SELECT ps.product_id, ps.season_id, ps.score, w.score_min,
+                       ROW_NUMBER() OVER (PARTITION BY ps.product_id ORDER BY ps.rank) AS rn
+                FROM product_seasons ps
+                JOIN w ON w.season_id = ps.season_id
+                JOIN product_season_classified c ON c.product_id = ps.product_id
+                WHERE (w.validity = 'ACTIVE' AND ps.score >= w.score_min
+                       AND NOT (c.has_exclude_keyword = 1 AND w.season_type = 'EVENT'))
+                   OR (w.validity = 'SOURCING' AND w.season_type != 'EVENT' AND ps.score >= w.score_min)
+                   OR (w.validity NOT IN ('ACTIVE', 'SOURCING') AND w.season_type != 'EVENT')
+            )
+            SELECT product_id, season_id FROM deciding WHERE rn = 1 AND score >= score_min
+        """, {"now": now})
+        self.valid: Dict[int, str] = dict(cursor.fetchall())
+
+    def _reason(self, season_id: str, score: float, has_exclude: bool) -> Tuple[Optional[str], bool]:
+        """제외된 상품에서 시즌 1개의 제외 사유. Returns: (사유 또는 None, 여기서 판정 중단 여부)"""
+        info = self.seasons.get(season_id)
+        if info is None:
+            return None, False
+        name, season_type, score_min, validity = info
+        if validity == "ACTIVE":
+            if has_exclude and season_type == "EVENT":
+                return f"{name}(공통 제외 키워드 매칭 - Event 타입)", False
+            return f"{name}(점수 부족: {score}/{score_min})", False
+        if validity == "SOURCING":
+            return (f"{name}(소싱 기간 - 이미 가공 완료)" if season_type == "EVENT" else None), False
+        if season_type == "EVENT":
+            return f"{name}(시즌 종료됨 - Event 타입)", False
+        return None, True
+
+    def filter(self, products: List[Dict]) -> tuple:
+        """
+        products 각 항목의 'id'(products.id) 로 판정
+        Returns: (filtered_products, excluded_count, excluded_seasons, included_seasons, season_stats)
+        """
+        excluded_count = 0
+        excluded_seasons = {}
+        included_seasons = {}
+        filtered_products = []
+        season_stats = {'non_season': 0, 'season_valid': 0, 'season_invalid': 0}
+
+        for product in products:
+            product_id = product.get("id")
+            detected = self.detected.get(product_id)
+            if not detected:
+                filtered_products.append(product)
+                season_stats['non_season'] += 1
+                continue
+
+            valid_season_id = self.valid.get(product_id)
+            if valid_season_id:
+                filtered_products.append(product)
+                season_stats['season_valid'] += 1
+                info = self.seasons.get(valid_season_id)
+                if valid_season_id not in included_seasons:
+                    included_seasons[valid_season_id] = {
+                        'count': 0,
+                        'name': info[0] if info else valid_season_id,
+                        'status': info[3] if info else "ACTIVE",
+                    }
+                included_seasons[valid_season_id]['count'] += 1
+                continue
+
+            has_exclude = product_id in self.has_exclude
+            if has_exclude:
+                filtered_products.append(product)
+                season_stats['non_season'] += 1
+            else:
+                excluded_count += 1
+                season_stats['season_invalid'] += 1
+
+            reasons = {}
+            for season_id, score in detected:
+                reason, stop = self._reason(season_id, score, has_exclude)
+                if reason:
+                    reasons[season_id] = reason
+                if stop:
+                    break
+            for season_id, _ in detected:
+                info = self.seasons.get(season_id)
+                season_name = info[0] if info else season_id
+                if season_id not in excluded_seasons:
+                    excluded_seasons[season_id] = {'count': 0, 'reason': '', 'name': season_name}
+                excluded_seasons[season_id]['count'] += 1
+                if not excluded_seasons[season_id]['reason']:
+                    excluded_seasons[season_id]['reason'] = reasons.get(
+                        season_id, f"{season_name}(시즌 기간 외 또는 점수 부족)")
+
+        return filtered_products, excluded_count, excluded_seasons, included_seasons, season_stats
+
+
+# =========================
+# 검증
+# =========================
+
+def _run_check() -> None:
+    import random
+    import tempfile
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database.db_handler import DBHandler
+    from season_filter_manager_gui import filter_products_by_season, _check_season_validity
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(base_dir, "season_filters.json"), "r", encoding="utf-8") as f:
+        season_config = json.load(f)
+
+    # 1) 시즌 기간: _check_season_validity 와 SQL 날짜 조건 비교 (1년 동안 매일)
+    conn = sqlite3.connect(":memory:")
+    mismatch = 0
+    day = datetime(2025, 1, 1, 10, 30)
+    for _ in range(366):
+        load_season_windows(conn, season_config, day)
+        rows = conn.execute(f"SELECT w.season_id, {VALIDITY_SQL} FROM temp.season_windows w",
+                            {"now": day.strftime(_TIME_FORMAT)}).fetchall()
+        sql_validity = dict(rows)
+        for season in season_config.get("seasons", []):
+            if season.get("id") in sql_validity and sql_validity[season["id"]] != _check_season_validity(season, day, season_config):
+                mismatch += 1
+        day += timedelta(days=1)
+    print(f"[기간] 366일 x {len(season_config.get('seasons', []))}개 시즌 유효성 불일치: {mismatch}")
+    assert mismatch == 0
+
+    # 2) 상품 판정: filter_products_by_season 과 비교
+    rng = random.Random(5)
+    words = []
+    for season in season_config.get("seasons", []):
+        words += [kw.get("keyword", "") for kw in season.get("keywords", {}).get("include", [])]
+    words += _exclude_keywords(season_config) + ["일반", "상품", "수납", "주방", "캠핑", "욕실"]
+    handler = DBHandler(os.path.join(tempfile.mkdtemp(prefix="product_seasons_"), "check.db"))
+    handler.connect()
+    rows = []
+    for i in range(8000):
+        name = " ".join(rng.choice(words) for _ in range(rng.randint(0, 4)))
+        category = rng.choice(["생활>주방", "스포츠>스키", "완구>인형", "패션>의류", ""])
+        rows.append((f"P{i:05d}", name, category))
+    handler.conn.executemany("INSERT INTO products (상품코드, 원본상품명, 카테고리명, product_status) "
+                             "VALUES (?, ?, ?, 'ACTIVE')", rows)
+    handler.conn.commit()
+    classified = classify_pending(handler.conn, season_config)
+    print(f"[분류] {classified:,}개 상품 분류, 재실행 시 {classify_pending(handler.conn, season_config)}개")
+
+    products = [{"id": pid, "상품코드": code, "상품명": name, "product_name": name, "카테고리명": category}
+                for pid, (code, name, category) in enumerate(rows, start=1)]
+    for month in range(1, 13):
+        current = datetime(2025, month, 9, 14, 0)
+        expected = filter_products_by_season(products, season_config, current_date=current)
+        actual = SeasonDecisions(handler.conn, season_config, current).filter(products)
+        assert [p["id"] for p in actual[0]] == [p["id"] for p in expected[0]], f"{month}월 포함 상품 불일치"
+        assert actual[1:] == expected[1:], f"{month}월 통계/사유 불일치"
+    print("[판정] 12개월 모두 filter_products_by_season 과 결과/통계/사유 일치")
+
+    # 3) 상품명 변경 → 트리거로 분류 삭제 → 해당 상품만 재분류
+    handler.conn.execute("UPDATE products SET 원본상품명 = '스키 고글' WHERE id <= 10")
+    handler.conn.commit()
+    print(f"[증분] 상품명 변경 10개 → 재분류 {classify_pending(handler.conn, season_config)}개")
+    handler.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="상품 시즌 분류 저장 검증")
+    parser.add_argument("--check", action="store_true", help="filter_products_by_season 과 결과 비교")
+    args = parser.parse_args()
+    if args.check:
+        _run_check()
+    else:
+        parser.print_help()
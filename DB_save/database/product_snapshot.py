@@ -0,0 +1,429 @@
+"""
+database/product_snapshot.py
+
+products 테이블 읽기 전용 스냅샷 (출고 GUI용 컬럼형 캐시)
+- products 전체를 DataFrame(컬럼별 배열)으로 들고 있다가 DB 파일 옆 '<DB경로>.products_snapshot.pkl' 에 저장
+- product_snapshot_changes : products INSERT / UPDATE / DELETE 트리거가 바뀐 id 를 순번(seq)과 함께 기록
+                             (순수 SQL 트리거라 data_entry 등 다른 연결에서 쓴 것도 기록됨)
+- 스냅샷은 마지막으로 반영한 seq(워터마크)를 기억하고, 그 뒤에 바뀐 id 의 행만 다시 읽어 교체 (증분 갱신)
+- DB가 바뀌었거나(토큰), 컬럼이 추가됐거나, 로그가 워터마크 이후까지 정리됐으면 전체 재구축
+- 출고 조회는 dict(row) 행 단위 변환 대신 카테고리별 행 번호 / 불리언 마스크로 필터링
+
+검증 / 벤치마크:
+    python -m database.product_snapshot --check
+    python -m database.product_snapshot --bench 300000
+"""
+
+import json
+import os
+import pickle
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_SUFFIX = ".products_snapshot.pkl"
+_SNAPSHOT_VERSION = 1
+
+# 출고용 상품 조회 컬럼 (DBHandler.get_products_for_upload 4단계와 같은 순서)
+UPLOAD_COLUMNS = ("상품코드", "원본상품명", "ST3_결과상품명", "ST1_정제상품명", "카테고리명")
+
+
+# =========================
+# 변경 로그 테이블 / 트리거
+# =========================
+
+def ensure_product_snapshot_log(conn: sqlite3.Connection) -> None:
+    """product_snapshot_changes / product_snapshot_meta 테이블과 products 트리거 생성"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_snapshot_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_snapshot_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+    # token: DB 파일 식별용 (다른 DB 의 스냅샷 파일을 잘못 쓰지 않도록)
+    # pruned_through: 이 seq 까지의 로그는 삭제됨 (더 오래된 스냅샷은 증분 갱신 불가)
+    cursor.execute("""
+        INSERT OR IGNORE INTO product_snapshot_meta (key, value)
+        VALUES ('token', lower(hex(randomblob(8)))), ('pruned_through', '0')
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_product_snapshot_insert
+        AFTER INSERT ON products
+        BEGIN
+            INSERT INTO product_snapshot_changes (product_id) VALUES (NEW.id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_product_snapshot_update
+        AFTER UPDATE ON products
+        BEGIN
+            INSERT INTO product_snapshot_changes (product_id) VALUES (NEW.id);
+            INSERT INTO product_snapshot_changes (product_id) SELECT OLD.id WHERE OLD.id != NEW.id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_product_snapshot_delete
+        AFTER DELETE ON products
+        BEGIN
+            INSERT INTO product_snapshot_changes (product_id) VALUES (OLD.id);
+        END
+    """)
+    conn.commit()
+
+
+def _read_stamp(conn: sqlite3.Connection) -> Tuple[str, int, int, int]:
+    """(토큰, pruned_through, 현재 seq, schema_version)"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT
+            (SELECT value FROM product_snapshot_meta WHERE key = 'token'),
+            (SELECT value FROM product_snapshot_meta WHERE key = 'pruned_through'),
+            COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'product_snapshot_changes'), 0)
+    """)
+    token, pruned, seq = cursor.fetchone()
+    cursor.execute("PRAGMA schema_version")
+    schema_version = cursor.fetchone()[0]
+    return token, int(pruned or 0), int(seq), int(schema_version)
+
+
+def _product_columns(conn: sqlite3.Connection) -> Tuple[str, ...]:
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(products)")
+    return tuple(row[1] for row in cursor.fetchall())
+
+
+def _fetch_frame(conn: sqlite3.Connection, columns: Sequence[str], where: str = "", params: Sequence = ()) -> pd.DataFrame:
+    """products 행을 튜플 그대로 DataFrame 으로 (행마다 dict 를 만들지 않음)"""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    col_names = ", ".join(f'"{col}"' for col in columns)
+    cursor.execute(f"SELECT {col_names} FROM products {where} ORDER BY id", params)
+    rows = cursor.fetchall()
+    return pd.DataFrame(rows, columns=list(columns), dtype=object)
+
+
+# =========================
+# 스냅샷
+# =========================
+
+class ProductSnapshot:
+    """products 컬럼형 스냅샷 (DB 파일 옆 피클 파일 + 메모리)"""
+
+    def __init__(self, db_path: str):
+        self.path = db_path + SNAPSHOT_SUFFIX
+        self.frame: Optional[pd.DataFrame] = None
+        self.token: Optional[str] = None
+        self.watermark = 0
+        self.columns: Tuple[str, ...] = ()
+        self._schema_version = None
+        self._category_rows: Optional[Dict[str, np.ndarray]] = None
+        self._masks: Dict[Tuple[str, str], np.ndarray] = {}
+        self.last_refresh = ""  # "memory" / "file" / "incremental:N" / "rebuild" (로그 출력용)
+
+    # ---------- 갱신 ----------
+
+    def invalidate(self) -> None:
+        """다음 refresh 때 스키마(컬럼)까지 다시 확인 (insert_products 등 쓰기 후 호출)"""
+        self._schema_version = None
+        self._clear_derived()
+
+    def refresh(self, conn: sqlite3.Connection) -> str:
+        """
+        DB 변경 로그 기준으로 스냅샷 최신화
+        Returns: self.last_refresh
+        """
+        token, pruned, seq, schema_version = _read_stamp(conn)
+        if schema_version != self._schema_version:
+            columns = _product_columns(conn)
+        else:
+            columns = self.columns
+
+        loaded = False
+        if self.frame is None or self.token != token or self.watermark < pruned:
+            loaded = self._load_file()
+
+        if (self.frame is None or self.token != token or self.columns != columns
+                or self.watermark < pruned or self.watermark > seq):
+            self._rebuild(conn, token, seq, columns)
+            self.last_refresh = "rebuild"
+        elif self.watermark < seq:
+            changed = self._apply_changes(conn, seq)
+            self.last_refresh = f"incremental:{changed}"
+        else:
+            self._schema_version = schema_version
+            self.last_refresh = "file" if loaded else "memory"
+            return self.last_refresh
+
+        self._schema_version = schema_version
+        self._save_file()
+        self._prune_log(conn, pruned)
+        return self.last_refresh
+
+    def _rebuild(self, conn: sqlite3.Connection, token: str, seq: int, columns: Tuple[str, ...]) -> None:
+        # seq 를 먼저 읽었으므로 그 뒤 변경은 다음 갱신 때 다시 반영됨 (누락 없음)
+        self.frame = _fetch_frame(conn, columns)
+        self.token = token
+        self.watermark = seq
+        self.columns = columns
+        self._clear_derived()
+
+    def _apply_changes(self, conn: sqlite3.Connection, seq: int) -> int:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT DISTINCT product_id FROM product_snapshot_changes
+            WHERE seq > ? AND seq <= ?
+        """, (self.watermark, seq))
+        changed_ids = [row[0] for row in cursor.fetchall()]
+        if changed_ids:
+            fresh = _fetch_frame(conn, self.columns, "WHERE id IN (SELECT value FROM json_each(?))",
+                                 (json.dumps(changed_ids),))
+            kept = self.frame[~self.frame["id"].isin(changed_ids)]
+            frame = pd.concat([kept, fresh], ignore_index=True) if len(fresh) else kept.reset_index(drop=True)
+            order = np.argsort(frame["id"].to_numpy(dtype=np.int64), kind="stable")
+            self.frame = frame.iloc[order].reset_index(drop=True)
+        self.watermark = seq
+        self._clear_derived()
+        return len(changed_ids)
+
+    def _prune_log(self, conn: sqlite3.Connection, pruned: int) -> None:
+        """스냅샷 파일에 반영된 로그 삭제 (실패해도 다음 갱신에 영향 없음)"""
+        if self.watermark <= pruned:
+            return
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM product_snapshot_changes WHERE seq <= ?", (self.watermark,))
+            cursor.execute("""
+                UPDATE product_snapshot_meta SET value = CAST(MAX(CAST(value AS INTEGER), ?) AS TEXT)
+                WHERE key = 'pruned_through'
+            """, (self.watermark,))
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+
+    # ---------- 파일 ----------
+
+    def _load_file(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") != _SNAPSHOT_VERSION:
+                return False
+            self.frame = data["frame"]
+            self.token = data["token"]
+            self.watermark = data["watermark"]
+            self.columns = tuple(data["columns"])
+            self._clear_derived()
+            return True
+        except Exception:
+            # 깨진 파일이면 재구축
+            self.frame = None
+            return False
+
+    def _save_file(self) -> None:
+        """임시 파일에 쓴 뒤 교체 (중간에 죽어도 이전 파일 또는 새 파일 중 하나만 남음)"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump({
+                    "version": _SNAPSHOT_VERSION,
+                    "token": self.token,
+                    "watermark": self.watermark,
+                    "columns": list(self.columns),
+                    "frame": self.frame,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # 저장 실패 (읽기 전용 폴더 등) - 메모리 스냅샷만 사용
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    # ---------- 조회 ----------
+
+    def _clear_derived(self) -> None:
+        self._category_rows = None
+        self._masks = {}
+
+    def _mask(self, name: str, status: str = "") -> np.ndarray:
+        key = (name, status)
+        mask = self._masks.get(key)
+        if mask is None:
+            frame = self.frame
+            if name == "status":
+                mask = (frame["product_status"] == status).to_numpy(dtype=bool)
+            elif name == "named":
+                names = frame["product_names_json"]
+                mask = (names.notna() & ~names.isin(["", "[]"])).to_numpy(dtype=bool)
+            else:
+                raise ValueError(name)
+            self._masks[key] = mask
+        return mask
+
+    def category_rows(self, categories: Sequence[str]) -> np.ndarray:
+        """카테고리명 목록 → 행 번호 (카테고리명 정렬 순, 카테고리 안에서는 id 순)"""
+        if self._category_rows is None:
+            self._category_rows = self.frame.groupby("카테고리명", sort=False).indices
+        parts = [self._category_rows[c] for c in sorted(set(categories)) if c in self._category_rows]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(parts)
+
+    def upload_rows(self, categories: Sequence[str], status: str = "ACTIVE") -> List[tuple]:
+        """
+        get_products_for_upload 4단계 조회와 같은 결과
+        (카테고리 IN / 상태 / 상품명 보유, UPLOAD_COLUMNS 기준 중복 제거 + 대표 id = 가장 작은 id)
+        """
+        rows = self.category_rows(categories)
+        if not len(rows):
+            return []
+        rows = rows[self._mask("status", status)[rows] & self._mask("named")[rows]]
+        subset = self.frame.iloc[rows][list(UPLOAD_COLUMNS) + ["id"]]
+        subset = subset.drop_duplicates(subset=list(UPLOAD_COLUMNS))  # id 순이므로 첫 행 = 가장 작은 id
+        return list(subset.itertuples(index=False, name=None))
+
+    def active_products(self, status: str = "ACTIVE", sort_by: str = "상품코드") -> pd.DataFrame:
+        """상태별 전체 상품 (sort_by 순, 같은 값은 id 순)"""
+        frame = self.frame[self._mask("status", status)]
+        if sort_by:
+            frame = frame.sort_values(sort_by, kind="stable", na_position="first")
+        return frame.reset_index(drop=True)
+
+
+# =========================
+# 검증 / 벤치마크
+# =========================
+
+def _run(rows: int, bench: bool) -> None:
+    import random
+    import sys
+    import tempfile
+    import time
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database.db_handler import DBHandler
+    from database.category_paths import _populate
+
+    rng = random.Random(11)
+    db_path = os.path.join(tempfile.mkdtemp(prefix="product_snapshot_"), "bench.db")
+    handler = DBHandler(db_path)
+    handler.connect()
+    t0 = time.time()
+    _populate(handler, rows)
+    print(f"[준비] products {rows:,}행 삽입 {time.time() - t0:.1f}초")
+
+    def sql_upload_rows(category):
+        cursor = handler.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute("""
+            SELECT 상품코드, 원본상품명, ST3_결과상품명, ST1_정제상품명, 카테고리명, MIN(id)
+            FROM products
+            WHERE 카테고리명 IN (SELECT value FROM json_each(?)) AND product_status = 'ACTIVE'
+            AND product_names_json IS NOT NULL AND product_names_json != '' AND product_names_json != '[]'
+            GROUP BY 상품코드, 원본상품명, ST3_결과상품명, ST1_정제상품명, 카테고리명
+            ORDER BY 카테고리명, MIN(id)
+        """, (json.dumps(handler.resolve_categories(category), ensure_ascii=False),))
+        return cursor.fetchall()
+
+    def sql_active_frame():
+        cursor = handler.conn.cursor()
+        cursor.execute("SELECT * FROM products WHERE product_status = 'ACTIVE' ORDER BY 상품코드")
+        columns = [d[0] for d in cursor.description]
+        return pd.DataFrame([dict(zip(columns, row)) for row in cursor.fetchall()])
+
+    def verify(snapshot, label):
+        keys = [f"대{a} > 중{b}" for a in range(12) for b in range(10)]
+        for key in rng.sample(keys, 10):
+            got = snapshot.upload_rows(handler.resolve_categories(key))
+            assert got == [tuple(r) for r in sql_upload_rows(key)], f"{label}: {key} 불일치"
+        expected = sql_active_frame()
+        actual = snapshot.active_products()
+        assert list(actual.columns) == list(expected.columns), f"{label}: 컬럼 불일치"
+        assert actual.astype(object).where(actual.notna(), None).values.tolist() == \
+            expected.astype(object).where(expected.notna(), None).values.tolist(), f"{label}: 전체 상품 불일치"
+        print(f"[검증] {label}: OK ({snapshot.last_refresh}, {len(snapshot.frame):,}행)")
+
+    t0 = time.time()
+    snapshot = handler.get_product_snapshot()
+    print(f"[스냅샷] 최초 구축 {time.time() - t0:.2f}초")
+    verify(snapshot, "최초 구축")
+
+    # 다른 연결(data_entry 처럼)에서 쓰기 → 증분 갱신
+    other = sqlite3.connect(db_path)
+    cursor = other.cursor()
+    cursor.execute("UPDATE products SET product_status = 'DELETED' WHERE id % 97 = 0")
+    cursor.execute("UPDATE products SET 카테고리명 = '대3>중4>소1>세부2' WHERE id % 89 = 0")
+    cursor.execute("DELETE FROM products WHERE id % 101 = 0")
+    cursor.execute("INSERT INTO products (상품코드, 카테고리명, product_status, product_names_json) "
+                   "VALUES ('PNEW1', '대1>중2>소0>세부0', 'ACTIVE', '[\"새 상품\"]')")
+    other.commit()
+    other.close()
+    t0 = time.time()
+    snapshot = handler.get_product_snapshot()
+    print(f"[스냅샷] 증분 갱신 {time.time() - t0:.2f}초")
+    verify(snapshot, "다른 연결 쓰기 후")
+
+    # insert_products (새 컬럼 추가) → 무효화 후 재구축
+    market_id = handler.insert_market({"market_name": "스냅샷검증"})
+    inserted, _ = handler.insert_products(pd.DataFrame([{"상품코드": "PNEW2", "카테고리명": "대1>중2>소0>세부0",
+                                                         "ST1_정제상품명": "추가", "새컬럼": "x"}]),
+                                          market_id, "check.xlsx")
+    assert inserted == 1
+    verify(handler.get_product_snapshot(), "insert_products 후")
+
+    # 새 핸들러(새 프로세스 가정)는 파일에서 읽고 바뀐 것만 반영
+    handler.conn.execute("UPDATE products SET 원본상품명 = '변경' WHERE id % 53 = 0")
+    handler.conn.commit()
+    handler2 = DBHandler(db_path)
+    handler2.connect()
+    t0 = time.time()
+    snapshot2 = handler2.get_product_snapshot()
+    print(f"[스냅샷] 파일 로드 + 증분 {time.time() - t0:.2f}초")
+    handler, handler2 = handler2, handler
+    verify(snapshot2, "파일 로드 후")
+    handler2.close()
+
+    if bench:
+        keys = [f"대{a} > 중{b}" for a in range(12) for b in range(10)][:40]
+        t0 = time.time()
+        for key in keys:
+            sql_upload_rows(key)
+        t_sql = time.time() - t0
+        t0 = time.time()
+        for key in keys:
+            handler.get_product_snapshot().upload_rows(handler.resolve_categories(key))
+        t_snap = time.time() - t0
+        print(f"[BENCH] 출고 상품 조회 {len(keys)}개: SQL {t_sql:.2f}초 / 스냅샷 {t_snap:.2f}초")
+        t0 = time.time()
+        sql_active_frame()
+        t_sql = time.time() - t0
+        t0 = time.time()
+        handler.get_product_snapshot().active_products()
+        t_snap = time.time() - t0
+        print(f"[BENCH] 전체 DB 출력 DataFrame: dict(row) {t_sql:.2f}초 / 스냅샷 {t_snap:.2f}초 "
+              f"(x{t_sql / max(t_snap, 1e-9):.1f})")
+    handler.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="products 스냅샷 검증 / 벤치마크")
+    parser.add_argument("--check", action="store_true", help="SQL 조회와 결과 비교 (작은 임시 DB)")
+    parser.add_argument("--bench", type=int, default=0, metavar="ROWS", help="products ROWS행으로 시간 측정")
+    args = parser.parse_args()
+    if not args.check and not args.bench:
+        parser.print_help()
+    else:
+        _run(rows=args.bench or 20000, bench=bool(args.bench))
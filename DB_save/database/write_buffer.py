@@ -0,0 +1,216 @@
+"""
+database/write_buffer.py
+
+기록용 쓰기 버퍼 (업로드 로그 / 조합 할당) - 그룹 커밋
+- INSERT 는 호출 즉시 실행하고, 한 건마다 하던 커밋만 모아서 한 번에 커밋
+  - 오류는 INSERT 를 부른 호출부에서 바로 발생 (실패한 행만 빠지고 앞서 쌓인 행은 그대로)
+  - 같은 연결의 조회(DBHandler 메서드 / conn 직접 조회 모두)는 커밋 전에도 쌓인 행을 봄 (자기 쓰기 읽기)
+- 커밋 시점
+  - 쌓인 행 수가 max_rows 이상이거나 첫 행이 들어온 지 max_delay 초가 지났을 때 (add 하는 호출에서)
+  - DBHandler.flush_writes() (UploadManager.process_upload 는 마켓마다) / close()
+  - 같은 연결에서 다른 코드가 커밋하면 쌓인 행도 함께 커밋됨 (기존 한 건씩 커밋과 같은 결과)
+- DBHandler.write_transaction(): 구간 안에서는 임계값 커밋을 보류하고 끝에서 한 번 커밋 / 예외면 롤백
+  (출고 루프가 스토어마다 조합 배정 상태 + 조합 할당 + 업로드 로그를 한 트랜잭션으로 기록)
+- 주의: 커밋 전에 프로세스가 죽으면 쌓인 행(최대 max_rows 건 / max_delay 초)은 기록되지 않음
+
+검증 / 벤치마크:
+    python -m database.write_buffer --check
+    python -m database.write_buffer --bench 20000
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Sequence
+
+# 기본 임계값 (행 수 / 첫 행 이후 경과 초)
+WRITE_BUFFER_MAX_ROWS = 500
+WRITE_BUFFER_MAX_DELAY = 2.0
+
+
+class WriteBuffer:
+    """INSERT 는 바로 실행, 커밋만 모아서 (커밋 안 된 행 수와 첫 행 시각을 관리)"""
+
+    def __init__(self, max_rows: int = WRITE_BUFFER_MAX_ROWS, max_delay: float = WRITE_BUFFER_MAX_DELAY):
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._pending = 0
+        self._first_at = 0.0
+        self._held = 0
+
+    def add(self, conn: sqlite3.Connection, sql: str, params: Sequence) -> bool:
+        """
+        행 INSERT (커밋 안 함, 오류는 그대로 발생)
+
+        Returns:
+            True: 임계값 도달 (호출부에서 flush 필요, hold() 구간 안에서는 항상 False)
+        """
+        conn.execute(sql, params)
+        return self._added(1)
+
+    def add_many(self, conn: sqlite3.Connection, sql: str, rows: Sequence[Sequence]) -> bool:
+        """여러 행 INSERT (executemany 한 번, 커밋 안 함)"""
+        if not rows:
+            return False
+        conn.executemany(sql, rows)
+        return self._added(len(rows))
+
+    def _added(self, count: int) -> bool:
+        if self._pending == 0:
+            self._first_at = time.monotonic()
+        self._pending += count
+        if self._held:
+            return False
+        return self._pending >= self.max_rows or time.monotonic() - self._first_at >= self.max_delay
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def flush(self, conn: sqlite3.Connection) -> int:
+        """
+        커밋 (호출부가 열어 둔 트랜잭션도 함께 커밋됨 - 기존 한 건씩 커밋과 동일)
+
+        Returns:
+            커밋한 버퍼 행 수
+        """
+        conn.commit()
+        return self.discard()
+
+    def discard(self) -> int:
+        """커밋/롤백으로 쌓인 행이 정리된 뒤 카운터 초기화. Returns: 정리된 행 수"""
+        count, self._pending = self._pending, 0
+        return count
+
+    @contextmanager
+    def hold(self):
+        """구간 안에서는 임계값 커밋을 하지 않음 (중첩 가능)"""
+        self._held += 1
+        try:
+            yield
+        finally:
+            self._held -= 1
+
+
+# =========================
+# 검증 / 벤치마크
+# =========================
+
+def _run(rows: int, bench: bool) -> None:
+    import os
+    import shutil
+    import sys
+    import tempfile
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database.db_handler import DBHandler
+
+    tmp_dir = tempfile.mkdtemp(prefix="write_buffer_")
+
+    def log_rows(db, n, tag):
+        for i in range(n):
+            db.log_upload(
+                business_number="123-45-67890", market_id=None, market_name=f"마켓{i % 7}",
+                product_id=None, product_code=f"{tag}{i:06d}",
+                used_product_name=f"상품명 {i}", used_nukki_url=f"https://img/{i}/n", used_mix_url=f"https://img/{i}/m",
+                product_name_index=i % 3, image_nukki_index=0, image_mix_index=0,
+                upload_strategy="{}", notes="bench",
+            )
+            db.assign_combination(f"{tag}{i:06d}", i % 5, f"마켓{i % 7}", "123-45-67890")
+
+    def dump(db):
+        return (
+            list(map(tuple, db.conn.execute(
+                "SELECT market_name, product_code, used_product_name, notes FROM upload_logs ORDER BY id").fetchall())),
+            list(map(tuple, db.conn.execute(
+                "SELECT sheet_name, business_number, product_code, combination_index FROM combination_assignments ORDER BY id").fetchall())),
+        )
+
+    try:
+        # 1) 한 건씩 커밋 (버퍼 크기 1) vs 그룹 커밋 → 결과 동일
+        timings = {}
+        dumps = {}
+        for name, max_rows in (("per-row", 1), ("buffered", WRITE_BUFFER_MAX_ROWS)):
+            db = DBHandler(os.path.join(tmp_dir, f"{name}.db"))
+            db.connect()
+            db.write_buffer.max_rows = max_rows
+            t0 = time.perf_counter()
+            log_rows(db, rows, "P")
+            db.flush_writes()
+            timings[name] = time.perf_counter() - t0
+            dumps[name] = dump(db)
+            db.close()
+            print(f"[{name}] upload_logs + combination_assignments {rows:,}건씩 {timings[name]:.2f}초")
+        assert dumps["per-row"] == dumps["buffered"], "한 건씩 기록과 버퍼 기록 결과가 다름"
+        print(f"[검증] 기록 결과 동일 ({timings['per-row'] / max(timings['buffered'], 1e-9):.1f}x)")
+        if bench:
+            return
+
+        # 2) 자기 쓰기 읽기: 커밋 전이라도 DBHandler 조회 / conn 직접 조회에 보임
+        path = os.path.join(tmp_dir, "ryw.db")
+        db = DBHandler(path)
+        db.connect()
+        db.log_upload("999", None, "마켓X", None, "RYW001", "n", "", "", 0)
+        db.assign_combination("RYW001", 3, "마켓X", "999")
+        assert db.write_buffer.pending == 2
+        assert db.check_business_duplicate("999", "RYW001"), "DBHandler 조회에 버퍼 행이 안 보임"
+        row = db.conn.execute("SELECT combination_index FROM combination_assignments WHERE product_code = 'RYW001'").fetchone()
+        assert row and row[0] == 3, "conn 직접 조회에 버퍼 행이 안 보임"
+        other = sqlite3.connect(path)
+        assert other.execute("SELECT COUNT(*) FROM upload_logs").fetchone()[0] == 0, "커밋 전에 다른 연결에 보임"
+        assert db.flush_writes() == 2 and db.write_buffer.pending == 0
+        assert other.execute("SELECT COUNT(*) FROM upload_logs").fetchone()[0] == 1
+        print("[검증] 커밋 전 자기 쓰기 읽기 OK (다른 연결에는 flush_writes() 후 보임)")
+
+        # 3) 오류는 INSERT 를 부른 호출부에서 바로 발생, 쌓인 행은 유지
+        db.log_upload("999", None, "마켓X", None, "RYW002", "n", "", "", 0)
+        try:
+            db._buffer_write("INSERT INTO upload_logs (no_such_column) VALUES (?)", (1,))
+            raise AssertionError("잘못된 INSERT 가 호출부에서 실패하지 않음")
+        except sqlite3.OperationalError:
+            pass
+        assert db.write_buffer.pending == 1 and db.check_business_duplicate("999", "RYW002")
+        print("[검증] 쓰기 오류는 호출부에서 발생, 앞서 쌓인 행 유지 OK")
+
+        # 4) 닫을 때 커밋 + 다른 연결에서 확인
+        db.close()
+        assert other.execute("SELECT COUNT(*) FROM upload_logs WHERE product_code = 'RYW002'").fetchone()[0] == 1
+        print("[검증] close() 시 커밋 OK")
+
+        # 5) write_transaction: 임계값 커밋 보류 → 끝에서 한 번 커밋 / 예외면 전부 롤백
+        db = DBHandler(path)
+        db.connect()
+        db.write_buffer.max_rows = 1
+        assign_rows = [("마켓T", "999", f"T{i:03d}", i) for i in range(5)]
+        try:
+            with db.write_transaction():
+                db.assign_combinations(assign_rows)
+                assert other.execute("SELECT COUNT(*) FROM combination_assignments WHERE sheet_name = '마켓T'").fetchone()[0] == 0
+                raise RuntimeError("중간 실패")
+        except RuntimeError:
+            pass
+        assert db.write_buffer.pending == 0
+        assert db.conn.execute("SELECT COUNT(*) FROM combination_assignments WHERE sheet_name = '마켓T'").fetchone()[0] == 0
+        with db.write_transaction():
+            db.assign_combinations(assign_rows)
+        assert other.execute("SELECT COUNT(*) FROM combination_assignments WHERE sheet_name = '마켓T'").fetchone()[0] == 5
+        other.close()
+        db.close()
+        print("[검증] write_transaction 커밋 / 롤백 OK")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="쓰기 버퍼 검증 / 벤치마크")
+    parser.add_argument("--check", action="store_true",
+                        help="한 건씩 기록과 결과 비교 + 자기 쓰기 읽기 + 오류 발생 위치 + close / 트랜잭션")
+    parser.add_argument("--bench", type=int, default=0, metavar="ROWS", help="ROWS건 기록 시간 비교 (한 건씩 커밋 vs 그룹 커밋)")
+    args = parser.parse_args()
+
+    if args.bench:
+        _run(args.bench, bench=True)
+    else:
+        _run(2000, bench=False)
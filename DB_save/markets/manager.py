@@ -240,6 +240,12 @@ class UploadManager:
                     failed_count += 1
                     log(f"❌ 오류 발생: {product_code} - {e}")
                     continue
+            
+            # 이 마켓의 업로드 로그 커밋 (중복 체크는 커밋 전에도 같은 연결에서 쌓인 로그를 봄)
+            try:
+                self.db_handler.flush_writes()
+            except Exception as e:
+                log(f"❌ 업로드 로그 기록 실패 ({market_name}): {e}")
         
         return {"success": success_count, "failed": failed_count}
     
@@ -239,7 +239,10 @@ def main():
         # 2. 초기 상태 설정
         print()
         print("2단계: 초기 상태 설정...")
-        if not initialize_state_from_assignments(db_handler, reset_mode):
+        # 대량 적재 모드: 상태 테이블 보조 인덱스는 적재 후 한 번에 생성 + ANALYZE (중단되면 다음 연결 때 복구)
+        with db_handler.bulk_load(["store_combination_state"]):
+            initialized = initialize_state_from_assignments(db_handler, reset_mode)
+        if not initialized:
             print("❌ 마이그레이션 실패")
             return
         
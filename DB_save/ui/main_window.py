@@ -2327,23 +2327,9 @@ class MainWindow(tk.Tk):
                 return
             
             try:
-                # 카테고리별 상품수 조회
-                cursor = self.db_handler.conn.cursor()
-                cursor.execute("""
-                    SELECT 카테고리명, COUNT(DISTINCT 상품코드) as product_count
-                    FROM products
-                    WHERE product_status = 'ACTIVE'
-                    AND product_names_json IS NOT NULL 
-                    AND product_names_json != '' 
-                    AND product_names_json != '[]'
-                    GROUP BY 카테고리명
-                    ORDER BY product_count DESC
-                """)
-                
+                # 카테고리별 상품수 조회 (category_stats 집계 테이블)
                 category_products = {}
-                for row in cursor.fetchall():
-                    cat_name = row[0]
-                    count = row[1]
+                for cat_name, count in self.db_handler.get_category_named_counts().items():
                     if cat_name:
                         # 대>중 형식으로 변환
                         large_medium = self._get_category_large_medium(cat_name)
@@ -2994,33 +2980,13 @@ class MainWindow(tk.Tk):
         ttk.Button(frame, text="닫기", command=info_window.destroy).pack(pady=(10, 0))
     
     def _get_category_product_count(self, category: str) -> int:
-        """카테고리의 상품 수 조회 (완료된 DB 기준)"""
+        """카테고리의 상품 수 조회 (완료된 DB 기준, category_stats 대>중 인덱스 조회)"""
         if not self.db_handler or not self.db_handler.conn:
             return 0
         
         try:
-            # 카테고리를 '대>중' 형식으로 변환
-            category_parts = [part.strip() for part in category.split('>')]
-            if len(category_parts) >= 2:
-                large_cat = category_parts[0].strip()
-                medium_cat = category_parts[1].strip()
-                category_pattern = f"%{large_cat}%>%{medium_cat}%"
-            else:
-                category_pattern = f"%{category}%"
-            
-            cursor = self.db_handler.conn.cursor()
-            cursor.execute("""
-                SELECT COUNT(DISTINCT 상품코드) 
-                FROM products 
-                WHERE 카테고리명 LIKE ? 
-                AND product_status = 'ACTIVE'
-                AND product_names_json IS NOT NULL 
-                AND product_names_json != '' 
-                AND product_names_json != '[]'
-            """, (category_pattern,))
-            
-            row = cursor.fetchone()
-            return row[0] if row else 0
+            # 같은 대>중 아래 여러 세부 카테고리에 걸친 상품코드는 1개로 계산 (기존 COUNT(DISTINCT)와 동일)
+            return self.db_handler.count_products_in_categories([category])
         except Exception as e:
             return 0
     
@@ -3785,13 +3751,15 @@ class MainWindow(tk.Tk):
                         
                         if combo_count == 0:
                             self._log("📊 상품 조합 생성 중... (최초 1회, 시간이 걸릴 수 있습니다)")
-                            total = temp_db_handler.generate_and_save_product_combinations()
-                            self._log(f"✅ 상품 조합 생성 완료: {total}개 조합")
-                            
-                            # 기존 upload_logs에서 할당 정보 마이그레이션
-                            self._log("📊 기존 조합 할당 정보 마이그레이션 중...")
-                            migrated = temp_db_handler.migrate_existing_assignments()
-                            self._log(f"✅ 기존 조합 할당 정보 마이그레이션 완료: {migrated}개")
+                            # 대량 적재 모드: 조합/할당 테이블 보조 인덱스는 적재 후 한 번에 생성
+                            with temp_db_handler.bulk_load(["product_combinations", "combination_assignments"]):
+                                total = temp_db_handler.generate_and_save_product_combinations()
+                                self._log(f"✅ 상품 조합 생성 완료: {total}개 조합")
+                                
+                                # 기존 upload_logs에서 할당 정보 마이그레이션
+                                self._log("📊 기존 조합 할당 정보 마이그레이션 중...")
+                                migrated = temp_db_handler.migrate_existing_assignments()
+                                self._log(f"✅ 기존 조합 할당 정보 마이그레이션 완료: {migrated}개")
                         else:
                             self._log(f"✅ 상품 조합 테이블 확인 완료: {combo_count}개 조합 존재")
                             
@@ -4270,135 +4238,24 @@ class MainWindow(tk.Tk):
             self.after(0, lambda: self._log(f"⚠️ 총 상품 수 조회 실패: {e}"))
     
     def _calculate_product_count_optimized(self, unique_categories: list, db_path: str):
-        """백그라운드에서 상품 수 계산 (속도 최적화 버전 - 대용량 배치 처리 + 병렬 처리 + DB 최적화)"""
+        """백그라운드에서 상품 수 계산 (category_stats 집계 테이블 - 대>중 인덱스 조회 + 카테고리 간 상품코드 중복 제거)"""
         try:
             import sqlite3
-            import time
-            from concurrent.futures import ThreadPoolExecutor, as_completed
+            from database.category_stats import count_distinct_products
             
             # DB 조회는 별도 연결 사용 (스레드 안전성을 위해)
             conn = sqlite3.connect(db_path, check_same_thread=False)
-            # 성능 최적화 설정 (RAM 충분하므로 더 큰 캐시 사용)
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA journal_mode=WAL")
-            cursor.execute("PRAGMA synchronous=NORMAL")  # 성능 향상
-            cursor.execute("PRAGMA cache_size=-500000")  # 500MB 캐시 (RAM 충분하므로 대용량 캐시)
-            cursor.execute("PRAGMA temp_store=MEMORY")
-            cursor.execute("PRAGMA mmap_size=268435456")  # 256MB 메모리 맵 (대용량 데이터 처리)
-            cursor.execute("PRAGMA threads=4")  # 멀티스레드 쿼리 처리
-            
             try:
-                # 전체 중복 제거를 위한 set (RAM 충분하므로 메모리에 모두 보관)
-                all_product_codes = set()
-                
-                # 카테고리를 대용량 배치로 나눠서 처리 (RAM 충분하므로 배치 크기 증가)
-                category_list = list(unique_categories)
-                batch_size = 300  # 원본 100에서 300으로 증가 (속도 향상, RAM 충분하므로 가능)
-                total_batches = (len(category_list) + batch_size - 1) // batch_size
-                
-                # 진행 상황 업데이트 주기
-                update_interval = 2  # 더 자주 업데이트 (2배치마다)
-                last_update_time = time.time()
-                
-                # 병렬 처리용 함수 (각 배치를 병렬로 처리)
-                def process_batch(batch_categories, batch_num):
-                    """단일 배치 처리 (병렬 실행용)"""
-                    try:
-                        # 각 배치마다 별도 DB 연결 생성 (병렬 처리 안전성)
-                        batch_conn = sqlite3.connect(db_path, check_same_thread=False)
-                        batch_cursor = batch_conn.cursor()
-                        # 성능 최적화 설정
-                        batch_cursor.execute("PRAGMA journal_mode=WAL")
-                        batch_cursor.execute("PRAGMA synchronous=NORMAL")
-                        batch_cursor.execute("PRAGMA cache_size=-500000")
-                        
-                        batch_product_codes = set()
-                        
-                        # 배치 내 카테고리 패턴 생성
-                        category_patterns = []
-                        for cat in batch_categories:
-                            category_parts = [part.strip() for part in cat.split('>')]
-                            if len(category_parts) >= 2:
-                                large_cat = category_parts[0].strip()
-                                medium_cat = category_parts[1].strip()
-                                category_pattern = f"%{large_cat}%>%{medium_cat}%"
-                            else:
-                                category_pattern = f"%{cat}%"
-                            category_patterns.append(category_pattern)
-                        
-                        # 배치별로 쿼리 실행 (대용량 배치)
-                        query = f"""
-                            SELECT DISTINCT 상품코드 
-                            FROM products 
-                            WHERE product_status = 'ACTIVE'
-                            AND product_names_json IS NOT NULL 
-                            AND product_names_json != '' 
-                            AND product_names_json != '[]'
-                            AND (
-                                {' OR '.join(['카테고리명 LIKE ?' for _ in batch_categories])}
-                            )
-                        """
-                        batch_cursor.execute(query, category_patterns)
-                        
-                        # 결과를 바로 set에 추가 (메모리 효율적)
-                        for row in batch_cursor.fetchall():
-                            product_code = row[0]
-                            if product_code:
-                                batch_product_codes.add(product_code)
-                        
-                        batch_conn.close()
-                        return batch_product_codes, batch_num
-                    except Exception as e:
-                        batch_conn.close()
-                        return set(), batch_num
-                
-                # 병렬 처리로 여러 배치를 동시에 처리 (속도 향상)
-                # 단, DB 연결 수가 너무 많아지지 않도록 최대 4개 스레드로 제한
-                max_workers = min(4, total_batches)  # 최대 4개 병렬 처리
-                
-                with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    # 모든 배치 작업 제출
-                    futures = {}
-                    for batch_idx in range(0, len(category_list), batch_size):
-                        if getattr(self, '_product_count_cancelled_opt', False):
-                            break
-                        
-                        batch_categories = category_list[batch_idx:batch_idx + batch_size]
-                        current_batch = (batch_idx // batch_size) + 1
-                        future = executor.submit(process_batch, batch_categories, current_batch)
-                        futures[future] = current_batch
-                    
-                    # 완료된 배치 결과 수집
-                    completed_batches = 0
-                    for future in as_completed(futures):
-                        if getattr(self, '_product_count_cancelled_opt', False):
-                            break
-                        
-                        batch_product_codes, batch_num = future.result()
-                        all_product_codes.update(batch_product_codes)
-                        completed_batches += 1
-                        
-                        # 진행 상황 업데이트 (더 자주)
-                        current_time = time.time()
-                        if current_time - last_update_time >= 0.3 or completed_batches % update_interval == 0:
-                            progress_pct = int((completed_batches / total_batches) * 100)
-                            self.after(0, lambda pct=progress_pct, batch=completed_batches, total=total_batches: 
-                                       self.total_product_count_label.config(text=f"계산 중... ({pct}%, {batch}/{total} 배치)"))
-                            last_update_time = current_time
-                
-                # 최종 카운트 계산 (전체 중복 제거 완료)
-                if not getattr(self, '_product_count_cancelled_opt', False):
-                    final_count = len(all_product_codes)
-                    
-                    # 취소 체크
-                    if getattr(self, '_product_count_cancelled_opt', False):
-                        conn.close()
-                        return
-                    
-                    # 메인 스레드에서 UI 업데이트
-                    self.after(0, lambda count=final_count: self.total_product_count_label.config(text=f"{count:,}개"))
+                final_count = count_distinct_products(conn, unique_categories)
             finally:
                 conn.close()
+            
+            # 취소 체크
+            if getattr(self, '_product_count_cancelled_opt', False):
+                return
+            
+            # 메인 스레드에서 UI 업데이트
+            self.after(0, lambda count=final_count: self.total_product_count_label.config(text=f"{count:,}개"))
         except Exception as e:
             # 메인 스레드에서 UI 업데이트
             self.after(0, lambda: self.total_product_count_label.config(text="조회 실패"))
@@ -5619,6 +5476,26 @@ class MainWindow(tk.Tk):
             
             global_used_combinations = global_used_combinations_db.copy()  # 메모리에서도 추적 (이번 출고에서 할당한 조합)
             
+            # 순환식 조합 배정기 (상품 조합/스토어 상태를 한 번만 읽고 메모리에서 배정 - 성능 최적화)
+            combination_allocator = db_handler.create_combination_allocator()
+            
+            # products 컬럼형 스냅샷 (카테고리별 상품 조회를 행 단위 변환 없이 처리 - 성능 최적화)
+            try:
+                product_snapshot = db_handler.use_product_snapshot()
+                self._log(f"상품 스냅샷 준비: {len(product_snapshot.frame):,}행 ({product_snapshot.last_refresh})")
+            except Exception as e:
+                db_handler.use_product_snapshot(False)
+                self._log(f"  ⚠️ 상품 스냅샷 사용 불가 (DB 직접 조회): {e}")
+            
+            # 시즌 분류가 안 된 상품(다른 프로그램으로 입고 / 시즌 설정 변경)만 미리 분류 (출고 중 반복 키워드 매칭 제거)
+            if export_mode == "upload" and getattr(self, 'season_filter_var', tk.BooleanVar(value=True)).get():
+                try:
+                    classified = db_handler.classify_product_seasons()
+                    if classified:
+                        self._log(f"시즌 분류 갱신: {classified:,}개 상품")
+                except Exception as e:
+                    self._log(f"  ⚠️ 시즌 분류 갱신 실패: {e}")
+            
             # 2단계: 시트별로 처리
             # 중요: 전체 시트에 대해 동일 조합 추적 (시트별 독립 추적 제거)
             # 새로운 DB만 출력 옵션 체크시: 같은 스토어 내 같은 상품코드 출력 불가
@@ -5990,6 +5867,9 @@ class MainWindow(tk.Tk):
                         # 우선순위 적용 안 함 (기본 정렬)
                         product_codes_list = sorted(all_products_by_code.keys())  # 상품코드 리스트 (정렬하여 일관성 유지)
                     
+                    # 스토어 상품들의 조합 + 스토어 상태 일괄 로드
+                    combination_allocator.preload(sheet_name, business_number, product_codes_list)
+                    
                     for product_code in product_codes_list:
                         # 등록된 상품수량 필터링 (출력 상품수량 제한 필터 전에 검증)
                         if store_registered_limit is not None:
@@ -6012,8 +5892,8 @@ class MainWindow(tk.Tk):
                             skipped_count += 1
                             continue
                         
-                        # 순환식 조합 선택 (store_combination_state 테이블 사용)
-                        found_product = db_handler.get_next_combination_for_store(
+                        # 순환식 조합 선택 (store_combination_state 기준, 상태는 스토어 끝에 일괄 기록)
+                        found_product = combination_allocator.next_combination(
                             product_code=product_code,
                             sheet_name=sheet_name,
                             business_number=business_number,
@@ -6052,12 +5932,6 @@ class MainWindow(tk.Tk):
                             candidate_combination_key = (product_code, url_type, final_name, used_url)
                             store_used_combinations.add(candidate_combination_key)
                         
-                        # 상태 업데이트 커밋 (get_next_combination_for_store에서 이미 업데이트됨)
-                        try:
-                            db_handler.conn.commit()
-                        except Exception as e:
-                            self._log(f"    ⚠️ 상태 업데이트 커밋 실패: {e}")
-                        
                         # 새로운 조합 할당 테이블에 기록 (배치 INSERT로 변경 - 성능 최적화)
                         combination_index = found_product.get("combination_index")
                         if combination_index is not None:
@@ -6168,35 +6042,20 @@ class MainWindow(tk.Tk):
                         else:
                             self._log(f"      ⏭️ DB 기록 건너뜀 (재다운로드): 상품코드 '{product_code}' → 마켓 '{sheet_name}' / 스토어 '{market_name}' / 조합: {url_type}url + 상품명({line_index+1}번째줄)")
                     
-                    # 배치 INSERT 실행 (성능 최적화)
+                    # 배치 INSERT 실행 (성능 최적화) - 스토어 단위 한 트랜잭션 (쓰기 버퍼, 예외면 전부 롤백)
                     try:
-                        cursor = db_handler.conn.cursor()
-                        
-                        # combination_assignments 배치 INSERT
-                        if combination_assignments_batch:
-                            cursor.executemany("""
-                                INSERT OR IGNORE INTO combination_assignments 
-                                (sheet_name, business_number, product_code, combination_index)
-                                VALUES (?, ?, ?, ?)
-                            """, combination_assignments_batch)
-                        
-                        # upload_logs 배치 INSERT
-                        if upload_logs_batch:
-                            cursor.executemany("""
-                                INSERT INTO upload_logs (
-                                    business_number, market_id, market_name, product_id, product_code,
-                                    used_product_name, used_nukki_url, used_mix_url,
-                                    product_name_index, image_nukki_index, image_mix_index,
-                                    upload_strategy, upload_status, notes, uploaded_at
-                                )
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """, upload_logs_batch)
-                        
-                        # 한 번에 커밋
-                        db_handler.conn.commit()
+                        with db_handler.write_transaction():
+                            # store_combination_state 일괄 기록 (조합 배정기 메모리 상태)
+                            combination_allocator.flush()
+                            
+                            # combination_assignments / upload_logs 배치 INSERT (executemany 한 번씩)
+                            db_handler.assign_combinations(combination_assignments_batch)
+                            db_handler.log_uploads(upload_logs_batch)
+                        combination_allocator.on_commit()
                         self._log(f"    ✓ 배치 DB 기록 완료: combination_assignments {len(combination_assignments_batch)}건, upload_logs {len(upload_logs_batch)}건")
                     except Exception as e:
-                        db_handler.conn.rollback()
+                        # 롤백된 조합 배정 상태는 버리고 다음 스토어부터 DB 상태로 다시 배정
+                        combination_allocator.on_rollback()
                         self._log(f"    ⚠️ 배치 DB 기록 실패: {e}")
                         import traceback
                         self._log(traceback.format_exc())
@@ -6541,36 +6400,19 @@ class MainWindow(tk.Tk):
             db_handler = DBHandler(db_path)
             db_handler.connect()
             
-            # 전체 ACTIVE 상품 조회
-            cursor = db_handler.conn.cursor()
-            cursor.execute("""
-                SELECT * FROM products 
-                WHERE product_status = 'ACTIVE'
-                ORDER BY 상품코드
-            """)
-            
-            # 컬럼명 가져오기
-            columns = [description[0] for description in cursor.description]
-            
-            # 모든 데이터 가져오기
-            rows = cursor.fetchall()
-            
-            # 딕셔너리 리스트로 변환
-            all_products = []
-            for row in rows:
-                product_dict = dict(zip(columns, row))
-                all_products.append(product_dict)
+            # 전체 ACTIVE 상품 조회 (컬럼형 스냅샷 - 바뀐 행만 DB에서 다시 읽음)
+            product_snapshot = db_handler.get_product_snapshot()
+            df = product_snapshot.active_products(status='ACTIVE', sort_by='상품코드')
             
-            self._log(f"전체 ACTIVE 상품: {len(all_products):,}건")
+            self._log(f"전체 ACTIVE 상품: {len(df):,}건 (스냅샷: {product_snapshot.last_refresh})")
             
-            if all_products:
+            if len(df):
                 # 전체 컬럼을 엑셀 파일로 저장
-                df = pd.DataFrame(all_products)
                 # ExcelWriter를 사용하여 권한 문제 해결 (임시 파일 사용 안 함)
                 with pd.ExcelWriter(export_path, engine='openpyxl', mode='w') as writer:
                     df.to_excel(writer, index=False, sheet_name='Sheet1')
                 
-                self._log(f"✅ 전체 DB 출력 완료: {len(all_products):,}건")
+                self._log(f"✅ 전체 DB 출력 완료: {len(df):,}건")
                 self._log(f"저장 위치: {export_path}")
                 
                 # 파일 열기 여부 확인
@@ -6578,7 +6420,7 @@ class MainWindow(tk.Tk):
                     result = messagebox.askyesno(
                         "완료",
                         f"전체 DB 출력이 완료되었습니다.\n\n"
-                        f"출력 건수: {len(all_products):,}건\n"
+                        f"출력 건수: {len(df):,}건\n"
                         f"파일: {os.path.basename(export_path)}\n\n"
                         f"파일을 여시겠습니까?"
                     )
@@ -13,6 +13,7 @@ Stage 3-1: 썸네일 이미지 분석 (배치/대량) - 캐싱 최적화 버전
 """
 
 import os
+import sys
 import json
 import re
 import threading
@@ -28,6 +29,12 @@ from tkinter.scrolledtext import ScrolledText
 
 from openai import OpenAI
 
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet, write_sheet
+
 # ToolTip 클래스
 class ToolTip:
     def __init__(self, widget, text):
@@ -299,7 +306,7 @@ def safe_save_excel(df: pd.DataFrame, path: str) -> bool:
     """엑셀 파일이 열려 있어 저장이 안 될 때 재시도를 유도하는 함수"""
     while True:
         try:
-            df.to_excel(path, index=False)
+            write_sheet(df, path)
             return True
         except PermissionError:
             if not messagebox.askretrycancel(
@@ -890,7 +897,7 @@ class ImageAnalysisBatchGUI(tk.Tk):
         
         try:
             self.append_log(f"엑셀 로드 중... {os.path.basename(src)}")
-            df = pd.read_excel(src)
+            df = read_sheet(src)
             
             if "IMG_S1_누끼" not in df.columns:
                 raise ValueError("필수 컬럼(IMG_S1_누끼)이 누락되었습니다.")
@@ -1184,7 +1191,7 @@ class ImageAnalysisBatchGUI(tk.Tk):
         try:
             client = OpenAI(api_key=key)
             self.append_log(f"엑셀 로드 중... {os.path.basename(src)}")
-            df = pd.read_excel(src)
+            df = read_sheet(src)
             
             if "IMG_S1_누끼" not in df.columns:
                 raise ValueError("필수 컬럼(IMG_S1_누끼)이 누락되었습니다.")
@@ -2511,7 +2518,7 @@ class ImageAnalysisBatchGUI(tk.Tk):
                         self.append_log(f"⚠️ 그룹 {group_id}: 예상 {expected_total_chunks}개 중 {len(downloaded_batch_ids)}개만 다운로드되었습니다. ({missing}개 누락 가능)")
                 
                 # 통합 결과를 엑셀에 병합
-                df = pd.read_excel(src_path)
+                df = read_sheet(src_path)
                 result_cols = [
                     "view_point", "subject_position", "subject_size", "lighting_condition",
                     "color_tone", "shadow_presence", "background_simplicity", "is_flat_lay",
@@ -2548,7 +2555,7 @@ class ImageAnalysisBatchGUI(tk.Tk):
                 # I3 버전 파일로 저장
                 try:
                     final_out_path = get_i3_output_path(src_path)
-                    df_done = pd.read_excel(out_excel)
+                    df_done = read_sheet(out_excel)
                     if safe_save_excel(df_done, final_out_path):
                         # 중간 파일 삭제
                         if out_excel != final_out_path and os.path.exists(out_excel):
@@ -2770,7 +2777,7 @@ class ImageAnalysisBatchGUI(tk.Tk):
                     self.append_log(f"  [비용절감] {bid}: 캐싱으로 ${cache_savings:.4f} 절감")
 
                 if src_path and os.path.exists(src_path):
-                    df = pd.read_excel(src_path)
+                    df = read_sheet(src_path)
                     result_cols = [
                         "view_point", "subject_position", "subject_size", "lighting_condition",
                         "color_tone", "shadow_presence", "background_simplicity", "is_flat_lay",
@@ -2808,7 +2815,7 @@ class ImageAnalysisBatchGUI(tk.Tk):
                     # I3 버전 파일로 저장
                     try:
                         final_out_path = get_i3_output_path(src_path)
-                        df_done = pd.read_excel(out_excel)
+                        df_done = read_sheet(out_excel)
                         if safe_save_excel(df_done, final_out_path):
                             # 중간 파일 삭제
                             if out_excel != final_out_path and os.path.exists(out_excel):
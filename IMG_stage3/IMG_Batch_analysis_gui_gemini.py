@@ -610,7 +610,8 @@ class IMGAnalysisGeminiBatchGUI(tk.Tk):
                 max_width=max_width,
                 skip_existing=skip_existing,
                 skip_bad_label=skip_bad_label,
-                log_func=self.append_log
+                log_func=self.append_log,
+                model_name=model,
             )
 
             self.append_log(f"JSONL 생성 완료: {result['written_count']}건")
@@ -618,8 +619,16 @@ class IMGAnalysisGeminiBatchGUI(tk.Tk):
             self.append_log(f"  - bad 라벨 스킵: {result['skipped_bad']}건")
             self.append_log(f"  - 이미지 없음 스킵: {result['skipped_no_image']}건")
             self.append_log(f"  - 기타 오류 스킵: {result['skipped_count']}건")
+            if result.get("cached_count"):
+                self.append_log(f"  - 응답 캐시 적중: {result['cached_count']}건 (배치에서 제외, 병합 시 캐시 결과로 채움)")
 
             if result['written_count'] == 0:
+                # 대상 행이 모두 응답 캐시에 있으면 배치 없이 바로 병합
+                if result.get("cached_count"):
+                    out_excel = get_i3_output_path(src)
+                    merged_count, _, _ = merge_results_to_excel(src, [], out_excel)
+                    self.append_log(f"응답 캐시로 {merged_count}건 병합 완료 (API 호출 없음): {out_excel}")
+                    return
                 self.append_log("생성할 요청이 없습니다.")
                 return
 
@@ -645,7 +654,8 @@ class IMGAnalysisGeminiBatchGUI(tk.Tk):
                 client=client,
                 model_name=model,
                 src_file_name=uploaded_file_name,
-                display_name=f"img_analysis_{base_name}"
+                display_name=f"img_analysis_{base_name}",
+                excel_path=src,
             )
 
             batch_name = batch_info["name"]
@@ -957,7 +967,8 @@ class IMGAnalysisGeminiBatchGUI(tk.Tk):
 
                 # 병합
                 output_excel = get_i3_output_path(src_excel)
-                merged_count, total_in, total_out = merge_results_to_excel(src_excel, results, output_excel)
+                merged_count, total_in, total_out = merge_results_to_excel(
+                    src_excel, results, output_excel, batch_name=batch_name)
 
                 # 비용 계산
                 model = job.get("model", DEFAULT_MODEL)
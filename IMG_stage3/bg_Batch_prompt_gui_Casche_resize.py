@@ -13,6 +13,7 @@ Stage 3-2: 전처리 -> AI배경생성 분석 작업 (배치/대량) - 캐싱 
 """
 
 import os
+import sys
 import json
 import re
 import threading
@@ -28,6 +29,12 @@ from tkinter.scrolledtext import ScrolledText
 
 from openai import OpenAI
 
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet, write_sheet
+
 # ToolTip 클래스
 class ToolTip:
     def __init__(self, widget, text, wraplength=400):
@@ -294,7 +301,7 @@ def safe_save_excel(df: pd.DataFrame, path: str) -> bool:
     """엑셀 파일이 열려 있어 저장이 안 될 때 재시도를 유도하는 함수"""
     while True:
         try:
-            df.to_excel(path, index=False)
+            write_sheet(df, path)
             return True
         except PermissionError:
             if not messagebox.askretrycancel(
@@ -684,7 +691,7 @@ class BGPromptBatchGUI(tk.Tk):
             
             # 엑셀 파일 검증
             try:
-                df_check = pd.read_excel(p)
+                df_check = read_sheet(p)
                 
                 # view_point 컬럼 필수 체크
                 if "view_point" not in df_check.columns:
@@ -785,7 +792,7 @@ class BGPromptBatchGUI(tk.Tk):
         
         try:
             self.append_log(f"엑셀 로드 중... {os.path.basename(src)}")
-            df = pd.read_excel(src)
+            df = read_sheet(src)
             
             if "ST2_JSON" not in df.columns:
                 raise ValueError("필수 컬럼(ST2_JSON)이 누락되었습니다. Stage 2를 먼저 완료하세요.")
@@ -1078,7 +1085,7 @@ class BGPromptBatchGUI(tk.Tk):
         try:
             client = OpenAI(api_key=key)
             self.append_log(f"엑셀 로드 중... {os.path.basename(src)}")
-            df = pd.read_excel(src)
+            df = read_sheet(src)
             
             if "ST2_JSON" not in df.columns:
                 raise ValueError("필수 컬럼(ST2_JSON)이 누락되었습니다. Stage 2를 먼저 완료하세요.")
@@ -2404,7 +2411,7 @@ class BGPromptBatchGUI(tk.Tk):
                             self.append_log(f"  [WARN] {cid} 파싱 실패: {e}")
                 
                 if src_path and os.path.exists(src_path):
-                    df = pd.read_excel(src_path)
+                    df = read_sheet(src_path)
                     result_cols = ["bg_positive_en", "bg_negative_en", "video_motion_prompt_en", "video_full_prompt_en"]
                     for col in result_cols:
                         if col not in df.columns:
@@ -2433,7 +2440,7 @@ class BGPromptBatchGUI(tk.Tk):
                     # I4 버전 파일로 저장
                     try:
                         final_out_path = get_i4_output_path(src_path)
-                        df_done = pd.read_excel(out_excel)
+                        df_done = read_sheet(out_excel)
                         if safe_save_excel(df_done, final_out_path):
                             # 중간 파일 삭제
                             if out_excel != final_out_path and os.path.exists(out_excel):
@@ -2658,7 +2665,7 @@ class BGPromptBatchGUI(tk.Tk):
                     self.append_log(f"  [비용절감] {bid}: 캐싱으로 ${cache_savings:.4f} 절감")
 
                 if src_path and os.path.exists(src_path):
-                    df = pd.read_excel(src_path)
+                    df = read_sheet(src_path)
                     result_cols = ["bg_positive_en", "bg_negative_en", "video_motion_prompt_en", "video_full_prompt_en"]
                     for col in result_cols:
                         if col not in df.columns:
@@ -2687,7 +2694,7 @@ class BGPromptBatchGUI(tk.Tk):
                     # I4 버전 파일로 저장
                     try:
                         final_out_path = get_i4_output_path(src_path)
-                        df_done = pd.read_excel(out_excel)
+                        df_done = read_sheet(out_excel)
                         if safe_save_excel(df_done, final_out_path):
                             # 중간 파일 삭제
                             if out_excel != final_out_path and os.path.exists(out_excel):
@@ -8,6 +8,7 @@ Stage 4: 배경 생성 (ComfyUI)
 """
 
 import os
+import sys
 import json
 import re
 import time
@@ -28,6 +29,12 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet, write_sheet
+
 # ========================================================
 # 디버그 로그 시스템
 # ========================================================
@@ -322,7 +329,10 @@ def safe_save_excel(df: pd.DataFrame, path: str) -> bool:
     
     while True:
         try:
-            df.to_excel(path, index=False, engine=engine)
+            if ext == '.xlsx':
+                write_sheet(df, path)
+            else:
+                df.to_excel(path, index=False, engine=engine)
             return True
         except PermissionError:
             if not messagebox.askretrycancel(
@@ -2335,7 +2345,7 @@ class BGGenerationGUI(tk.Tk):
             
             # 엑셀 파일 검증
             try:
-                df_check = pd.read_excel(p)
+                df_check = read_sheet(p)
                 
                 # 필수 컬럼 체크
                 required_cols = ["IMG_S1_누끼", "bg_positive_en", "bg_negative_en"]
@@ -2498,11 +2508,11 @@ class BGGenerationGUI(tk.Tk):
             _, ext = os.path.splitext(actual_input_path.lower())
             try:
                 if ext == '.xlsx':
-                    df = pd.read_excel(actual_input_path, engine='openpyxl')
+                    df = read_sheet(actual_input_path)
                 elif ext == '.xls':
-                    df = pd.read_excel(actual_input_path, engine='xlrd')
+                    df = read_sheet(actual_input_path, engine='xlrd')
                 else:
-                    df = pd.read_excel(actual_input_path, engine='openpyxl')
+                    df = read_sheet(actual_input_path, engine='openpyxl')
             except (zipfile.BadZipFile, Exception) as e:
                 # I5 파일이 손상된 경우 원본 I4 파일로 폴백
                 if actual_input_path != input_path and actual_input_path == i5_output_path:
@@ -2513,11 +2523,11 @@ class BGGenerationGUI(tk.Tk):
                     # 원본 파일로 다시 시도
                     _, ext = os.path.splitext(actual_input_path.lower())
                     if ext == '.xlsx':
-                        df = pd.read_excel(actual_input_path, engine='openpyxl')
+                        df = read_sheet(actual_input_path)
                     elif ext == '.xls':
-                        df = pd.read_excel(actual_input_path, engine='xlrd')
+                        df = read_sheet(actual_input_path, engine='xlrd')
                     else:
-                        df = pd.read_excel(actual_input_path, engine='openpyxl')
+                        df = read_sheet(actual_input_path, engine='openpyxl')
                 else:
                     # 원본 파일도 읽을 수 없으면 예외를 다시 발생
                     raise
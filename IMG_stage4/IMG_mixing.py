@@ -8,6 +8,7 @@ Stage 4-2: 배경 합성 (ComfyUI)
 """
 
 import os
+import sys
 import json
 import re
 import time
@@ -28,6 +29,12 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet, write_sheet
+
 try:
     from PIL import Image, ImageTk
     PIL_AVAILABLE = True
@@ -333,7 +340,10 @@ def safe_save_excel(df: pd.DataFrame, path: str) -> bool:
     
     while True:
         try:
-            df.to_excel(path, index=False, engine=engine)
+            if ext == '.xlsx':
+                write_sheet(df, path)
+            else:
+                df.to_excel(path, index=False, engine=engine)
             return True
         except PermissionError:
             if not messagebox.askretrycancel("저장 실패", f"엑셀 파일이 열려있습니다!\n[{os.path.basename(path)}]\n\n파일을 닫고 '다시 시도'를 눌러주세요."):
@@ -381,15 +391,15 @@ def find_comfyui_paths(server_address: str, workflow_path: Optional[str] = None,
             # 엑셀 파일 확장자에 따라 엔진 지정
             _, ext = os.path.splitext(excel_path.lower())
             if ext == '.xlsx':
-                df_temp = pd.read_excel(excel_path, engine='openpyxl')
+                df_temp = read_sheet(excel_path)
             elif ext == '.xls':
-                df_temp = pd.read_excel(excel_path, engine='xlrd')
+                df_temp = read_sheet(excel_path, engine='xlrd')
             else:
                 # 기본값으로 openpyxl 시도
                 try:
-                    df_temp = pd.read_excel(excel_path, engine='openpyxl')
+                    df_temp = read_sheet(excel_path, engine='openpyxl')
                 except:
-                    df_temp = pd.read_excel(excel_path, engine='xlrd')
+                    df_temp = read_sheet(excel_path, engine='xlrd')
             if "IMG_S4_BG_생성경로" in df_temp.columns:
                 # 비어있지 않은 경로 찾기
                 for idx, row in df_temp.iterrows():
@@ -2348,16 +2358,16 @@ class IMGMixingGUI(tk.Tk):
             
             try:
                 if ext == '.xlsx':
-                    df = pd.read_excel(input_path, engine='openpyxl')
+                    df = read_sheet(input_path)
                 elif ext == '.xls':
-                    df = pd.read_excel(input_path, engine='xlrd')
+                    df = read_sheet(input_path, engine='xlrd')
                 else:
                     # 기본값으로 openpyxl 시도
                     try:
-                        df = pd.read_excel(input_path, engine='openpyxl')
+                        df = read_sheet(input_path, engine='openpyxl')
                     except Exception as e1:
                         try:
-                            df = pd.read_excel(input_path, engine='xlrd')
+                            df = read_sheet(input_path, engine='xlrd')
                         except Exception as e2:
                             raise Exception(f"엑셀 파일 읽기 실패 (openpyxl: {e1}, xlrd: {e2})")
             except zipfile.BadZipFile as e:
@@ -2370,11 +2380,11 @@ class IMGMixingGUI(tk.Tk):
                     # I4 파일 다시 읽기
                     try:
                         if ext == '.xlsx':
-                            df = pd.read_excel(i4_path, engine='openpyxl')
+                            df = read_sheet(i4_path)
                         elif ext == '.xls':
-                            df = pd.read_excel(i4_path, engine='xlrd')
+                            df = read_sheet(i4_path, engine='xlrd')
                         else:
-                            df = pd.read_excel(i4_path, engine='openpyxl')
+                            df = read_sheet(i4_path, engine='openpyxl')
                         debug_log(f"I4 파일 로드 완료: {len(df)}행, {len(df.columns)}컬럼", "INFO")
                         self._log(f"✅ I4 파일 로드 성공: {len(df)}행")
                     except Exception as e2:
@@ -2405,11 +2415,11 @@ class IMGMixingGUI(tk.Tk):
                 time.sleep(1)
                 try:
                     if ext == '.xlsx':
-                        df = pd.read_excel(input_path, engine='openpyxl')
+                        df = read_sheet(input_path)
                     elif ext == '.xls':
-                        df = pd.read_excel(input_path, engine='xlrd')
+                        df = read_sheet(input_path, engine='xlrd')
                     else:
-                        df = pd.read_excel(input_path, engine='openpyxl')
+                        df = read_sheet(input_path, engine='openpyxl')
                 except Exception as e2:
                     raise Exception(
                         f"엑셀 파일을 읽을 수 없습니다.\n\n"
@@ -2431,11 +2441,11 @@ class IMGMixingGUI(tk.Tk):
                     # I4 파일 다시 읽기
                     _, ext = os.path.splitext(i4_path.lower())
                     if ext == '.xlsx':
-                        df = pd.read_excel(i4_path, engine='openpyxl')
+                        df = read_sheet(i4_path)
                     elif ext == '.xls':
-                        df = pd.read_excel(i4_path, engine='xlrd')
+                        df = read_sheet(i4_path, engine='xlrd')
                     else:
-                        df = pd.read_excel(i4_path, engine='openpyxl')
+                        df = read_sheet(i4_path, engine='openpyxl')
                     debug_log(f"I4 파일 로드 완료: {len(df)}행, {len(df.columns)}컬럼", "INFO")
                 else:
                     raise Exception("엑셀 파일을 읽을 수 없습니다. I4 파일도 찾을 수 없습니다.")
@@ -2468,11 +2478,11 @@ class IMGMixingGUI(tk.Tk):
                     # I4 파일 다시 읽기
                     _, ext = os.path.splitext(i4_path.lower())
                     if ext == '.xlsx':
-                        df = pd.read_excel(i4_path, engine='openpyxl')
+                        df = read_sheet(i4_path)
                     elif ext == '.xls':
-                        df = pd.read_excel(i4_path, engine='xlrd')
+                        df = read_sheet(i4_path, engine='xlrd')
                     else:
-                        df = pd.read_excel(i4_path, engine='openpyxl')
+                        df = read_sheet(i4_path, engine='openpyxl')
                     debug_log(f"I4 파일 로드 완료: {len(df)}행, {len(df.columns)}컬럼", "INFO")
 
             # 서버 연결 확인
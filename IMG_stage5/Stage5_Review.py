@@ -20,6 +20,12 @@ from pathlib import Path
 
 import pandas as pd
 
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet, write_sheet
+
 # ========================================================
 # 상대 경로 지원 (외부 PC 패키지 작업용)
 # ========================================================
@@ -122,6 +128,23 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+# 미리보기 이미지 캐시 (프로젝트 루트 공용 모듈 - sys.path 는 위 excel_io import 에서 추가)
+try:
+    from image_preview_cache import PreviewImageCache, DEFAULT_DISK_CACHE_DIR
+    PREVIEW_CACHE_AVAILABLE = True
+except ImportError:
+    PREVIEW_CACHE_AVAILABLE = False
+
+# 현재 항목 기준 앞/뒤로 미리 읽어둘 상품 개수
+PREVIEW_PREFETCH_COUNT = 3
+
+# 미리보기 칸 (current_<칸>_path / preview_<칸>_label / photo_<칸>) → 이미지 없을 때 문구
+PREVIEW_SLOTS = {
+    "original": "원본 이미지 없음",
+    "nukki": "누끼 이미지 없음",
+    "mix": "합성 이미지 없음",
+}
+
 # ========================================================
 # 메인 런처 연동용 JobManager & 파일명 유틸
 # ========================================================
@@ -348,7 +371,7 @@ def safe_save_excel(df: pd.DataFrame, path: str) -> bool:
     """엑셀 파일 저장 (재시도 포함)"""
     while True:
         try:
-            df.to_excel(path, index=False)
+            write_sheet(df, path)
             return True
         except PermissionError:
             if not messagebox.askretrycancel("저장 실패", f"엑셀 파일이 열려있습니다!\n[{os.path.basename(path)}]\n\n파일을 닫고 '다시 시도'를 눌러주세요."):
@@ -442,6 +465,14 @@ class Stage5ReviewGUI(tk.Tk):
         self.photo_nukki = None
         self.photo_mix = None
 
+        # 썸네일 캐시 (다음/이전 상품 미리 로드, 디스크 캐시는 I2 라벨링 도구와 공유)
+        # + 캐시를 채운 엑셀 파일 정보 (경로, 수정시각)
+        # (로드 오류는 워커 스레드에서 오므로 after() 로 로그창에 전달)
+        self.preview_cache = (PreviewImageCache(cache_dir=DEFAULT_DISK_CACHE_DIR,
+                                                on_error=lambda msg: self.after(0, self._log, msg))
+                              if (PIL_AVAILABLE and PREVIEW_CACHE_AVAILABLE) else None)
+        self.preview_cache_source = None
+
         # 패키지 모드 (외부 PC 작업용)
         self.package_mode = False
         self.base_dir = None  # 엑셀 파일 기준 디렉토리
@@ -585,7 +616,7 @@ class Stage5ReviewGUI(tk.Tk):
             
             # 필수 컬럼 체크
             try:
-                df_check = pd.read_excel(path)
+                df_check = read_sheet(path)
                 required_cols = ["썸네일경로", "IMG_S1_누끼", "IMG_S4_mix_생성경로", "view_point"]
                 missing_cols = [col for col in required_cols if col not in df_check.columns]
                 
@@ -666,11 +697,14 @@ class Stage5ReviewGUI(tk.Tk):
         
         # 엑셀 파일 로드
         try:
-            self.df = pd.read_excel(self.input_file_path.get())
+            self.df = read_sheet(self.input_file_path.get())
             self._log(f"엑셀 파일 로드 완료: {len(self.df)}행")
         except Exception as e:
             messagebox.showerror("오류", f"엑셀 파일을 읽는 중 오류가 발생했습니다:\n{e}")
             return
+
+        # 엑셀 파일이 바뀌었으면 (다른 파일 또는 수정됨) 이전 미리보기 캐시 폐기
+        self._reset_preview_cache_if_stale()
         
         # 처리할 항목 필터링
         self.items = []
@@ -1102,37 +1136,79 @@ class Stage5ReviewGUI(tk.Tk):
                 else:
                     max_size = 300  # 기본값
                 
-                # 원본 이미지
-                if self.current_original_path and os.path.exists(self.current_original_path):
-                    img = Image.open(self.current_original_path)
-                    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-                    self.photo_original = ImageTk.PhotoImage(img)
-                    self.preview_original_label.config(image=self.photo_original, text="")
-                else:
-                    self.preview_original_label.config(image="", text="원본 이미지 없음")
-                
-                # 누끼 이미지
-                if self.current_nukki_path and os.path.exists(self.current_nukki_path):
-                    img = Image.open(self.current_nukki_path)
-                    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-                    self.photo_nukki = ImageTk.PhotoImage(img)
-                    self.preview_nukki_label.config(image=self.photo_nukki, text="")
-                else:
-                    self.preview_nukki_label.config(image="", text="누끼 이미지 없음")
-                
-                # 합성 이미지
-                if self.current_mix_path and os.path.exists(self.current_mix_path):
-                    img = Image.open(self.current_mix_path)
-                    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-                    self.photo_mix = ImageTk.PhotoImage(img)
-                    self.preview_mix_label.config(image=self.photo_mix, text="")
-                else:
-                    self.preview_mix_label.config(image="", text="합성 이미지 없음")
+                # 원본 / 누끼 / 합성 이미지 (캐시 적중 시 바로 표시, 미스면 워커에서 디코딩 후 표시)
+                for slot in PREVIEW_SLOTS:
+                    self._show_preview_slot(slot, max_size)
+
+                # 앞/뒤 상품 이미지 백그라운드 미리 로드
+                self._prefetch_neighbor_previews(max_size)
             except Exception as e:
                 self._log(f"[미리보기] 이미지 로드 오류: {e}")
         
         self.after(0, update_ui)
     
+    def _show_preview_slot(self, slot: str, max_size: int):
+        """미리보기 한 칸 표시 - 캐시 미스면 '불러오는 중'을 띄우고 워커에서 디코딩 (Tk 스레드에서 디코딩 안 함)"""
+        path = getattr(self, f"current_{slot}_path")
+        label = getattr(self, f"preview_{slot}_label")
+        if not path or not os.path.exists(path):
+            label.config(image="", text=PREVIEW_SLOTS[slot])
+            return
+        if self.preview_cache is None:
+            img = Image.open(path)
+            img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+            self._apply_preview_slot(slot, path, img)
+            return
+        img = self.preview_cache.peek(path, max_size)
+        if img is not None:
+            self._apply_preview_slot(slot, path, img)
+            return
+        label.config(image="", text="불러오는 중...")
+        self.preview_cache.request(
+            path, max_size,
+            lambda loaded, slot=slot, path=path: self.after(0, self._apply_preview_slot, slot, path, loaded),
+        )
+
+    def _apply_preview_slot(self, slot: str, path: str, img):
+        """Tk 스레드에서 썸네일을 라벨에 반영 (그 사이 다른 상품으로 넘어갔으면 무시)"""
+        if self.preview_window is None or not self.preview_window.winfo_exists():
+            return
+        if path != getattr(self, f"current_{slot}_path"):
+            return
+        label = getattr(self, f"preview_{slot}_label")
+        if img is None:
+            label.config(image="", text=PREVIEW_SLOTS[slot])
+            return
+        photo = ImageTk.PhotoImage(img)
+        setattr(self, f"photo_{slot}", photo)
+        label.config(image=photo, text="")
+
+    def _prefetch_neighbor_previews(self, max_size: int):
+        """현재 항목 기준 다음/이전 PREVIEW_PREFETCH_COUNT개 상품의 이미지를 백그라운드로 미리 로드"""
+        if self.preview_cache is None or not self.items:
+            return
+        paths = []
+        # 가까운 항목부터 (다음 → 이전 순으로 번갈아) 요청
+        for offset in range(1, PREVIEW_PREFETCH_COUNT + 1):
+            for i in (self.current_index + offset, self.current_index - offset):
+                if 0 <= i < len(self.items):
+                    item = self.items[i]
+                    paths.extend([item['original_path'], item['nukki_path'], item['mix_path']])
+        self.preview_cache.prefetch(paths, max_size)
+
+    def _reset_preview_cache_if_stale(self):
+        """엑셀 파일(경로 또는 수정시각)이 바뀌었으면 미리보기 캐시 비우기"""
+        if self.preview_cache is None:
+            return
+        path = self.input_file_path.get()
+        try:
+            source = (os.path.abspath(path), os.path.getmtime(path))
+        except OSError:
+            source = None
+        if source != self.preview_cache_source:
+            self.preview_cache.clear()
+            self.preview_cache_source = source
+
     def _on_preview_window_resize(self):
         """팝업 창 크기 변경 시 이미지 재조정"""
         if self.preview_window and self.preview_window.winfo_exists():
@@ -1333,7 +1409,7 @@ class Stage5ReviewGUI(tk.Tk):
         temp_save_path = os.path.join(excel_dir, f"{excel_base}_stage5_중간저장.xlsx")
         if os.path.exists(temp_save_path):
             try:
-                df_temp = pd.read_excel(temp_save_path)
+                df_temp = read_sheet(temp_save_path)
                 
                 if nukki_col in df_temp.columns or mix_col in df_temp.columns:
                     temp_recovered = 0
@@ -1472,7 +1548,7 @@ class Stage5ReviewGUI(tk.Tk):
         # 엑셀 파일이 로드되어 있는지 확인
         if self.df is None:
             try:
-                self.df = pd.read_excel(self.input_file_path.get())
+                self.df = read_sheet(self.input_file_path.get())
                 self._log(f"엑셀 파일 로드 완료: {len(self.df)}행")
             except Exception as e:
                 messagebox.showerror("오류", f"엑셀 파일을 읽는 중 오류가 발생했습니다:\n{e}")
@@ -13,10 +13,14 @@ Stage5 외부 PC 작업용 패키지 생성 도구 (Export Tool)
 
 import os
 import re
+import io
 import json
 import shutil
+import hashlib
 import zipfile
 import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from pathlib import Path
@@ -32,19 +36,20 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+# 리사이즈 병렬 처리 프로세스 수 (CPU 1개는 GUI용으로 남김)
+EXPORT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
 
-def resize_image_for_review(src_path: str, dest_path: str, size: int = 350) -> bool:
-    """
-    리뷰용으로 이미지를 리사이즈하여 저장
-    - 350x350으로 축소 (비율 유지, 중앙 맞춤)
-    - JPG로 저장 (품질 85%)
-    """
-    if not PIL_AVAILABLE:
-        # PIL 없으면 그냥 복사
-        import shutil
-        shutil.copy2(src_path, dest_path)
-        return True
+# 증분 생성용 인덱스 파일 (images 폴더 안에 저장, 결과 파일 ↔ 원본 파일 정보)
+EXPORT_INDEX_NAME = ".export_index.json"
+
+# ZIP 압축 시 재압축하지 않고 그대로 저장할 확장자 (이미 압축된 포맷)
+ZIP_STORED_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".zip"}
 
+
+def render_review_jpeg(src_path: str, size: int = 350) -> Optional[bytes]:
+    """리뷰용 JPG(350x350 이내, 품질 85%) 바이트 생성. 실패 시 None"""
+    if not PIL_AVAILABLE:
+        return None
     try:
         img = Image.open(src_path)
 
@@ -64,18 +69,94 @@ def resize_image_for_review(src_path: str, dest_path: str, size: int = 350) -> b
         # 비율 유지하며 리사이즈
         img.thumbnail((size, size), Image.Resampling.LANCZOS)
 
-        # JPG로 저장 (품질 85%)
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=85, optimize=True)
+        return buf.getvalue()
+    except Exception:
+        return None
+
+
+def resize_image_for_review(src_path: str, dest_path: str, size: int = 350) -> bool:
+    """
+    리뷰용으로 이미지를 리사이즈하여 저장
+    - 350x350으로 축소 (비율 유지, 중앙 맞춤)
+    - JPG로 저장 (품질 85%)
+    """
+    if not PIL_AVAILABLE:
+        # PIL 없으면 그냥 복사
+        shutil.copy2(src_path, dest_path)
+        return True
+
+    data = render_review_jpeg(src_path, size)
+    if data is not None:
         dest_path_jpg = os.path.splitext(dest_path)[0] + ".jpg"
-        img.save(dest_path_jpg, "JPEG", quality=85, optimize=True)
+        with open(dest_path_jpg, 'wb') as f:
+            f.write(data)
         return True
+
+    # 실패 시 원본 복사 시도
+    try:
+        shutil.copy2(src_path, dest_path)
+        return True
+    except:
+        return False
+
+
+def file_sha1(path: str) -> str:
+    """파일 내용 SHA1 (증분 생성 시 원본 변경 여부 판단용)"""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def export_review_image(src_path: str, dest_path: Optional[str], size: int = 350,
+                        prev_entry: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    패키지용 이미지 1개 처리 (프로세스 풀 워커에서 실행)
+
+    - dest_path가 있으면: 파일로 저장. 이전 인덱스(prev_entry)와 원본 mtime/크기 또는 해시가 같고
+      결과 파일이 남아 있으면 리사이즈를 건너뜀
+    - dest_path가 None이면: 리사이즈된 JPG 바이트를 반환 (ZIP에 바로 기록하는 모드)
+
+    Returns:
+        {"status": "skipped"|"resized"|"failed", "entry": 인덱스 항목, "data": bytes 또는 None, "error": str}
+    """
+    result = {"status": "failed", "entry": None, "data": None, "error": ""}
+    try:
+        st = os.stat(src_path)
+        entry = {"src": src_path, "mtime": st.st_mtime, "size": st.st_size, "sha1": None}
+
+        if dest_path and prev_entry and prev_entry.get("src") == src_path and os.path.exists(dest_path):
+            if prev_entry.get("mtime") == st.st_mtime and prev_entry.get("size") == st.st_size:
+                entry["sha1"] = prev_entry.get("sha1")
+                result.update(status="skipped", entry=entry)
+                return result
+            # mtime만 바뀐 경우 (복사/동기화 등) 내용이 같으면 재사용
+            entry["sha1"] = file_sha1(src_path)
+            if entry["sha1"] == prev_entry.get("sha1"):
+                result.update(status="skipped", entry=entry)
+                return result
+
+        if entry["sha1"] is None:
+            entry["sha1"] = file_sha1(src_path)
+
+        if dest_path:
+            if resize_image_for_review(src_path, dest_path, size=size):
+                result.update(status="resized", entry=entry)
+            else:
+                result["error"] = "리사이즈 실패"
+        else:
+            data = render_review_jpeg(src_path, size)
+            if data is None:
+                # 리사이즈 실패 시 원본 그대로 사용 (파일 모드와 동일한 동작)
+                with open(src_path, 'rb') as f:
+                    data = f.read()
+            result.update(status="resized", entry=entry, data=data)
     except Exception as e:
-        # 실패 시 원본 복사 시도
-        try:
-            import shutil
-            shutil.copy2(src_path, dest_path)
-            return True
-        except:
-            return False
+        result["error"] = str(e)
+    return result
 
 
 def get_root_filename(filename: str) -> str:
@@ -109,6 +190,7 @@ class Stage5ExportToolGUI(tk.Tk):
         self.input_file_path = tk.StringVar()
         self.output_dir_path = tk.StringVar()
         self.create_zip = tk.BooleanVar(value=True)
+        self.zip_only = tk.BooleanVar(value=False)  # 폴더 없이 ZIP에 바로 기록
 
         # 상태 변수
         self.is_running = False
@@ -182,6 +264,8 @@ class Stage5ExportToolGUI(tk.Tk):
         opt_frame = ttk.Frame(frame_output)
         opt_frame.pack(fill='x', pady=(10, 0))
         ttk.Checkbutton(opt_frame, text="ZIP 파일로 압축", variable=self.create_zip).pack(side='left')
+        ttk.Checkbutton(opt_frame, text="폴더 없이 ZIP만 생성 (이미지를 ZIP에 바로 기록)",
+                        variable=self.zip_only).pack(side='left', padx=(15, 0))
 
         # 3. 패키지 정보 미리보기
         frame_preview = ttk.LabelFrame(main_frame, text="3. 패키지 정보 미리보기", padding=15)
@@ -347,32 +431,47 @@ class Stage5ExportToolGUI(tk.Tk):
         thread.start()
 
     def _create_package_thread(self):
-        """패키지 생성 스레드"""
+        """
+        패키지 생성 스레드
+
+        - 증분 생성: 기존 패키지 폴더를 지우지 않고, 원본(mtime/크기 또는 해시)이 그대로인 이미지는 재사용
+        - 리사이즈는 프로세스 풀(EXPORT_WORKERS)에서 병렬 처리
+        - "폴더 없이 ZIP만 생성" 옵션: 리사이즈 결과를 ZIP에 바로 기록 (중간 파일 없음)
+        """
         try:
             input_path = self.input_file_path.get()
             output_base = self.output_dir_path.get()
+            zip_only = self.zip_only.get()
 
             excel_name = os.path.basename(input_path)
             job_name = get_root_filename(excel_name).replace(".xlsx", "")
 
-            # 패키지 폴더 생성
+            # 패키지 폴더 준비 (기존 폴더는 유지 → 변경된 이미지만 다시 생성)
             package_dir = output_base
-            if os.path.exists(package_dir):
-                self.after(0, lambda: self._log(f"기존 폴더 삭제 중: {package_dir}"))
-                shutil.rmtree(package_dir)
-
-            os.makedirs(package_dir, exist_ok=True)
-            self.after(0, lambda: self._log(f"패키지 폴더 생성: {package_dir}"))
-
-            # 이미지 폴더 생성
             images_dir = os.path.join(package_dir, "images")
             nukki_dir = os.path.join(images_dir, "nukki")
             mix_dir = os.path.join(images_dir, "mix")
             thumbnail_dir = os.path.join(images_dir, "thumbnail")
 
-            os.makedirs(nukki_dir, exist_ok=True)
-            os.makedirs(mix_dir, exist_ok=True)
-            os.makedirs(thumbnail_dir, exist_ok=True)
+            if not zip_only:
+                if os.path.exists(package_dir):
+                    self.after(0, lambda: self._log(f"기존 패키지 폴더 재사용 (변경된 이미지만 갱신): {package_dir}"))
+                os.makedirs(nukki_dir, exist_ok=True)
+                os.makedirs(mix_dir, exist_ok=True)
+                os.makedirs(thumbnail_dir, exist_ok=True)
+                self.after(0, lambda: self._log(f"패키지 폴더: {package_dir}"))
+            else:
+                os.makedirs(os.path.dirname(os.path.abspath(package_dir)), exist_ok=True)
+
+            # 이전 생성 정보 로드
+            index_path = os.path.join(images_dir, EXPORT_INDEX_NAME)
+            prev_index = {}
+            if not zip_only and os.path.exists(index_path):
+                try:
+                    with open(index_path, 'r', encoding='utf-8') as f:
+                        prev_index = json.load(f)
+                except Exception:
+                    prev_index = {}
 
             # 엑셀 로드
             df = pd.read_excel(input_path)
@@ -387,16 +486,11 @@ class Stage5ExportToolGUI(tk.Tk):
 
             total_images = 0
             copied_images = 0
+            reused_images = 0
             failed_images = []
 
-            # 총 이미지 수 계산
-            for col in col_mappings.keys():
-                if col in df.columns:
-                    total_images += int(df[col].notna().sum())
-
-            self.after(0, lambda: self.progress_bar.config(maximum=total_images if total_images > 0 else 1))
-
-            processed = 0
+            # 작업 목록 수집: (행 인덱스, 컬럼, 원본 경로, 패키지 내 상대 경로)
+            jobs = []
             for col, (subdir, dest_dir) in col_mappings.items():
                 if col not in df.columns:
                     continue
@@ -405,65 +499,125 @@ class Stage5ExportToolGUI(tk.Tk):
                     path_str = str(val).strip()
                     if not path_str or path_str == "nan":
                         continue
+                    total_images += 1
 
-                    processed += 1
-                    self.after(0, lambda p=processed: self.progress_bar.config(value=p))
+                    if not os.path.exists(path_str):
+                        failed_images.append(f"{path_str}: 파일 없음")
+                        continue
 
-                    if os.path.exists(path_str):
-                        # 파일명 생성 (충돌 방지, JPG로 통일)
-                        orig_name = os.path.basename(path_str)
-                        base_name = os.path.splitext(orig_name)[0]
-                        new_name = f"row{idx}_{base_name}.jpg"
-                        dest_path = os.path.join(dest_dir, new_name)
+                    # 파일명 생성 (충돌 방지, JPG로 통일)
+                    orig_name = os.path.basename(path_str)
+                    base_name = os.path.splitext(orig_name)[0]
+                    new_name = f"row{idx}_{base_name}.jpg"
+                    rel_path = os.path.join("images", subdir, new_name)
+                    jobs.append((idx, col, path_str, rel_path))
 
-                        try:
-                            # 350x350으로 리사이즈하여 저장
-                            if resize_image_for_review(path_str, dest_path, size=350):
-                                # 상대 경로로 변환
-                                rel_path = os.path.join("images", subdir, new_name)
-                                df.at[idx, col] = rel_path
-                                copied_images += 1
-                            else:
-                                failed_images.append(f"{path_str}: 리사이즈 실패")
-                        except Exception as e:
-                            failed_images.append(f"{path_str}: {e}")
-                            self.after(0, lambda p=path_str, e=e: self._log(f"[오류] 복사 실패: {p} - {e}"))
-                    else:
-                        failed_images.append(f"{path_str}: 파일 없음")
+            self.after(0, lambda: self.progress_bar.config(maximum=total_images if total_images > 0 else 1))
+            self.after(0, lambda n=len(jobs), w=EXPORT_WORKERS: self._log(f"이미지 처리 시작: {n}개 (병렬 {w}개 프로세스)"))
 
-                    # UI 업데이트
-                    if processed % 50 == 0:
-                        self.after(0, lambda p=processed, t=total_images:
-                            self.progress_label.config(text=f"이미지 복사 중... {p}/{t}"))
-
-            self.after(0, lambda: self._log(f"이미지 복사 완료: {copied_images}/{total_images}개"))
-
-            # 엑셀 파일 저장 (경로 변환됨)
-            excel_output_path = os.path.join(package_dir, excel_name)
-            df.to_excel(excel_output_path, index=False)
-            self.after(0, lambda: self._log(f"엑셀 파일 저장: {excel_name}"))
-
-            # manifest.json 생성
-            manifest = {
-                "version": "1.0",
-                "job_name": job_name,
-                "excel_file": excel_name,
-                "original_base_dir": original_base_dir,
-                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "total_rows": len(df),
-                "total_images": total_images,
-                "copied_images": copied_images,
-                "failed_images": len(failed_images),
-                "columns_converted": list(col_mappings.keys())
-            }
+            zip_path = None
+            zf = None
+            zip_root = os.path.basename(os.path.normpath(package_dir))
+            if zip_only:
+                zip_path = f"{package_dir}.zip"
+                zf = zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED)
+
+            new_index = {}
+            processed = total_images - len(jobs)
+            try:
+                with ProcessPoolExecutor(max_workers=EXPORT_WORKERS) as executor:
+                    futures = {}
+                    for job in jobs:
+                        idx, col, path_str, rel_path = job
+                        key = rel_path.replace(os.sep, "/")
+                        dest_path = None if zip_only else os.path.join(package_dir, rel_path)
+                        fut = executor.submit(export_review_image, path_str, dest_path, 350, prev_index.get(key))
+                        futures[fut] = job
+
+                    for fut in as_completed(futures):
+                        idx, col, path_str, rel_path = futures[fut]
+                        key = rel_path.replace(os.sep, "/")
+                        processed += 1
+                        self.after(0, lambda p=processed: self.progress_bar.config(value=p))
 
-            manifest_path = os.path.join(package_dir, "manifest.json")
-            with open(manifest_path, 'w', encoding='utf-8') as f:
-                json.dump(manifest, f, ensure_ascii=False, indent=2)
-            self.after(0, lambda: self._log("manifest.json 생성 완료"))
+                        try:
+                            res = fut.result()
+                        except Exception as e:
+                            res = {"status": "failed", "error": str(e)}
 
-            # README 파일 생성
-            readme_content = f"""Stage5 외부 작업 패키지
+                        if res["status"] == "failed":
+                            failed_images.append(f"{path_str}: {res.get('error') or '리사이즈 실패'}")
+                            self.after(0, lambda p=path_str, e=res.get('error'): self._log(f"[오류] 복사 실패: {p} - {e}"))
+                        else:
+                            if zf is not None:
+                                zf.writestr(f"{zip_root}/{key}", res["data"], compress_type=zipfile.ZIP_STORED)
+                            # 상대 경로로 변환
+                            df.at[idx, col] = rel_path
+                            new_index[key] = res["entry"]
+                            copied_images += 1
+                            if res["status"] == "skipped":
+                                reused_images += 1
+
+                        # UI 업데이트
+                        if processed % 50 == 0:
+                            self.after(0, lambda p=processed, t=total_images:
+                                self.progress_label.config(text=f"이미지 처리 중... {p}/{t}"))
+
+                self.after(0, lambda: self._log(
+                    f"이미지 처리 완료: {copied_images}/{total_images}개 (재사용 {reused_images}개, 새로 생성 {copied_images - reused_images}개)"))
+
+                if not zip_only:
+                    # 이번 엑셀에 없는 이전 이미지 정리
+                    removed = 0
+                    for subdir_path in (nukki_dir, mix_dir, thumbnail_dir):
+                        for name in os.listdir(subdir_path):
+                            key = os.path.relpath(os.path.join(subdir_path, name), package_dir).replace(os.sep, "/")
+                            if key not in new_index:
+                                try:
+                                    os.remove(os.path.join(subdir_path, name))
+                                    removed += 1
+                                except OSError:
+                                    pass
+                    if removed:
+                        self.after(0, lambda r=removed: self._log(f"사용하지 않는 이전 이미지 {r}개 삭제"))
+
+                    with open(index_path, 'w', encoding='utf-8') as f:
+                        json.dump(new_index, f, ensure_ascii=False)
+
+                # 엑셀 파일 저장 (경로 변환됨)
+                if zf is not None:
+                    excel_buf = io.BytesIO()
+                    df.to_excel(excel_buf, index=False)
+                    zf.writestr(f"{zip_root}/{excel_name}", excel_buf.getvalue())
+                else:
+                    excel_output_path = os.path.join(package_dir, excel_name)
+                    df.to_excel(excel_output_path, index=False)
+                self.after(0, lambda: self._log(f"엑셀 파일 저장: {excel_name}"))
+
+                # manifest.json 생성
+                manifest = {
+                    "version": "1.0",
+                    "job_name": job_name,
+                    "excel_file": excel_name,
+                    "original_base_dir": original_base_dir,
+                    "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "total_rows": len(df),
+                    "total_images": total_images,
+                    "copied_images": copied_images,
+                    "failed_images": len(failed_images),
+                    "columns_converted": list(col_mappings.keys())
+                }
+
+                manifest_json = json.dumps(manifest, ensure_ascii=False, indent=2)
+                if zf is not None:
+                    zf.writestr(f"{zip_root}/manifest.json", manifest_json)
+                else:
+                    with open(os.path.join(package_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+                        f.write(manifest_json)
+                self.after(0, lambda: self._log("manifest.json 생성 완료"))
+
+                # README 파일 생성
+                readme_content = f"""Stage5 외부 작업 패키지
 ========================
 
 작업명: {job_name}
@@ -488,24 +642,34 @@ class Stage5ExportToolGUI(tk.Tk):
 - 복사 실패: {len(failed_images)}개
 """
 
-            readme_path = os.path.join(package_dir, "README.txt")
-            with open(readme_path, 'w', encoding='utf-8') as f:
-                f.write(readme_content)
-            self.after(0, lambda: self._log("README.txt 생성 완료"))
-
-            # ZIP 압축
-            zip_path = None
-            if self.create_zip.get():
+                if zf is not None:
+                    zf.writestr(f"{zip_root}/README.txt", readme_content)
+                else:
+                    with open(os.path.join(package_dir, "README.txt"), 'w', encoding='utf-8') as f:
+                        f.write(readme_content)
+                self.after(0, lambda: self._log("README.txt 생성 완료"))
+            finally:
+                if zf is not None:
+                    zf.close()
+
+            # ZIP 압축 (폴더 → ZIP, 이미 압축된 이미지는 재압축하지 않고 저장)
+            if not zip_only and self.create_zip.get():
                 self.after(0, lambda: self.progress_label.config(text="ZIP 파일 생성 중..."))
                 zip_path = f"{package_dir}.zip"
 
                 with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
                     for root, dirs, files in os.walk(package_dir):
                         for file in files:
+                            if file == EXPORT_INDEX_NAME:
+                                continue
                             file_path = os.path.join(root, file)
                             arcname = os.path.relpath(file_path, os.path.dirname(package_dir))
-                            zf.write(file_path, arcname)
+                            if os.path.splitext(file)[1].lower() in ZIP_STORED_EXTS:
+                                zf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+                            else:
+                                zf.write(file_path, arcname)
 
+            if zip_path:
                 zip_size_mb = os.path.getsize(zip_path) / (1024 * 1024)
                 self.after(0, lambda: self._log(f"ZIP 파일 생성 완료: {os.path.basename(zip_path)} ({zip_size_mb:.1f} MB)"))
 
@@ -517,9 +681,11 @@ class Stage5ExportToolGUI(tk.Tk):
             result_msg = f"""패키지 생성이 완료되었습니다.
 
 작업명: {job_name}
-이미지: {copied_images}/{total_images}개 복사됨
+이미지: {copied_images}/{total_images}개 복사됨 (재사용 {reused_images}개)
+"""
 
-패키지 폴더: {package_dir}"""
+            if not zip_only:
+                result_msg += f"\n패키지 폴더: {package_dir}"
 
             if zip_path:
                 result_msg += f"\nZIP 파일: {zip_path}"
@@ -530,7 +696,8 @@ class Stage5ExportToolGUI(tk.Tk):
             self.after(0, lambda: messagebox.showinfo("완료", result_msg))
 
             # 폴더 열기
-            self.after(0, lambda: os.startfile(package_dir) if os.name == 'nt' else None)
+            open_dir = os.path.dirname(os.path.abspath(package_dir)) if zip_only else package_dir
+            self.after(0, lambda: os.startfile(open_dir) if os.name == 'nt' else None)
 
         except Exception as e:
             self.after(0, lambda: self._log(f"[오류] 패키지 생성 실패: {e}"))
@@ -541,6 +708,8 @@ class Stage5ExportToolGUI(tk.Tk):
 
 
 def main():
+    # 프로세스 풀 사용 (Windows exe 빌드 시 필요)
+    multiprocessing.freeze_support()
     app = Stage5ExportToolGUI()
     app.mainloop()
 
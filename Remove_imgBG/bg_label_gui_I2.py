@@ -39,6 +39,19 @@ from PIL import Image, ImageTk
 from bs4 import BeautifulSoup
 import pandas as pd
 
+# 썸네일 디스크 캐시 (상위 폴더 공용 모듈, Stage5 품질검증과 캐시 폴더 공유)
+PARENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PARENT_DIR not in sys.path:
+    sys.path.append(PARENT_DIR)
+try:
+    from image_preview_cache import PreviewImageCache, DEFAULT_DISK_CACHE_DIR
+    PREVIEW_CACHE_AVAILABLE = True
+except ImportError:
+    PREVIEW_CACHE_AVAILABLE = False
+
+# 현재 항목 이후 미리 읽어둘 항목 수 (이전 항목은 1개)
+PREFETCH_AHEAD = 8
+
 # GPU 메모리 정리 유틸
 def clear_gpu_cache_safe():
     """
@@ -468,6 +481,12 @@ class BgLabelApp:
         self.preview_size = 400
         self.left_photo = None
         self.right_photo = None
+        self.shown_paths = {True: None, False: None}  # 캔버스별 표시 중인 경로 (늦게 도착한 썸네일 무시용)
+
+        # 썸네일 캐시 (디스크 키: 원본 내용 sha1 + 크기 단계, 다음 항목 백그라운드 미리 생성)
+        self.preview_cache = None
+        if PREVIEW_CACHE_AVAILABLE:
+            self.preview_cache = PreviewImageCache(cache_dir=DEFAULT_DISK_CACHE_DIR, mode="RGB", upscale=True)
 
         # Variables
         self.label_filter_var = tk.StringVar(value="unlabeled")
@@ -911,6 +930,7 @@ class BgLabelApp:
         # Images
         self.show_img(self.resolve_path(row, "input"), self.left_canvas, True)
         self.show_img(self.resolve_path(row, "output"), self.right_canvas, False)
+        self._prefetch_ahead()
         
         # HTML Render (새 창이 떠 있을 경우)
         if self.html_window: self.render_html()
@@ -936,17 +956,49 @@ class BgLabelApp:
         return cands[0] if cands else ""
 
     def show_img(self, path, canvas, is_left):
+        """이미지 표시 - 캐시 미스면 'Loading...'을 띄우고 워커에서 디코딩 (Tk 스레드에서 디코딩 안 함)"""
+        self.shown_paths[is_left] = path
         canvas.delete("all")
         if not path or not os.path.exists(path):
             canvas.create_text(self.preview_size//2, self.preview_size//2, text="No Image", fill="white")
             return
-        img = load_preview_image(path, self.preview_size)
+        if self.preview_cache is None:
+            self._apply_img(path, canvas, is_left, load_preview_image(path, self.preview_size))
+            return
+        img = self.preview_cache.peek(path, self.preview_size)
+        if img is not None:
+            self._apply_img(path, canvas, is_left, img)
+            return
+        canvas.create_text(self.preview_size//2, self.preview_size//2, text="Loading...", fill="white")
+        self.preview_cache.request(
+            path, self.preview_size,
+            lambda loaded, path=path, canvas=canvas, is_left=is_left:
+                self.root.after(0, self._apply_img, path, canvas, is_left, loaded),
+        )
+
+    def _apply_img(self, path, canvas, is_left, img):
+        """Tk 스레드에서 썸네일을 캔버스에 반영 (그 사이 다른 항목으로 넘어갔으면 무시)"""
+        if path != self.shown_paths[is_left] or not canvas.winfo_exists():
+            return
+        canvas.delete("all")
         if not img: return
         photo = ImageTk.PhotoImage(img)
         canvas.create_image(self.preview_size//2, self.preview_size//2, image=photo)
         if is_left: self.left_photo = photo
         else: self.right_photo = photo
 
+    def _prefetch_ahead(self):
+        """커서 앞쪽 PREFETCH_AHEAD개(+ 바로 이전 1개) 항목의 썸네일을 백그라운드로 미리 생성"""
+        if self.preview_cache is None or not self.filtered_indices:
+            return
+        paths = []
+        for i in list(range(self.current_index + 1, self.current_index + 1 + PREFETCH_AHEAD)) + [self.current_index - 1]:
+            if 0 <= i < len(self.filtered_indices):
+                row = self.rows[self.filtered_indices[i]]
+                paths.append(self.resolve_path(row, "input"))
+                paths.append(self.resolve_path(row, "output"))
+        self.preview_cache.prefetch(paths, self.preview_size)
+
     def set_label(self, val):
         if not self.filtered_indices: return
         if self.is_loading: return  # 로딩 중이면 무시
@@ -1067,6 +1119,7 @@ class BgLabelApp:
     def on_close(self):
         # 팝업 창도 닫아주기
         if self.html_window: self.html_window.destroy()
+        if self.preview_cache is not None: self.preview_cache.close()
         if self.change_since_save > 0 and messagebox.askyesno("종료", "저장하시겠습니까?"): self.on_save()
         self.root.destroy()
 
@@ -66,6 +66,8 @@ def build_exe():
         "--hidden-import=openpyxl",
         "--hidden-import=tkinter",
         "--hidden-import=config_manager",
+        "--hidden-import=excel_reader",
+        "--hidden-import=xlrd",
         "--hidden-import=solutions",
         "--hidden-import=solutions.base_solution",
         "--hidden-import=solutions.dafalza",
@@ -0,0 +1,493 @@
+"""
+엑셀 읽기 모듈
+- .xls (97-03 워크시트): xlrd 1.2.0으로 열 단위(col_values) 일괄 읽기
+- HTML 형식 .xls (솔루션에서 내려받은 '가짜 xls'): 스트리밍 HTML 테이블 파서로 읽기
+- .xlsx: openpyxl
+- 파싱 결과 캐시: 같은 내용(파일 해시)의 파일을 같은 옵션으로 다시 읽으면 파싱 생략
+
+벤치마크 (1천~10만 행 임시 파일 생성 후 측정):
+    python excel_reader.py --bench
+"""
+
+import os
+import re
+import html
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# xlrd 1.2.0을 사용하여 .xls 파일 읽기 지원
+try:
+    import xlrd
+    HAS_XLRD = True
+except ImportError:
+    HAS_XLRD = False
+
+# 파싱 결과 캐시 (메모리, 최근 사용 순)
+FRAME_CACHE_MAX_ENTRIES = 16
+_frame_cache: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_digest_memo: Dict[Tuple[str, int, int], str] = {}
+_cache_lock = threading.Lock()
+
+# HTML 파일 판별/인코딩 감지에 쓰는 앞부분 크기
+_SNIFF_BYTES = 64 * 1024
+_HTML_CHUNK_CHARS = 1024 * 1024
+
+
+# =========================
+# 파일 해시 / 캐시
+# =========================
+
+def file_digest(file_path: str) -> str:
+    """파일 내용 SHA-1 (경로/크기/수정시각이 같으면 이전 계산값 재사용)"""
+    st = os.stat(file_path)
+    sig = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+    with _cache_lock:
+        digest = _digest_memo.get(sig)
+    if digest:
+        return digest
+
+    h = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _cache_lock:
+        _digest_memo[sig] = digest
+    return digest
+
+
+def clear_frame_cache():
+    """파싱 결과 캐시 비우기"""
+    with _cache_lock:
+        _frame_cache.clear()
+        _digest_memo.clear()
+
+
+def _cache_get(key) -> Optional[pd.DataFrame]:
+    with _cache_lock:
+        df = _frame_cache.get(key)
+        if df is None:
+            return None
+        _frame_cache.move_to_end(key)
+    # 호출하는 쪽에서 DataFrame을 수정하므로 항상 복사본 반환
+    return df.copy()
+
+
+def _cache_put(key, df: pd.DataFrame):
+    with _cache_lock:
+        _frame_cache[key] = df.copy()
+        _frame_cache.move_to_end(key)
+        while len(_frame_cache) > FRAME_CACHE_MAX_ENTRIES:
+            _frame_cache.popitem(last=False)
+
+
+# =========================
+# .xls (xlrd, 열 단위 읽기)
+# =========================
+
+def _header_value(cell_value, col: int) -> str:
+    # xlrd는 숫자 타입을 float로 반환하므로 문자열로 변환
+    if isinstance(cell_value, float) and cell_value == int(cell_value):
+        return str(int(cell_value))
+    return str(cell_value) if cell_value else f"Unnamed: {col}"
+
+
+def _xls_data_start_row(sheet_name) -> int:
+    if sheet_name and '기본정보' in str(sheet_name):
+        # 이셀러스는 2행이 설명탭이므로 3행부터 (인덱스 2부터)
+        return 2
+    return 1
+
+
+def _xls_column(sheet, col: int, start_row: int, datemode: int) -> list:
+    """한 열의 값을 한 번에 읽고 숫자/날짜만 변환 (float 정수 → int, 날짜 → 'YYYY-MM-DD')"""
+    values = sheet.col_values(col, start_row)
+    types = sheet.col_types(col, start_row)
+    if xlrd.XL_CELL_NUMBER not in types and xlrd.XL_CELL_DATE not in types:
+        return values
+
+    for i, cell_type in enumerate(types):
+        if cell_type == xlrd.XL_CELL_NUMBER:
+            v = values[i]
+            if v == int(v):
+                values[i] = int(v)
+        elif cell_type == xlrd.XL_CELL_DATE:
+            date_tuple = xlrd.xldate_as_tuple(values[i], datemode)
+            if date_tuple[0] != 0:  # 유효한 날짜인 경우
+                values[i] = datetime(*date_tuple).strftime('%Y-%m-%d')
+            else:
+                values[i] = ""
+    return values
+
+
+def _open_xls_sheet(file_path: str, sheet_name):
+    # on_demand: 요청한 시트만 파싱 (기본정보/확장정보가 같이 있는 솔루션 파일)
+    workbook = xlrd.open_workbook(file_path, on_demand=True)
+    if sheet_name:
+        try:
+            sheet = workbook.sheet_by_name(sheet_name)
+        except xlrd.XLRDError:
+            # 시트가 없으면 첫 번째 시트 사용
+            sheet = workbook.sheet_by_index(0)
+    else:
+        sheet = workbook.sheet_by_index(0)
+    return workbook, sheet
+
+
+def _read_xls(file_path: str, sheet_name=None) -> pd.DataFrame:
+    workbook, sheet = _open_xls_sheet(file_path, sheet_name)
+    if sheet.nrows == 0:
+        return pd.DataFrame()
+
+    # 헤더 읽기 (첫 번째 행)
+    header = [_header_value(v, col) for col, v in enumerate(sheet.row_values(0))]
+
+    # 데이터 읽기 (열 단위)
+    start_row = _xls_data_start_row(sheet_name)
+    n_rows = max(0, sheet.nrows - start_row)
+    if not header:
+        return pd.DataFrame(index=range(n_rows))
+
+    columns = [_xls_column(sheet, col, start_row, workbook.datemode) for col in range(sheet.ncols)]
+    df = pd.DataFrame(dict(enumerate(columns)))
+    if len(df) == 0:
+        df = df.astype(object)
+    df.columns = header
+    return df
+
+
+def _read_xls_cellwise(file_path: str, sheet_name=None) -> pd.DataFrame:
+    """기존 셀 단위 읽기 (벤치마크/결과 비교용)"""
+    workbook, sheet = _open_xls_sheet(file_path, sheet_name)
+    header = [_header_value(sheet.cell_value(0, col), col) for col in range(sheet.ncols)]
+    data = []
+    for row_idx in range(_xls_data_start_row(sheet_name), sheet.nrows):
+        row_data = []
+        for col in range(sheet.ncols):
+            cell_value = sheet.cell_value(row_idx, col)
+            if isinstance(cell_value, float):
+                if sheet.cell_type(row_idx, col) == xlrd.XL_CELL_DATE:
+                    date_tuple = xlrd.xldate_as_tuple(cell_value, workbook.datemode)
+                    if date_tuple[0] != 0:
+                        cell_value = datetime(*date_tuple).strftime('%Y-%m-%d')
+                    else:
+                        cell_value = ""
+                elif cell_value == int(cell_value):
+                    cell_value = int(cell_value)
+            row_data.append(cell_value)
+        data.append(row_data)
+    return pd.DataFrame(data, columns=header)
+
+
+# =========================
+# HTML 형식 .xls (스트리밍 파서)
+# =========================
+
+def is_html_excel(file_path: str) -> bool:
+    """확장자는 .xls지만 실제 내용은 HTML 표인 파일인지 확인"""
+    with open(file_path, "rb") as f:
+        head = f.read(2048)
+    head = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if not head.startswith(b"<"):
+        return False
+    return b"<html" in head or b"<table" in head or head.startswith(b"<!doctype html")
+
+
+def _detect_html_encoding(file_path: str) -> str:
+    with open(file_path, "rb") as f:
+        head = f.read(_SNIFF_BYTES)
+    if head.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    m = re.search(rb"charset\s*=\s*[\"']?([A-Za-z0-9_\-]+)", head, re.IGNORECASE)
+    if m:
+        name = m.group(1).decode("ascii").lower()
+        # 국내 솔루션은 euc-kr로 표기하고 cp949 문자를 쓰는 경우가 많음
+        return "cp949" if name in ("euc-kr", "euckr", "ks_c_5601-1987") else name
+    try:
+        head.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # 앞부분 끝에서 멀티바이트 문자가 잘린 경우는 utf-8로 봄
+        return "utf-8" if e.start >= len(head) - 3 else "cp949"
+
+
+# 표 구조 태그 / 그 외 태그
+_TABLE_TAG_RE = re.compile(r"<(/?)(table|tr|td|th|br)\b([^>]*)>", re.IGNORECASE)
+_OTHER_TAG_RE = re.compile(r"<[^>]*>")
+_COLSPAN_RE = re.compile(r"colspan\s*=\s*[\"']?(\d+)", re.IGNORECASE)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+
+
+class _HTMLTableReader:
+    """
+    첫 번째 <table>의 행/셀 텍스트만 모으는 스트리밍 리더
+    - 표 구조 태그(table/tr/td/th/br)만 정규식으로 찾고, 셀 안의 다른 태그는 제거 후 엔티티 변환
+    - 중첩 표는 바깥 셀의 텍스트로 취급
+    - feed()로 나눠서 넣어도 되며, 청크 경계에서 잘린 태그는 다음 청크와 이어서 처리
+    """
+
+    def __init__(self):
+        self.rows: List[List[str]] = []
+        self.done = False
+        self._buf = ""
+        self._depth = 0
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+        self._colspan = 1
+
+    def feed(self, text: str):
+        if self.done:
+            return
+        buf = self._buf + text
+        # 끝부분에 닫히지 않은 태그/주석이 있으면 다음 청크까지 보류
+        cut = buf.rfind("<")
+        if cut != -1 and (buf.find(">", cut) == -1 or buf.startswith("<!--", cut)):
+            self._buf = buf[cut:]
+            buf = buf[:cut]
+        else:
+            self._buf = ""
+        comment = buf.rfind("<!--")
+        if comment != -1 and buf.find("-->", comment) == -1:
+            self._buf = buf[comment:] + self._buf
+            buf = buf[:comment]
+        self._process(_COMMENT_RE.sub("", buf))
+
+    def close(self):
+        if self._buf:
+            self._process(self._buf)
+            self._buf = ""
+        self._finish_row()
+
+    def _process(self, buf: str):
+        # split 결과: [텍스트, '/'|'', 태그, 속성, 텍스트, '/'|'', 태그, 속성, 텍스트, ...]
+        parts = _TABLE_TAG_RE.split(buf)
+        if self._cell is not None and parts[0]:
+            self._cell.append(parts[0])
+        for i in range(1, len(parts), 4):
+            if self.done:
+                return
+            tag = parts[i + 1].lower()
+            if self._depth == 1 and (tag == "td" or tag == "th"):
+                # 가장 많은 셀 태그는 바로 처리
+                if self._cell is not None:
+                    self._finish_cell()
+                if not parts[i]:
+                    if self._row is None:
+                        self._row = []
+                    self._cell = []
+                    attrs = parts[i + 2]
+                    if attrs and "colspan" in attrs.lower():
+                        m = _COLSPAN_RE.search(attrs)
+                        self._colspan = max(1, int(m.group(1))) if m else 1
+            else:
+                self._handle_tag(parts[i] == "/", tag, parts[i + 2])
+            text = parts[i + 3]
+            if text and self._cell is not None:
+                self._cell.append(text)
+
+    def _handle_tag(self, closing: bool, tag: str, attrs: str):
+        if tag == "table":
+            if not closing:
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_row()
+                    self.done = True
+            return
+        if tag == "br":
+            if self._cell is not None:
+                self._cell.append("\n")
+            return
+        if self._depth != 1:
+            return
+        if tag == "tr":
+            self._finish_row()
+            if not closing:
+                self._row = []
+        elif closing:
+            self._finish_cell()
+        else:
+            self._finish_cell()
+            if self._row is None:
+                self._row = []
+            self._cell = []
+            m = _COLSPAN_RE.search(attrs)
+            self._colspan = max(1, int(m.group(1))) if m else 1
+
+    def _finish_cell(self):
+        cell = self._cell
+        if cell is None:
+            return
+        text = cell[0] if len(cell) == 1 else "".join(cell)
+        if "<" in text:
+            text = _OTHER_TAG_RE.sub("", text)
+        if "&" in text:
+            text = html.unescape(text)
+        self._row.append(text.strip())
+        if self._colspan > 1:
+            self._row.extend([""] * (self._colspan - 1))
+            self._colspan = 1
+        self._cell = None
+
+    def _finish_row(self):
+        self._finish_cell()
+        if self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+
+
+def _read_html_excel(file_path: str, sheet_name=None) -> pd.DataFrame:
+    """HTML 형식 .xls 읽기 (값은 모두 문자열, 빈 셀은 '')"""
+    reader = _HTMLTableReader()
+    encoding = _detect_html_encoding(file_path)
+    with open(file_path, "r", encoding=encoding, errors="replace") as f:
+        for chunk in iter(lambda: f.read(_HTML_CHUNK_CHARS), ""):
+            reader.feed(chunk)
+            if reader.done:
+                break
+    reader.close()
+
+    rows = reader.rows
+    if not rows:
+        return pd.DataFrame()
+    width = max(len(r) for r in rows)
+    header = [h if h else f"Unnamed: {col}" for col, h in enumerate(rows[0] + [""] * (width - len(rows[0])))]
+    data = [r + [""] * (width - len(r)) for r in rows[_xls_data_start_row(sheet_name):]]
+    return pd.DataFrame(data, columns=header, dtype=object)
+
+
+# =========================
+# 공개 함수
+# =========================
+
+def read_excel_with_fallback(file_path, sheet_name=None, use_cache: bool = True, **kwargs):
+    """엑셀 파일 읽기 (xls 파일 지원 포함)
+
+    .xls 파일(97-03 워크시트)은 xlrd 1.2.0으로 직접 읽고,
+    HTML 형식으로 저장된 .xls 파일은 HTML 표로 읽고,
+    .xlsx 파일은 openpyxl을 사용합니다.
+    use_cache=True면 같은 내용의 파일을 같은 옵션으로 다시 읽을 때 파싱 결과를 재사용합니다.
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+
+    cache_key = None
+    if use_cache:
+        try:
+            cache_key = (file_digest(file_path), file_ext, repr(sheet_name), repr(sorted(kwargs.items())))
+        except OSError:
+            cache_key = None
+        if cache_key is not None:
+            cached = _cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+    if file_ext == '.xls':
+        try:
+            if is_html_excel(file_path):
+                df = _read_html_excel(file_path, sheet_name)
+            else:
+                # .xls 파일은 xlrd 1.2.0으로 직접 읽기
+                if not HAS_XLRD:
+                    raise ImportError("xlrd가 설치되지 않았습니다. pip install xlrd==1.2.0 을 실행하세요.")
+                df = _read_xls(file_path, sheet_name)
+        except ImportError:
+            raise
+        except Exception as e:
+            raise Exception(f".xls 파일 읽기 실패: {str(e)}")
+    else:
+        # .xlsx 파일은 openpyxl 사용
+        engine = kwargs.pop('engine', 'openpyxl')
+        if sheet_name:
+            df = pd.read_excel(file_path, sheet_name=sheet_name, engine=engine, **kwargs)
+        else:
+            df = pd.read_excel(file_path, engine=engine, **kwargs)
+
+        # 이셀러스 기본정보/확장정보 시트는 2행 설명탭 처리 (3행부터 데이터)
+        if sheet_name and ('기본정보' in str(sheet_name) or '확장정보' in str(sheet_name)) and len(df) > 0:
+            # 헤더는 유지하고 데이터는 3행부터 (인덱스 2부터)
+            df = df.iloc[2:].reset_index(drop=True)
+
+    if cache_key is not None:
+        _cache_put(cache_key, df)
+    return df
+
+
+# =========================
+# 벤치마크
+# =========================
+
+def _write_bench_html(path: str, rows: int, cols: int):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<html><head><meta charset="utf-8"></head><body><table>\n<tr>')
+        f.write("".join(f"<th>컬럼{c}</th>" for c in range(cols)))
+        f.write("</tr>\n")
+        for r in range(rows):
+            f.write("<tr>" + "".join(f"<td>값{r}-{c}</td>" for c in range(cols)) + "</tr>\n")
+        f.write("</table></body></html>")
+
+
+def _write_bench_xls(path: str, rows: int, cols: int) -> bool:
+    try:
+        import xlwt  # 벤치마크용 .xls 생성에만 사용
+    except ImportError:
+        return False
+    wb = xlwt.Workbook()
+    ws = wb.add_sheet("Sheet1")
+    for c in range(cols):
+        ws.write(0, c, f"컬럼{c}")
+    for r in range(1, rows + 1):
+        for c in range(cols):
+            ws.write(r, c, r * 10 + c if c % 2 else f"값{r}-{c}")
+    wb.save(path)
+    return True
+
+
+def _run_benchmark(row_counts, cols: int = 30):
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in row_counts:
+            # BIFF .xls는 시트당 65536행 제한
+            if rows < 65536 and HAS_XLRD:
+                path = os.path.join(tmp, f"bench_{rows}.xls")
+                if _write_bench_xls(path, rows, cols):
+                    t0 = time.perf_counter()
+                    legacy = _read_xls_cellwise(path)
+                    t1 = time.perf_counter()
+                    fast = _read_xls(path)
+                    t2 = time.perf_counter()
+                    same = legacy.equals(fast) and list(legacy.columns) == list(fast.columns)
+                    print(f"[xls ] rows={rows:>6}  셀 단위 {t1 - t0:6.2f}s  열 단위 {t2 - t1:6.2f}s  결과 동일={same}")
+                else:
+                    print(f"[xls ] rows={rows:>6}  xlwt 미설치로 건너뜀")
+
+            path = os.path.join(tmp, f"bench_html_{rows}.xls")
+            _write_bench_html(path, rows, cols)
+            clear_frame_cache()
+            t0 = time.perf_counter()
+            df = read_excel_with_fallback(path)
+            t1 = time.perf_counter()
+            read_excel_with_fallback(path)
+            t2 = time.perf_counter()
+            print(f"[html] rows={rows:>6}  파싱 {t1 - t0:6.2f}s  캐시 적중 {t2 - t1:6.3f}s  shape={df.shape}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Upload_Mapper 엑셀 읽기 벤치마크")
+    parser.add_argument("--bench", action="store_true", help="1천~10만 행 임시 파일로 읽기 속도 측정")
+    parser.add_argument("--rows", type=int, nargs="*", default=[1000, 10000, 50000, 100000])
+    parser.add_argument("--cols", type=int, default=30)
+    args = parser.parse_args()
+    if args.bench:
+        _run_benchmark(args.rows, args.cols)
+    else:
+        parser.print_help()
@@ -28,93 +28,8 @@ import pandas as pd
 from datetime import datetime
 from typing import Optional, Dict, Tuple, List
 
-# xlrd 1.2.0을 사용하여 .xls 파일 읽기 지원
-try:
-    import xlrd
-    HAS_XLRD = True
-except ImportError:
-    HAS_XLRD = False
-
-def read_excel_with_fallback(file_path, sheet_name=None, **kwargs):
-    """엑셀 파일 읽기 (xls 파일 지원 포함)
-    
-    .xls 파일(97-03 워크시트)은 xlrd 1.2.0으로 직접 읽고,
-    .xlsx 파일은 openpyxl을 사용합니다.
-    """
-    file_ext = os.path.splitext(file_path)[1].lower()
-    
-    if file_ext == '.xls':
-        # .xls 파일은 xlrd 1.2.0으로 직접 읽기
-        if not HAS_XLRD:
-            raise ImportError("xlrd가 설치되지 않았습니다. pip install xlrd==1.2.0 을 실행하세요.")
-        
-        try:
-            workbook = xlrd.open_workbook(file_path)
-            if sheet_name:
-                try:
-                    sheet = workbook.sheet_by_name(sheet_name)
-                except xlrd.XLRDError:
-                    # 시트가 없으면 첫 번째 시트 사용
-                    sheet = workbook.sheet_by_index(0)
-            else:
-                sheet = workbook.sheet_by_index(0)
-            
-            # 헤더 읽기 (첫 번째 행)
-            header = []
-            for col in range(sheet.ncols):
-                cell_value = sheet.cell_value(0, col)
-                # xlrd는 숫자 타입을 float로 반환하므로 문자열로 변환
-                if isinstance(cell_value, float) and cell_value == int(cell_value):
-                    header.append(str(int(cell_value)))
-                else:
-                    header.append(str(cell_value) if cell_value else f"Unnamed: {col}")
-            
-            # 데이터 읽기
-            data = []
-            start_row = 1
-            if sheet_name and '기본정보' in str(sheet_name):
-                # 이셀러스는 2행이 설명탭이므로 3행부터 (인덱스 2부터)
-                start_row = 2
-            
-            for row_idx in range(start_row, sheet.nrows):
-                row_data = []
-                for col in range(sheet.ncols):
-                    cell_value = sheet.cell_value(row_idx, col)
-                    # xlrd 타입 처리
-                    if isinstance(cell_value, float):
-                        # 날짜 타입 체크
-                        if sheet.cell_type(row_idx, col) == xlrd.XL_CELL_DATE:
-                            # 날짜를 문자열로 변환
-                            date_tuple = xlrd.xldate_as_tuple(cell_value, workbook.datemode)
-                            if date_tuple[0] != 0:  # 유효한 날짜인 경우
-                                from datetime import datetime
-                                cell_value = datetime(*date_tuple).strftime('%Y-%m-%d')
-                            else:
-                                cell_value = ""
-                        elif cell_value == int(cell_value):
-                            cell_value = int(cell_value)
-                    row_data.append(cell_value)
-                data.append(row_data)
-            
-            # DataFrame 생성
-            df = pd.DataFrame(data, columns=header)
-            return df
-        except Exception as e:
-            raise Exception(f".xls 파일 읽기 실패: {str(e)}")
-    else:
-        # .xlsx 파일은 openpyxl 사용
-        engine = kwargs.pop('engine', 'openpyxl')
-        if sheet_name:
-            df = pd.read_excel(file_path, sheet_name=sheet_name, engine=engine, **kwargs)
-        else:
-            df = pd.read_excel(file_path, engine=engine, **kwargs)
-        
-        # 이셀러스 기본정보/확장정보 시트는 2행 설명탭 처리 (3행부터 데이터)
-        if sheet_name and ('기본정보' in str(sheet_name) or '확장정보' in str(sheet_name)) and len(df) > 0:
-            # 헤더는 유지하고 데이터는 3행부터 (인덱스 2부터)
-            df = df.iloc[2:].reset_index(drop=True)
-        
-        return df
+# .xls / HTML 형식 .xls / .xlsx 읽기 (파싱 결과 캐시 포함)
+from excel_reader import read_excel_with_fallback
 
 class ToolTip:
     """간단한 툴팁 클래스"""
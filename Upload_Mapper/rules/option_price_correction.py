@@ -4,7 +4,20 @@
 """
 
 import re
-from typing import List, Tuple, Optional
+import math
+import numbers
+from functools import lru_cache
+from typing import List, Tuple, Optional, Sequence
+
+import numpy as np
+
+# 마지막 금액 토큰 패턴: +숫자원 또는 -숫자원 (콤마 포함/미포함, 공백 허용)
+# 예: +0원, -100원, +8,020원, +8020원, +3040원, , -100원
+# 권장 패턴: "마지막에 붙은 ...원"만 잡고, "콤마 유무 + 공백 유무" 다 허용
+_AMOUNT_TOKEN_RE = re.compile(r'(?:,\s*)?([+-]?)\s*(\d[\d,]*)\s*원\s*$')
+
+# 배치 계산에서 float64로 정확히 다룰 수 있는 금액 범위 (넘으면 행 단위 계산 사용)
+_BATCH_SAFE_ABS = 2 ** 53
 
 
 class OptionPriceCorrector:
@@ -26,11 +39,7 @@ class OptionPriceCorrector:
         if not line:
             return (line, None)
         
-        # 마지막 금액 토큰 패턴: +숫자원 또는 -숫자원 (콤마 포함/미포함, 공백 허용)
-        # 예: +0원, -100원, +8,020원, +8020원, +3040원, , -100원
-        # 권장 패턴: "마지막에 붙은 ...원"만 잡고, "콤마 유무 + 공백 유무" 다 허용
-        pattern = r'(?:,\s*)?([+-]?)\s*(\d[\d,]*)\s*원\s*$'
-        match = re.search(pattern, line)
+        match = _AMOUNT_TOKEN_RE.search(line)
         
         if match:
             sign = match.group(1) or ''
@@ -294,9 +303,238 @@ class OptionPriceCorrector:
             "corrected_deltas": corrected_deltas_list
         })
 
+    @staticmethod
+    def _format_option_line(text_part: str, delta: int) -> str:
+        # 금액 토큰 재조립 (빈 text_part 처리)
+        if text_part:
+            return f"{text_part},+{delta}원" if delta >= 0 else f"{text_part},{delta}원"
+        # text_part가 비어있는 경우 (금액만 있는 라인)
+        return f"+{delta}원" if delta >= 0 else f"{delta}원"
+
+    @staticmethod
+    def redistribute_deltas_batch(deltas: np.ndarray, starts: np.ndarray,
+                                  max_deltas: np.ndarray, market_prices: np.ndarray) -> np.ndarray:
+        """
+        여러 상품의 옵션추가금을 한 번에 재배정 (redistribute_deltas와 같은 규칙)
+
+        Args:
+            deltas: 모든 상품의 원본 옵션추가금을 상품 순서대로 이어붙인 int64 배열
+            starts: 각 상품이 deltas에서 시작하는 위치 (상품마다 1개 이상)
+            max_deltas: 상품별 최대 허용 옵션추가금
+            market_prices: 상품별 마켓판매가격
+
+        Returns:
+            deltas와 같은 길이의 재배정된 int64 배열
+        """
+        n = len(deltas)
+        if n == 0:
+            return deltas.astype(np.int64)
+        counts = np.diff(np.append(starts, n))
+        gid = np.repeat(np.arange(len(starts)), counts)
+
+        def first_min_positions(values, groups_mask):
+            # 그룹별 최소값이 처음 나오는 위치 (list.index(min(...))와 동일)
+            gmin = np.minimum.reduceat(values, starts)
+            hit = np.flatnonzero((values == gmin[gid]) & groups_mask[gid])
+            _, first = np.unique(gid[hit], return_index=True)
+            return hit[first]
+
+        # 1. -값은 전부 0으로 변경 (has_zero는 원본 기준)
+        has_zero = np.logical_or.reduceat(deltas == 0, starts)
+        corrected = np.maximum(deltas, 0)
+
+        # 3. 0이 없는 경우, 최소값을 0으로 만들기 (2. 모두 0인 상품은 그대로)
+        all_positive = np.logical_and.reduceat(corrected > 0, starts)
+        make_zero = ~has_zero & all_positive
+        corrected[first_min_positions(corrected, make_zero)] = 0
+        has_zero = has_zero | make_zero
+
+        # 4~5. 양수 개수 / 최대값
+        positive = corrected > 0
+        positive_count = np.add.reduceat(positive.astype(np.int64), starts)
+        max_positive = np.maximum.reduceat(corrected, starts)
+
+        # 단위 내림 규칙 / 상한선 cap
+        rounding = np.select(
+            [market_prices > 60000, market_prices > 30000, market_prices > 10000],
+            [1000, 500, 100], default=10,
+        ).astype(np.int64)
+        cap = np.trunc(max_deltas).astype(np.int64) // rounding * rounding
+
+        # 양수 값이 2개 이상: 분포 유지 스케일링 후 단위 내림, cap 적용
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(max_positive > 0, max_deltas / np.maximum(max_positive, 1), 0.0)
+        scaled = np.floor_divide(corrected * ratio[gid], rounding[gid]) * rounding[gid]
+        scaled = np.trunc(scaled).astype(np.int64)
+        scaled = np.maximum(np.minimum(scaled, cap[gid]), 0)
+
+        single = (positive_count == 1)[gid]
+        result = np.where(positive, np.where(single, cap[gid], scaled), 0)
+
+        # 스케일링 후에도 0이 없는 경우, 최소값을 0으로 만들기
+        multi = positive_count >= 2
+        still_positive = np.logical_and.reduceat(result > 0, starts)
+        fix = multi & ~has_zero & still_positive
+        if fix.any():
+            result[first_min_positions(result, fix)] = 0
+        return result.astype(np.int64)
+
+    @staticmethod
+    def correct_option_texts(option_texts: Sequence, market_prices: Sequence[float]) -> List[Tuple[str, dict]]:
+        """
+        여러 상품의 옵션 텍스트를 한 번에 보정 (correct_option_text와 결과 문자열/변경 정보 동일)
+
+        - 모든 옵션 라인을 미리 컴파일한 정규식으로 한 번에 파싱해
+          (상품 번호, 라인 번호, 금액) 평탄 배열로 만든 뒤 상품별 재배정을 배열 연산으로 처리
+        - 금액이 너무 크거나 가격이 숫자가 아닌 상품은 행 단위 correct_option_text로 처리
+
+        Args:
+            option_texts: 옵션 텍스트 목록
+            market_prices: 같은 순서의 마켓판매가격 목록
+
+        Returns:
+            [(보정된 옵션 텍스트, 변경 정보 딕셔너리), ...]
+        """
+        results: List[Optional[Tuple[str, dict]]] = [None] * len(option_texts)
+        duplicates = []     # (결과 위치, 같은 입력이 처음 나온 위치)
+        first_seen = {}
+
+        # 파싱 단계: 모든 상품의 라인을 평탄 배열로
+        batch_items = []    # (결과 위치, 가격, 라인 목록, 파싱 결과, 금액 개수)
+        flat_deltas = []
+        starts = []
+        for pos, (option_text, market_price) in enumerate(zip(option_texts, market_prices)):
+            if not option_text or not str(option_text).strip():
+                results[pos] = (option_text, {"changed": False, "lines_changed": 0})
+                continue
+            if not (type(market_price) is float or isinstance(market_price, numbers.Real)) \
+                    or not math.isfinite(market_price):
+                results[pos] = OptionPriceCorrector.correct_option_text(option_text, market_price)
+                continue
+
+            # 같은 옵션 텍스트 + 같은 가격은 한 번만 계산
+            key = (str(option_text), type(market_price), market_price)
+            if key in first_seen:
+                duplicates.append((pos, first_seen[key]))
+                continue
+            first_seen[key] = pos
+
+            lines = key[0].split('\n')
+            parsed = [_parse_option_line_cached(line) for line in lines]
+            deltas = [d for _, d in parsed if d is not None]
+            if any(abs(d) >= _BATCH_SAFE_ABS for d in deltas):
+                results[pos] = OptionPriceCorrector.correct_option_text(option_text, market_price)
+                continue
+
+            batch_items.append((pos, market_price, lines, parsed, len(deltas)))
+            if deltas:
+                starts.append(len(flat_deltas))
+                flat_deltas.extend(deltas)
+
+        # 재배정 단계 (금액이 있는 상품만)
+        priced = [item for item in batch_items if item[4]]
+        max_deltas = [OptionPriceCorrector.calculate_max_delta(item[1]) for item in priced]
+        redistributed = OptionPriceCorrector.redistribute_deltas_batch(
+            np.asarray(flat_deltas, dtype=np.int64),
+            np.asarray(starts, dtype=np.int64),
+            np.asarray(max_deltas, dtype=np.float64),
+            np.asarray([item[1] for item in priced], dtype=np.float64),
+        ).tolist()
+
+        # 재조립 단계: 원본 텍스트 유지하고 금액 토큰만 교체
+        offset = 0
+        max_delta_iter = iter(max_deltas)
+        for pos, market_price, lines, parsed, n_deltas in batch_items:
+            max_delta = next(max_delta_iter) if n_deltas else OptionPriceCorrector.calculate_max_delta(market_price)
+            new_deltas = redistributed[offset:offset + n_deltas]
+            offset += n_deltas
+
+            corrected_lines = []
+            original_deltas_list = []
+            k = 0
+            for line, (text_part, original_delta) in zip(lines, parsed):
+                if original_delta is None:
+                    # 금액 토큰이 없는 라인은 원본 유지
+                    corrected_lines.append(line)
+                    continue
+                original_deltas_list.append(original_delta)
+                corrected_lines.append(OptionPriceCorrector._format_option_line(text_part, new_deltas[k]))
+                k += 1
+
+            lines_changed = sum(1 for a, b in zip(original_deltas_list, new_deltas) if a != b)
+            results[pos] = ('\n'.join(corrected_lines), {
+                "changed": lines_changed > 0,
+                "lines_changed": lines_changed,
+                "max_delta": max_delta,
+                "original_deltas": original_deltas_list,
+                "corrected_deltas": new_deltas,
+            })
+
+        for pos, src in duplicates:
+            text, info = results[src]
+            results[pos] = (text, dict(info, original_deltas=list(info["original_deltas"]),
+                                       corrected_deltas=list(info["corrected_deltas"])))
+        return results
+
+
+# 옵션 라인 파싱 결과 캐시 (같은 라인이 여러 상품/여러 번의 매핑 실행에 반복해서 나옴)
+_parse_option_line_cached = lru_cache(maxsize=200_000)(OptionPriceCorrector.parse_option_line)
+
 
 def log_option_correction(product_code: str, option_text: str, market_price: float, 
                          corrected_text: str, change_info: dict):
     """옵션 보정 로그 기록 (현재는 사용하지 않음)"""
     pass
 
+
+
+# =========================
+# 배치/행 단위 결과 비교 (무작위 입력 속성 검사)
+#   python option_price_correction.py --check 20000
+# =========================
+
+def _random_option_text(rng) -> str:
+    names = ["색상:그린", "사이즈:XL", "선택:대장금 올은수저 1벌,추가구성:수저세트", "", "  옵션A  ", "구성, 세트"]
+    lines = []
+    for _ in range(rng.randint(1, 8)):
+        name = rng.choice(names)
+        kind = rng.random()
+        if kind < 0.1:
+            lines.append(name)  # 금액 없음
+            continue
+        amount = rng.choice([0, 0, rng.randint(1, 500) * 10, rng.randint(1, 99999), rng.randint(1, 10 ** 7)])
+        amount_str = f"{amount:,}" if rng.random() < 0.3 else str(amount)
+        sign = rng.choice(["+", "-", "", "+ ", "- "])
+        sep = rng.choice([",", ", ", " ", ""])
+        tail = rng.choice(["원", "원 ", " 원", "원\t"])
+        lines.append(f"{name}{sep}{sign}{amount_str}{tail}")
+    return rng.choice(["\n", "\n", "\r\n"]).join(lines)
+
+
+def _check_batch_equivalence(n_cases: int = 10000, seed: int = 0) -> int:
+    import random
+
+    rng = random.Random(seed)
+    texts = [_random_option_text(rng) for _ in range(n_cases)]
+    prices = [rng.choice([rng.uniform(100, 200000), float(rng.randint(1, 120) * 1000), 9999.5, 60000.0])
+              for _ in range(n_cases)]
+    texts += ["", None, "   ", "가격없음\n옵션"]
+    prices += [1000.0, 1000.0, 1000.0, 1000.0]
+
+    batch = OptionPriceCorrector.correct_option_texts(texts, prices)
+    mismatches = 0
+    for text, price, got in zip(texts, prices, batch):
+        expected = OptionPriceCorrector.correct_option_text(text, price)
+        if got != expected:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"[불일치] price={price} text={text!r}\n  batch={got}\n  row  ={expected}")
+    print(f"검사 {len(texts)}건, 불일치 {mismatches}건")
+    return mismatches
+
+
+if __name__ == "__main__":
+    import sys
+
+    count = int(sys.argv[2]) if len(sys.argv) >= 3 and sys.argv[1] == "--check" else 10000
+    sys.exit(1 if _check_batch_equivalence(count) else 0)
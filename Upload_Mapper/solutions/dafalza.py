@@ -258,10 +258,10 @@ class DafalzaSolution(BaseSolution):
         
         # 옵션금액 규칙이 "none"이 아니고, 필요한 컬럼이 있을 때만 보정 수행
         if option_price_rule != "none" and "옵션" in result_df.columns and "마켓판매가격" in processed_df.columns:
-            for idx, row in result_df.iterrows():
-                product_code = row.get("상품코드", "")
-                option_text = row.get("옵션", "")
-                
+            # 보정 대상 행 수집 후 한 번에 보정
+            targets = []  # (idx, 상품코드, 옵션, 마켓판매가격)
+            codes = result_df["상품코드"] if "상품코드" in result_df.columns else pd.Series("", index=result_df.index)
+            for idx, product_code, option_text in zip(result_df.index, codes, result_df["옵션"]):
                 # 옵션이 있는 행만 처리
                 if pd.notna(option_text) and str(option_text).strip():
                     # 가공된 엑셀에서 마켓판매가격 가져오기
@@ -274,19 +274,21 @@ class DafalzaSolution(BaseSolution):
                             except (ValueError, TypeError):
                                 market_price = 0
                     
-                    # 옵션 보정 수행
+                    # 옵션 보정 대상
                     if market_price > 0:
-                        corrected_option, change_info = OptionPriceCorrector.correct_option_text(
-                            option_text, market_price
-                        )
-                        
-                        # 로그 기록
-                        log_option_correction(product_code, option_text, market_price, 
-                                             corrected_option, change_info)
-                        
-                        # 보정된 옵션 적용
-                        if change_info.get("changed", False):
-                            result_df.at[idx, "옵션"] = corrected_option
+                        targets.append((idx, product_code, option_text, market_price))
+            
+            corrected_results = OptionPriceCorrector.correct_option_texts(
+                [t[2] for t in targets], [t[3] for t in targets]
+            )
+            for (idx, product_code, option_text, market_price), (corrected_option, change_info) in zip(targets, corrected_results):
+                # 로그 기록
+                log_option_correction(product_code, option_text, market_price, 
+                                     corrected_option, change_info)
+                
+                # 보정된 옵션 적용
+                if change_info.get("changed", False):
+                    result_df.at[idx, "옵션"] = corrected_option
         
         # 상세정보 → 상단 추가 + 원본 상세정보 + 하단 추가 (HTML 형식)
         if "상세정보" in result_df.columns:
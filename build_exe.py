@@ -167,6 +167,8 @@ hidden_imports = [
     'tkinter.ttk',
     'pandas',
     'openpyxl',
+    'python_calamine',  # excel_io.read_sheet (pandas engine="calamine" 는 동적 import 라 자동 감지 안 됨)
+    'xlsxwriter',       # excel_io.write_sheet
     'PIL',
     'PIL.Image',
     'PIL.ImageTk',
@@ -0,0 +1,582 @@
+"""
+excel_io.py
+
+엑셀 읽기/쓰기 공용 모듈
+- read_sheet(): pandas.read_excel 과 같은 인자로 호출
+  - python-calamine 이 설치되어 있으면 calamine 엔진(Rust)으로 읽고, 실패하면 openpyxl(pandas 기본 엔진)로 다시 읽음
+- 파싱 결과 캐시: (파일 절대경로, 크기, 수정시각, 시트/읽기 옵션) 키
+  - 메모리(최근 사용 순) + 디스크(프로젝트 루트/.excel_read_cache, pickle)
+  - 같은 _T{n}_I{n} 파일을 여러 도구/여러 번 읽을 때 두 번째부터는 캐시 파일만 읽음
+  - 파일이 바뀌면(크기/수정시각) 키가 달라져 자동으로 새로 읽음
+  - 항상 복사본 반환 (호출하는 쪽에서 DataFrame 을 수정해도 캐시는 그대로)
+- write_sheet(): df.to_excel(path, index=False) 대신 스트리밍 저장
+  - xlsxwriter(constant_memory) 가 있으면 사용, 없으면 openpyxl write_only
+- python-calamine / xlsxwriter 는 requirements.txt 에 포함 (설치 안 된 환경에서도 openpyxl 로 같은 결과)
+- 각 도구는 이 모듈을 직접 import (프로젝트 루트를 sys.path 에 추가한 뒤 from excel_io import ...)
+  - 열 너비/서식은 column_formats 로 미리 선언 (저장 후 워크북을 다시 열어 꾸미지 않음)
+  - 파일명은 각 도구의 get_next_version_path 가 정한 경로 그대로 (safe_save_excel 에서 호출)
+
+사용 예시:
+    from excel_io import read_sheet, write_sheet, LONG_TEXT_FORMAT
+    df = read_sheet(path)                          # pd.read_excel(path) 대신
+    df = read_sheet(path, sheet_name="Sheet1", dtype=str)
+    write_sheet(df, get_next_version_path(path, task_type="text"), column_formats={"ST2_JSON": LONG_TEXT_FORMAT})
+
+벤치마크:
+    python excel_io.py --bench 20000
+    python excel_io.py --bench-write 50000         # df.to_excel vs write_sheet 시간/최대 RSS
+"""
+
+import os
+import sys
+import math
+import pickle
+import datetime
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import python_calamine  # noqa: F401  (pandas engine="calamine" 가 사용)
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+# 공용 디스크 캐시 폴더 (프로젝트 루트/.excel_read_cache) 및 용량 상한
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".excel_read_cache")
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2GB
+
+# 메모리 캐시 (최근 사용 순)
+MEMORY_CACHE_MAX_ENTRIES = 8
+_memory_cache: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+# 캐시 파일 형식이 바뀌면 올림 (이전 캐시 파일은 자연히 사용 안 됨)
+_CACHE_VERSION = 1
+
+
+# =========================
+# 엔진
+# =========================
+
+def _read_excel(io, sheet_name=0, **kwargs):
+    """calamine 우선, 실패 시 pandas 기본 엔진(xlsx → openpyxl)"""
+    if CALAMINE_AVAILABLE and "engine" not in kwargs:
+        try:
+            return pd.read_excel(io, sheet_name=sheet_name, engine="calamine", **kwargs)
+        except Exception:
+            pass
+    return pd.read_excel(io, sheet_name=sheet_name, **kwargs)
+
+
+# =========================
+# 캐시
+# =========================
+
+def _cache_key(path: str, sheet_name, kwargs: dict) -> Optional[str]:
+    """(절대경로, 크기, 수정시각, 시트, 옵션) 해시. 캐시할 수 없는 옵션(함수 등)이면 None"""
+    for value in kwargs.values():
+        if callable(value) or (isinstance(value, dict) and any(callable(v) for v in value.values())):
+            return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    raw = repr((_CACHE_VERSION, os.path.abspath(path), st.st_size, st.st_mtime_ns, sheet_name,
+                sorted((k, repr(v)) for k, v in kwargs.items())))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _memory_get(key: str) -> Optional[pd.DataFrame]:
+    with _cache_lock:
+        df = _memory_cache.get(key)
+        if df is None:
+            return None
+        _memory_cache.move_to_end(key)
+    return df.copy()
+
+
+def _memory_put(key: str, df: pd.DataFrame) -> None:
+    with _cache_lock:
+        _memory_cache[key] = df.copy()
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_MAX_ENTRIES:
+            _memory_cache.popitem(last=False)
+
+
+def _disk_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+
+def _disk_get(cache_dir: str, key: str) -> Optional[pd.DataFrame]:
+    path = _disk_path(cache_dir, key)
+    try:
+        with open(path, "rb") as f:
+            df = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # 깨진 캐시 파일은 지우고 다시 읽음
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    try:
+        os.utime(path)  # 최근 사용 표시 (용량 정리 시 오래된 것부터 삭제)
+    except OSError:
+        pass
+    return df
+
+
+def _disk_put(cache_dir: str, key: str, df: pd.DataFrame) -> None:
+    """임시 파일에 쓴 뒤 교체 (여러 도구가 동시에 써도 반쯤 쓴 파일을 읽지 않음)"""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = _disk_path(cache_dir, key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except Exception:
+            pass
+        return
+    _trim_disk_cache(cache_dir)
+
+
+def _trim_disk_cache(cache_dir: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+    """용량 상한을 넘으면 오래 안 쓴 캐시 파일부터 삭제"""
+    try:
+        entries = []
+        total = 0
+        for entry in os.scandir(cache_dir):
+            if entry.is_file() and entry.name.endswith(".pkl"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= max_bytes:
+                break
+    except OSError:
+        pass
+
+
+def clear_cache(cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+    """메모리/디스크 캐시 비우기"""
+    with _cache_lock:
+        _memory_cache.clear()
+    try:
+        for entry in os.scandir(cache_dir):
+            if entry.is_file() and entry.name.endswith(".pkl"):
+                os.remove(entry.path)
+    except OSError:
+        pass
+
+
+# =========================
+# 공개 함수
+# =========================
+
+def read_sheet(io, sheet_name=0, use_cache: bool = True, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, **kwargs):
+    """
+    pd.read_excel 대체 (같은 인자)
+    - io 가 파일 경로이고 시트 1개(DataFrame)를 읽을 때만 캐시 사용
+    - sheet_name=None / 리스트(여러 시트 dict), 파일 객체, 함수 옵션(converters 등)은 캐시 없이 그대로 읽음
+    - cache_dir=None 이면 메모리 캐시만 사용
+    """
+    path = os.fspath(io) if isinstance(io, (str, os.PathLike)) else None
+    if not use_cache or path is None or sheet_name is None or isinstance(sheet_name, (list, tuple)):
+        return _read_excel(io, sheet_name=sheet_name, **kwargs)
+
+    key = _cache_key(path, sheet_name, kwargs)
+    if key is None:
+        return _read_excel(io, sheet_name=sheet_name, **kwargs)
+
+    df = _memory_get(key)
+    if df is not None:
+        return df
+    if cache_dir:
+        df = _disk_get(cache_dir, key)
+        if df is not None:
+            _memory_put(key, df)
+            return df
+
+    df = _read_excel(path, sheet_name=sheet_name, **kwargs)
+    if isinstance(df, pd.DataFrame):
+        _memory_put(key, df)
+        if cache_dir:
+            _disk_put(cache_dir, key, df)
+    return df
+
+
+# =========================
+# 쓰기 (스트리밍)
+# =========================
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+# 긴 텍스트 컬럼(프롬프트/HTML/JSON 결과)용 서식: 넓은 열
+# (num_format/wrap 은 openpyxl 에서 셀마다 스타일 셀을 만들어야 해서 느려짐 → 필요한 컬럼에만 지정)
+LONG_TEXT_FORMAT = {"width": 80}
+
+# 한 번에 파이썬 값으로 바꾸는 행 수 (DataFrame 전체를 셀 객체로 만들지 않음)
+WRITE_CHUNK_ROWS = 2000
+
+# 엑셀 셀 하나의 최대 글자 수
+# (openpyxl 은 넘는 부분을 잘라서 기록, xlsxwriter 는 그 셀에서 write_row 가 멈춰 같은 행의 나머지 셀이 빠짐)
+XLSX_MAX_CELL_CHARS = 32767
+
+_DATETIME_FORMAT = "yyyy-mm-dd hh:mm:ss"
+
+
+def _cell_value(value):
+    """엑셀 셀에 쓸 수 있는 파이썬 값으로 변환 (NaN/None → 빈 칸, 그 외 알 수 없는 타입 → 문자열)"""
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf"
+        return value
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.Timestamp):
+        if value.tzinfo is not None:
+            value = value.tz_localize(None)
+        return value.to_pydatetime()
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value
+    if isinstance(value, np.generic):
+        return _cell_value(value.item())
+    return str(value)
+
+
+def _column_values(series: pd.Series) -> list:
+    """컬럼 한 구간을 셀 값 리스트로 변환 (결측 없는 정수/불리언 컬럼은 그대로, 나머지는 셀 단위 변환)"""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        if getattr(series.dt, "tz", None) is not None:
+            series = series.dt.tz_localize(None)
+        return [None if pd.isna(v) else v.to_pydatetime() for v in series]
+    values = series.tolist()
+    if (pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_integer_dtype(series.dtype)) and not series.hasnans:
+        return values
+    return [_cell_value(v) for v in values]
+
+
+def _iter_rows(df: pd.DataFrame):
+    """WRITE_CHUNK_ROWS 행씩 잘라 행 단위(list)로 내보냄"""
+    for start in range(0, len(df), WRITE_CHUNK_ROWS):
+        chunk = df.iloc[start:start + WRITE_CHUNK_ROWS]
+        columns = [_column_values(chunk.iloc[:, i]) for i in range(chunk.shape[1])]
+        yield from (list(row) for row in zip(*columns))
+
+
+def _overlong_text_columns(df: pd.DataFrame) -> list:
+    """셀 최대 글자 수를 넘는 문자열이 있는 컬럼명 (문자열이 들어갈 수 있는 object/string 컬럼만 확인)"""
+    columns = []
+    for i in range(df.shape[1]):
+        series = df.iloc[:, i]
+        if not (series.dtype == object or pd.api.types.is_string_dtype(series.dtype)):
+            continue
+        if any(isinstance(v, str) and len(v) > XLSX_MAX_CELL_CHARS for v in series.tolist()):
+            columns.append(str(df.columns[i]))
+    return columns
+
+
+def _write_xlsxwriter(df: pd.DataFrame, path: str, sheet_name: str, column_formats: dict) -> None:
+    """xlsxwriter constant_memory 모드: 행을 쓰는 즉시 임시 파일로 내보냄"""
+    workbook = xlsxwriter.Workbook(path, {
+        "constant_memory": True,
+        "strings_to_numbers": False,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+        "default_date_format": _DATETIME_FORMAT,
+    })
+    try:
+        sheet = workbook.add_worksheet(sheet_name)
+        header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        for col_idx, name in enumerate(df.columns):
+            spec = column_formats.get(name)
+            if spec:
+                props = {}
+                if spec.get("num_format"):
+                    props["num_format"] = spec["num_format"]
+                if spec.get("wrap"):
+                    props["text_wrap"] = True
+                sheet.set_column(col_idx, col_idx, spec.get("width"), workbook.add_format(props) if props else None)
+            sheet.write_string(0, col_idx, str(name), header_format)
+        for row_idx, row in enumerate(_iter_rows(df), start=1):
+            # write_row 는 셀 하나가 실패하면(-2: 문자열 잘림 등) 그 행의 나머지를 쓰지 않고 오류 코드를 반환
+            error = sheet.write_row(row_idx, 0, row)
+            if error:
+                raise ValueError(f"xlsxwriter 셀 기록 실패 (행 {row_idx + 1}, 코드 {error})")
+    finally:
+        workbook.close()
+
+
+def _write_openpyxl(df: pd.DataFrame, path: str, sheet_name: str, column_formats: dict) -> None:
+    """openpyxl write_only 모드: 셀 객체를 메모리에 쌓지 않고 행 단위로 기록"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+
+    # 열 너비/서식은 행보다 먼저 선언해야 함 (write_only)
+    styled_columns = {}
+    for col_idx, name in enumerate(df.columns):
+        spec = column_formats.get(name)
+        if not spec:
+            continue
+        if spec.get("width"):
+            sheet.column_dimensions[get_column_letter(col_idx + 1)].width = spec["width"]
+        if spec.get("num_format") or spec.get("wrap"):
+            styled_columns[col_idx] = spec
+    datetime_columns = {
+        i for i in range(df.shape[1]) if pd.api.types.is_datetime64_any_dtype(df.dtypes.iloc[i])
+    }
+
+    thin = Side(style="thin")
+    header = []
+    for name in df.columns:
+        cell = WriteOnlyCell(sheet, value=str(name))
+        cell.font = Font(bold=True)
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        cell.alignment = Alignment(horizontal="center", vertical="top")
+        header.append(cell)
+    sheet.append(header)
+
+    cell_columns = set(styled_columns) | datetime_columns
+    for row in _iter_rows(df):
+        for col_idx, value in enumerate(row):
+            # "=..." 문자열은 수식이 아니라 문자열 셀로 저장 (xlsxwriter strings_to_formulas=False 와 동일)
+            formula_like = isinstance(value, str) and value.startswith("=")
+            if not formula_like and col_idx not in cell_columns:
+                continue
+            cell = WriteOnlyCell(sheet, value=value)
+            if formula_like:
+                cell.data_type = "s"
+            if col_idx in datetime_columns:
+                cell.number_format = _DATETIME_FORMAT
+            spec = styled_columns.get(col_idx)
+            if spec and spec.get("num_format"):
+                cell.number_format = spec["num_format"]
+            if spec and spec.get("wrap"):
+                cell.alignment = Alignment(wrap_text=True)
+            row[col_idx] = cell
+        sheet.append(row)
+    workbook.save(path)
+
+
+def write_sheet(df: pd.DataFrame, path, sheet_name: str = "Sheet1", column_formats: Optional[dict] = None) -> None:
+    """
+    df.to_excel(path, index=False) 대체 (스트리밍 기록)
+    - xlsxwriter 가 설치되어 있으면 constant_memory 모드, 없으면 openpyxl write_only 모드
+    - 셀 최대 글자 수(32,767자)를 넘는 문자열이 있으면 xlsxwriter 대신 openpyxl 로 저장하고 경고
+      (df.to_excel 과 같이 그 셀만 32,767자로 잘리고 같은 행의 다른 셀은 그대로)
+    - column_formats: {컬럼명: {"width": 열 너비, "num_format": 표시 형식, "wrap": 줄바꿈}} (쓰기 전에 선언)
+    - 같은 폴더의 임시 파일에 쓴 뒤 교체 → 도중에 실패해도 기존 파일은 그대로
+      (대상 파일이 엑셀에서 열려 있으면 교체 단계에서 PermissionError - 기존 safe_save_excel 재시도 흐름 그대로)
+    - .xlsx 가 아닌 경로는 df.to_excel 로 그대로 저장
+    """
+    path = os.fspath(path)
+    if not path.lower().endswith(".xlsx"):
+        df.to_excel(path, sheet_name=sheet_name, index=False)
+        return
+
+    column_formats = column_formats or {}
+    dir_name, base_name = os.path.split(os.path.abspath(path))
+    tmp_path = os.path.join(dir_name, f"~{base_name}.{os.getpid()}.{threading.get_ident()}.tmp.xlsx")
+    try:
+        overlong = _overlong_text_columns(df)
+        if overlong:
+            warnings.warn(
+                f"{os.path.basename(path)}: 셀 최대 글자 수({XLSX_MAX_CELL_CHARS:,}자)를 넘는 값이 있어 "
+                f"{XLSX_MAX_CELL_CHARS:,}자로 잘려서 저장됩니다 - 컬럼: {', '.join(overlong)}",
+                UserWarning, stacklevel=2,
+            )
+        if XLSXWRITER_AVAILABLE and not overlong:
+            _write_xlsxwriter(df, tmp_path, sheet_name, column_formats)
+        else:
+            _write_openpyxl(df, tmp_path, sheet_name, column_formats)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+# =========================
+# 벤치마크
+# =========================
+
+def _bench(rows: int) -> None:
+    import tempfile
+    import time
+
+    tmp_dir = tempfile.mkdtemp(prefix="excel_io_")
+    path = os.path.join(tmp_dir, "bench_T3_I5.xlsx")
+    pd.DataFrame({
+        "상품코드": [f"P{i:07d}" for i in range(rows)],
+        "원본상품명": [f"상품 이름 {i} 스테인리스 수납함" for i in range(rows)],
+        "ST2_JSON": ['{"a": 1, "b": [1, 2, 3]}'] * rows,
+        "가격": list(range(rows)),
+    }).to_excel(path, index=False)
+    cache_dir = os.path.join(tmp_dir, "cache")
+    print(f"[준비] {rows:,}행 xlsx 생성 (calamine {'사용' if CALAMINE_AVAILABLE else '미설치 → openpyxl'})")
+
+    t0 = time.perf_counter()
+    expected = pd.read_excel(path)
+    t_plain = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    first = read_sheet(path, cache_dir=cache_dir)
+    t_first = time.perf_counter() - t0
+
+    with _cache_lock:
+        _memory_cache.clear()
+    t0 = time.perf_counter()
+    disk = read_sheet(path, cache_dir=cache_dir)
+    t_disk = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    memory = read_sheet(path, cache_dir=cache_dir)
+    t_memory = time.perf_counter() - t0
+
+    for label, df in (("첫 읽기", first), ("디스크 캐시", disk), ("메모리 캐시", memory)):
+        pd.testing.assert_frame_equal(df, expected, check_dtype=not CALAMINE_AVAILABLE, obj=label)
+    memory.loc[0, "원본상품명"] = "수정"
+    assert read_sheet(path, cache_dir=cache_dir).loc[0, "원본상품명"] != "수정", "캐시가 호출자 수정에 오염됨"
+
+    # 파일이 바뀌면 새로 읽음
+    pd.DataFrame({"상품코드": ["X"]}).to_excel(path, index=False)
+    assert list(read_sheet(path, cache_dir=cache_dir)["상품코드"]) == ["X"], "파일 변경 후에도 이전 캐시 사용"
+
+    print(f"[BENCH] pd.read_excel {t_plain:.2f}초 / read_sheet 첫 읽기 {t_first:.2f}초 / "
+          f"디스크 캐시 {t_disk * 1000:.0f}ms / 메모리 캐시 {t_memory * 1000:.0f}ms")
+    print("[검증] 결과 동일, 반환값 수정 격리, 파일 변경 감지 OK")
+
+
+def _bench_frame(rows: int) -> pd.DataFrame:
+    """스테이지 출력과 비슷한 모양 (짧은 컬럼 + 프롬프트/HTML/JSON 긴 텍스트 컬럼)"""
+    prompt = "당신은 온라인 쇼핑몰 상품명 전문가입니다. 아래 정보를 참고하여 검색에 잘 걸리는 상품명을 만드세요. " * 8
+    html = "<div style='text-align:center'><img src='https://example.com/detail/{0}.jpg'></div>" * 6
+    return pd.DataFrame({
+        "상품코드": [f"P{i:07d}" for i in range(rows)],
+        "원본상품명": [f"상품 이름 {i} 스테인리스 수납함" for i in range(rows)],
+        "판매가": [9900 + i for i in range(rows)],
+        "ST2_프롬프트": [prompt + str(i) for i in range(rows)],
+        "본문상세설명": [html.format(i) for i in range(rows)],
+        "ST2_JSON": [f'{{"core_keywords": ["수납함", "정리함"], "idx": {i}}}' for i in range(rows)],
+    })
+
+
+def _bench_write_child(method: str, rows: int, path: str) -> None:
+    """벤치마크 하위 프로세스: 한 가지 방식으로만 저장하고 시간/최대 RSS 증가량 출력"""
+    import json
+    import time
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    df = _bench_frame(rows)
+
+    def _peak_mb():
+        if resource is None:
+            return float("nan")
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+    before = _peak_mb()
+    t0 = time.perf_counter()
+    if method == "to_excel":
+        df.to_excel(path, index=False)
+    else:
+        write_sheet(df, path, column_formats={c: LONG_TEXT_FORMAT for c in ("ST2_프롬프트", "본문상세설명", "ST2_JSON")})
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({"sec": elapsed, "rss_mb": _peak_mb() - before}))
+
+
+def _bench_write(rows: int) -> None:
+    import json
+    import subprocess
+    import tempfile
+
+    tmp_dir = tempfile.mkdtemp(prefix="excel_io_")
+    engine = "xlsxwriter constant_memory" if XLSXWRITER_AVAILABLE else "openpyxl write_only"
+    print(f"[준비] {rows:,}행 (긴 텍스트 컬럼 3개) / write_sheet 엔진: {engine}")
+    results = {}
+    for method in ("to_excel", "write_sheet"):
+        path = os.path.join(tmp_dir, f"{method}_T3_I0.xlsx")
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--_bench-write-child", method, str(rows), path],
+            capture_output=True, text=True, check=True,
+        )
+        results[method] = json.loads(out.stdout.strip().splitlines()[-1])
+        results[method]["size_mb"] = os.path.getsize(path) / (1024 * 1024)
+        print(f"[BENCH] {method:<11} {results[method]['sec']:.2f}초 / 최대 RSS 증가 {results[method]['rss_mb']:.0f}MB"
+              f" / 파일 {results[method]['size_mb']:.1f}MB")
+
+    expected = pd.read_excel(os.path.join(tmp_dir, "to_excel_T3_I0.xlsx"))
+    actual = pd.read_excel(os.path.join(tmp_dir, "write_sheet_T3_I0.xlsx"))
+    pd.testing.assert_frame_equal(actual, expected)
+    print("[검증] 두 파일 내용 동일 OK")
+
+    # 셀 최대 글자 수를 넘는 문자열: 경고 + 그 셀만 잘리고 같은 행의 뒤 컬럼은 그대로 (df.to_excel 과 동일)
+    long_text = "가" * (XLSX_MAX_CELL_CHARS + 5000)
+    long_df = pd.DataFrame({"상품코드": ["P1", "P2"], "ST2_프롬프트": [long_text, "짧음"], "ST2_JSON": ["{}", "{}"]})
+    long_path = os.path.join(tmp_dir, "long_T3_I0.xlsx")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        write_sheet(long_df, long_path)
+    assert any("ST2_프롬프트" in str(w.message) for w in caught), "긴 셀 경고 없음"
+    back = pd.read_excel(long_path)
+    assert back.loc[0, "ST2_프롬프트"] == long_text[:XLSX_MAX_CELL_CHARS] and back.loc[1, "ST2_프롬프트"] == "짧음"
+    assert list(back["ST2_JSON"]) == ["{}", "{}"], "긴 셀 뒤 컬럼이 빠짐"
+    print(f"[검증] {len(long_text):,}자 셀 경고 + {XLSX_MAX_CELL_CHARS:,}자 저장, 같은 행 다른 셀 유지 OK")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="엑셀 읽기 캐시 / 스트리밍 쓰기 벤치마크")
+    parser.add_argument("--bench", type=int, default=0, metavar="ROWS", help="ROWS행 임시 xlsx로 읽기 시간 측정")
+    parser.add_argument("--bench-write", type=int, default=0, metavar="ROWS",
+                        help="ROWS행 저장: df.to_excel vs write_sheet 시간/최대 RSS 비교")
+    parser.add_argument("--_bench-write-child", nargs=3, metavar=("METHOD", "ROWS", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args._bench_write_child:
+        method, rows, path = args._bench_write_child
+        _bench_write_child(method, int(rows), path)
+    elif args.bench or args.bench_write:
+        if args.bench:
+            _bench(args.bench)
+        if args.bench_write:
+            _bench_write(args.bench_write)
+    else:
+        parser.print_help()
@@ -0,0 +1,605 @@
+"""
+gemini_batch_poller.py
+
+Gemini Batch 작업 상태 폴링 / 결과 다운로드 공용 모듈
+- GeminiBatchPoller : 여러 배치 작업을 하나의 백그라운드 스레드(asyncio)에서 동시에 폴링
+  (작업마다 스레드 + 고정 30초 타이머 대신, 작업 상태/진행률에 따라 간격을 자동 조절)
+- fetch_batch_statuses : 선택한 배치들의 상태를 한 번에 동시 조회 (상태 확인 / 병합 전 확인용)
+- download_batch_results_streamed : 결과 파일을 청크 단위로 디스크에 기록 (문자열 디코딩 사본 없음)
+- iter_batch_results : 결과 JSONL을 한 줄씩 읽는 제너레이터 (전체 리스트를 메모리에 올리지 않음)
+- MockGeminiBatchClient : 로컬 모의 Batch API (실제 과금 없이 폴링/다운로드/병합 흐름 점검용)
+
+google-genai 클라이언트에 client.aio(비동기 API)가 있으면 그것을 쓰고,
+없으면 기본 스레드풀에서 동기 client.batches.get 을 호출합니다.
+
+모의 API 사용:
+    GEMINI_MOCK_API=1 로 실행하면 GUI가 실제 Gemini 대신 MockGeminiBatchClient를 사용
+    (상태 조회/병합 경로만 해당. 배치 생성/업로드는 실제 API 필요)
+
+자체 점검:
+    python gemini_batch_poller.py --check --jobs 12 --latency 0.2
+"""
+
+import os
+import json
+import time
+import zlib
+import random
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Gemini 배치 상태 (각 stage core 의 BATCH_STATE_* 와 동일한 문자열)
+STATE_PENDING = "JOB_STATE_PENDING"
+STATE_RUNNING = "JOB_STATE_RUNNING"
+STATE_SUCCEEDED = "JOB_STATE_SUCCEEDED"
+STATE_FAILED = "JOB_STATE_FAILED"
+STATE_CANCELLED = "JOB_STATE_CANCELLED"
+TERMINAL_STATES = (STATE_SUCCEEDED, STATE_FAILED, STATE_CANCELLED, "JOB_STATE_EXPIRED")
+
+# 폴링 간격 기본값 (초)
+DEFAULT_MIN_INTERVAL = 10.0
+DEFAULT_MAX_INTERVAL = 300.0
+DEFAULT_MAX_CONCURRENCY = 8
+# 연속 오류가 이 횟수를 넘으면 해당 작업 폴링 중단
+DEFAULT_MAX_ERRORS = 5
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+# =========================
+# 상태 변환 / 간격 계산
+# =========================
+
+def batch_job_to_status(batch_job: Any) -> Dict[str, Any]:
+    """
+    SDK BatchJob 객체 → 상태 dict (stage core 의 get_batch_status 와 같은 형식)
+    {name, state, total_count?, succeeded_count?, failed_count?, output_file_name?}
+    """
+    state = batch_job.state
+    result = {
+        "name": batch_job.name,
+        "state": state.name if hasattr(state, "name") else str(state),
+    }
+
+    stats = getattr(batch_job, "batch_stats", None)
+    if stats:
+        result["total_count"] = getattr(stats, "total_count", 0)
+        result["succeeded_count"] = getattr(stats, "succeeded_count", 0)
+        result["failed_count"] = getattr(stats, "failed_count", 0)
+
+    dest = getattr(batch_job, "dest", None)
+    if dest and getattr(dest, "file_name", None):
+        result["output_file_name"] = dest.file_name
+
+    return result
+
+
+def is_terminal_state(state: str) -> bool:
+    return state in TERMINAL_STATES
+
+
+def _progress_of(status: Dict[str, Any]) -> int:
+    try:
+        return int(status.get("succeeded_count") or 0) + int(status.get("failed_count") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def next_poll_interval(
+    prev_interval: float,
+    state: str,
+    progressed: bool,
+    min_interval: float = DEFAULT_MIN_INTERVAL,
+    max_interval: float = DEFAULT_MAX_INTERVAL,
+    growth: float = 1.5,
+) -> float:
+    """
+    다음 폴링까지 대기 시간
+    - 대기열(PENDING)이거나 진행률 변화가 없으면 growth배씩 늘림 (최대 max_interval)
+    - 진행 중인데 처리 건수가 늘었으면 간격을 절반으로 줄임 (완료 직후를 빨리 잡기 위해)
+    - ±10% 지터로 여러 작업의 조회 시점이 한 번에 몰리지 않게 함
+    """
+    if state == STATE_RUNNING and progressed:
+        interval = prev_interval / 2.0
+    else:
+        interval = prev_interval * growth
+    interval = min(max_interval, max(min_interval, interval))
+    return interval * random.uniform(0.9, 1.1)
+
+
+# =========================
+# 비동기 조회
+# =========================
+
+async def _aget_batch_job(client: Any, batch_name: str) -> Any:
+    """client.aio.batches.get 우선, 없으면 스레드풀에서 동기 호출"""
+    aio = getattr(client, "aio", None)
+    if aio is not None and hasattr(aio, "batches"):
+        return await aio.batches.get(name=batch_name)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: client.batches.get(name=batch_name))
+
+
+async def _afetch_statuses(client: Any, batch_names: List[str], max_concurrency: int) -> Dict[str, Any]:
+    sem = asyncio.Semaphore(max(1, int(max_concurrency or 1)))
+
+    async def one(name: str):
+        async with sem:
+            try:
+                return name, batch_job_to_status(await _aget_batch_job(client, name))
+            except Exception as e:
+                return name, e
+
+    pairs = await asyncio.gather(*(one(n) for n in batch_names))
+    return dict(pairs)
+
+
+def fetch_batch_statuses(
+    client: Any,
+    batch_names: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    여러 배치 상태를 동시에 조회
+    Returns: {batch_name: 상태 dict 또는 Exception} (입력 순서 유지)
+    작업 스레드에서 호출하세요 (내부에서 asyncio.run 사용)
+    """
+    names = list(dict.fromkeys(batch_names))
+    if not names:
+        return {}
+    return asyncio.run(_afetch_statuses(client, names, max_concurrency))
+
+
+# =========================
+# 다중 작업 폴러
+# =========================
+
+class _PollEntry:
+    __slots__ = ("name", "api_key", "interval", "next_due", "progress", "errors")
+
+    def __init__(self, name: str, api_key: str, interval: float):
+        self.name = name
+        self.api_key = api_key
+        self.interval = interval
+        self.next_due = 0.0  # 등록 직후 바로 한 번 조회
+        self.progress = -1
+        self.errors = 0
+
+
+class GeminiBatchPoller:
+    """
+    여러 Gemini 배치 작업을 한 스레드의 asyncio 루프에서 동시에 폴링
+
+    - add(name, api_key): 폴링 대상 추가 (이미 폴링 중이면 무시)
+    - on_status(name, status): 조회할 때마다 호출
+    - on_done(name, status): 완료/실패/취소 상태가 되면 한 번 호출 후 대상에서 제거
+    - on_error(name, exc, gave_up): 조회 오류 시 호출 (gave_up=True 면 더 이상 폴링 안 함)
+    콜백은 폴러 스레드에서 불리므로 Tk 위젯 갱신은 호출 측에서 after()로 넘기세요.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[str], Any],
+        on_status: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        on_done: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        on_error: Optional[Callable[[str, Exception, bool], None]] = None,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_errors: int = DEFAULT_MAX_ERRORS,
+    ):
+        self.client_factory = client_factory
+        self.on_status = on_status
+        self.on_done = on_done
+        self.on_error = on_error
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max(max_interval, min_interval))
+        self.max_concurrency = max(1, int(max_concurrency or 1))
+        self.max_errors = max(1, int(max_errors or 1))
+
+        self._entries: Dict[str, _PollEntry] = {}
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closed = False
+
+    # ----------------------------------------------------
+    # 외부 API
+    # ----------------------------------------------------
+    def add(self, batch_name: str, api_key: str = "") -> bool:
+        """폴링 대상 추가. 새로 추가되면 True"""
+        with self._lock:
+            if self._closed or batch_name in self._entries:
+                return False
+            self._entries[batch_name] = _PollEntry(batch_name, api_key, self.min_interval)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                return True
+        self._notify()
+        return True
+
+    def is_polling(self, batch_name: str) -> bool:
+        with self._lock:
+            return batch_name in self._entries
+
+    def pending(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def close(self) -> None:
+        """폴링 중단 (진행 중인 조회가 끝나면 스레드 종료)"""
+        with self._lock:
+            self._closed = True
+            self._entries.clear()
+        self._notify()
+
+    # ----------------------------------------------------
+    # 폴러 스레드
+    # ----------------------------------------------------
+    def _notify(self) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # 루프가 이미 종료됨
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._main())
+        finally:
+            with self._lock:
+                self._loop = None
+                self._wakeup = None
+                # 종료 직전에 add()된 작업이 있으면 스레드 다시 시작
+                restart = bool(self._entries) and not self._closed
+                if restart:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+
+    def _client_for(self, api_key: str) -> Any:
+        client = self._clients.get(api_key)
+        if client is None:
+            client = self.client_factory(api_key)
+            self._clients[api_key] = client
+        return client
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        sem = asyncio.Semaphore(self.max_concurrency)
+
+        while True:
+            with self._lock:
+                if self._closed or not self._entries:
+                    return
+                now = time.monotonic()
+                due = [e for e in self._entries.values() if e.next_due <= now]
+                waiting = [e.next_due for e in self._entries.values() if e.next_due > now]
+
+            if due:
+                await asyncio.gather(*(self._poll_one(e, sem) for e in due))
+                continue
+
+            self._wakeup.clear()
+            timeout = max(0.0, min(waiting) - time.monotonic()) if waiting else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_one(self, entry: _PollEntry, sem: asyncio.Semaphore) -> None:
+        async with sem:
+            try:
+                client = self._client_for(entry.api_key)
+                status = batch_job_to_status(await _aget_batch_job(client, entry.name))
+            except Exception as e:
+                entry.errors += 1
+                gave_up = entry.errors >= self.max_errors
+                # 오류 시 간격 두 배 (일시적 장애 / 429 대응)
+                entry.interval = min(self.max_interval, entry.interval * 2.0)
+                entry.next_due = time.monotonic() + entry.interval
+                if gave_up:
+                    with self._lock:
+                        self._entries.pop(entry.name, None)
+                self._call(self.on_error, entry.name, e, gave_up)
+                return
+
+        entry.errors = 0
+        state = status.get("state", "")
+        self._call(self.on_status, entry.name, status)
+
+        if is_terminal_state(state):
+            with self._lock:
+                self._entries.pop(entry.name, None)
+            self._call(self.on_done, entry.name, status)
+            return
+
+        progress = _progress_of(status)
+        progressed = entry.progress >= 0 and progress > entry.progress
+        entry.progress = progress
+        entry.interval = next_poll_interval(
+            entry.interval, state, progressed, self.min_interval, self.max_interval
+        )
+        entry.next_due = time.monotonic() + entry.interval
+
+    @staticmethod
+    def _call(cb: Optional[Callable], *args) -> None:
+        if cb is None:
+            return
+        try:
+            cb(*args)
+        except Exception as e:
+            print(f"[GeminiBatchPoller] 콜백 오류: {e}")
+
+
+# =========================
+# 결과 다운로드 / 스트리밍 파싱
+# =========================
+
+def _iter_content_chunks(content: Any, chunk_size: int) -> Iterator[bytes]:
+    """files.download 반환값(bytes / 파일 객체 / 스트림 응답)을 청크로 나눠 반환"""
+    if hasattr(content, "iter_bytes"):
+        for chunk in content.iter_bytes():
+            yield chunk
+        return
+    if hasattr(content, "read"):
+        while True:
+            chunk = content.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    if hasattr(content, "content"):
+        content = content.content
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    view = memoryview(content)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
+
+
+def download_batch_results_streamed(
+    client: Any,
+    output_file_name: str,
+    local_path: str,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+) -> str:
+    """
+    결과 파일을 청크 단위로 바이너리 기록 (임시 파일 → os.replace)
+    stage core 의 download_batch_results 와 달리 전체를 문자열로 디코딩한 사본을 만들지 않음
+    Returns: 저장된 로컬 파일 경로
+    """
+    content = client.files.download(file=output_file_name)
+    tmp_path = local_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in _iter_content_chunks(content, chunk_size):
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                f.write(chunk)
+        os.replace(tmp_path, local_path)
+    finally:
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return local_path
+
+
+def iter_batch_results(results_jsonl_path: str) -> Iterator[Dict[str, Any]]:
+    """결과 JSONL을 한 줄씩 dict로 반환 (빈 줄/깨진 줄은 건너뜀)"""
+    with open(results_jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+# =========================
+# 모의 Batch API (점검용)
+# =========================
+
+class MockGeminiAPIError(Exception):
+    """모의 API 오류 (status_code 속성으로 429/5xx 흉내)"""
+
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(message or f"mock error {status_code}")
+        self.status_code = status_code
+
+
+class _MockJob:
+    def __init__(self, name: str, rows: int, polls_to_finish: int):
+        self.name = name
+        self.rows = rows
+        self.polls_to_finish = polls_to_finish
+        self.polls = 0
+
+    def snapshot(self) -> Any:
+        self.polls += 1
+        if self.polls <= 1:
+            state, done = STATE_PENDING, 0
+        elif self.polls < self.polls_to_finish:
+            state = STATE_RUNNING
+            done = self.rows * (self.polls - 1) // max(1, self.polls_to_finish - 1)
+        else:
+            state, done = STATE_SUCCEEDED, self.rows
+        dest = SimpleNamespace(file_name=f"files/{self.name.split('/')[-1]}-out") if state == STATE_SUCCEEDED else None
+        return SimpleNamespace(
+            name=self.name,
+            state=SimpleNamespace(name=state),
+            batch_stats=SimpleNamespace(total_count=self.rows, succeeded_count=done, failed_count=0),
+            dest=dest,
+        )
+
+
+class _MockBatches:
+    def __init__(self, owner: "MockGeminiBatchClient"):
+        self._owner = owner
+
+    def get(self, name: str) -> Any:
+        time.sleep(self._owner.latency)
+        return self._owner._get(name)
+
+
+class _MockAioBatches:
+    def __init__(self, owner: "MockGeminiBatchClient"):
+        self._owner = owner
+
+    async def get(self, name: str) -> Any:
+        await asyncio.sleep(self._owner.latency)
+        return self._owner._get(name)
+
+
+class _MockFiles:
+    def __init__(self, owner: "MockGeminiBatchClient"):
+        self._owner = owner
+
+    def download(self, file: str) -> bytes:
+        time.sleep(self._owner.latency)
+        return self._owner._result_bytes(file)
+
+
+class MockGeminiBatchClient:
+    """
+    client.batches.get / client.aio.batches.get / client.files.download 만 흉내 내는 모의 클라이언트.
+    처음 조회되는 배치 이름은 자동 등록되고, 조회할 때마다 PENDING → RUNNING(진행률 증가) → SUCCEEDED 로 진행.
+    - GEMINI_MOCK_ROWS   : 배치당 결과 행 수 (기본 20)
+    - GEMINI_MOCK_POLLS  : 완료까지 조회 횟수 (기본 4, 배치 이름에 따라 +0~2)
+    - GEMINI_MOCK_LATENCY: 호출당 지연(초, 기본 0.3)
+    """
+
+    def __init__(self, rows: Optional[int] = None, polls_to_finish: Optional[int] = None,
+                 latency: Optional[float] = None, error_rate: float = 0.0):
+        if rows is None:
+            rows = int(os.environ.get("GEMINI_MOCK_ROWS", "20"))
+        if polls_to_finish is None:
+            polls_to_finish = int(os.environ.get("GEMINI_MOCK_POLLS", "4"))
+        if latency is None:
+            latency = float(os.environ.get("GEMINI_MOCK_LATENCY", "0.3"))
+        self.rows = rows
+        self.polls_to_finish = max(1, polls_to_finish)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self._jobs: Dict[str, _MockJob] = {}
+        self._lock = threading.Lock()
+        self.batches = _MockBatches(self)
+        self.aio = SimpleNamespace(batches=_MockAioBatches(self))
+        self.files = _MockFiles(self)
+
+    def _get(self, name: str) -> Any:
+        with self._lock:
+            self.calls += 1
+            if self.error_rate and random.random() < self.error_rate:
+                raise MockGeminiAPIError(random.choice([429, 500, 503]))
+            job = self._jobs.get(name)
+            if job is None:
+                extra = zlib.crc32(name.encode("utf-8")) % 3
+                job = _MockJob(name, self.rows, self.polls_to_finish + extra)
+                self._jobs[name] = job
+            return job.snapshot()
+
+    def _result_bytes(self, file_name: str) -> bytes:
+        lines = []
+        for i in range(self.rows):
+            text = json.dumps({"mock": file_name, "row": i}, ensure_ascii=False)
+            lines.append(json.dumps({
+                "key": f"row-{i}",
+                "response": {
+                    "candidates": [{"content": {"parts": [{"text": "```json\n" + text + "\n```"}]}}],
+                    "usageMetadata": {"promptTokenCount": 500 + i, "candidatesTokenCount": 40},
+                },
+            }, ensure_ascii=False))
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def mock_api_enabled() -> bool:
+    return os.environ.get("GEMINI_MOCK_API", "").strip() in ("1", "true", "yes")
+
+
+# =========================
+# 자체 점검 (모의 API)
+# =========================
+
+def _run_check(jobs: int, latency: float, rows: int) -> None:
+    import tempfile
+
+    names = [f"batches/mock-{i:03d}" for i in range(jobs)]
+
+    # 1) 동시 상태 조회 vs 순차 조회
+    seq_client = MockGeminiBatchClient(rows=rows, polls_to_finish=3, latency=latency)
+    t0 = time.time()
+    seq = {n: batch_job_to_status(seq_client.batches.get(name=n)) for n in names}
+    t_seq = time.time() - t0
+
+    con_client = MockGeminiBatchClient(rows=rows, polls_to_finish=3, latency=latency)
+    t0 = time.time()
+    con = fetch_batch_statuses(con_client, names)
+    t_con = time.time() - t0
+    assert seq == con, "동시 조회 결과가 순차 조회와 다름"
+    print(f"[상태 조회] {jobs}건 순차 {t_seq:.2f}s / 동시 {t_con:.2f}s")
+
+    # 2) 폴러: 모든 작업이 완료 콜백까지 도달하는지
+    poll_client = MockGeminiBatchClient(rows=rows, polls_to_finish=4, latency=latency, error_rate=0.05)
+    done: Dict[str, Dict[str, Any]] = {}
+    errors: List[str] = []
+    finished = threading.Event()
+
+    def on_done(name, status):
+        done[name] = status
+        if len(done) + len(errors) >= jobs:
+            finished.set()
+
+    def on_error(name, exc, gave_up):
+        if gave_up:
+            errors.append(name)
+            if len(done) + len(errors) >= jobs:
+                finished.set()
+
+    poller = GeminiBatchPoller(lambda _key: poll_client, on_done=on_done, on_error=on_error,
+                               min_interval=0.05, max_interval=0.5)
+    t0 = time.time()
+    for n in names:
+        poller.add(n, "mock")
+    assert finished.wait(60), "폴러가 제한 시간 안에 끝나지 않음"
+    t_poll = time.time() - t0
+    assert not errors, f"폴링 포기: {errors}"
+    assert all(s["state"] == STATE_SUCCEEDED and s.get("output_file_name") for s in done.values())
+    print(f"[폴러] {jobs}건 완료 {t_poll:.2f}s, API 호출 {poll_client.calls}회 (모의 오류 재시도 포함)")
+
+    # 3) 스트리밍 다운로드 + 한 줄씩 파싱 = 전체 로드와 동일
+    with tempfile.TemporaryDirectory() as tmp:
+        out_name = done[names[0]]["output_file_name"]
+        path = os.path.join(tmp, "results.jsonl")
+        download_batch_results_streamed(poll_client, out_name, path, chunk_size=97)
+        whole = poll_client._result_bytes(out_name)
+        with open(path, "rb") as f:
+            assert f.read() == whole, "스트리밍 다운로드 내용 불일치"
+        parsed = [json.loads(l) for l in whole.decode("utf-8").splitlines() if l.strip()]
+        assert list(iter_batch_results(path)) == parsed, "스트리밍 파싱 결과 불일치"
+    print(f"[다운로드] 스트리밍 기록/파싱 일치 ({rows}행)")
+    print("OK")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gemini Batch 폴러 자체 점검 (모의 Batch API)")
+    parser.add_argument("--check", action="store_true", help="모의 API로 동시 조회/폴러/스트리밍 다운로드 점검")
+    parser.add_argument("--jobs", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    if args.check:
+        _run_check(args.jobs, args.latency, args.rows)
+    else:
+        parser.print_help()
@@ -0,0 +1,417 @@
+"""
+image_preview_cache.py
+
+미리보기 이미지 캐시 (공용 모듈)
+- 기능: 원본/누끼/합성 이미지를 미리 디코딩 + 썸네일로 줄여 메모리에 보관
+- LRU 방식, 보관 중인 이미지의 총 픽셀 수로 메모리 상한 관리
+- 백그라운드 스레드에서 다음/이전 상품 이미지를 미리 읽어둠 (prefetch)
+- 메모리 캐시 키: (파일 경로, 수정시각, 파일 크기, 썸네일 크기) → 파일이 바뀌면 자동으로 새로 읽음
+- 디스크 캐시(선택): 한 번 만든 썸네일을 PNG로 저장해 두고 다음 실행/다른 도구에서 재사용
+  (Stage5 품질검증, I2 라벨링 도구가 같은 폴더 DEFAULT_DISK_CACHE_DIR 를 공유)
+  - 키: 원본 파일 내용(sha1) + 크기 단계(DISK_SIZE_TIERS) → 경로/도구/창 크기가 달라도 같은 항목 사용
+  - 저장은 원본 모드 그대로, 모드 변환(mode)/확대(upscale)/요청 크기로 축소는 읽은 뒤 적용
+  - 적중 시 파일 수정시각을 갱신 → 용량 정리(prune_disk_cache)가 오래 안 쓴 순서로 삭제 (LRU)
+
+사용 예시:
+    cache = PreviewImageCache()
+    img = cache.get(path, 400)            # 캐시 적중 시 즉시 반환, 아니면 현재 스레드에서 로드
+    img = cache.peek(path, 400)           # 캐시 적중 시에만 반환 (로드 안 함)
+    cache.request(path, 400, callback)    # 미스면 백그라운드에서 로드 후 callback(img) (GUI 스레드 대신 디코딩)
+    cache.prefetch([p1, p2, p3], 400)     # 백그라운드로 미리 로드
+
+    # 로드 오류는 on_error(msg) 로 전달 (GUI 로그 등, 지정 안 하면 print)
+    cache = PreviewImageCache(on_error=lambda msg: print(msg))
+
+    # 디스크 캐시 사용 (RGB 변환 + 작은 이미지 확대까지 하는 라벨링 도구 방식)
+    cache = PreviewImageCache(cache_dir=DEFAULT_DISK_CACHE_DIR, mode="RGB", upscale=True)
+
+주의: 반환되는 것은 PIL Image 입니다. ImageTk.PhotoImage 변환은 반드시 Tk 스레드에서 하세요.
+      request() 의 callback / on_error 는 워커 스레드에서 호출되므로 Tk 위젯은 after() 로 넘겨서 다루세요.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Iterable, Tuple
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# 기본 메모리 상한: 약 2400만 픽셀 (RGBA 기준 약 96MB)
+DEFAULT_MAX_PIXELS = 24_000_000
+
+# 공용 디스크 캐시 폴더 (프로젝트 루트/.preview_cache) 및 용량 상한
+DEFAULT_DISK_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".preview_cache")
+DEFAULT_DISK_MAX_BYTES = 1024 * 1024 * 1024  # 1GB
+
+# 디스크 캐시 썸네일 크기 단계 (요청 크기 이상인 가장 작은 단계로 저장, 마지막 단계보다 크면 요청 크기 그대로)
+DISK_SIZE_TIERS = (256, 400, 640, 1024, 1600)
+
+# 원본 파일 내용 해시 (경로, 수정시각, 크기) → sha1 (같은 파일을 다시 해시하지 않도록 프로세스 안에서 보관)
+_DIGEST_MEMO_MAX = 20000
+_digest_memo = {}
+_digest_lock = threading.Lock()
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """파일의 (mtime_ns, size) 반환. 파일이 없으면 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _report(on_error: Optional[Callable[[str], None]], msg: str):
+    if on_error is not None:
+        on_error(msg)
+    else:
+        print(msg)
+
+
+def _content_digest(path: str, sig: Tuple[int, int]) -> str:
+    """원본 파일 내용의 sha1 (수정시각/크기가 같으면 메모 재사용)"""
+    memo_key = (path, sig)
+    with _digest_lock:
+        digest = _digest_memo.get(memo_key)
+    if digest is not None:
+        return digest
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _digest_lock:
+        if len(_digest_memo) >= _DIGEST_MEMO_MAX:
+            _digest_memo.clear()
+        _digest_memo[memo_key] = digest
+    return digest
+
+
+def _disk_tier(max_size: int) -> int:
+    for tier in DISK_SIZE_TIERS:
+        if max_size <= tier:
+            return tier
+    return max_size
+
+
+def _decode_thumbnail(path: str, max_size: int):
+    """원본을 max_size 안으로 축소한 PIL Image (원본 모드 유지, JPEG는 draft 로 디코딩 단계에서 축소). 실패 시 예외"""
+    with Image.open(path) as src:
+        if src.format == "JPEG":
+            src.draft("RGB", (max_size, max_size))
+        img = src.copy()
+    if img.width == 0 or img.height == 0:
+        raise ValueError("이미지 크기가 0")
+    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    return img
+
+
+def _finish_thumbnail(img, max_size: int, mode: Optional[str] = None, upscale: bool = False):
+    """모드 변환 + 요청 크기에 맞추기 (upscale=True 면 작은 이미지도 max_size 에 맞게 확대)"""
+    if mode and img.mode != mode:
+        img = img.convert(mode)
+    w, h = img.size
+    scale = min(max_size / w, max_size / h)
+    if scale < 1 or (upscale and scale > 1):
+        img = img.resize((max(1, int(w * scale)), max(1, int(h * scale))), Image.Resampling.LANCZOS)
+    return img
+
+
+def load_preview_image(path: str, max_size: int, mode: Optional[str] = None, upscale: bool = False,
+                       on_error: Optional[Callable[[str], None]] = None):
+    """
+    이미지를 열어 max_size x max_size 안에 들어오도록 축소한 PIL Image 반환
+    - JPEG는 draft 모드로 디코딩 단계에서 먼저 줄여서 읽음 (대용량 원본 속도 개선)
+    - mode: 지정 시 해당 모드로 변환 (예: "RGB")
+    - upscale: True면 max_size보다 작은 이미지도 max_size에 맞게 확대
+    - 로드 실패 시 None (오류 메시지는 on_error 로 전달, 없으면 print)
+    """
+    if not PIL_AVAILABLE:
+        return None
+    try:
+        return _finish_thumbnail(_decode_thumbnail(path, max_size), max_size, mode, upscale)
+    except Exception as e:
+        _report(on_error, f"[미리보기 캐시] 이미지 로드 오류: {path} ({e})")
+        return None
+
+
+def prune_disk_cache(cache_dir: str, max_bytes: int = DEFAULT_DISK_MAX_BYTES) -> int:
+    """
+    디스크 캐시가 max_bytes를 넘으면 오래 안 쓴 파일부터 삭제 (적중 시 수정시각을 갱신하므로 LRU)
+    Returns: 삭제한 파일 수
+    """
+    files = []
+    total = 0
+    for root, _dirs, names in os.walk(cache_dir):
+        for name in names:
+            fp = os.path.join(root, name)
+            try:
+                st = os.stat(fp)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, fp))
+            total += st.st_size
+
+    removed = 0
+    if total <= max_bytes:
+        return removed
+    files.sort()
+    for _mtime, size, fp in files:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(fp)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class PreviewImageCache:
+    """
+    썸네일 PIL 이미지 LRU 캐시 + 백그라운드 prefetch
+
+    - get(): 캐시 적중 시 즉시 반환, 미스 시 호출 스레드에서 로드 후 캐시에 저장
+    - peek() / request(): 적중 여부만 확인 / 미스면 워커가 prefetch 보다 먼저 로드 후 callback(img 또는 None)
+    - prefetch(): 요청한 경로들을 백그라운드 워커가 순서대로 로드
+      (새 prefetch 요청이 오면 아직 처리 안 된 이전 요청은 버림 → 화살표 연타 시 불필요한 작업 방지)
+    - clear(): 엑셀 파일이 바뀌는 등 기존 항목이 의미 없어졌을 때 전체 비우기 (디스크 캐시는 유지)
+    - cache_dir 지정 시: 메모리 미스 → 디스크 PNG → 원본 디코딩 순으로 조회
+    """
+
+    def __init__(self, max_pixels: int = DEFAULT_MAX_PIXELS, cache_dir: Optional[str] = None,
+                 mode: Optional[str] = None, upscale: bool = False,
+                 disk_max_bytes: int = DEFAULT_DISK_MAX_BYTES,
+                 on_error: Optional[Callable[[str], None]] = None):
+        self.max_pixels = max_pixels
+        self.on_error = on_error
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.upscale = upscale
+        self._entries = OrderedDict()  # key -> PIL Image
+        self._pixels = 0
+        self._lock = threading.Lock()
+
+        # 작업 큐: request() 요청(먼저 처리, 콜백 있음) + prefetch 요청(가장 최근 요청만 유지)
+        self._requests = []
+        self._pending = []
+        self._epoch = 0  # clear() 할 때마다 증가 (로드 중이던 결과 폐기용)
+        self._cond = threading.Condition(self._lock)
+        self._worker = None
+        self._closed = False
+
+        # 디스크 캐시 용량 정리는 시작 시 한 번, 백그라운드에서
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                threading.Thread(target=prune_disk_cache, args=(self.cache_dir, disk_max_bytes),
+                                 daemon=True).start()
+            except OSError:
+                self.cache_dir = None
+
+    # ----------------------------------------------------
+    # 조회 / 저장
+    # ----------------------------------------------------
+    def _make_key(self, path: str, max_size: int):
+        sig = _file_signature(path)
+        if sig is None:
+            return None
+        return (os.path.normcase(os.path.abspath(path)), sig[0], sig[1], int(max_size))
+
+    def _disk_path(self, path: str, key, tier: int) -> Optional[str]:
+        """디스크 캐시 파일 경로 (원본 내용 sha1 + 크기 단계, 원본을 못 읽으면 None)"""
+        if not self.cache_dir:
+            return None
+        try:
+            digest = _content_digest(key[0], (key[1], key[2]))
+        except OSError:
+            return None
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}_{tier}.png")
+
+    def _load(self, path: str, max_size: int, key):
+        """디스크 캐시 → 원본 디코딩 순으로 썸네일 로드 (원본에서 만든 경우 디스크에도 저장)"""
+        tier = _disk_tier(max_size) if self.cache_dir else max_size
+        disk_path = self._disk_path(path, key, tier)
+        thumb = None
+        if disk_path and os.path.exists(disk_path):
+            try:
+                with Image.open(disk_path) as cached:
+                    thumb = cached.copy()
+                os.utime(disk_path)  # 최근 사용 표시 (용량 정리 시 LRU 순서)
+            except Exception:
+                thumb = None  # 손상된 캐시 파일 → 원본에서 다시 생성
+
+        if thumb is None:
+            try:
+                thumb = _decode_thumbnail(path, tier)
+            except Exception as e:
+                _report(self.on_error, f"[미리보기 캐시] 이미지 로드 오류: {path} ({e})")
+                return None
+            if disk_path:
+                try:
+                    os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+                    tmp_path = f"{disk_path}.{threading.get_ident()}.tmp"
+                    to_save = thumb if thumb.mode in ("RGB", "RGBA", "L", "LA", "P") else thumb.convert("RGBA")
+                    to_save.save(tmp_path, "PNG", compress_level=1)
+                    os.replace(tmp_path, disk_path)
+                except Exception:
+                    pass  # 디스크 캐시 저장 실패는 무시 (메모리 캐시만 사용)
+
+        try:
+            return _finish_thumbnail(thumb, max_size, self.mode, self.upscale)
+        except Exception as e:
+            _report(self.on_error, f"[미리보기 캐시] 이미지 변환 오류: {path} ({e})")
+            return None
+
+    def _lookup(self, key):
+        img = self._entries.get(key)
+        if img is not None:
+            self._entries.move_to_end(key)
+        return img
+
+    def _store(self, key, img):
+        if key in self._entries:
+            return
+        w, h = img.size
+        self._entries[key] = img
+        self._pixels += w * h
+        # 픽셀 상한 초과 시 가장 오래 안 쓴 항목부터 제거 (방금 넣은 항목은 유지)
+        while self._pixels > self.max_pixels and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            ow, oh = old.size
+            self._pixels -= ow * oh
+
+    def get(self, path: Optional[str], max_size: int):
+        """경로의 썸네일 반환 (없거나 로드 실패 시 None)"""
+        if not path:
+            return None
+        key = self._make_key(path, max_size)
+        if key is None:
+            return None
+
+        with self._lock:
+            img = self._lookup(key)
+        if img is not None:
+            return img
+
+        img = self._load(path, max_size, key)
+        if img is None:
+            return None
+        with self._lock:
+            self._store(key, img)
+        return img
+
+    def peek(self, path: Optional[str], max_size: int):
+        """캐시 적중 시 썸네일 반환, 미스면 None (로드는 하지 않음 - GUI 스레드용)"""
+        if not path:
+            return None
+        key = self._make_key(path, max_size)
+        if key is None:
+            return None
+        with self._lock:
+            return self._lookup(key)
+
+    def contains(self, path: Optional[str], max_size: int) -> bool:
+        """캐시 적중 여부 (로드는 하지 않음)"""
+        if not path:
+            return False
+        key = self._make_key(path, max_size)
+        with self._lock:
+            return key is not None and key in self._entries
+
+    def clear(self):
+        """캐시 전체 비우기 + 대기 중인 request / prefetch 취소 (취소된 request 의 callback 은 호출 안 됨)"""
+        with self._lock:
+            self._entries.clear()
+            self._pixels = 0
+            self._requests = []
+            self._pending = []
+            self._epoch += 1
+
+    @property
+    def pixel_count(self) -> int:
+        return self._pixels
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ----------------------------------------------------
+    # 백그라운드 로드 (request / prefetch)
+    # ----------------------------------------------------
+    def _start_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+            self._worker.start()
+        self._cond.notify()
+
+    def request(self, path: Optional[str], max_size: int, callback: Callable[[Optional[object]], None]):
+        """
+        썸네일을 백그라운드에서 로드한 뒤 callback(img) 호출 (로드 실패/경로 없음이면 callback(None))
+        - 캐시 적중이면 호출 스레드에서 바로 callback
+        - 미스면 prefetch 보다 먼저 처리, callback 은 워커 스레드에서 호출됨
+        """
+        img = self.peek(path, max_size)
+        if img is not None or not path:
+            callback(img)
+            return
+        with self._cond:
+            if self._closed:
+                return
+            self._requests.append((path, int(max_size), callback))
+            self._start_worker()
+
+    def prefetch(self, paths: Iterable[Optional[str]], max_size: int):
+        """
+        paths를 순서대로 백그라운드에서 로드 (앞쪽이 우선순위 높음)
+        이전에 요청한 prefetch 중 처리되지 않은 것은 취소됨
+        """
+        jobs = [(p, int(max_size), None) for p in paths if p]
+        with self._cond:
+            if self._closed:
+                return
+            self._pending = jobs
+            self._start_worker()
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._requests and not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                queue = self._requests if self._requests else self._pending
+                path, max_size, callback = queue.pop(0)
+                epoch = self._epoch
+
+            img = None
+            key = self._make_key(path, max_size)
+            if key is not None:
+                with self._lock:
+                    img = self._lookup(key)
+                if img is None:
+                    img = self._load(path, max_size, key)
+                    if img is not None:
+                        with self._lock:
+                            # 로드 중에 clear()가 호출되었으면 저장하지 않음
+                            if epoch == self._epoch:
+                                self._store(key, img)
+            if callback is None or epoch != self._epoch:
+                continue
+            try:
+                callback(img)
+            except Exception as e:
+                _report(self.on_error, f"[미리보기 캐시] 콜백 오류: {path} ({e})")
+
+    def close(self):
+        """백그라운드 워커 종료"""
+        with self._cond:
+            self._closed = True
+            self._requests = []
+            self._pending = []
+            self._cond.notify_all()
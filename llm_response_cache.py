@@ -0,0 +1,727 @@
+"""
+llm_response_cache.py
+
+LLM 응답 캐시 (공용 모듈, Stage1~4 / IMG_stage3 공통)
+- 같은 요청(모델, reasoning effort, 프롬프트 버전, system/user 프롬프트, 이미지 내용)이면
+  API를 다시 호출하지 않고 이전 응답을 그대로 사용
+- 공급사가 같은 상품을 반복해서 보내는 경우 배치 요청 수와 비용을 줄이기 위함
+- 저장소: 프로젝트 루트의 SQLite 파일 (DEFAULT_CACHE_PATH)
+- 항목마다 토큰 사용량 / 비용(USD) / 적중 횟수를 기록 → stats()로 절감액 확인
+- 만료(TTL) + 용량 상한(최근에 안 쓴 항목부터 삭제)
+
+사용처:
+    - Gemini 배치 도구 (Stage1~4, IMG 썸네일 분석, 배경 프롬프트): 배치 생성 / 결과 병합
+    - Stage1 건별 러너 (stage1_api_ver_runner): 행마다 조회 / 저장
+    - OpenAI 배치 도구(Gui_stage1_batch_Casche, stage2/3/4 *_Casche, IMG_Batch_analysis_gui_Casche_resize)는
+      JSONL 생성 / 병합을 GUI 안에서 직접 하므로 아직 이 캐시를 쓰지 않음
+
+배치 흐름 (Gemini core 는 stage_cache() 어댑터로 아래를 한 번에 처리):
+    1) create_batch_input_jsonl: 행마다 fingerprint 계산 → 캐시 적중 행은 JSONL에서 제외
+       register_batch(batch_scope(stage, 엑셀), {custom_id: fingerprint}) 로 행 ↔ fingerprint 기록
+    2) 배치 생성 직후: bind_batch(stage, 엑셀, 배치 id) 로 기록을 배치 id 범위로 옮김
+       (같은 엑셀로 배치를 또 만들어도 앞 배치의 기록이 지워지지 않음)
+    3) 결과 병합: merge_batch_results(merge_scope(stage, 엑셀, 배치 id), results, ...) 로 결과를 감싸면
+       - 새 결과는 캐시에 저장
+       - 1)에서 제외됐던 행은 캐시 응답을 같은 형식으로 다시 만들어 이어서 반환 ("_cached": True)
+       - 모든 행이 캐시 적중이라 배치를 만들지 않은 경우는 배치 id 없이 엑셀 범위로 병합
+
+core 사용 예시:
+    RESPONSE_CACHE = stage_cache("stage1-gemini", extract_text_from_response_dict,
+                                 extract_usage_from_response_dict, compute_cost_usd)
+    batch = RESPONSE_CACHE.start_batch(excel_path, model_name, enabled=use_response_cache)
+    if batch.is_cached(custom_id, request): continue     # JSONL 생성 루프 안
+    batch.register()                                     # JSONL 생성 끝
+    RESPONSE_CACHE.bind(excel_path, batch_job.name)      # 배치 생성 직후
+    results = RESPONSE_CACHE.merge(excel_path, batch_name, results)  # 병합 전
+
+환경변수:
+    LLM_RESPONSE_CACHE=0       캐시 사용 안 함
+    LLM_RESPONSE_CACHE_PATH    캐시 파일 경로 변경
+
+관리:
+    python llm_response_cache.py --stats
+    python llm_response_cache.py --prune
+    python llm_response_cache.py --check
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".llm_response_cache.sqlite3")
+DEFAULT_TTL_SECONDS = 60 * 60 * 24 * 60  # 60일
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024    # 512MB
+
+# put() 이 횟수마다 만료/용량 정리
+PRUNE_EVERY_PUTS = 500
+
+# fingerprint 형식이 바뀌면 올려서 이전 항목을 자연스럽게 무효화
+FINGERPRINT_VERSION = 1
+
+# 이 길이 이상의 data URL / inline 이미지는 내용 해시로 바꿔서 fingerprint 계산
+_INLINE_DATA_MIN_LEN = 256
+
+# 응답에서 제거할 사용량 필드 (캐시 재사용분이 토큰/비용 합계에 다시 잡히지 않도록)
+_USAGE_KEYS = ("usage", "usageMetadata", "usage_metadata")
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("LLM_RESPONSE_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+# =========================
+# fingerprint
+# =========================
+
+def _canonical_json(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def content_hash(data: Any) -> str:
+    """bytes/str 내용의 sha256 (hex)"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _file_hash_cached(path: str, mtime: float, size: int) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_content_hash(path: str) -> Optional[str]:
+    """이미지 파일 내용 해시 ((경로, 수정시각, 크기)가 같으면 다시 읽지 않음). 파일이 없으면 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return _file_hash_cached(os.path.abspath(path), st.st_mtime, st.st_size)
+
+
+def _hash_inline_data(obj: Any) -> Any:
+    """요청 payload 안의 base64 이미지(data URL, inlineData.data)를 내용 해시로 치환한 사본"""
+    if isinstance(obj, dict):
+        out = {}
+        for k, v in obj.items():
+            if k == "data" and isinstance(v, str) and len(v) >= _INLINE_DATA_MIN_LEN:
+                out[k] = "sha256:" + content_hash(v)
+            else:
+                out[k] = _hash_inline_data(v)
+        return out
+    if isinstance(obj, list):
+        return [_hash_inline_data(v) for v in obj]
+    if isinstance(obj, str) and obj.startswith("data:") and len(obj) >= _INLINE_DATA_MIN_LEN:
+        return "sha256:" + content_hash(obj)
+    return obj
+
+
+def request_fingerprint(
+    model: str,
+    user_prompt: str,
+    reasoning_effort: Optional[str] = None,
+    system_prompt: str = "",
+    prompt_version: str = "",
+    image_hashes: Sequence[str] = (),
+    stage: str = "",
+) -> str:
+    """프롬프트 문자열로 직접 호출하는 경로(동기 러너 등)의 캐시 키"""
+    return content_hash(_canonical_json({
+        "v": FINGERPRINT_VERSION,
+        "stage": stage,
+        "model": model,
+        "effort": reasoning_effort,
+        "prompt_version": prompt_version,
+        "system": system_prompt,
+        "user": user_prompt,
+        "images": list(image_hashes),
+    }))
+
+
+def payload_fingerprint(
+    stage: str,
+    model: str,
+    payload: Any,
+    reasoning_effort: Optional[str] = None,
+    prompt_version: str = "",
+) -> str:
+    """
+    배치 요청 body/request 전체로 계산하는 캐시 키
+    (system/user 프롬프트, prompt_cache_key, reasoning, 생성 옵션이 모두 포함되고 이미지는 내용 해시로 치환)
+    """
+    return content_hash(_canonical_json({
+        "v": FINGERPRINT_VERSION,
+        "stage": stage,
+        "model": model,
+        "effort": reasoning_effort,
+        "prompt_version": prompt_version,
+        "payload": _hash_inline_data(payload),
+    }))
+
+
+def strip_usage(obj: Any) -> Any:
+    """응답 dict 에서 사용량 필드를 뺀 사본"""
+    if isinstance(obj, dict):
+        return {k: strip_usage(v) for k, v in obj.items() if k not in _USAGE_KEYS}
+    if isinstance(obj, list):
+        return [strip_usage(v) for v in obj]
+    return obj
+
+
+# =========================
+# 캐시 저장소
+# =========================
+
+@dataclass
+class CachedResponse:
+    key: str
+    stage: str
+    model: str
+    response: Any
+    input_tokens: int = 0
+    output_tokens: int = 0
+    reasoning_tokens: int = 0
+    cost_usd: Optional[float] = None
+    created_at: float = 0.0
+    hits: int = 0
+
+
+class LLMResponseCache:
+    """
+    fingerprint → 응답 SQLite 캐시 (여러 스레드에서 같이 사용 가능)
+
+    - get(key): 만료 안 된 항목이면 CachedResponse (touch=True면 적중 횟수/최근 사용 시각 갱신)
+    - put(key, response, ...): 응답 + 사용량/비용 저장 (같은 키면 덮어씀)
+    - register_batch / merge_batch_results: 배치 생성 ↔ 결과 병합 연결 (모듈 설명 참고)
+    - prune(): 만료 항목 삭제 후 용량 상한을 넘으면 최근에 안 쓴 항목부터 삭제
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = float(ttl_seconds) if ttl_seconds else 0.0
+        self.max_bytes = int(max_bytes or 0)
+        self._lock = threading.RLock()
+        self._puts = 0
+        dir_name = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dir_name, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    stage TEXT,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    input_tokens INTEGER DEFAULT 0,
+                    output_tokens INTEGER DEFAULT 0,
+                    reasoning_tokens INTEGER DEFAULT 0,
+                    cost_usd REAL,
+                    size_bytes INTEGER DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    hits INTEGER DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used_at);
+                CREATE TABLE IF NOT EXISTS batch_keys (
+                    scope TEXT NOT NULL,
+                    custom_id TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    stage TEXT,
+                    model TEXT,
+                    registered_at REAL NOT NULL,
+                    PRIMARY KEY (scope, custom_id)
+                );
+            """)
+            self._conn.commit()
+        self.prune()
+
+    # ----------------------------------------------------
+    # 조회 / 저장
+    # ----------------------------------------------------
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created_at > self.ttl_seconds
+
+    def get(self, key: str, touch: bool = True) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage, model, response, input_tokens, output_tokens, reasoning_tokens, "
+                "cost_usd, created_at, hits FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[7], now):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            hits = row[8] or 0
+            if touch:
+                hits += 1
+                self._conn.execute(
+                    "UPDATE responses SET hits = hits + 1, last_used_at = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+        try:
+            response = json.loads(row[2])
+        except ValueError:
+            return None
+        return CachedResponse(key, row[0] or "", row[1] or "", response,
+                              row[3] or 0, row[4] or 0, row[5] or 0, row[6], row[7], hits)
+
+    def put(self, key: str, response: Any, stage: str = "", model: str = "",
+            input_tokens: int = 0, output_tokens: int = 0, reasoning_tokens: int = 0,
+            cost_usd: Optional[float] = None) -> None:
+        text = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, stage, model, response, input_tokens, output_tokens, "
+                "reasoning_tokens, cost_usd, size_bytes, created_at, last_used_at, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, stage, model, text, int(input_tokens or 0), int(output_tokens or 0),
+                 int(reasoning_tokens or 0), cost_usd, len(text.encode("utf-8")), now, now),
+            )
+            self._conn.commit()
+            self._puts += 1
+            need_prune = self._puts % PRUNE_EVERY_PUTS == 0
+        if need_prune:
+            self.prune()
+
+    # ----------------------------------------------------
+    # 배치 생성 ↔ 결과 병합 연결
+    # ----------------------------------------------------
+    @staticmethod
+    def batch_scope(stage: str, excel_path: str) -> str:
+        """배치 제출 전(JSONL 생성 ~ 배치 생성) 기록 범위: 단계 + 엑셀 경로"""
+        return f"{stage}|{os.path.normcase(os.path.abspath(excel_path))}"
+
+    @staticmethod
+    def job_scope(stage: str, batch_id: str) -> str:
+        """배치 생성 후 기록 범위: 단계 + 배치 id"""
+        return f"{stage}|batch:{batch_id}"
+
+    def register_batch(self, scope: str, keys: Dict[str, str], stage: str = "", model: str = "") -> None:
+        """배치 입력을 만들 때 custom_id → fingerprint 기록 (같은 scope의 이전 기록은 교체)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM batch_keys WHERE scope = ?", (scope,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO batch_keys (scope, custom_id, key, stage, model, registered_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(scope, str(cid), fp, stage, model, now) for cid, fp in keys.items()],
+            )
+            self._conn.commit()
+
+    def bind_batch(self, stage: str, excel_path: str, batch_id: str) -> int:
+        """
+        배치 생성 직후 호출: 엑셀 범위에 기록된 custom_id → fingerprint 를 배치 id 범위로 옮김
+        Returns: 옮긴 행 수
+        """
+        src = self.batch_scope(stage, excel_path)
+        dst = self.job_scope(stage, batch_id)
+        with self._lock:
+            self._conn.execute("DELETE FROM batch_keys WHERE scope = ?", (dst,))
+            moved = self._conn.execute(
+                "UPDATE batch_keys SET scope = ? WHERE scope = ?", (dst, src)
+            ).rowcount
+            self._conn.commit()
+        return moved
+
+    def merge_scope(self, stage: str, excel_path: str, batch_id: Optional[str] = None) -> str:
+        """
+        병합에 쓸 범위: 배치 id 범위에 기록이 있으면 그것, 없으면 엑셀 범위
+        (배치 없이 캐시로만 병합하는 경우 / bind_batch 이전에 만든 배치)
+        """
+        if batch_id:
+            scope = self.job_scope(stage, batch_id)
+            with self._lock:
+                found = self._conn.execute(
+                    "SELECT 1 FROM batch_keys WHERE scope = ? LIMIT 1", (scope,)
+                ).fetchone()
+            if found:
+                return scope
+        return self.batch_scope(stage, excel_path)
+
+    def batch_keys(self, scope: str) -> Dict[str, Tuple[str, str, str]]:
+        """{custom_id: (fingerprint, stage, model)}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT custom_id, key, stage, model FROM batch_keys WHERE scope = ?", (scope,)
+            ).fetchall()
+        return {r[0]: (r[1], r[2] or "", r[3] or "") for r in rows}
+
+    def merge_batch_results(
+        self,
+        scope: str,
+        results: Iterable[Dict[str, Any]],
+        id_field: str = "key",
+        is_success: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        usage_fn: Optional[Callable[[Dict[str, Any]], Tuple[int, ...]]] = None,
+        cost_fn: Optional[Callable[[str, int, int], Optional[float]]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        배치 결과 iterable 을 감싸는 제너레이터
+        - 결과를 그대로 흘려보내면서 성공한 행은 캐시에 저장 (사용량/비용 포함)
+        - 끝나면 배치 생성 때 캐시 적중으로 빠졌던 행을 캐시 응답으로 만들어 추가 반환
+          (사용량 필드 없음, "_cached": True)
+        """
+        keys = self.batch_keys(scope)
+        seen = set()
+        for result in results:
+            cid = result.get(id_field)
+            seen.add(cid)
+            entry = keys.get(cid)
+            if entry is not None and (is_success is None or is_success(result)):
+                fp, stage, model = entry
+                usage = tuple(usage_fn(result)) if usage_fn else ()
+                in_tok = usage[0] if len(usage) > 0 else 0
+                out_tok = usage[1] if len(usage) > 1 else 0
+                r_tok = usage[2] if len(usage) > 2 else 0
+                cost = None
+                if cost_fn is not None:
+                    try:
+                        cost = cost_fn(model, in_tok, out_tok)
+                    except Exception:
+                        cost = None
+                stored = strip_usage({k: v for k, v in result.items() if k != id_field})
+                try:
+                    self.put(fp, stored, stage=stage, model=model, input_tokens=in_tok,
+                             output_tokens=out_tok, reasoning_tokens=r_tok, cost_usd=cost)
+                except sqlite3.Error as e:
+                    print(f"[응답 캐시] 저장 실패: {e}")
+            yield result
+
+        for cid, (fp, _stage, _model) in keys.items():
+            if cid in seen:
+                continue
+            hit = self.get(fp, touch=False)
+            if hit is None or not isinstance(hit.response, dict):
+                continue
+            replay = dict(hit.response)
+            replay[id_field] = cid
+            replay["_cached"] = True
+            yield replay
+
+    # ----------------------------------------------------
+    # 정리 / 통계
+    # ----------------------------------------------------
+    def prune(self) -> int:
+        """만료 항목 + 용량 초과분 삭제. Returns: 삭제한 응답 수"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            if self.ttl_seconds:
+                cutoff = now - self.ttl_seconds
+                removed += self._conn.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,)).rowcount
+                self._conn.execute("DELETE FROM batch_keys WHERE registered_at < ?", (cutoff,))
+            if self.max_bytes:
+                total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    # 상한의 90%까지 줄여서 매번 정리가 반복되지 않게 함
+                    target = int(self.max_bytes * 0.9)
+                    doomed = []
+                    for key, size in self._conn.execute(
+                        "SELECT key, size_bytes FROM responses ORDER BY last_used_at ASC"
+                    ):
+                        if total <= target:
+                            break
+                        doomed.append((key,))
+                        total -= size or 0
+                    self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+                    removed += len(doomed)
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """항목 수 / 용량 / 적중 수 / 적중으로 아낀 비용(USD) (전체 + 단계별)"""
+        sql = ("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(hits), 0), "
+               "COALESCE(SUM(hits * COALESCE(cost_usd, 0)), 0), "
+               "COALESCE(SUM(hits * (input_tokens + output_tokens)), 0) FROM responses")
+        with self._lock:
+            total = self._conn.execute(sql).fetchone()
+            by_stage = self._conn.execute(
+                sql.replace(" FROM responses", ", stage FROM responses GROUP BY stage")
+            ).fetchall()
+
+        def as_dict(row):
+            return {"entries": row[0], "bytes": row[1], "hits": row[2],
+                    "saved_cost_usd": row[3], "saved_tokens": row[4]}
+
+        out = as_dict(total)
+        out["by_stage"] = {(r[5] or "-"): as_dict(r) for r in by_stage}
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM batch_keys")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """
+    프로세스 공용 캐시 인스턴스. LLM_RESPONSE_CACHE=0 이거나 캐시 파일을 열 수 없으면 None
+    (캐시는 부가 기능이므로 실패해도 원래 흐름은 그대로 진행)
+    """
+    global _shared_cache
+    if not cache_enabled():
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            path = os.environ.get("LLM_RESPONSE_CACHE_PATH", "").strip() or DEFAULT_CACHE_PATH
+            try:
+                _shared_cache = LLMResponseCache(path)
+            except (OSError, sqlite3.Error) as e:
+                print(f"[응답 캐시] 캐시 파일을 열 수 없어 사용하지 않습니다: {e}")
+                return None
+        return _shared_cache
+
+
+# =========================
+# 배치 core 어댑터
+# =========================
+
+class _BatchRegistration:
+    """JSONL 생성 한 번 동안의 custom_id → fingerprint 기록 (캐시가 꺼져 있으면 아무것도 안 함)"""
+
+    def __init__(self, stage: str, cache: Optional[LLMResponseCache], excel_path: str, model: str):
+        self.stage = stage
+        self.cache = cache
+        self.excel_path = excel_path
+        self.model = model
+        self.keys: Dict[str, str] = {}
+
+    def is_cached(self, custom_id: str, request: Any) -> bool:
+        """요청 fingerprint 를 기록하고, 캐시 적중이면 True (→ JSONL 에서 제외)"""
+        if self.cache is None:
+            return False
+        fp = payload_fingerprint(self.stage, self.model, request)
+        self.keys[custom_id] = fp
+        return self.cache.get(fp) is not None
+
+    def register(self) -> None:
+        """기록한 행을 엑셀 범위로 저장 (배치 생성 후 StageCache.bind 로 배치 id 범위로 옮김)"""
+        if self.cache is not None:
+            self.cache.register_batch(
+                LLMResponseCache.batch_scope(self.stage, self.excel_path),
+                self.keys, stage=self.stage, model=self.model,
+            )
+
+
+class StageCache:
+    """
+    Gemini 배치 core 한 단계의 캐시 사용 묶음 (stage 이름 + 결과 해석 함수)
+    - text_fn(result): 병합 때 채워지는 값 (비었거나 {"error": ...} 이면 캐시에 저장 안 함)
+    - usage_fn(result): (입력 토큰, 출력 토큰[, 캐시 토큰])
+    - cost_fn(model, 입력, 출력): 비용 dict({"total_cost": ...}) 또는 USD 숫자, 모르면 None
+    캐시가 꺼져 있거나 열 수 없으면 모든 메서드가 원래 흐름을 그대로 둠
+    """
+
+    def __init__(self, stage: str, text_fn: Callable[[Dict[str, Any]], Any],
+                 usage_fn: Callable[[Dict[str, Any]], Tuple[int, ...]],
+                 cost_fn: Callable[[str, int, int], Any]):
+        self.stage = stage
+        self.text_fn = text_fn
+        self.usage_fn = usage_fn
+        self.cost_fn = cost_fn
+
+    def start_batch(self, excel_path: str, model: str, enabled: bool = True) -> _BatchRegistration:
+        """JSONL 생성 시작 (enabled=False 이거나 모델이 없으면 캐시 없이)"""
+        cache = get_response_cache() if (enabled and model) else None
+        return _BatchRegistration(self.stage, cache, excel_path, model)
+
+    def bind(self, excel_path: Optional[str], batch_id: str) -> None:
+        """배치 생성 직후: 엑셀 범위 기록을 배치 id 범위로 옮김"""
+        cache = get_response_cache() if excel_path else None
+        if cache is not None:
+            cache.bind_batch(self.stage, excel_path, batch_id)
+
+    def merge(self, excel_path: str, batch_id: Optional[str], results: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        """병합 전: 새 결과는 캐시에 저장, 생성 때 캐시 적중으로 빠진 행은 캐시 응답으로 이어 붙임"""
+        cache = get_response_cache()
+        if cache is None:
+            return results
+        return cache.merge_batch_results(
+            cache.merge_scope(self.stage, excel_path, batch_id),
+            results,
+            is_success=self._is_success,
+            usage_fn=self.usage_fn,
+            cost_fn=self._cost,
+        )
+
+    def _is_success(self, result: Dict[str, Any]) -> bool:
+        value = self.text_fn(result)
+        return bool(value) and not (isinstance(value, dict) and value.get("error"))
+
+    def _cost(self, model: str, in_tok: int, out_tok: int) -> Optional[float]:
+        info = self.cost_fn(model, in_tok, out_tok)
+        if isinstance(info, dict):
+            return info.get("total_cost")
+        return float(info) if info is not None else None
+
+
+def stage_cache(stage: str, text_fn: Callable[[Dict[str, Any]], Any],
+                usage_fn: Callable[[Dict[str, Any]], Tuple[int, ...]],
+                cost_fn: Callable[[str, int, int], Any]) -> StageCache:
+    """배치 core 모듈 전역에 하나씩 만드는 캐시 어댑터"""
+    return StageCache(stage, text_fn, usage_fn, cost_fn)
+
+
+# =========================
+# 자체 점검
+# =========================
+
+def _run_check() -> None:
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(os.path.join(tmp, "c.sqlite3"), ttl_seconds=3600, max_bytes=0)
+
+        # fingerprint: 이미지 내용이 같으면 같은 키, 프롬프트 버전/effort가 다르면 다른 키
+        img = "data:image/jpeg;base64," + "A" * 1000
+        body = {"input": [{"role": "user", "content": [{"type": "input_image", "image_url": img}]}],
+                "prompt_cache_key": "stage1_v1"}
+        fp1 = payload_fingerprint("s", "m", body, "low")
+        assert fp1 == payload_fingerprint("s", "m", json.loads(json.dumps(body)), "low")
+        assert fp1 != payload_fingerprint("s", "m", body, "medium")
+        body2 = json.loads(json.dumps(body))
+        body2["input"][0]["content"][0]["image_url"] = img[:-1] + "B"
+        assert fp1 != payload_fingerprint("s", "m", body2, "low")
+        assert request_fingerprint("m", "p", prompt_version="v1") != request_fingerprint("m", "p", prompt_version="v2")
+
+        # 배치: 0,1행은 새 결과, 2행은 생성 시 캐시 적중으로 제외된 행
+        def line(i, text):
+            return {"key": f"row-{i}", "response": {
+                "candidates": [{"content": {"parts": [{"text": text}]}}],
+                "usageMetadata": {"promptTokenCount": 100, "candidatesTokenCount": 10}}}
+
+        fps = {f"row-{i}": request_fingerprint("m", f"p{i}") for i in range(3)}
+        cache.put(fps["row-2"], strip_usage({"response": line(2, "old")["response"]}), stage="s", model="m",
+                  input_tokens=100, output_tokens=10, cost_usd=0.001)
+        assert cache.get(fps["row-2"]).hits == 1
+        excel = os.path.join(tmp, "a.xlsx")
+        cache.register_batch(LLMResponseCache.batch_scope("s", excel), fps, stage="s", model="m")
+        assert cache.bind_batch("s", excel, "batches/1") == 3
+
+        # 같은 엑셀로 두 번째 배치를 만들어도 첫 배치의 기록은 그대로
+        other_fps = {f"row-{i}": request_fingerprint("m", f"q{i}") for i in range(3)}
+        cache.register_batch(LLMResponseCache.batch_scope("s", excel), other_fps, stage="s", model="m")
+        cache.bind_batch("s", excel, "batches/2")
+        scope = cache.merge_scope("s", excel, "batches/1")
+        assert scope == LLMResponseCache.job_scope("s", "batches/1")
+        assert {k: v[0] for k, v in cache.batch_keys(scope).items()} == fps
+        assert cache.merge_scope("s", excel, "batches/unknown") == LLMResponseCache.batch_scope("s", excel)
+
+        usage = lambda r: (r["response"].get("usageMetadata", {}).get("promptTokenCount", 0),
+                           r["response"].get("usageMetadata", {}).get("candidatesTokenCount", 0))
+        merged = list(cache.merge_batch_results(scope, [line(0, "a"), line(1, "b")],
+                                                usage_fn=usage, cost_fn=lambda m, i, o: 0.5))
+        assert [m["key"] for m in merged] == ["row-0", "row-1", "row-2"]
+        assert merged[2]["_cached"] and "usageMetadata" not in merged[2]["response"]
+        assert cache.get(fps["row-0"], touch=False).input_tokens == 100
+        st = cache.stats()
+        assert st["entries"] == 3 and st["hits"] == 1, st
+        print(f"[fingerprint/배치] OK  stats={st}")
+
+        # TTL 만료
+        cache.ttl_seconds = 1e-9
+        time.sleep(0.01)
+        assert cache.get(fps["row-0"]) is None
+        assert cache.prune() == 2 and cache.stats()["entries"] == 0
+        cache.ttl_seconds = 3600
+
+        # 용량 상한: 최근에 안 쓴 항목부터 삭제
+        for i in range(50):
+            cache.put(f"k{i}", {"text": "x" * 1000})
+        cache.get("k0")
+        cache.max_bytes = 20_000
+        cache.prune()
+        left = cache.stats()
+        assert left["bytes"] <= 20_000 and cache.get("k0", touch=False) is not None, left
+        print(f"[TTL/용량] OK  남은 항목 {left['entries']}개, {left['bytes']} bytes")
+        cache.close()
+
+        # 배치 core 어댑터: 생성(적중 행 제외) → 배치 id 로 옮김 → 병합(새 결과 저장 + 적중 행 재생)
+        global _shared_cache
+        saved_env = os.environ.get("LLM_RESPONSE_CACHE_PATH")
+        os.environ["LLM_RESPONSE_CACHE_PATH"] = os.path.join(tmp, "adapter.sqlite3")
+        _shared_cache = None
+        try:
+            text_fn = lambda r: r["response"]["candidates"][0]["content"]["parts"][0]["text"]
+            adapter = stage_cache("s-adapter", text_fn, usage, lambda m, i, o: {"total_cost": 0.25})
+            requests = {f"row-{i}": {"contents": [{"parts": [{"text": f"p{i}"}]}]} for i in range(3)}
+
+            batch = adapter.start_batch(excel, "m")
+            assert not any(batch.is_cached(k, r) for k, r in requests.items())
+            batch.register()
+            adapter.bind(excel, "batches/a1")
+            merged = list(adapter.merge(excel, "batches/a1", [line(0, "a"), line(1, ""), line(2, "c")]))
+            assert len(merged) == 3 and not any(m.get("_cached") for m in merged)
+            assert get_response_cache().stats()["entries"] == 2, "빈 결과가 캐시에 저장됨"
+            assert get_response_cache().stats()["saved_cost_usd"] == 0
+
+            batch = adapter.start_batch(excel, "m")
+            sent = [k for k, r in requests.items() if not batch.is_cached(k, r)]
+            assert sent == ["row-1"], sent
+            batch.register()
+            adapter.bind(excel, "batches/a2")
+            merged = list(adapter.merge(excel, "batches/a2", [line(1, "b")]))
+            assert [m["key"] for m in merged] == ["row-1", "row-0", "row-2"]
+            assert [text_fn(m) for m in merged] == ["b", "a", "c"]
+
+            assert not adapter.start_batch(excel, "m", enabled=False).is_cached("row-0", requests["row-0"])
+            print("[stage_cache 어댑터] OK")
+        finally:
+            if _shared_cache is not None:
+                _shared_cache.close()
+            _shared_cache = None
+            if saved_env is None:
+                os.environ.pop("LLM_RESPONSE_CACHE_PATH", None)
+            else:
+                os.environ["LLM_RESPONSE_CACHE_PATH"] = saved_env
+    print("OK")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LLM 응답 캐시 관리")
+    parser.add_argument("--stats", action="store_true", help="항목 수 / 적중 수 / 절감 비용 출력")
+    parser.add_argument("--prune", action="store_true", help="만료/용량 초과 항목 삭제")
+    parser.add_argument("--clear", action="store_true", help="캐시 전체 삭제")
+    parser.add_argument("--check", action="store_true", help="임시 파일로 자체 점검")
+    args = parser.parse_args()
+
+    if args.check:
+        _run_check()
+    elif args.stats or args.prune or args.clear:
+        c = LLMResponseCache(os.environ.get("LLM_RESPONSE_CACHE_PATH", "").strip() or DEFAULT_CACHE_PATH)
+        if args.clear:
+            c.clear()
+            print("캐시를 비웠습니다.")
+        if args.prune:
+            print(f"삭제: {c.prune()}건")
+        if args.stats:
+            print(json.dumps(c.stats(), ensure_ascii=False, indent=2))
+    else:
+        parser.print_help()
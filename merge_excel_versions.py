@@ -13,12 +13,16 @@ import re
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple, Optional
 import pandas as pd
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 
+# 공용 엑셀 읽기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시)
+from excel_io import read_sheet
+
 # ========================================================
 # ToolTip 클래스
 # ========================================================
@@ -144,6 +148,46 @@ def extract_version_suffixes(filename: str) -> Tuple[Optional[str], Optional[str
     
     return t_suffix, i_suffix
 
+class FileVersionInfo(NamedTuple):
+    """파일명에서 뽑은 병합용 메타데이터 (root_name, T/I 버전, T/I 괄호 정보)"""
+    root_name: str
+    t_version: Optional[int]
+    i_version: Optional[int]
+    t_suffix: Optional[str]
+    i_suffix: Optional[str]
+
+
+@lru_cache(maxsize=4096)
+def _version_info_from_name(filename: str) -> FileVersionInfo:
+    t_version, i_version = extract_version_info(filename)
+    t_suffix, i_suffix = extract_version_suffixes(filename)
+    return FileVersionInfo(get_root_filename(filename), t_version, i_version, t_suffix, i_suffix)
+
+
+def get_file_version_info(file_path: str) -> FileVersionInfo:
+    """
+    파일의 병합용 메타데이터 (파일명만으로 결정되므로 이름 기준으로 캐시)
+    폴더 스캔 → 쌍 만들기 → 안전장치 확인 → 병합 단계에서 같은 파일을 여러 번 분석하지 않도록 함
+    """
+    return _version_info_from_name(os.path.basename(file_path))
+
+
+def scan_version_metadata(file_paths) -> Dict[str, FileVersionInfo]:
+    """파일 목록의 메타데이터를 한 번에 추출 {경로: FileVersionInfo}"""
+    return {str(p): get_file_version_info(str(p)) for p in file_paths}
+
+
+def calculate_priority_score(info: FileVersionInfo) -> int:
+    """
+    병합 기준 파일 선택용 우선순위 점수
+    - T 점수: 버전 * 1000 + 괄호 여부 * 100
+    - I 점수: 버전 * 10 + 괄호 여부 * 1
+    """
+    t_score = (info.t_version or 0) * 1000 + (100 if info.t_suffix else 0)
+    i_score = (info.i_version or 0) * 10 + (1 if info.i_suffix else 0)
+    return t_score + i_score
+
+
 def find_matching_pairs(directory: str) -> List[Tuple[str, str, str]]:
     """
     디렉토리에서 같은 공통 분모를 가진 엑셀 파일들을 2개씩 쌍으로 묶기
@@ -152,14 +196,12 @@ def find_matching_pairs(directory: str) -> List[Tuple[str, str, str]]:
     
     반환: [(root_name, file1_path, file2_path), ...]
     """
-    # 1. 같은 root_name을 가진 파일들을 그룹화
+    # 1. 폴더의 모든 파일 메타데이터를 한 번에 추출 후 같은 root_name끼리 그룹화
+    metadata = scan_version_metadata(Path(directory).glob("*.xlsx"))
     groups: Dict[str, List[str]] = {}
     
-    for file_path in Path(directory).glob("*.xlsx"):
-        root_name = get_root_filename(str(file_path))
-        if root_name not in groups:
-            groups[root_name] = []
-        groups[root_name].append(str(file_path))
+    for file_path, info in metadata.items():
+        groups.setdefault(info.root_name, []).append(file_path)
     
     pairs: List[Tuple[str, str, str]] = []
     
@@ -168,11 +210,11 @@ def find_matching_pairs(directory: str) -> List[Tuple[str, str, str]]:
         if len(file_list) < 2:
             continue
         
-        # 3. 각 파일의 버전 정보 추출
-        file_versions = []
-        for file_path in file_list:
-            t_ver, i_ver = extract_version_info(file_path)
-            file_versions.append((file_path, t_ver, i_ver))
+        # 3. 각 파일의 버전 정보 (이미 추출된 메타데이터 사용)
+        file_versions = [
+            (file_path, metadata[file_path].t_version, metadata[file_path].i_version)
+            for file_path in file_list
+        ]
         
         # 4. 가능한 모든 쌍 생성 및 점수 계산 (최대 버전 조합 우선)
         possible_pairs = []
@@ -185,8 +227,8 @@ def find_matching_pairs(directory: str) -> List[Tuple[str, str, str]]:
                 if (t1 is not None and t2 is not None and t1 != t2) or \
                    (i1 is not None and i2 is not None and i1 != i2):
                     # 안전장치: root_name 재확인
-                    pair_root1 = get_root_filename(file1_path)
-                    pair_root2 = get_root_filename(file2_path)
+                    pair_root1 = metadata[file1_path].root_name
+                    pair_root2 = metadata[file2_path].root_name
                     
                     if pair_root1 == pair_root2 == root_name:
                         # 점수 계산: 최대 T 버전 + 최대 I 버전 조합
@@ -212,8 +254,8 @@ def find_matching_pairs(directory: str) -> List[Tuple[str, str, str]]:
         while len(remaining) >= 2:
             file1_path, file2_path = remaining[0][0], remaining[1][0]
             # 안전장치: root_name 재확인
-            rem_root1 = get_root_filename(file1_path)
-            rem_root2 = get_root_filename(file2_path)
+            rem_root1 = metadata[file1_path].root_name
+            rem_root2 = metadata[file2_path].root_name
             
             if rem_root1 == rem_root2 == root_name:
                 pairs.append((root_name, file1_path, file2_path))
@@ -224,6 +266,15 @@ def find_matching_pairs(directory: str) -> List[Tuple[str, str, str]]:
     
     return pairs
 
+# 빈 값으로 취급하는 문자열 (소문자, 앞뒤 공백 제거 후 비교)
+EMPTY_CELL_TOKENS = ["", "nan", "none", "null"]
+
+
+def _empty_cell_mask(df: pd.DataFrame) -> pd.DataFrame:
+    """셀 단위 빈 값 여부 (NaN/None 또는 공백/'nan'/'none'/'null' 문자열)"""
+    text = df.astype(str).apply(lambda s: s.str.strip().str.lower())
+    return df.isna() | text.isin(EMPTY_CELL_TOKENS)
+
 class JobManager:
     DB_FILE = None
 
@@ -785,8 +836,10 @@ class MergeExcelVersionsGUI(tk.Tk):
         valid_pairs = []
         for root_name, file1_path, file2_path in self.file_pairs:
             # 안전장치: root_name 재확인
-            file1_root = get_root_filename(file1_path)
-            file2_root = get_root_filename(file2_path)
+            info1 = get_file_version_info(file1_path)
+            info2 = get_file_version_info(file2_path)
+            file1_root = info1.root_name
+            file2_root = info2.root_name
             
             if file1_root != file2_root:
                 self._log(f"  ⚠️ 안전장치: 쌍 제외됨 - root_name 불일치")
@@ -801,9 +854,9 @@ class MergeExcelVersionsGUI(tk.Tk):
             file1_name = os.path.basename(file1_path)
             file2_name = os.path.basename(file2_path)
             
-            # 버전 정보 추출
-            t1, i1 = extract_version_info(file1_path)
-            t2, i2 = extract_version_info(file2_path)
+            # 버전 정보
+            t1, i1 = info1.t_version, info1.i_version
+            t2, i2 = info2.t_version, info2.i_version
             version_info = f"T{t1 or '?'}_I{i1 or '?'} ↔ T{t2 or '?'}_I{i2 or '?'}"
             
             # 체크박스는 "☐" (미선택) 또는 "☑" (선택)
@@ -947,8 +1000,8 @@ class MergeExcelVersionsGUI(tk.Tk):
         안전장치: 같은 root_name을 가진 파일만 병합 가능
         """
         # 0. 안전장치: 두 파일의 root_name이 일치하는지 확인
-        file1_root = get_root_filename(file1_path)
-        file2_root = get_root_filename(file2_path)
+        file1_root = get_file_version_info(file1_path).root_name
+        file2_root = get_file_version_info(file2_path).root_name
         
         if file1_root != file2_root:
             self._log(f"  ❌ 안전장치: 두 파일의 공통 분모가 일치하지 않습니다.")
@@ -969,15 +1022,14 @@ class MergeExcelVersionsGUI(tk.Tk):
         
         for file_path in [file1_path, file2_path]:
             try:
-                df = pd.read_excel(file_path, dtype=str, engine='openpyxl')
+                df = read_sheet(file_path, dtype=str)
                 
                 # 상품코드 컬럼 확인
                 if product_code_col not in df.columns:
                     self._log(f"  ⚠️ {os.path.basename(file_path)}: '{product_code_col}' 컬럼이 없습니다. 스킵합니다.")
                     continue
                 
-                t_version, i_version = extract_version_info(file_path)
-                t_suffix, i_suffix = extract_version_suffixes(file_path)
+                _root, t_version, i_version, t_suffix, i_suffix = get_file_version_info(file_path)
                 self._log(f"  파일: {os.path.basename(file_path)} -> T{t_version or 0}{t_suffix or ''}, I{i_version or 0}{i_suffix or ''}")
                 dataframes.append((df, file_path, t_version or 0, i_version or 0, t_suffix, i_suffix))
                 
@@ -1021,18 +1073,12 @@ class MergeExcelVersionsGUI(tk.Tk):
         final_t_suffix = best_t_file[4] if best_t_file else None
         final_i_suffix = best_i_file[5] if best_i_file else None
         
-        # 3. 베이스 파일 선택: T와 I 우선순위를 종합하여 결정
-        # T 우선순위 점수와 I 우선순위 점수를 합산
-        def calculate_priority_score(df_tuple):
-            df, path, t_ver, i_ver, t_suffix, i_suffix = df_tuple
-            # T 점수: 버전 * 1000 + 괄호 여부 * 100
-            t_score = (t_ver or 0) * 1000 + (100 if t_suffix else 0)
-            # I 점수: 버전 * 10 + 괄호 여부 * 1
-            i_score = (i_ver or 0) * 10 + (1 if i_suffix else 0)
-            return t_score + i_score
-        
+        # 3. 베이스 파일 선택: T와 I 우선순위를 종합하여 결정 (calculate_priority_score 참고)
         # 우선순위 점수가 높은 파일을 베이스로 선택
-        dataframes.sort(key=calculate_priority_score, reverse=True)
+        dataframes.sort(
+            key=lambda d: calculate_priority_score(FileVersionInfo(root_name, d[2], d[3], d[4], d[5])),
+            reverse=True,
+        )
         
         # 4. 첫 번째(기준) DataFrame을 기준으로 시작
         base_df, base_path, base_t, base_i, base_t_suffix, base_i_suffix = dataframes[0]
@@ -1106,59 +1152,37 @@ class MergeExcelVersionsGUI(tk.Tk):
         - 공통 컬럼: base_df가 비어있고 new_df에 값이 있으면 채움 (기존 값은 보존)
         - 새 컬럼: new_df에만 있는 컬럼을 추가하고 값 채움
         - base_df에만 있는 컬럼: 유지
+        - base_df에 없는 상품코드: 맨 뒤에 한 번에 추가 (new_df 순서 유지)
         """
         # 상품코드를 인덱스로 설정
         base_df = base_df.set_index(product_code_col)
         new_df = new_df.set_index(product_code_col)
         
-        # 새 컬럼 추가 (new_df에만 있는 컬럼)
-        for col in new_df.columns:
-            if col not in base_df.columns:
-                # 새 컬럼 추가 (초기값 None)
-                base_df[col] = None
+        # 새 컬럼 추가 (new_df에만 있는 컬럼, 초기값 None)
+        added_cols = [col for col in new_df.columns if col not in base_df.columns]
+        base_df = base_df.astype(object)
+        for col in added_cols:
+            base_df[col] = None
         
-        # base_df에만 있는 컬럼도 new_df에 추가 (None으로 초기화, 나중에 채울 수 있도록)
-        for col in base_df.columns:
-            if col not in new_df.columns:
-                new_df[col] = None
+        # new_df를 base_df의 행/컬럼 순서에 맞춰 정렬 (같은 상품코드가 여러 번이면 첫 행 사용)
+        new_unique = new_df[~new_df.index.duplicated(keep="first")].astype(object)
+        aligned = new_unique.reindex(index=base_df.index, columns=base_df.columns)
         
-        # 상품코드 기준으로 병합
-        for product_code in new_df.index:
-            if product_code in base_df.index:
-                # 기존 행이 있는 경우
-                for col in new_df.columns:
-                    base_value = base_df.at[product_code, col]
-                    new_value = new_df.at[product_code, col]
-                    
-                    # 빈 값 체크 함수
-                    def is_empty(val):
-                        if pd.isna(val):
-                            return True
-                        val_str = str(val).strip()
-                        return val_str == "" or val_str.lower() in ["nan", "none", "null"]
-                    
-                    # 공통 컬럼인 경우: base_df가 비어있고 new_df에 값이 있으면 채움
-                    if col in base_df.columns:
-                        if is_empty(base_value) and not is_empty(new_value):
-                            base_df.at[product_code, col] = new_value
-                    # 새 컬럼인 경우: new_df에 값이 있으면 채움
-                    else:
-                        if not is_empty(new_value):
-                            base_df.at[product_code, col] = new_value
-            else:
-                # 새 행 추가
-                new_row = new_df.loc[[product_code]].copy()
-                # base_df에만 있는 컬럼을 None으로 채우기
-                for col in base_df.columns:
-                    if col not in new_row.columns:
-                        new_row[col] = None
-                base_df = pd.concat([base_df, new_row])
+        # base가 비어있고 new에 값이 있는 칸만 채움
+        fill_mask = _empty_cell_mask(base_df) & ~_empty_cell_mask(aligned)
+        base_df = base_df.mask(fill_mask, aligned)
+        
+        # 새 행 추가 (한 번에 concat)
+        new_rows = new_df[~new_df.index.isin(base_df.index)]
+        if len(new_rows):
+            base_df = pd.concat([base_df, new_rows.reindex(columns=base_df.columns).astype(object)])
         
         # 인덱스를 컬럼으로 복원
         base_df = base_df.reset_index()
         
         return base_df
 
+
 if __name__ == "__main__":
     app = MergeExcelVersionsGUI()
     app.mainloop()
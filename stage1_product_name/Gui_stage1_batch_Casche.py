@@ -43,6 +43,12 @@ from tkinter.scrolledtext import ScrolledText
 
 from openai import OpenAI
 
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet, write_sheet
+
 # ========================================================
 # [NEW] 메인 런처 연동용 JobManager & 파일명 유틸
 # ========================================================
@@ -209,7 +215,7 @@ def safe_save_excel(df, path: str) -> bool:
     """엑셀 파일이 열려 있어 저장이 안 될 때 재시도를 유도하는 함수"""
     while True:
         try:
-            df.to_excel(path, index=False)
+            write_sheet(df, path)
             return True
         except PermissionError:
             if not messagebox.askretrycancel(
@@ -694,7 +700,7 @@ class Stage1BatchGUI(tk.Tk):
         try:
             client = OpenAI(api_key=key)
             self.append_log(f"엑셀 로드 중... {os.path.basename(src)}")
-            df = pd.read_excel(src)
+            df = read_sheet(src)
             
             # 필수 컬럼 확인
             req_cols = ['카테고리명', '원본상품명']
@@ -1707,7 +1713,7 @@ class Stage1BatchGUI(tk.Tk):
                     out_filename = f"{base_name}_T1_I0.xlsx"
                 out_excel = os.path.join(base_dir, out_filename)
                 
-                df = pd.read_excel(src_path)
+                df = read_sheet(src_path)
                 target_col = "ST1_결과상품명"
                 if target_col not in df.columns:
                     df[target_col] = ""
@@ -1907,7 +1913,7 @@ class Stage1BatchGUI(tk.Tk):
                     self.append_log(f"  [비용절감] {bid}: 캐싱으로 ${cache_savings:.4f} 절감")
 
                 if src_path and os.path.exists(src_path):
-                    df = pd.read_excel(src_path)
+                    df = read_sheet(src_path)
                     target_col = "ST1_결과상품명"
                     if target_col not in df.columns:
                         df[target_col] = ""
@@ -2002,7 +2008,7 @@ class Stage1BatchGUI(tk.Tk):
                 continue
             
             try:
-                df = pd.read_excel(out_path)
+                df = read_sheet(out_path)
                 if "ST1_결과상품명" not in df.columns or "원본상품명" not in df.columns: continue
                 for idx, row in df.iterrows():
                     raw = safe_str(row.get("원본상품명", ""))
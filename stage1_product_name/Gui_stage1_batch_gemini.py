@@ -509,8 +509,16 @@ class Stage1GeminiBatchGUI(tk.Tk):
             )
 
             self.append_log(f"JSONL 생성 완료: {result['written_count']}건 (스킵: {result['skipped_count']}건, 기존결과: {result['skipped_existing']}건)")
+            if result.get("cached_count"):
+                self.append_log(f"  - 응답 캐시 적중: {result['cached_count']}건 (배치에서 제외, 병합 시 캐시 결과로 채움)")
 
             if result['written_count'] == 0:
+                # 대상 행이 모두 응답 캐시에 있으면 배치 없이 바로 병합
+                if result.get("cached_count"):
+                    out_excel = get_next_version_path(src, "text")
+                    merged_count, _, _ = merge_results_to_excel(src, [], out_excel)
+                    self.append_log(f"응답 캐시로 {merged_count}건 병합 완료 (API 호출 없음): {out_excel}")
+                    return
                 self.append_log("생성할 요청이 없습니다.")
                 return
 
@@ -532,7 +540,8 @@ class Stage1GeminiBatchGUI(tk.Tk):
                 client=client,
                 model_name=model,
                 src_file_name=uploaded_file_name,
-                display_name=f"stage1_{base_name}"
+                display_name=f"stage1_{base_name}",
+                excel_path=src,
             )
 
             batch_name = batch_info["name"]
@@ -834,7 +843,8 @@ class Stage1GeminiBatchGUI(tk.Tk):
 
                 # 병합
                 output_excel = get_next_version_path(src_excel, "text")
-                merged_count, total_in, total_out = merge_results_to_excel(src_excel, results, output_excel)
+                merged_count, total_in, total_out = merge_results_to_excel(
+                    src_excel, results, output_excel, batch_name=batch_name)
 
                 # 비용 계산
                 model = job.get("model", DEFAULT_MODEL)
@@ -8,6 +8,7 @@ STAGE1 Batch API + 엑셀 병합 핵심 로직 (캐싱 최적화 버전)
 """
 
 import os
+import sys
 import json
 import time
 import threading
@@ -19,6 +20,12 @@ from openai import OpenAI
 from prompts_stage1 import build_stage1_prompt, safe_str
 from stage1_run_history import append_run_history
 
+# 공용 엑셀 읽기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet
+
 # =====================================
 # 프롬프트 캐싱 최적화: System/User 분리
 # =====================================
@@ -366,7 +373,7 @@ def create_batch_input_jsonl(
     - 제외된 행은 별도 엑셀 파일(<원본명>_stage1_skipped_rows.xlsx)에 저장.
     - 반환값(info_dict)으로 전체/변환/제외 개수와 제외파일 경로를 돌려줌.
     """
-    df = pd.read_excel(excel_path)
+    df = read_sheet(excel_path)
 
     required_cols = ["원본상품명", "카테고리명", "판매형태"]
     for col in required_cols:
@@ -593,7 +600,7 @@ def wait_and_collect_batch(
     )
 
     # 3) 엑셀 병합
-    df = pd.read_excel(excel_path)
+    df = read_sheet(excel_path)
     total_rows = len(df)
 
     if "ST1_결과상품명" not in df.columns:
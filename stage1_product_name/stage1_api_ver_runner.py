@@ -8,12 +8,31 @@ from datetime import datetime, timedelta
 from typing import Optional, Tuple, Any, Dict
 
 import re  # 출력 후처리용
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-import pandas as pd
 from openai import OpenAI
 
 from stage1_run_history import append_run_history
 from prompts_stage1 import safe_str, build_stage1_prompt  # ★ 프롬프트/유틸 분리 모듈 사용
+from stage1_parallel import (  # ★ 병렬 호출 / 속도 제한 / 재시도 / 중간저장 저널
+    RateLimiter,
+    ResultJournal,
+    MockOpenAIClient,
+    call_with_retry,
+    estimate_tokens,
+    mock_api_enabled,
+)
+
+# ★ 공용 LLM 응답 캐시 (프로젝트 루트 llm_response_cache.py - 요청 fingerprint 는 중간 저장 저널 키로도 사용)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from llm_response_cache import get_response_cache, request_fingerprint
+
+# 공용 엑셀 읽기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시)
+from excel_io import read_sheet
+
+RESPONSE_CACHE_STAGE = "stage1-sync"
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -128,6 +147,12 @@ STOP_REQUESTED = False
 # API 키 저장 파일 (스크립트와 같은 폴더)
 CONFIG_API_KEY_PATH = os.path.join(os.path.dirname(__file__), ".openai_api_key")
 
+# 병렬 호출 기본값 (계정 Tier에 맞게 조정)
+DEFAULT_MAX_WORKERS = 8             # 동시에 진행하는 API 호출 수
+DEFAULT_REQUESTS_PER_MINUTE = 500   # RPM 제한
+DEFAULT_TOKENS_PER_MINUTE = 500_000 # TPM 제한
+MAX_API_RETRIES = 5                 # 429/5xx 재시도 횟수
+
 # 사용 모델: GPT-5 계열 3종만
 MODEL_ORDER = [
     "gpt-5",        # 5세대 풀사이즈 reasoning, 최고 품질/고비용
@@ -268,9 +293,14 @@ def save_api_key_to_file(key: str) -> None:
 def init_openai_client(api_key: str) -> None:
     global client
     api_key = api_key.strip()
+    if mock_api_enabled():
+        # 로컬 모의 Responses API (처리량 테스트용, STAGE1_MOCK_API=1)
+        client = MockOpenAIClient()
+        return
     if not api_key:
         raise ValueError("API 키가 비어 있습니다.")
-    client = OpenAI(api_key=api_key)
+    # 재시도는 call_with_retry(지터 포함)에서 처리하므로 SDK 자체 재시도는 끔
+    client = OpenAI(api_key=api_key, max_retries=0)
 
 
 def normalize_reasoning_effort(gui_value: str) -> Optional[str]:
@@ -385,10 +415,12 @@ def call_stage1_api(
     raw_name: str,
     model_name: str,
     reasoning_effort: Optional[str] = None,
+    prompt_text: Optional[str] = None,
 ) -> Tuple[str, int, int, int, str]:
     """
     한 행에 대해 Stage1 API 호출.
     - prompts_stage1.build_stage1_prompt()를 사용해 전체 프롬프트를 생성.
+      (prompt_text 를 넘기면 그대로 사용 - 호출부에서 이미 만든 프롬프트 재사용)
     - 단일 user 메시지로 호출 (규칙/예시/입력정보 모두 포함).
 
     반환: (정제상품명, input_tokens, output_tokens, reasoning_tokens, reasoning_summary_text)
@@ -398,11 +430,12 @@ def call_stage1_api(
         raise RuntimeError("OpenAI client가 초기화되지 않았습니다. 먼저 API 키를 설정하세요.")
 
     # prompts_stage1에서 가져온 템플릿/규칙으로 전체 프롬프트 생성
-    prompt_text = build_stage1_prompt(
-        category=category,
-        sale_type=sale_type,
-        raw_name=raw_name,
-    )
+    if prompt_text is None:
+        prompt_text = build_stage1_prompt(
+            category=category,
+            sale_type=sale_type,
+            raw_name=raw_name,
+        )
 
     is_gpt5 = model_name.startswith("gpt-5")
 
@@ -535,6 +568,7 @@ class Stage1GUI(tk.Tk):
         self.model_var = tk.StringVar(value="gpt-5-mini")
 
         self.save_every_var = tk.IntVar(value=50)
+        self.max_workers_var = tk.IntVar(value=DEFAULT_MAX_WORKERS)
 
         self.file_path_var = tk.StringVar(value="")
 
@@ -622,19 +656,31 @@ class Stage1GUI(tk.Tk):
         )
         self.model_inline_label.grid(row=2, column=0, columnspan=3, sticky="w", padx=24, pady=(0, 2))
 
-        # 저장 주기
-        ttk.Label(frame_top, text="엑셀 저장 주기(행):").grid(
+        # 저장 주기 + 동시 요청 수
+        ttk.Label(frame_top, text="중간 저장 주기(행):").grid(
             row=3, column=0, sticky="w", padx=5, pady=4
         )
+        frame_row3 = ttk.Frame(frame_top)
+        frame_row3.grid(row=3, column=1, sticky="w", padx=5, pady=4)
         spin_save = ttk.Spinbox(
-            frame_top,
+            frame_row3,
             from_=1,
             to=1000,
             increment=1,
             textvariable=self.save_every_var,
             width=7,
         )
-        spin_save.grid(row=3, column=1, sticky="w", padx=5, pady=4)
+        spin_save.pack(side="left")
+        ttk.Label(frame_row3, text="   동시 요청 수:").pack(side="left")
+        spin_workers = ttk.Spinbox(
+            frame_row3,
+            from_=1,
+            to=64,
+            increment=1,
+            textvariable=self.max_workers_var,
+            width=5,
+        )
+        spin_workers.pack(side="left", padx=(5, 0))
 
         # Reasoning Effort
         ttk.Label(frame_top, text="Reasoning Effort (GPT-5):").grid(
@@ -887,6 +933,36 @@ class Stage1GUI(tk.Tk):
         text = "완료 예상 시각: " + dt.strftime("%Y-%m-%d %H:%M:%S")
         self.after(0, self._set_finish_time_on_main_thread, text)
 
+    def _update_eta(self, processed: int, total_rows: int, start_dt: datetime,
+                    start_time_monotonic: float) -> None:
+        """처리된 행 수 기준으로 남은 예상 시간 / 완료 예상 시각 갱신"""
+        try:
+            if processed > 0 and total_rows > 0:
+                elapsed = time.time() - start_time_monotonic
+                per_row = elapsed / processed
+                remaining = max(total_rows - processed, 0)
+                eta_seconds = max(per_row * remaining, 0)
+
+                eta_min = int(eta_seconds // 60)
+                eta_sec = int(round(eta_seconds % 60))
+
+                if remaining == 0:
+                    eta_text = "남은 예상 시간: 거의 완료"
+                else:
+                    if eta_min > 0:
+                        eta_text = f"남은 예상 시간: 약 {eta_min}분 {eta_sec}초"
+                    else:
+                        eta_text = f"남은 예상 시간: 약 {eta_sec}초"
+                self.set_eta(eta_text)
+
+                expected_end_dt = start_dt + timedelta(
+                    seconds=elapsed + eta_seconds
+                )
+                self.set_finish_time(expected_end_dt)
+        except Exception:
+            # ETA 계산 실패해도 전체 작업에는 영향 없음
+            pass
+
     # ★ 완료된 파일 열기 헬퍼
     def _open_file(self, path: str) -> None:
         try:
@@ -1040,6 +1116,7 @@ class Stage1GUI(tk.Tk):
 
             model_name = self.model_var.get().strip()
             save_every = int(self.save_every_var.get())
+            max_workers = max(1, int(self.max_workers_var.get()))
 
             raw_effort = self.reasoning_effort_var.get()
             reasoning_effort = normalize_reasoning_effort(raw_effort)
@@ -1062,9 +1139,13 @@ class Stage1GUI(tk.Tk):
             self.append_log(
                 f"[INFO] ST1_정제상품명 기존값 덮어쓰기: {overwrite_results}"
             )
-            self.append_log(f"[INFO] 엑셀 저장 주기: {save_every} 행마다 저장")
+            self.append_log(f"[INFO] 중간 저장(저널) 동기화 주기: {save_every} 행마다")
+            self.append_log(
+                f"[INFO] 동시 요청 수: {max_workers} "
+                f"(RPM {DEFAULT_REQUESTS_PER_MINUTE}, TPM {DEFAULT_TOKENS_PER_MINUTE:,})"
+            )
 
-            df = pd.read_excel(file_path)
+            df = read_sheet(file_path)
             required_cols = ["원본상품명", "카테고리명", "판매형태"]
 
             for col in required_cols:
@@ -1100,161 +1181,193 @@ class Stage1GUI(tk.Tk):
 
             stopped_by_user = False
 
-            # ETA 계산은 start_time_monotonic 기준
-            for idx in range(total_rows):
-                if STOP_REQUESTED:
-                    self.append_log("[INFO] 중지 플래그 감지, 루프 종료.")
-                    stopped_by_user = True
-                    break
+            # 중간 저장 저널: 이전 실행이 중단되었으면 남은 결과를 복구
+            journal = ResultJournal(
+                os.path.join(base_dir, f"{base_name}_stage1_journal.jsonl"),
+                flush_every=save_every,
+            )
+            resumed = journal.load()
+
+            # 응답 캐시: 같은 모델/추론강도/프롬프트로 이미 받은 결과는 API 재호출 없이 사용
+            cache = get_response_cache()
+            fingerprints: Dict[int, str] = {}  # 행 → 요청 fingerprint (저널 / 캐시 공용 키)
+            cached_rows = 0
 
+            # 1) 대상 행 선별 (스킵 판정은 순서대로, API 호출 대상만 tasks에 모음)
+            tasks = []
+            done_count = 0
+            resumed_rows = 0
+            for idx in range(total_rows):
                 raw_name = safe_str(df.at[idx, "원본상품명"])
                 category = safe_str(df.at[idx, "카테고리명"])
                 sale_type = safe_str(df.at[idx, "판매형태"])  # 이미 엑셀에서 지정된 단품형/옵션형
 
-                # 이 행은 방문했으므로 처리된 행 수 카운트
-                processed_rows_total = idx + 1
-
                 # 덮어쓰기 옵션 OFF이고, 기존 정제상품명이 있으면 스킵
                 existing_refined = safe_str(df.at[idx, "ST1_정제상품명"])
                 if existing_refined and not overwrite_results:
                     self.append_log(
                         f"[SKIP] 행 {idx}: ST1_정제상품명 값이 이미 있어 덮어쓰기 옵션 OFF 상태로 스킵."
                     )
-                    self.set_progress(idx + 1, total_rows)
-                    # ETA 및 완료 예상 시각 업데이트
-                    try:
-                        processed = idx + 1
-                        if processed > 0 and total_rows > 0:
-                            elapsed = time.time() - start_time_monotonic
-                            per_row = elapsed / processed
-                            remaining = max(total_rows - processed, 0)
-                            eta_seconds = max(per_row * remaining, 0)
-                            eta_min = int(eta_seconds // 60)
-                            eta_sec = int(round(eta_seconds % 60))
-                            if remaining == 0:
-                                eta_text = "남은 예상 시간: 거의 완료"
-                            else:
-                                if eta_min > 0:
-                                    eta_text = f"남은 예상 시간: 약 {eta_min}분 {eta_sec}초"
-                                else:
-                                    eta_text = f"남은 예상 시간: 약 {eta_sec}초"
-                            self.set_eta(eta_text)
-
-                            expected_end_dt = start_dt + timedelta(
-                                seconds=elapsed + eta_seconds
-                            )
-                            self.set_finish_time(expected_end_dt)
-                    except Exception:
-                        pass
+                    done_count += 1
                     continue
 
                 if not raw_name:
                     self.append_log(f"[SKIP] 행 {idx}: 원본상품명이 비어 있음.")
-                    self.set_progress(idx + 1, total_rows)
-                    # ETA 및 완료 예상 시각 업데이트
-                    try:
-                        processed = idx + 1
-                        if processed > 0 and total_rows > 0:
-                            elapsed = time.time() - start_time_monotonic
-                            per_row = elapsed / processed
-                            remaining = max(total_rows - processed, 0)
-                            eta_seconds = max(per_row * remaining, 0)
-                            eta_min = int(eta_seconds // 60)
-                            eta_sec = int(round(eta_seconds % 60))
-                            if remaining == 0:
-                                eta_text = "남은 예상 시간: 거의 완료"
-                            else:
-                                if eta_min > 0:
-                                    eta_text = f"남은 예상 시간: 약 {eta_min}분 {eta_sec}초"
-                                else:
-                                    eta_text = f"남은 예상 시간: 약 {eta_sec}초"
-                            self.set_eta(eta_text)
-
-                            expected_end_dt = start_dt + timedelta(
-                                seconds=elapsed + eta_seconds
-                            )
-                            self.set_finish_time(expected_end_dt)
-                    except Exception:
-                        pass
+                    done_count += 1
                     continue
 
-                self.append_log(f"[INFO] 행 {idx} 처리 중...")
-                self.append_log(f"       원본상품명: {raw_name}")
-                self.append_log(f"       카테고리명: {category}")
-                self.append_log(f"       판매형태(엑셀): {sale_type}")
+                # 프롬프트는 행마다 한 번만 생성 (저널/캐시 키 / 토큰 추정 / API 호출에 같이 사용)
+                prompt_text = build_stage1_prompt(category=category, sale_type=sale_type, raw_name=raw_name)
+                fp = request_fingerprint(
+                    model_name,
+                    prompt_text,
+                    reasoning_effort=reasoning_effort,
+                    stage=RESPONSE_CACHE_STAGE,
+                )
 
-                # 실제 OpenAI API를 호출하는 행 카운트
-                api_rows += 1
+                # 이전 실행 저널에 같은 요청(프롬프트 + 모델 + 추론강도)의 결과가 있으면 재사용
+                rec = resumed.get(idx)
+                if rec and rec.get("fingerprint") == fp:
+                    df.at[idx, "ST1_정제상품명"] = rec.get("refined", "")
+                    df.at[idx, "ST1_판매형태"] = sale_type
+                    done_count += 1
+                    resumed_rows += 1
+                    continue
 
-                try:
-                    refined, in_tok, out_tok, r_tok, r_summary = call_stage1_api(
+                if cache is not None:
+                    hit = cache.get(fp)
+                    if hit is not None and isinstance(hit.response, dict) and hit.response.get("text"):
+                        df.at[idx, "ST1_정제상품명"] = hit.response["text"]
+                        df.at[idx, "ST1_판매형태"] = sale_type
+                        self.append_log(f"[CACHE] 행 {idx}: 응답 캐시 사용 → {hit.response['text']}")
+                        done_count += 1
+                        cached_rows += 1
+                        continue
+                fingerprints[idx] = fp
+
+                tasks.append((idx, category, sale_type, raw_name, prompt_text))
+
+            if resumed_rows:
+                self.append_log(f"[RESUME] 이전 중간 저장(저널)에서 {resumed_rows}행 결과 복구 (API 재호출 안 함)")
+            if cached_rows:
+                self.append_log(f"[CACHE] 응답 캐시에서 {cached_rows}행 결과 사용 (API 재호출 안 함)")
+            self.append_log(f"[INFO] API 호출 대상: {len(tasks)}행")
+            processed_rows_total = done_count
+            self.set_progress(done_count, total_rows if total_rows > 0 else 1)
+            self._update_eta(done_count, total_rows, start_dt, start_time_monotonic)
+
+            # 2) API 호출: 제한된 워커 풀 + RPM/TPM 토큰 버킷 + 429/5xx 재시도
+            limiter = RateLimiter(DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE)
+
+            def run_task(task):
+                idx, category, sale_type, raw_name, prompt_text = task
+                est_tokens = estimate_tokens(prompt_text)
+
+                def on_retry(attempt, delay, err):
+                    self.append_log(f"[RETRY] 행 {idx}: {attempt}회차 재시도 ({delay:.1f}초 후) - {err}")
+
+                result = call_with_retry(
+                    lambda: call_stage1_api(
                         category=category,
                         sale_type=sale_type,
                         raw_name=raw_name,
                         model_name=model_name,
                         reasoning_effort=reasoning_effort,
-                    )
-                    total_in_tok += in_tok
-                    total_out_tok += out_tok
-                    total_reasoning_tok += r_tok
-
-                    df.at[idx, "ST1_정제상품명"] = refined
-                    df.at[idx, "ST1_판매형태"] = sale_type
-
-                    success_rows += 1
-
-                    self.append_log(f"[OK] 행 {idx} 완료")
-                    self.append_log(f"     정제상품명: {refined}")
-                    self.append_log(f"     tokens in/out/reason = {in_tok}/{out_tok}/{r_tok}")
-
-                    if r_summary:
-                        self.append_log("     [Reasoning Summary]")
-                        self.append_log("     " + r_summary.replace("\n", "\n     "))
-
-                except Exception as e:
-                    fail_rows += 1
-                    self.append_log(f"[ERROR] 행 {idx} 처리 중 예외 발생: {e}")
+                        prompt_text=prompt_text,
+                    ),
+                    max_retries=MAX_API_RETRIES,
+                    should_stop=lambda: STOP_REQUESTED,
+                    on_retry=on_retry,
+                    limiter=limiter,
+                    tokens=est_tokens,
+                )
+                limiter.settle(est_tokens, result[1] + result[2])
+                return result
+
+            # 완료 순서와 상관없이 결과는 원래 행 순서대로 반영 (순서 맞추기 버퍼)
+            finished: Dict[int, Any] = {}
+            next_pos = 0
+            in_flight = {}
+            submit_pos = 0
+            max_in_flight = max_workers * 2
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                while True:
+                    # 새 작업 투입 (중지 요청 시 더 이상 투입하지 않음)
+                    while not STOP_REQUESTED and submit_pos < len(tasks) and len(in_flight) < max_in_flight:
+                        fut = executor.submit(run_task, tasks[submit_pos])
+                        in_flight[fut] = submit_pos
+                        submit_pos += 1
+                        api_rows += 1
+
+                    if not in_flight:
+                        break
+
+                    done, _ = wait(list(in_flight.keys()), return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        pos = in_flight.pop(fut)
+                        try:
+                            finished[pos] = (True, fut.result())
+                        except Exception as e:
+                            finished[pos] = (False, e)
+
+                    # 앞에서부터 연속으로 끝난 결과만 순서대로 반영
+                    while next_pos in finished:
+                        ok, payload = finished.pop(next_pos)
+                        idx, category, sale_type, raw_name, _ = tasks[next_pos]
+                        next_pos += 1
+
+                        if ok:
+                            refined, in_tok, out_tok, r_tok, r_summary = payload
+                            total_in_tok += in_tok
+                            total_out_tok += out_tok
+                            total_reasoning_tok += r_tok
+
+                            df.at[idx, "ST1_정제상품명"] = refined
+                            df.at[idx, "ST1_판매형태"] = sale_type
+                            journal.append({
+                                "idx": idx,
+                                "raw_name": raw_name,
+                                "model": model_name,
+                                "fingerprint": fingerprints[idx],
+                                "refined": refined,
+                                "in_tok": in_tok,
+                                "out_tok": out_tok,
+                                "reasoning_tok": r_tok,
+                            })
+                            if cache is not None and refined and not refined.startswith("[INCOMPLETE"):
+                                row_cost = compute_cost_usd(model_name, in_tok, out_tok)
+                                try:
+                                    cache.put(
+                                        fingerprints[idx], {"text": refined},
+                                        stage=RESPONSE_CACHE_STAGE, model=model_name,
+                                        input_tokens=in_tok, output_tokens=out_tok, reasoning_tokens=r_tok,
+                                        cost_usd=row_cost[2] if row_cost else None,
+                                    )
+                                except Exception as e:
+                                    self.append_log(f"[WARN] 응답 캐시 저장 실패: {e}")
+
+                            success_rows += 1
+                            self.append_log(f"[OK] 행 {idx} 완료 (원본상품명: {raw_name})")
+                            self.append_log(f"     정제상품명: {refined}")
+                            self.append_log(f"     tokens in/out/reason = {in_tok}/{out_tok}/{r_tok}")
+
+                            if r_summary:
+                                self.append_log("     [Reasoning Summary]")
+                                self.append_log("     " + r_summary.replace("\n", "\n     "))
+                        else:
+                            fail_rows += 1
+                            self.append_log(f"[ERROR] 행 {idx} 처리 중 예외 발생: {payload}")
 
-                # 진행률 업데이트
-                self.set_progress(idx + 1, total_rows)
+                        done_count += 1
+                        processed_rows_total = done_count
+                        self.set_progress(done_count, total_rows)
+                        self._update_eta(done_count, total_rows, start_dt, start_time_monotonic)
 
-                # ETA 계산 및 완료 예상 시각 업데이트
-                try:
-                    processed = idx + 1
-                    if processed > 0 and total_rows > 0:
-                        elapsed = time.time() - start_time_monotonic
-                        per_row = elapsed / processed
-                        remaining = max(total_rows - processed, 0)
-                        eta_seconds = max(per_row * remaining, 0)
-
-                        eta_min = int(eta_seconds // 60)
-                        eta_sec = int(round(eta_seconds % 60))
-
-                        if remaining == 0:
-                            eta_text = "남은 예상 시간: 거의 완료"
-                        else:
-                            if eta_min > 0:
-                                eta_text = f"남은 예상 시간: 약 {eta_min}분 {eta_sec}초"
-                            else:
-                                eta_text = f"남은 예상 시간: 약 {eta_sec}초"
-                        self.set_eta(eta_text)
-
-                        expected_end_dt = start_dt + timedelta(
-                            seconds=elapsed + eta_seconds
-                        )
-                        self.set_finish_time(expected_end_dt)
-                except Exception:
-                    # ETA 계산 실패해도 전체 작업에는 영향 없음
-                    pass
-
-                # 중간 저장
-                if (idx + 1) % save_every == 0:
-                    out_path_tmp = os.path.join(base_dir, f"{base_name}_stage1_중간저장.xlsx")
-                    try:
-                        df.to_excel(out_path_tmp, index=False)
-                        self.append_log(f"[SAVE] {idx+1}행까지 중간 저장: {out_path_tmp}")
-                    except Exception as e:
-                        self.append_log(f"[WARN] 중간 저장 실패: {e}")
+            journal.close()
+            if STOP_REQUESTED and submit_pos < len(tasks):
+                self.append_log("[INFO] 중지 플래그 감지, 진행 중이던 호출까지만 반영하고 종료.")
+                stopped_by_user = True
 
             # 최종 저장 (T0 → T1로 버전 업)
             # 입력 파일명에서 버전 정보 추출 (괄호 포함 가능, 예: _I5(업완))
@@ -1277,6 +1390,9 @@ class Stage1GUI(tk.Tk):
             try:
                 df.to_excel(out_path, index=False)
                 self.append_log(f"[DONE] 최종 엑셀 저장 완료: {out_path}")
+                # 끝까지 처리했으면 저널 삭제 (중단된 경우 다음 실행에서 이어서 사용)
+                if not stopped_by_user:
+                    journal.remove()
                 self.append_log(
                     f"[USAGE] total tokens in/out/reason = "
                     f"{total_in_tok}/{total_out_tok}/{total_reasoning_tok}"
@@ -23,15 +23,19 @@ Stage1 상품명 정제용 맵핑 파일 생성 도구 (대화방용)
 """
 
 import os
-import io
+import sys
 import json
 import pprint
+import hashlib
 import threading
 import importlib.util
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from datetime import datetime
 from typing import Callable, Tuple, Any
 import re
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 from PIL import Image
 
@@ -39,6 +43,12 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from tkinter.scrolledtext import ScrolledText
 
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet, write_sheet
+
 # =========================================================
 # [런처 연동] JobManager & 유틸 (표준화됨)
 # =========================================================
@@ -141,7 +151,7 @@ def safe_save_excel(df, path):
     """파일이 열려있어 저장이 안 될 때 재시도를 유도하는 함수"""
     while True:
         try:
-            df.to_excel(path, index=False)
+            write_sheet(df, path)
             return True
         except PermissionError:
             if not messagebox.askretrycancel("저장 실패", f"엑셀 파일이 열려있습니다!\n[{os.path.basename(path)}]\n\n파일을 닫고 '다시 시도'를 눌러주세요."):
@@ -160,6 +170,15 @@ BG_MAIN = "#f4f4f7"
 THUMB_SIZE = 1000
 THUMB_COL_NAME = "썸네일경로"
 
+# 썸네일 병렬 처리 설정
+DOWNLOAD_WORKERS = 16                               # 동시 다운로드 수 (HTTP 커넥션 풀 크기)
+RESIZE_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # 1000px 리사이즈 프로세스 수
+# 원본 이미지 다운로드 캐시 (내용 해시 기준 저장 → 도매처 양식을 바꿔 다시 돌려도 재다운로드 없음)
+DOWNLOAD_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".thumb_download_cache")
+# 다운로드 캐시 정리 기준 (썸네일 맵핑 시작 시): 오래 안 쓴 파일 삭제 + 용량 상한 초과 시 오래 안 쓴 순서로 삭제
+DOWNLOAD_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2GB
+DOWNLOAD_CACHE_MAX_AGE_DAYS = 30
+
 # Stage1 프롬프트 정의/유틸
 try:
     from prompts_stage1 import safe_str, build_stage1_prompt  # type: ignore
@@ -442,7 +461,7 @@ def _read_with_preset(
     data_idx = data_row_1based - 1      # 실제 데이터 시작 행(0-based, 원본 기준)
 
     log(f"[INFO] 헤더행={header_row_1based}행, 데이터 시작={data_row_1based}행 기준으로 읽기")
-    df_raw = pd.read_excel(excel_path, header=header_idx, dtype=str)
+    df_raw = read_sheet(excel_path, header=header_idx, dtype=str)
 
     skip_data_rows = max(0, data_idx - (header_idx + 1))
     if skip_data_rows > 0:
@@ -603,6 +622,121 @@ def extract_first_url(url_field: Any) -> str:
     return s
 
 
+_http_local = threading.local()
+
+
+def get_http_session() -> requests.Session:
+    """스레드별 requests.Session (keep-alive 커넥션 재사용)"""
+    session = getattr(_http_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=DOWNLOAD_WORKERS, pool_maxsize=DOWNLOAD_WORKERS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _http_local.session = session
+    return session
+
+
+def _cache_url_index_path(url: str, cache_dir: str) -> str:
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "urls", digest[:2], digest)
+
+
+def _cache_blob_path(content_hash: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, "blobs", content_hash[:2], content_hash)
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def fetch_image_cached(url: str, cache_dir: str = DOWNLOAD_CACHE_DIR) -> Tuple[str, str]:
+    """
+    URL 이미지를 다운로드 캐시에서 찾거나 받아서 저장하고 (캐시 파일 경로, 상태)를 반환.
+    - 캐시 구조: urls/<URL sha1> → 내용 sha256, blobs/<내용 sha256> → 원본 바이트
+      (같은 이미지가 다른 URL로 와도 한 번만 저장)
+    - 상태: "cache" (캐시 적중) / "download" (새로 받음)
+    - 실패 시 예외 발생
+    """
+    index_path = _cache_url_index_path(url, cache_dir)
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                content_hash = f.read().strip()
+            blob_path = _cache_blob_path(content_hash, cache_dir)
+            if content_hash and os.path.exists(blob_path):
+                # 최근 사용 표시 (prune_download_cache 가 오래 안 쓴 것부터 삭제)
+                os.utime(index_path)
+                os.utime(blob_path)
+                return blob_path, "cache"
+        except OSError:
+            pass
+
+    resp = get_http_session().get(url, timeout=20)
+    if resp.status_code != 200:
+        raise RuntimeError(f"이미지 다운로드 실패 ({resp.status_code}): {url}")
+    data = resp.content
+
+    content_hash = hashlib.sha256(data).hexdigest()
+    blob_path = _cache_blob_path(content_hash, cache_dir)
+    if not os.path.exists(blob_path):
+        _atomic_write(blob_path, data)
+    _atomic_write(index_path, content_hash.encode("utf-8"))
+    return blob_path, "download"
+
+
+def prune_download_cache(
+    cache_dir: str = DOWNLOAD_CACHE_DIR,
+    max_bytes: int = DOWNLOAD_CACHE_MAX_BYTES,
+    max_age_days: float = DOWNLOAD_CACHE_MAX_AGE_DAYS,
+) -> int:
+    """
+    다운로드 캐시 정리 (캐시 적중 시 수정시각을 갱신하므로 수정시각 = 마지막 사용 시각)
+    - max_age_days 동안 안 쓴 파일 삭제 (urls 인덱스 / blobs 모두)
+    - 남은 blobs 합계가 max_bytes 를 넘으면 오래 안 쓴 blob 부터 삭제
+      (인덱스가 가리키는 blob 이 없으면 fetch_image_cached 가 다시 받음)
+    반환: 삭제한 파일 수
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    cutoff = datetime.now().timestamp() - max_age_days * 86400
+    removed = 0
+    blobs = []
+    total = 0
+    for root, _dirs, names in os.walk(cache_dir):
+        is_blob_dir = os.path.relpath(root, cache_dir).split(os.sep)[0] == "blobs"
+        for name in names:
+            fp = os.path.join(root, name)
+            try:
+                st = os.stat(fp)
+                if st.st_mtime < cutoff or name.endswith(".tmp"):
+                    os.remove(fp)
+                    removed += 1
+                    continue
+            except OSError:
+                continue
+            if is_blob_dir:
+                blobs.append((st.st_mtime, st.st_size, fp))
+                total += st.st_size
+
+    if total > max_bytes:
+        blobs.sort()
+        for _mtime, size, fp in blobs:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(fp)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
 def make_square_thumbnail(img: Image.Image, size: int = THUMB_SIZE) -> Image.Image:
     """이미지를 비율 유지하면서 흰 배경 정사각형 썸네일로 변환."""
     img = img.convert("RGB")
@@ -641,19 +775,115 @@ def download_and_build_thumbnail(
     out_path = os.path.join(out_dir, filename)
 
     try:
-        resp = requests.get(url, timeout=20)
-        if resp.status_code != 200:
-            log(f"[WARN] 이미지 다운로드 실패 ({resp.status_code}): {url}")
-            return ""
-        img = Image.open(io.BytesIO(resp.content))
-        thumb = make_square_thumbnail(img, THUMB_SIZE)
-        thumb.save(out_path, "JPEG", quality=90, optimize=True)
-        return out_path
+        src_path, _ = fetch_image_cached(url)
+    except Exception as e:
+        log(f"[WARN] {e}")
+        return ""
+
+    try:
+        return render_thumbnail_file(src_path, out_path, THUMB_SIZE)
     except Exception as e:
         log(f"[WARN] 썸네일 생성 실패 ({base_name}): {e}")
         return ""
 
 
+def render_thumbnail_file(src_path: str, out_path: str, size: int = THUMB_SIZE) -> str:
+    """
+    원본 이미지 파일 → 정사각형 JPG 썸네일 저장 (프로세스 풀 워커에서도 사용)
+    임시 파일에 쓴 뒤 교체 → 같은 경로를 동시에 쓰거나 중간에 끊겨도 깨진 JPG 가 남지 않음
+    """
+    with Image.open(src_path) as img:
+        thumb = make_square_thumbnail(img, size)
+    tmp_path = f"{out_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        thumb.save(tmp_path, "JPEG", quality=90, optimize=True)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return out_path
+
+
+def build_thumbnails_parallel(
+    jobs: list[tuple[Any, str, str]],
+    out_dir: str,
+    log: LogFunc,
+    progress_cb: Callable[[int, int], None] | None = None,
+) -> dict[Any, str]:
+    """
+    여러 썸네일을 병렬로 생성.
+    - jobs: [(키, URL, 파일 기본이름)] → 반환: {키: 썸네일 경로 (실패 시 "")}
+    - 다운로드: 스레드 풀 + 커넥션 풀 세션 + 다운로드 캐시
+    - 1000px 리사이즈: 프로세스 풀 (다운로드가 끝나는 대로 바로 투입)
+    - 출력 파일명이 같은 작업(같은 판매자코드 / safe_filename 후 같은 이름)은 한 번만 생성하고
+      결과를 해당 키 모두에 반영 (기존 순차 처리처럼 마지막 행의 URL 사용)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    results: dict[Any, str] = {key: "" for key, _, _ in jobs}
+    total = len(jobs)
+    done_count = 0
+    cache_hits = 0
+
+    try:
+        pruned = prune_download_cache()
+        if pruned:
+            log(f"[INFO] 다운로드 캐시 정리: {pruned}개 파일 삭제")
+    except OSError as e:
+        log(f"[WARN] 다운로드 캐시 정리 실패: {e}")
+
+    # 출력 경로 기준으로 작업 묶기 {경로: (URL, 파일 기본이름, [키...])}
+    by_out: dict[str, tuple[str, str, list]] = {}
+    for key, url, base_name in jobs:
+        out_path = os.path.join(out_dir, f"{safe_filename(base_name)}_01.jpg")
+        norm = os.path.normcase(out_path)
+        keys = by_out[norm][2] if norm in by_out else []
+        keys.append(key)
+        by_out[norm] = (url, base_name, keys)
+    if len(by_out) < total:
+        log(f"[INFO] 같은 썸네일 파일명 {total - len(by_out)}건은 한 번만 생성 (마지막 행 이미지 사용)")
+
+    def finish(keys: list) -> None:
+        nonlocal done_count
+        done_count += len(keys)
+        if progress_cb:
+            progress_cb(done_count, total)
+
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as dl_pool, \
+            ProcessPoolExecutor(max_workers=RESIZE_WORKERS) as resize_pool:
+        dl_futures = {
+            dl_pool.submit(fetch_image_cached, url): norm
+            for norm, (url, _base_name, _keys) in by_out.items()
+        }
+        resize_futures = {}
+
+        for fut in as_completed(dl_futures):
+            norm = dl_futures[fut]
+            _url, base_name, keys = by_out[norm]
+            try:
+                src_path, status = fut.result()
+            except Exception as e:
+                log(f"[WARN] {e}" if isinstance(e, RuntimeError) else f"[WARN] 이미지 다운로드 실패 ({base_name}): {e}")
+                finish(keys)
+                continue
+            if status == "cache":
+                cache_hits += 1
+            out_path = os.path.join(out_dir, f"{safe_filename(base_name)}_01.jpg")
+            resize_futures[resize_pool.submit(render_thumbnail_file, src_path, out_path, THUMB_SIZE)] = norm
+
+        for fut in as_completed(resize_futures):
+            _url, base_name, keys = by_out[resize_futures[fut]]
+            try:
+                thumb_path = fut.result()
+                for key in keys:
+                    results[key] = thumb_path
+            except Exception as e:
+                log(f"[WARN] 썸네일 생성 실패 ({base_name}): {e}")
+            finish(keys)
+
+    log(f"[INFO] 썸네일 {total}건 처리 (파일 {len(by_out)}개, 다운로드 캐시 재사용 {cache_hits}건)")
+    return results
+
+
 # =========================================================
 #  GUI: 도매처 양식 추가/수정 다이얼로그
 # =========================================================
@@ -1431,7 +1661,7 @@ class Stage1MappingApp:
 
         def worker():
             try:
-                df = pd.read_excel(excel_path, dtype=str)
+                df = read_sheet(excel_path, dtype=str)
                 total = len(df.index)
 
                 if "이미지대" not in df.columns:
@@ -1464,28 +1694,33 @@ class Stage1MappingApp:
                     ),
                 )
 
-                for i, (idx, row) in enumerate(df.iterrows(), start=1):
+                # 대상 행 수집 (URL/코드가 없는 행은 빈 경로)
+                jobs = []
+                for idx, row in df.iterrows():
                     seller_code = safe_str(
                         row.get("판매자관리코드1", "") or row.get("상품코드", "")
                     )
                     url_field = row.get("이미지대", "")
                     url = extract_first_url(url_field)
-
-                    thumb_path = ""
+                    df.at[idx, THUMB_COL_NAME] = ""
                     if url and seller_code:
-                        thumb_path = download_and_build_thumbnail(
-                            url=url,
-                            out_dir=img_dir,
-                            base_name=seller_code,
-                            log=lambda m: self.root.after(0, lambda: self.append_log(m)),
-                        )
+                        jobs.append((idx, url, seller_code))
 
-                    df.at[idx, THUMB_COL_NAME] = thumb_path
+                skipped = total - len(jobs)
 
-                    # 진행 표시
-                    def update_progress(i=i, total=total):
-                        self.set_progress(i, total)
-                    self.root.after(0, update_progress)
+                # 진행 표시 (URL 없는 행은 처리 완료로 계산)
+                def update_progress(done, _tot, total=total, skipped=skipped):
+                    self.root.after(0, lambda: self.set_progress(skipped + done, total))
+
+                thumb_paths = build_thumbnails_parallel(
+                    jobs,
+                    out_dir=img_dir,
+                    log=lambda m: self.root.after(0, lambda m=m: self.append_log(m)),
+                    progress_cb=update_progress,
+                )
+                for idx, thumb_path in thumb_paths.items():
+                    df.at[idx, THUMB_COL_NAME] = thumb_path
+                self.root.after(0, lambda: self.set_progress(total, max(total, 1)))
 
 
                 
@@ -1605,6 +1840,8 @@ class Stage1MappingApp:
 #  실행
 # =========================================================
 def main() -> None:
+    # 썸네일 리사이즈 프로세스 풀 사용 (Windows exe 빌드 시 필요)
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = Stage1MappingApp(root)
     root.mainloop()
@@ -0,0 +1,328 @@
+# stage1_parallel.py
+"""
+Stage1 건별(동기) 실행 병렬화 유틸
+- RateLimiter      : 분당 요청 수(RPM) + 분당 토큰 수(TPM) 토큰 버킷
+- call_with_retry  : 429 / 5xx / 연결 오류 시 지수 백오프 + 지터로 재시도 (재시도도 매번 RateLimiter 통과)
+- ResultJournal    : 중간 저장용 JSONL 저널 (엑셀 전체를 다시 쓰지 않고 한 줄씩 추가)
+- MockOpenAIClient : 로컬 모의 Responses API (처리량 테스트용, 실제 과금 없음)
+
+처리량 테스트:
+    python stage1_parallel.py --rows 2000 --workers 8 --rpm 3000 --tpm 2000000
+"""
+import os
+import json
+import time
+import random
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+# 재시도 대상 HTTP 상태 코드
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+# =========================
+# 토큰 버킷 (RPM / TPM)
+# =========================
+
+class RateLimiter:
+    """
+    분당 요청 수 / 분당 토큰 수 두 개의 토큰 버킷.
+    - acquire(tokens): 두 버킷 모두 여유가 생길 때까지 대기 후 차감
+    - settle(estimated, actual): 실제 사용량이 나오면 추정치와의 차이를 보정
+    - 값이 0 이하이면 해당 제한은 사용하지 않음
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.rpm = max(0, int(requests_per_minute or 0))
+        self.tpm = max(0, int(tokens_per_minute or 0))
+        self._req_level = float(self.rpm)
+        self._tok_level = float(self.tpm)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        if self.rpm:
+            self._req_level = min(self.rpm, self._req_level + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._tok_level = min(self.tpm, self._tok_level + elapsed * self.tpm / 60.0)
+
+    def acquire(self, tokens: int = 0, should_stop: Optional[Callable[[], bool]] = None) -> bool:
+        """여유가 생길 때까지 대기. 대기 중 중지 요청이 오면 False"""
+        # 한 요청이 버킷 전체보다 크면 영원히 못 들어가므로 상한으로 자름
+        tokens = min(int(tokens or 0), self.tpm) if self.tpm else 0
+        while True:
+            with self._lock:
+                self._refill()
+                req_ok = (not self.rpm) or self._req_level >= 1.0
+                tok_ok = (not self.tpm) or self._tok_level >= tokens
+                if req_ok and tok_ok:
+                    if self.rpm:
+                        self._req_level -= 1.0
+                    if self.tpm:
+                        self._tok_level -= tokens
+                    return True
+
+                wait = 0.05
+                if self.rpm and not req_ok:
+                    wait = max(wait, (1.0 - self._req_level) * 60.0 / self.rpm)
+                if self.tpm and not tok_ok:
+                    wait = max(wait, (tokens - self._tok_level) * 60.0 / self.tpm)
+            if should_stop is not None and should_stop():
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """추정 토큰과 실제 토큰 차이만큼 버킷 보정 (음수 허용 = 다음 요청들이 대기)"""
+        if not self.tpm:
+            return
+        with self._lock:
+            self._refill()
+            self._tok_level = min(self.tpm, self._tok_level + (estimated_tokens - actual_tokens))
+
+
+def estimate_tokens(prompt_text: str, max_output_tokens: int = 300) -> int:
+    """
+    TPM 제한용 대략적인 토큰 추정.
+    한글 위주 프롬프트는 1토큰 ≈ 1~2자 → 보수적으로 글자수/2 + 출력 여유분.
+    """
+    return len(prompt_text or "") // 2 + max_output_tokens
+
+
+# =========================
+# 재시도
+# =========================
+
+def get_status_code(exc: Exception) -> Optional[int]:
+    """OpenAI SDK 예외 등에서 HTTP 상태 코드 추출"""
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        resp = getattr(exc, "response", None)
+        code = getattr(resp, "status_code", None)
+    try:
+        return int(code) if code is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    """429/5xx, 타임아웃/연결 오류면 True"""
+    code = get_status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    name = type(exc).__name__
+    return name in ("APIConnectionError", "APITimeoutError", "RateLimitError",
+                    "InternalServerError", "Timeout", "ConnectionError")
+
+
+def call_with_retry(
+    fn: Callable[[], Any],
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_retry: Optional[Callable[[int, float, Exception], None]] = None,
+    limiter: Optional[RateLimiter] = None,
+    tokens: int = 0,
+) -> Any:
+    """
+    fn()을 호출하고, 재시도 대상 오류면 지수 백오프(full jitter)로 최대 max_retries번 재시도.
+    재시도 불가 오류 / 재시도 소진 / 중지 요청 시 마지막 예외를 그대로 올림.
+    limiter 를 주면 첫 호출과 재시도 모두 호출 직전에 limiter.acquire(tokens) 를 거침
+    (429 연속 발생 시에도 RPM/TPM 제한을 넘지 않음). 대기 중 중지 요청이면 RuntimeError.
+    """
+    attempt = 0
+    while True:
+        if limiter is not None and not limiter.acquire(tokens, should_stop=should_stop):
+            raise RuntimeError("중지 요청으로 호출하지 않음")
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable_error(e):
+                raise
+            if should_stop is not None and should_stop():
+                raise
+            attempt += 1
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            if on_retry is not None:
+                on_retry(attempt, delay, e)
+            time.sleep(delay)
+
+
+# =========================
+# 중간 저장 저널
+# =========================
+
+class ResultJournal:
+    """
+    행 단위 결과를 JSONL로 추가 기록하는 중간 저장 파일.
+    - append(): 한 줄 추가 (flush_every 줄마다 디스크 동기화)
+    - load(): 이전 실행에서 남은 결과 {idx: record} 읽기 (깨진 마지막 줄은 무시)
+    - remove(): 최종 엑셀 저장이 끝나면 삭제
+    """
+
+    def __init__(self, path: str, flush_every: int = 50):
+        self.path = path
+        self.flush_every = max(1, int(flush_every or 1))
+        self._fp = None
+        self._pending = 0
+
+    def load(self) -> Dict[int, Dict[str, Any]]:
+        records: Dict[int, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                    records[int(rec["idx"])] = rec
+                except Exception:
+                    continue
+        return records
+
+    def append(self, record: Dict[str, Any]) -> None:
+        if self._fp is None:
+            self._fp = open(self.path, "a", encoding="utf-8")
+        self._fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._fp is None:
+            return
+        self._fp.flush()
+        try:
+            os.fsync(self._fp.fileno())
+        except OSError:
+            pass
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._fp is not None:
+            self.flush()
+            self._fp.close()
+            self._fp = None
+
+    def remove(self) -> None:
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+# =========================
+# 모의 Responses API (처리량 테스트용)
+# =========================
+
+class MockAPIError(Exception):
+    """모의 API 오류 (status_code 속성으로 429/5xx 흉내)"""
+
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(message or f"mock error {status_code}")
+        self.status_code = status_code
+
+
+class _MockResponses:
+    def __init__(self, latency: float, error_rate: float):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs) -> Any:
+        with self._lock:
+            self.calls += 1
+        time.sleep(random.uniform(self.latency * 0.5, self.latency * 1.5))
+        if self.error_rate and random.random() < self.error_rate:
+            raise MockAPIError(random.choice([429, 500, 503]))
+
+        prompt = ""
+        for msg in kwargs.get("input") or []:
+            prompt += str(msg.get("content", ""))
+        text = "모의 정제 상품명 " + str(abs(hash(prompt)) % 100000)
+        return SimpleNamespace(
+            status="completed",
+            output=[SimpleNamespace(type="message", content=[SimpleNamespace(text=text)])],
+            output_text=text,
+            usage=SimpleNamespace(
+                input_tokens=len(prompt) // 2,
+                output_tokens=20,
+                output_tokens_details=SimpleNamespace(reasoning_tokens=0),
+            ),
+        )
+
+
+class MockOpenAIClient:
+    """
+    client.responses.create(...)만 흉내 내는 로컬 모의 클라이언트.
+    환경변수 STAGE1_MOCK_API=1 이면 runner가 실제 OpenAI 대신 이 클라이언트를 사용.
+    - STAGE1_MOCK_LATENCY : 평균 응답 지연(초, 기본 0.8)
+    - STAGE1_MOCK_ERROR_RATE : 429/5xx 발생 확률 (기본 0.02)
+    """
+
+    def __init__(self, latency: Optional[float] = None, error_rate: Optional[float] = None):
+        if latency is None:
+            latency = float(os.environ.get("STAGE1_MOCK_LATENCY", "0.8"))
+        if error_rate is None:
+            error_rate = float(os.environ.get("STAGE1_MOCK_ERROR_RATE", "0.02"))
+        self.responses = _MockResponses(latency, error_rate)
+
+
+def mock_api_enabled() -> bool:
+    return os.environ.get("STAGE1_MOCK_API", "").strip() in ("1", "true", "yes")
+
+
+# =========================
+# 처리량 측정 (모의 API)
+# =========================
+
+def _run_throughput_benchmark(rows: int, workers: int, rpm: int, tpm: int,
+                              latency: float, error_rate: float) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    client = MockOpenAIClient(latency=latency, error_rate=error_rate)
+    limiter = RateLimiter(rpm, tpm)
+    prompt = "가" * 1500
+
+    def one(i: int) -> int:
+        est = estimate_tokens(prompt)
+        resp = call_with_retry(
+            lambda: client.responses.create(model="mock", input=[{"role": "user", "content": prompt + str(i)}]),
+            base_delay=0.2,
+            limiter=limiter,
+            tokens=est,
+        )
+        actual = resp.usage.input_tokens + resp.usage.output_tokens
+        limiter.settle(est, actual)
+        return i
+
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(one, range(rows)))
+    elapsed = time.time() - t0
+    assert results == list(range(rows))
+    print(f"rows={rows} workers={workers} rpm={rpm} tpm={tpm} latency={latency}s error_rate={error_rate}")
+    print(f"elapsed={elapsed:.1f}s  throughput={rows / elapsed:.1f} rows/s  "
+          f"api_calls={client.responses.calls} (재시도 포함)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stage1 병렬 실행 처리량 측정 (모의 Responses API)")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=3000)
+    parser.add_argument("--tpm", type=int, default=2_000_000)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+    _run_throughput_benchmark(args.rows, args.workers, args.rpm, args.tpm, args.latency, args.error_rate)
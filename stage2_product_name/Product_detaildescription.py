@@ -13,6 +13,7 @@ Product_detaildescription.py
 
 import os
 import re
+import sys
 import time
 import math
 import threading
@@ -20,7 +21,10 @@ import traceback
 import requests
 from io import BytesIO
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from html.parser import HTMLParser
 from urllib.parse import quote, unquote
 import pandas as pd
 from bs4 import BeautifulSoup
@@ -189,6 +193,7 @@ def add_blocked_keyword(keyword: str) -> bool:
     if keyword not in keywords:
         keywords.append(keyword)
         save_blocked_keywords(keywords)
+        BLOCKED_MATCHER.invalidate()
         return True
     return False
 
@@ -198,10 +203,11 @@ def remove_blocked_keyword(keyword: str):
     if keyword in keywords:
         keywords.remove(keyword)
         save_blocked_keywords(keywords)
+        BLOCKED_MATCHER.invalidate()
 
 def get_noise_url_keywords() -> list:
     """현재 사용할 금지 키워드 리스트 반환"""
-    return load_blocked_keywords()
+    return BLOCKED_MATCHER.keywords()
 
 def load_blocked_urls() -> list:
     """저장된 금지 URL 리스트를 로드"""
@@ -232,6 +238,7 @@ def add_blocked_url(url: str) -> bool:
     if url not in urls:
         urls.append(url)
         save_blocked_urls(urls)
+        BLOCKED_MATCHER.invalidate()
         return True
     return False
 
@@ -241,14 +248,110 @@ def remove_blocked_url(url: str):
     if url in urls:
         urls.remove(url)
         save_blocked_urls(urls)
+        BLOCKED_MATCHER.invalidate()
+
+def _file_signature(path: str):
+    """파일 (수정시각, 크기) - 없으면 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class BlockedImageMatcher:
+    """
+    금지 키워드 / 금지 URL 매처
+    - 두 JSON 파일은 처음 한 번만 읽고, 파일 수정시각/크기가 바뀌었을 때만 다시 읽음
+    - 키워드는 소문자/URL 인코딩 형태를 미리 만들어 두고 하나의 정규식으로 검사
+    - 금지 URL은 완전 일치 set + 부분 일치용 정규식 하나로 검사
+    """
+
+    def __init__(self, urls_file: str, keywords_file: str):
+        self.urls_file = urls_file
+        self.keywords_file = keywords_file
+        self._lock = threading.Lock()
+        self._urls_sig = False      # False: 아직 로드 안 함
+        self._keywords_sig = False
+        self._keywords = []
+        self._keyword_raw_re = None      # 소문자 URL / URL 디코딩 결과에서 찾을 키워드
+        self._keyword_encoded_re = None  # 소문자 URL에서 찾을 키워드 (원본 + URL 인코딩 형태)
+        self._keyword_match_all = False  # 빈 키워드가 있으면 모든 URL이 걸림 (기존 'in' 동작과 동일)
+        self._blocked_set = frozenset()
+        self._blocked_re = None
+        self._blocked_match_all = False
+
+    @staticmethod
+    def _alternation(items):
+        items = sorted(set(items), key=len, reverse=True)
+        return re.compile("|".join(re.escape(x) for x in items)) if items else None
+
+    def _refresh(self):
+        keywords_sig = _file_signature(self.keywords_file)
+        urls_sig = _file_signature(self.urls_file)
+        if keywords_sig == self._keywords_sig and urls_sig == self._urls_sig:
+            return
+        with self._lock:
+            if keywords_sig != self._keywords_sig:
+                keywords = [str(k) for k in load_blocked_keywords()]
+                lowered = [k.lower() for k in keywords]
+                encoded = []
+                for k in keywords:
+                    try:
+                        encoded.append(quote(k, safe='').lower())
+                    except Exception:
+                        pass
+                self._keywords = keywords
+                self._keyword_match_all = "" in lowered
+                self._keyword_raw_re = self._alternation(lowered)
+                self._keyword_encoded_re = self._alternation(lowered + encoded)
+                # 기본값 파일이 새로 만들어졌을 수 있으므로 로드 후 다시 확인
+                self._keywords_sig = _file_signature(self.keywords_file)
+            if urls_sig != self._urls_sig:
+                urls = [str(u) for u in load_blocked_urls()]
+                self._blocked_set = frozenset(urls)
+                self._blocked_match_all = "" in self._blocked_set
+                self._blocked_re = self._alternation(urls)
+                self._urls_sig = urls_sig
+
+    def invalidate(self):
+        """다음 검사 때 두 파일을 다시 읽도록 표시"""
+        with self._lock:
+            self._urls_sig = False
+            self._keywords_sig = False
+
+    def keywords(self) -> list:
+        self._refresh()
+        return list(self._keywords)
+
+    def is_noise_url(self, src: str) -> bool:
+        """광고/공지 등 금지 키워드가 URL(원본/디코딩/URL 인코딩 키워드)에 포함되어 있는지"""
+        self._refresh()
+        if self._keyword_match_all:
+            return True
+        if self._keyword_encoded_re is None:
+            return False
+        src_lower = src.lower()
+        if self._keyword_encoded_re.search(src_lower):
+            return True
+        # URL 인코딩된 형태도 체크 (한글 키워드 대응)
+        src_decoded = unquote(src_lower)
+        return src_decoded != src_lower and self._keyword_raw_re.search(src_decoded) is not None
+
+    def is_blocked_url(self, img_url: str) -> bool:
+        """사용자가 추가한 금지 URL이 포함되어 있는지"""
+        self._refresh()
+        if self._blocked_match_all or img_url in self._blocked_set:
+            return True
+        return self._blocked_re is not None and self._blocked_re.search(img_url) is not None
+
+
+BLOCKED_MATCHER = BlockedImageMatcher(BLOCKED_URLS_FILE, BLOCKED_KEYWORDS_FILE)
+
 
 def is_blocked_url(img_url: str) -> bool:
     """이미지 URL이 금지 목록에 있는지 확인"""
-    blocked_urls = load_blocked_urls()
-    for blocked in blocked_urls:
-        if blocked in img_url:
-            return True
-    return False
+    return BLOCKED_MATCHER.is_blocked_url(img_url)
 
 # 엑셀 컬럼명 후보
 COL_PRODUCT_CODE = [
@@ -269,6 +372,15 @@ MAX_HEIGHT_2 = 8000  # 이하면 2장, 초과면 3장
 # 전체 다운로드 제한 (None = 제한없음)
 MAX_DETAIL_IMAGES = None
 
+# 상세설명 HTML에서 img src 추출 방식
+# - "fast": 표준 HTMLParser 토크나이저로 img 태그만 수집 (BeautifulSoup html.parser와 같은 토크나이저, 트리 생성 없음)
+# - "bs4" : 기존 BeautifulSoup 트리 방식
+DETAIL_HTML_PARSER = "fast"
+
+# 이 행 수 이상이면 HTML 파싱을 프로세스 풀에서 처리 (적으면 프로세스 시작 비용이 더 큼)
+PARSE_POOL_MIN_ROWS = 300
+PARSE_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
+
 
 def get_valid_filename(name: str) -> str:
     """파일명으로 쓸 수 없는 특수문자 제거"""
@@ -427,12 +539,92 @@ def download_and_split_image(
         return []
 
 
-def process_excel_logic(filepath: str, log_func, progress_func=None):
+class _ImgSrcCollector(HTMLParser):
+    """img 태그의 src 속성만 순서대로 모으는 토크나이저 (속성이 중복되면 BeautifulSoup처럼 마지막 값 사용)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.srcs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "img":
+            return
+        src = None
+        for name, value in attrs:
+            if name == "src":
+                src = value
+        self.srcs.append(src or "")
+
+    handle_startendtag = handle_starttag
+
+
+def extract_img_srcs_fast(html_content: str) -> list:
+    """상세설명 HTML의 img src 목록 (빠른 경로)"""
+    if "<img" not in html_content.lower():
+        return []
+    collector = _ImgSrcCollector()
+    collector.feed(html_content)
+    collector.close()
+    return collector.srcs
+
+
+def extract_img_srcs_bs4(html_content: str) -> list:
+    """상세설명 HTML의 img src 목록 (기존 BeautifulSoup 경로)"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    return [img.get('src') or "" for img in soup.find_all('img')]
+
+
+def extract_img_srcs(html_content: str, parser: str = None) -> list:
+    if (parser or DETAIL_HTML_PARSER) == "bs4":
+        return extract_img_srcs_bs4(html_content)
+    return extract_img_srcs_fast(html_content)
+
+
+def _extract_img_srcs_worker(args):
+    """프로세스 풀 작업: (HTML, 방식) -> (src 목록 또는 None, 오류 메시지)"""
+    html_content, parser = args
+    try:
+        return extract_img_srcs(html_content, parser), None
+    except Exception as e:
+        return None, str(e)
+
+
+def extract_img_srcs_many(html_list: list, parser: str = None, workers: int = None) -> list:
+    """
+    여러 행의 HTML을 한 번에 파싱 → [(src 목록 또는 None, 오류 메시지), ...] (입력 순서 유지)
+    행 수가 PARSE_POOL_MIN_ROWS 이상이면 프로세스 풀 사용
+    """
+    parser = parser or DETAIL_HTML_PARSER
+    jobs = [(h, parser) for h in html_list]
+    workers = PARSE_WORKERS if workers is None else workers
+    if workers > 1 and len(jobs) >= PARSE_POOL_MIN_ROWS:
+        try:
+            chunksize = max(1, len(jobs) // (workers * 8))
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                return list(ex.map(_extract_img_srcs_worker, jobs, chunksize=chunksize))
+        except Exception:
+            pass  # 프로세스 풀을 쓸 수 없는 환경이면 현재 프로세스에서 처리
+    return [_extract_img_srcs_worker(job) for job in jobs]
+
+
+def check_img_extraction_conformance(html_list: list) -> list:
+    """빠른 경로와 BeautifulSoup 경로의 src 목록 비교 → [(행 번호, 빠른 경로, bs4 경로), ...] 불일치 목록"""
+    mismatches = []
+    for i, html_content in enumerate(html_list):
+        fast, _ = _extract_img_srcs_worker((html_content, "fast"))
+        slow, _ = _extract_img_srcs_worker((html_content, "bs4"))
+        if fast != slow:
+            mismatches.append((i, fast, slow))
+    return mismatches
+
+
+def process_excel_logic(filepath: str, log_func, progress_func=None, out_path: str = None):
     """
     실제 엑셀 처리 로직 (스레드 내부 실행)
 
     progress_func(current, total) 형태의 콜백을 받아
     진행률 업데이트에 사용한다.
+    out_path 를 주면 결과(이미지가 있는 행)를 그 파일에 저장하고, 없으면 입력 파일에 덮어쓴다.
     """
     base_dir = os.path.dirname(filepath)
     file_name_only = os.path.splitext(os.path.basename(filepath))[0]
@@ -490,26 +682,32 @@ def process_excel_logic(filepath: str, log_func, progress_func=None):
 
     success_count = 0
 
+    # HTML 파싱 (다운로드 전에 모든 행을 한 번에, 행이 많으면 프로세스 풀)
+    html_by_idx = {}
+    for idx, value in zip(df.index, df[desc_col].tolist()):
+        html_content = str(value)
+        if html_content and html_content.lower() != 'nan':
+            html_by_idx[idx] = html_content
+    t_parse = time.time()
+    parsed_by_idx = dict(zip(html_by_idx.keys(), extract_img_srcs_many(list(html_by_idx.values()))))
+    log_func(f"[정보] HTML 파싱 완료: {len(parsed_by_idx)}개 행, {time.time() - t_parse:.1f}초 ({DETAIL_HTML_PARSER})")
+
     for idx, row in df.iterrows():
         try:
             # 상품코드(또는 판매자코드 등) 가져오기
             p_code_raw = row.get(code_col, f'Row_{idx}')
             p_code = get_valid_filename(p_code_raw)
 
-            html_content = str(row.get(desc_col, ''))
-
-            if not html_content or html_content.lower() == 'nan':
+            if idx not in parsed_by_idx:
                 # 빈 상세설명일 때도 진행률은 올라가야 함
                 if progress_func:
                     progress_func(idx + 1, total_rows)
                 continue
 
-            # HTML 파싱
-            try:
-                soup = BeautifulSoup(html_content, 'html.parser')
-                img_tags = soup.find_all('img')
-            except Exception as e:
-                log_func(f"[경고] 행 {idx + 1} ({p_code}): HTML 파싱 실패 - {str(e)}")
+            # HTML 파싱 결과
+            img_srcs, parse_error = parsed_by_idx[idx]
+            if parse_error is not None:
+                log_func(f"[경고] 행 {idx + 1} ({p_code}): HTML 파싱 실패 - {parse_error}")
                 if progress_func:
                     progress_func(idx + 1, total_rows)
                 continue
@@ -517,36 +715,14 @@ def process_excel_logic(filepath: str, log_func, progress_func=None):
             # URL 추출
             img_urls = []
             try:
-                for img in img_tags:
-                    src = img.get('src')
+                for src in img_srcs:
                     if src:
                         src = src.strip()
-                        # 노이즈 필터링 (키워드 기반) - 동적으로 로드
-                        noise_keywords = get_noise_url_keywords()
-                        # URL 인코딩된 형태도 체크 (한글 키워드 대응)
-                        src_lower = src.lower()
-                        src_decoded = unquote(src_lower)  # URL 디코딩
-                        
-                        keyword_matched = False
-                        for k in noise_keywords:
-                            k_lower = k.lower()
-                            # 원본 키워드 체크
-                            if k_lower in src_lower or k_lower in src_decoded:
-                                keyword_matched = True
-                                break
-                            # URL 인코딩된 키워드 체크 (한글 키워드의 경우)
-                            try:
-                                k_encoded = quote(k, safe='')  # URL 인코딩
-                                if k_encoded.lower() in src_lower:
-                                    keyword_matched = True
-                                    break
-                            except:
-                                pass
-                        
-                        if keyword_matched:
+                        # 노이즈 필터링 (키워드 기반, URL 인코딩된 한글 키워드 포함)
+                        if BLOCKED_MATCHER.is_noise_url(src):
                             continue
                         # 금지 URL 필터링 (사용자 추가)
-                        if is_blocked_url(src):
+                        if BLOCKED_MATCHER.is_blocked_url(src):
                             continue
                         if not src.startswith('http'):
                             continue
@@ -624,7 +800,7 @@ def process_excel_logic(filepath: str, log_func, progress_func=None):
         df_no_images = df.copy()
     
     # 결과 저장
-    out_path = filepath
+    out_path = out_path or filepath
     no_images_path = None
     
     try:
@@ -1282,6 +1458,49 @@ class ImageExtractorApp(tk.Tk):
             self.log("[안내] 결과 파일이 생성되지 않았습니다.")
 
 
+def process_excel(filepath: str, log_func, progress_func=None) -> str:
+    """
+    통합 파이프라인(stage2_pipeline_GUI) Step 1용 진입점
+    - 입력 파일은 그대로 두고 결과를 [원본파일명]_with_detail_images.xlsx 로 저장
+    - 반환: 결과 파일 경로 (실패 / 이미지가 있는 상품이 없으면 RuntimeError)
+    """
+    base, _ = os.path.splitext(filepath)
+    out_path = f"{base}_with_detail_images.xlsx"
+    result = process_excel_logic(filepath, log_func, progress_func, out_path=out_path)
+    if result is None:
+        raise RuntimeError("1단계(상세이미지 추출)에 실패했습니다. 로그를 확인하세요.")
+    if not os.path.exists(out_path):
+        raise RuntimeError("이미지가 있는 상품이 없어 1단계 결과 파일이 생성되지 않았습니다.")
+    return out_path
+
+
+def _run_parser_check(excel_path: str) -> int:
+    """
+    엑셀의 상세설명 HTML 전체를 빠른 경로 / BeautifulSoup 경로로 각각 파싱해 src 목록 비교
+    사용법: python Product_detaildescription.py --check-parser <엑셀경로>
+    """
+    df = pd.read_excel(excel_path)
+    desc_col = next((c for c in COL_DETAIL_HTML if c in df.columns), None)
+    if not desc_col:
+        print(f"[검증] 상세설명 컬럼({COL_DETAIL_HTML})을 찾을 수 없습니다.")
+        return 1
+    html_list = [str(v) for v in df[desc_col].tolist() if str(v) and str(v).lower() != 'nan']
+
+    t0 = time.time()
+    extract_img_srcs_many(html_list, parser="fast", workers=1)
+    t1 = time.time()
+    extract_img_srcs_many(html_list, parser="bs4", workers=1)
+    t2 = time.time()
+    mismatches = check_img_extraction_conformance(html_list)
+    print(f"[검증] {len(html_list)}개 행: fast {t1 - t0:.2f}초 / bs4 {t2 - t1:.2f}초, 불일치 {len(mismatches)}건")
+    for i, fast, slow in mismatches[:10]:
+        print(f"  - 행 {i}: fast={fast} / bs4={slow}")
+    return 1 if mismatches else 0
+
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Windows exe 빌드 시 프로세스 풀용
+    if len(sys.argv) >= 3 and sys.argv[1] == "--check-parser":
+        sys.exit(_run_parser_check(sys.argv[2]))
     app = ImageExtractorApp()
     app.mainloop()
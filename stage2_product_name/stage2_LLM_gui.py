@@ -1,5 +1,6 @@
 # stage2_llm_gui.py
 import os
+import sys
 import re
 import time
 import threading
@@ -21,6 +22,12 @@ from stage2_core import (
 )
 from stage2_run_history import append_run_history  # ✅ Stage2 실행 이력 기록
 
+# 공용 엑셀 읽기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet
+
 API_KEY_FILE = ".openai_api_key_stage2_llm"
 
 # =========================================================
@@ -746,7 +753,7 @@ class Stage2LLMApp(tk.Tk):
     def _analyze_detail_images(self, excel_path):
         """엑셀 파일의 상세이미지 컬럼 통계를 분석합니다."""
         try:
-            df = pd.read_excel(excel_path)
+            df = read_sheet(excel_path)
             
             # 상세이미지 컬럼 찾기
             detail_cols = [c for c in df.columns if str(c).startswith("상세이미지_")]
@@ -1142,7 +1149,7 @@ class Stage2LLMApp(tk.Tk):
         - 다음 실행 시 'skip_filled=True' 옵션 덕분에 이어서 처리 가능.
         """
         self.append_log(f"[INFO] 엑셀 읽는 중: {excel_path}")
-        df = pd.read_excel(excel_path)
+        df = read_sheet(excel_path)
 
         # ST2_프롬프트 컬럼이 없어도 동작. (Stage2 프롬프트는 코드에서 자동 생성)
         if "ST2_JSON" not in df.columns:
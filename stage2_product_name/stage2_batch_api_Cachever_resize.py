@@ -16,6 +16,9 @@ import json
 import threading
 import subprocess
 import re
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 import pandas as pd
@@ -25,6 +28,12 @@ from tkinter.scrolledtext import ScrolledText
 
 from openai import OpenAI
 
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet, write_sheet
+
 
 # ========================================================
 # 메인 런처 연동용 JobManager & 파일명 유틸 (Stage2 전용)
@@ -200,7 +209,7 @@ def safe_save_excel(df: pd.DataFrame, path: str) -> bool:
     """엑셀 파일이 열려 있어 저장이 안 될 때 재시도를 유도하는 함수"""
     while True:
         try:
-            df.to_excel(path, index=False)
+            write_sheet(df, path)
             return True
         except PermissionError:
             if not messagebox.askretrycancel(
@@ -234,6 +243,17 @@ try:
 except ImportError:
     def append_run_history(*args, **kwargs): pass
 
+# 상세이미지 병렬 인코딩 (워커 프로세스에서도 import 되는 가벼운 모듈)
+from stage2_image_encoder import (
+    PHASES as ENCODE_PHASES,
+    DEFAULT_DATA_URL_CACHE_BYTES,
+    DataUrlCache,
+    ReorderWindow,
+    encode_row_images,
+    image_cache_key,
+    resize_target_width,
+)
+
 # 안정적으로 동작하는 기존 Stage2 Batch 코어 로직 재사용
 # 주의: Batch JSONL 생성 로직(create_stage2_batch_input_jsonl)은 이 파일(Cachever)에서 별도로 구현하여
 #       프롬프트 캐싱 구조(system/user 분리, meta JSON, prompt_cache_key 고정)를 강제합니다.
@@ -266,6 +286,14 @@ API_KEY_FILE = ".openai_api_key_stage2_batch"
 BATCH_JOBS_FILE = os.path.join(os.path.dirname(__file__), "stage2_batch_jobs.json")
 DEFAULT_SETTINGS_FILE = os.path.join(os.path.dirname(__file__), ".stage2_batch_defaults.json")
 
+# 상세이미지 인코딩 병렬 처리
+# - 리사이즈 모드(B/C)에서만 프로세스 풀 사용 (A는 파일 읽기 + Base64뿐이라 프로세스 간 전송 비용이 더 큼)
+# - 결과는 행 순서대로 JSONL에 기록, 아직 기록 못 한 행은 최대 ENCODE_REORDER_WINDOW 개까지만 메모리에 보관
+ENCODE_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+ENCODE_POOL_MIN_ROWS = 20
+ENCODE_REORDER_WINDOW = ENCODE_WORKERS * 4
+IMAGE_CACHE_MAX_BYTES = DEFAULT_DATA_URL_CACHE_BYTES
+
 # Stage 2용 Batch 모델/가격 (stage2_core 와 동일한 gpt-5 계열만 사용)
 MODEL_PRICING_USD_PER_MTOK = {
     "gpt-5": {
@@ -315,6 +343,7 @@ def create_stage2_batch_input_jsonl(
     max_detail_images: int = 10,
     resize_mode: str = "A",
     log_func=None,
+    encode_workers: int | None = None,
 ):
     """
     Stage2 엑셀을 읽어서 Batch API용 요청 JSONL을 만든다. (Cachever 전용)
@@ -323,20 +352,21 @@ def create_stage2_batch_input_jsonl(
     - custom_id 는 "row-{index}-{resize_mode}" 형식 (결과 비교를 위해 resize_mode 포함).
     - OpenAI Prompt Caching 가이드에 맞게 system/user 분리 및 prompt_cache_key 고정.
     
+    - 상세이미지 인코딩은 프로세스 풀에서 병렬로 처리하고, 완성된 요청은 행 순서대로 바로 JSONL에 기록한다.
+      (요청 전체/인코딩 결과 전체를 메모리에 모아두지 않음)
+
     Args:
         resize_mode: 리사이즈 모드. "A"(기본/리사이즈 안 함), "B"(가로 512px), "C"(가로 448px)
+        encode_workers: 이미지 인코딩 프로세스 수 (None이면 ENCODE_WORKERS, 1이면 현재 프로세스에서 처리)
     """
 
-    if build_image_nodes_from_paths is None:
-        raise RuntimeError("build_image_nodes_from_paths를 stage2_batch_api_기존gpt 에서 가져올 수 없습니다.")
-
     def log(msg: str):
         if log_func:
             log_func(msg)
         else:
             print(msg)
 
-    df = pd.read_excel(excel_path)
+    df = read_sheet(excel_path)
 
     # ST2_JSON 컬럼 없으면 만들어 둔다 (병합 시 쓰임)
     if "ST2_JSON" not in df.columns:
@@ -365,9 +395,6 @@ def create_stage2_batch_input_jsonl(
 
     log(f"[INFO] 사용할 상세이미지 컬럼: {detail_cols}")
 
-    image_cache: dict[str, str] = {}
-
-    requests = []
     total_rows = len(df)
     target_rows = 0
 
@@ -432,61 +459,145 @@ def create_stage2_batch_input_jsonl(
         PROMPT_CACHE_BUCKETS = 1
 
     # target_rows 초기화 (실제 처리 시 다시 계산)
+    target_rows_estimate = target_rows
     target_rows = 0
 
-    for idx, row in df.iterrows():
-        # ST2_JSON 중복 체크 (skip_filled 옵션)
-        existing_json = safe_str(row.get("ST2_JSON", ""))
-        # 빈 문자열, "nan", None 등을 모두 빈 값으로 처리
-        existing_json_clean = existing_json.strip().lower() if existing_json else ""
-        if skip_filled and existing_json_clean and existing_json_clean not in ("", "nan", "none", "null"):
-            log(f"[SKIP] idx={idx}: 이미 ST2_JSON 값이 있어 건너뜀.")
-            continue
-
-        target_rows += 1
-
+    # ---------------------------------------------------------
+    # 상세이미지 인코딩 준비
+    #  - 로컬 이미지는 행 단위로 프로세스 풀에 넘겨 병렬 인코딩
+    #  - 여러 행이 같은 이미지를 쓰면 DataUrlCache(바이트 상한 LRU)에서 재사용
+    #  - encoded_keys: 한 번이라도 인코딩에 성공한 캐시 키 (기존 image_cache 적중과 같은 판정/로그용, 문자열만 보관)
+    #  - inflight_keys: 앞 행에서 이미 워커에 넘긴 캐시 키 (같은 이미지를 중복 인코딩하지 않도록)
+    # ---------------------------------------------------------
+    resize_width = resize_target_width(resize_mode)
+    jpeg_quality = 85
+    data_url_cache = DataUrlCache(IMAGE_CACHE_MAX_BYTES)
+    encoded_keys: set[str] = set()
+    inflight_keys: set[str] = set()
+
+    workers = ENCODE_WORKERS if encode_workers is None else max(1, int(encode_workers))
+    executor = None
+    if resize_width is not None and workers > 1 and target_rows_estimate >= ENCODE_POOL_MIN_ROWS:
         try:
-            # stage2_core_Cache 의 캐싱 최적화 프롬프트 빌더 사용
-            req = build_stage2_request_from_row(row, detail_cols)
+            executor = ProcessPoolExecutor(max_workers=workers)
         except Exception as e:
-            log(f"[ERROR] idx={idx}: Stage2 프롬프트 생성 실패 → 스킵. ({e})")
-            continue
+            log(f"[WARN] 이미지 인코딩 프로세스 풀 생성 실패 → 현재 프로세스에서 처리합니다. ({e})")
+            executor = None
+    if executor is not None:
+        log(f"[INFO] 상세이미지 병렬 인코딩: 워커 {workers}개, 대기 행 최대 {ENCODE_REORDER_WINDOW}개")
+    window = ReorderWindow(executor, max_pending=ENCODE_REORDER_WINDOW)
+
+    phase_seconds = {k: 0.0 for k in ENCODE_PHASES}
+    phase_seconds["write"] = 0.0
+    started_at = time.perf_counter()
+
+    # 통계 (요청 목록을 들고 있지 않으므로 기록하면서 누적)
+    num_requests = 0
+    total_image_data_bytes = 0
+    total_image_count = 0
+    requests_with_images = 0
 
-        system_prompt = safe_str(getattr(req, "system_prompt", ""))
-        user_prompt = safe_str(getattr(req, "user_prompt", ""))
+    def plan_row_images(image_paths):
+        """
+        build_image_nodes_from_paths와 같은 순서/규칙으로 행의 이미지 슬롯 구성.
+        반환: (slots, jobs) - slots는 결과 조립 순서, jobs는 워커에 넘길 (슬롯번호, 경로)
+        """
+        slots = []
+        jobs = []
+        seen = set()
+        url_skip_count = 0
+        for raw_p in image_paths:
+            p = safe_str(raw_p)
+            if not p or p in seen:
+                continue
+            seen.add(p)
 
-        if not system_prompt or not user_prompt:
-            log(f"[SKIP] idx={idx}: Stage2 프롬프트가 비어 있어 건너뜀.")
-            continue
+            lower = p.lower()
+            # 1) URL 이미지
+            if lower.startswith("http://") or lower.startswith("https://"):
+                if not allow_url:
+                    url_skip_count += 1
+                    continue
+                slots.append(("node", p))
+                continue
 
-        # 디버깅용 ST2_프롬프트 기록 (system + user 결합)
-        full_prompt = f"[System]\n{system_prompt}\n\n[User]\n{user_prompt}"
-        df.at[idx, "ST2_프롬프트"] = full_prompt
-
-        image_paths = list(getattr(req, "image_paths", []) or [])
-
-        # 썸네일(이미지대) 제외 옵션 (성능 최적화: 썸네일 제외 옵션이 활성화된 경우에만 체크)
-        if not use_thumbnail:
-            thumb_val = safe_str(row.get("이미지대", ""))
-            if thumb_val:  # 이미지대 값이 있을 때만 필터링
-                before_len = len(image_paths)
-                if before_len > 0:  # 이미지가 있을 때만 필터링
-                    image_paths = [p for p in image_paths if safe_str(p) != thumb_val]
-                    if len(image_paths) != before_len:
-                        thumbnail_exclude_count += 1
-                        # 처음 5개만 로그 저장 (디버깅용)
-                        if thumbnail_exclude_count <= 5:
-                            thumbnail_exclude_logs.append(f"idx={idx}: {thumb_val[:50]}...")
-
-        # stage2_batch_api_기존gpt 의 이미지 인코딩/캐시 로직 재사용
-        # resize_mode에 따라 가로 기준 리사이즈 적용
-        image_nodes = build_image_nodes_from_paths(
-            image_paths,
-            log_func=log,
-            cache=image_cache,
-            allow_url=allow_url,
-            resize_mode=resize_mode,
-        )
+            # 2) 로컬 파일
+            if os.path.exists(p):
+                key = image_cache_key(p, resize_width, None, jpeg_quality, resize_mode)
+                cached = data_url_cache.get(key)
+                if cached is not None:
+                    slots.append(("node", cached))
+                elif key in inflight_keys:
+                    # 앞 행의 인코딩 결과를 조립 시점에 캐시에서 가져옴
+                    slots.append(("shared", (key, p)))
+                else:
+                    inflight_keys.add(key)
+                    jobs.append((len(slots), p))
+                    slots.append(("encode", key))
+            else:
+                slots.append(("log", f"[WARN] 이미지 파일을 찾을 수 없습니다: {p}"))
+
+        # URL 스킵 요약 로그 (100개 이상이면 요약 문구)
+        if url_skip_count > 0:
+            if url_skip_count >= 100:
+                msg = f"[INFO] URL 이미지 {url_skip_count}개가 'URL 이미지 허용' 옵션으로 인해 스킵되었습니다."
+            else:
+                msg = f"[INFO] URL 이미지 {url_skip_count}개 스킵됨 (URL 허용 옵션 비활성화)"
+            slots.append(("log", msg))
+        return slots, jobs
+
+    def assemble_image_nodes(slots, encoded):
+        """워커 결과를 슬롯 순서대로 input_image 노드로 조립 (로그도 같은 순서로 출력)"""
+        image_nodes = []
+        for slot_no, slot in enumerate(slots):
+            kind, value = slot
+            if kind == "node":
+                image_nodes.append({"type": "input_image", "image_url": value})
+            elif kind == "log":
+                log(value)
+            else:
+                if kind == "encode":
+                    key = value
+                    inflight_keys.discard(key)
+                    data_url, msgs = encoded[slot_no]
+                else:
+                    # shared: 앞 행이 인코딩한 결과 (캐시에서 밀려났거나 실패했으면 여기서 다시 인코딩)
+                    key, path = value
+                    data_url, msgs = data_url_cache.get(key), []
+                    if data_url is None:
+                        retry, timings = encode_row_images(([(0, path)], None, resize_width, jpeg_quality))
+                        data_url, msgs = retry[0]
+                        for k in ENCODE_PHASES:
+                            phase_seconds[k] += timings.get(k, 0.0)
+                if key in encoded_keys and data_url is not None:
+                    msgs = []  # 기존 로직에서는 캐시 적중 → 로그 없이 재사용
+                for msg in msgs:
+                    log(msg)
+                if data_url is not None:
+                    encoded_keys.add(key)
+                    data_url_cache.put(key, data_url)
+                    image_nodes.append({"type": "input_image", "image_url": data_url})
+        return image_nodes
+
+    def write_row(out_f, payload, result):
+        """행 하나의 결과를 조립해 JSONL에 기록 (ReorderWindow가 행 순서대로 넘겨줌)"""
+        nonlocal duplicate_count, num_requests, total_image_data_bytes, total_image_count, requests_with_images
+
+        for msg in payload["logs"]:
+            log(msg)
+        if "slots" not in payload:
+            return
+
+        encoded = {}
+        if result is not None:
+            encoded, timings = result
+            for k in ENCODE_PHASES:
+                phase_seconds[k] += timings.get(k, 0.0)
+        image_nodes = assemble_image_nodes(payload["slots"], encoded)
+
+        idx = payload["idx"]
+        system_prompt = payload["system_prompt"]
+        user_prompt = payload["user_prompt"]
 
         # System 메시지 (텍스트만, 정적)
         system_content = [{"type": "input_text", "text": system_prompt}]
@@ -574,7 +685,7 @@ def create_stage2_batch_input_jsonl(
         if custom_id in seen_custom_ids:
             duplicate_count += 1
             log(f"[WARN] 중복 요청 감지: custom_id={custom_id} (idx={idx}) - 건너뜀.")
-            continue
+            return
 
         seen_custom_ids.add(custom_id)
 
@@ -589,18 +700,100 @@ def create_stage2_batch_input_jsonl(
                     base64_part = img_url.split(",", 1)[1] if "," in img_url else ""
                     image_data_size += len(base64_part)  # Base64 문자열 길이 (바이트 단위)
 
-        requests.append(
-            {
-                "custom_id": custom_id,
-                "method": "POST",
-                "url": "/v1/responses",
-                "body": body,
-                "_size_estimate": {  # 디버깅용 (실제 JSONL에는 포함되지 않음)
-                    "image_data_bytes": image_data_size,
-                    "image_count": len(image_nodes),
-                }
-            }
-        )
+        t0 = time.perf_counter()
+        item = {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/responses",
+            "body": body,
+        }
+        out_f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        phase_seconds["write"] += time.perf_counter() - t0
+
+        num_requests += 1
+        total_image_data_bytes += image_data_size
+        total_image_count += len(image_nodes)
+        if image_nodes:
+            requests_with_images += 1
+
+    # 완성된 요청은 임시 파일에 행 순서대로 바로 기록 → 끝나면 jsonl_path로 교체
+    tmp_jsonl_path = jsonl_path + ".tmp"
+    try:
+        with open(tmp_jsonl_path, "w", encoding="utf-8") as out_f:
+            for idx, row in df.iterrows():
+                row_logs: list[str] = []
+                payload = {"idx": idx, "logs": row_logs}
+
+                # ST2_JSON 중복 체크 (skip_filled 옵션)
+                existing_json = safe_str(row.get("ST2_JSON", ""))
+                # 빈 문자열, "nan", None 등을 모두 빈 값으로 처리
+                existing_json_clean = existing_json.strip().lower() if existing_json else ""
+                if skip_filled and existing_json_clean and existing_json_clean not in ("", "nan", "none", "null"):
+                    row_logs.append(f"[SKIP] idx={idx}: 이미 ST2_JSON 값이 있어 건너뜀.")
+                    for ready in window.put(payload):
+                        write_row(out_f, *ready)
+                    continue
+
+                target_rows += 1
+
+                try:
+                    # stage2_core_Cache 의 캐싱 최적화 프롬프트 빌더 사용
+                    req = build_stage2_request_from_row(row, detail_cols)
+                except Exception as e:
+                    row_logs.append(f"[ERROR] idx={idx}: Stage2 프롬프트 생성 실패 → 스킵. ({e})")
+                    for ready in window.put(payload):
+                        write_row(out_f, *ready)
+                    continue
+
+                system_prompt = safe_str(getattr(req, "system_prompt", ""))
+                user_prompt = safe_str(getattr(req, "user_prompt", ""))
+
+                if not system_prompt or not user_prompt:
+                    row_logs.append(f"[SKIP] idx={idx}: Stage2 프롬프트가 비어 있어 건너뜀.")
+                    for ready in window.put(payload):
+                        write_row(out_f, *ready)
+                    continue
+
+                # 디버깅용 ST2_프롬프트 기록 (system + user 결합)
+                full_prompt = f"[System]\n{system_prompt}\n\n[User]\n{user_prompt}"
+                df.at[idx, "ST2_프롬프트"] = full_prompt
+
+                image_paths = list(getattr(req, "image_paths", []) or [])
+
+                # 썸네일(이미지대) 제외 옵션 (성능 최적화: 썸네일 제외 옵션이 활성화된 경우에만 체크)
+                if not use_thumbnail:
+                    thumb_val = safe_str(row.get("이미지대", ""))
+                    if thumb_val:  # 이미지대 값이 있을 때만 필터링
+                        before_len = len(image_paths)
+                        if before_len > 0:  # 이미지가 있을 때만 필터링
+                            image_paths = [p for p in image_paths if safe_str(p) != thumb_val]
+                            if len(image_paths) != before_len:
+                                thumbnail_exclude_count += 1
+                                # 처음 5개만 로그 저장 (디버깅용)
+                                if thumbnail_exclude_count <= 5:
+                                    thumbnail_exclude_logs.append(f"idx={idx}: {thumb_val[:50]}...")
+
+                # resize_mode에 따라 가로 기준 리사이즈 적용 (인코딩은 워커에서)
+                slots, jobs = plan_row_images(image_paths)
+                payload.update(slots=slots, system_prompt=system_prompt, user_prompt=user_prompt)
+                if jobs:
+                    ready_rows = window.put(payload, encode_row_images, (jobs, None, resize_width, jpeg_quality))
+                else:
+                    ready_rows = window.put(payload)
+                for ready in ready_rows:
+                    write_row(out_f, *ready)
+
+            for ready in window.drain():
+                write_row(out_f, *ready)
+    except BaseException:
+        try:
+            os.remove(tmp_jsonl_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
     # 썸네일 제외 요약 로그 (성능 최적화)
     if not use_thumbnail and thumbnail_exclude_count > 0:
@@ -620,41 +813,24 @@ def create_stage2_batch_input_jsonl(
     # 중복 요청 감지 로그
     if duplicate_count > 0:
         log(f"[WARN] ⚠️ 중복 요청 {duplicate_count}개가 감지되어 제외되었습니다. (같은 행이 여러 번 요청되는 것을 방지)")
-        log(f"[WARN] ⚠️ 중복 요청으로 인해 실제 요청 수가 {len(requests)}개입니다. (예상: {target_rows}개)")
+        log(f"[WARN] ⚠️ 중복 요청으로 인해 실제 요청 수가 {num_requests}개입니다. (예상: {target_rows}개)")
 
     # 최종 통계 로그
     log(f"[INFO] 최종 요청 통계:")
     log(f"  - 전체 행 수: {total_rows}개")
     log(f"  - 대상 행 수 (ST2_JSON 비어있음): {target_rows}개")
-    log(f"  - 실제 생성된 요청 수: {len(requests)}개")
+    log(f"  - 실제 생성된 요청 수: {num_requests}개")
     if duplicate_count > 0:
         log(f"  - 중복 제외: {duplicate_count}개")
-    if target_rows != len(requests):
-        log(f"  - ⚠️ 차이: {target_rows - len(requests)}개 (중복 제외 또는 프롬프트 생성 실패)")
+    if target_rows != num_requests:
+        log(f"  - ⚠️ 차이: {target_rows - num_requests}개 (중복 제외 또는 프롬프트 생성 실패)")
 
-    if not requests:
+    if not num_requests:
+        os.remove(tmp_jsonl_path)
         raise RuntimeError("Batch 요청에 사용할 유효한 행이 없습니다.")
 
-    # 용량 분석: 이미지 데이터 크기 통계
-    total_image_data_bytes = 0
-    total_image_count = 0
-    requests_with_images = 0
-    for req in requests:
-        size_est = req.get("_size_estimate", {})
-        if size_est:
-            total_image_data_bytes += size_est.get("image_data_bytes", 0)
-            total_image_count += size_est.get("image_count", 0)
-            if size_est.get("image_count", 0) > 0:
-                requests_with_images += 1
-    
-    # JSONL 파일 생성 (용량 분석용 필드 제거)
-    import json as json_module
-    with open(jsonl_path, "w", encoding="utf-8") as f:
-        for item in requests:
-            # _size_estimate 필드는 실제 JSONL에 포함하지 않음
-            item_clean = {k: v for k, v in item.items() if k != "_size_estimate"}
-            f.write(json_module.dumps(item_clean, ensure_ascii=False) + "\n")
-    
+    os.replace(tmp_jsonl_path, jsonl_path)
+
     # 용량 분석 로그
     jsonl_size_bytes = os.path.getsize(jsonl_path)
     jsonl_size_mb = jsonl_size_bytes / (1024 * 1024)
@@ -665,13 +841,21 @@ def create_stage2_batch_input_jsonl(
     log(f"  - 전체 파일 크기: {jsonl_size_mb:.2f} MB ({jsonl_size_bytes:,} bytes)")
     log(f"  - Base64 이미지 데이터: {image_data_mb:.2f} MB ({total_image_data_bytes:,} bytes, {image_data_ratio:.1f}%)")
     log(f"  - 텍스트/메타데이터: {jsonl_size_mb - image_data_mb:.2f} MB ({(100 - image_data_ratio):.1f}%)")
-    log(f"  - 총 이미지 개수: {total_image_count}개 (평균 {total_image_count / len(requests):.1f}개/요청)")
-    log(f"  - 이미지 포함 요청: {requests_with_images}개 / {len(requests)}개")
+    log(f"  - 총 이미지 개수: {total_image_count}개 (평균 {total_image_count / num_requests:.1f}개/요청)")
+    log(f"  - 이미지 포함 요청: {requests_with_images}개 / {num_requests}개")
     if total_image_data_bytes > 0:
         avg_image_size_mb = (total_image_data_bytes / total_image_count) / (1024 * 1024) if total_image_count > 0 else 0
         log(f"  - 평균 이미지 크기: {avg_image_size_mb:.2f} MB (Base64 인코딩 후)")
         log(f"[INFO] 💡 참고: Base64 인코딩은 원본 이미지보다 약 33% 크기가 증가합니다.")
 
+    # 단계별 소요 시간 (decode/resize/encode는 워커 합계 = CPU 시간, write는 JSONL 직렬화+쓰기)
+    elapsed = time.perf_counter() - started_at
+    log(
+        f"[INFO] ⏱ 단계별 시간: 디코딩 {phase_seconds['decode']:.2f}초 / 리사이즈 {phase_seconds['resize']:.2f}초 / "
+        f"인코딩 {phase_seconds['encode']:.2f}초 (워커 {workers if executor is not None else 1}개 합계), "
+        f"쓰기 {phase_seconds['write']:.2f}초, 전체 {elapsed:.2f}초"
+    )
+
     # ST2_프롬프트 기록을 위해 엑셀 덮어쓰기 (열려있으면 실패해도 무방)
     try:
         df.to_excel(excel_path, index=False)
@@ -681,13 +865,14 @@ def create_stage2_batch_input_jsonl(
 
     log(
         f"[DONE] Batch 입력 JSONL 생성 완료: {jsonl_path} "
-        f"(전체 {total_rows}행 중 대상 {target_rows}행, 요청 {len(requests)}개)"
+        f"(전체 {total_rows}행 중 대상 {target_rows}행, 요청 {num_requests}개)"
     )
 
     return {
         "total_rows": total_rows,
         "target_rows": target_rows,
-        "num_requests": len(requests),
+        "num_requests": num_requests,
+        "phase_seconds": dict(phase_seconds, total=elapsed),
     }
 
 def get_seoul_now():
@@ -1225,7 +1410,7 @@ class Stage2BatchGUI(tk.Tk):
     def _analyze_detail_images(self, excel_path):
         """엑셀 파일의 상세이미지 컬럼 통계를 분석합니다."""
         try:
-            df = pd.read_excel(excel_path)
+            df = read_sheet(excel_path)
             
             # 상세이미지 컬럼 찾기
             detail_cols = [c for c in df.columns if str(c).startswith("상세이미지_")]
@@ -2757,7 +2942,7 @@ class Stage2BatchGUI(tk.Tk):
                 core_out_path = info["out_excel_path"]
                 final_out_path = None
                 try:
-                    df_done = pd.read_excel(core_out_path)
+                    df_done = read_sheet(core_out_path)
                     
                     # ST2_JSON이 있는 행과 없는 행 분리
                     if "ST2_JSON" in df_done.columns:
@@ -2986,7 +3171,7 @@ class Stage2BatchGUI(tk.Tk):
                 final_out_path = None
                 try:
                     # 코어가 만든 완료 파일을 다시 읽어와서 T2 버전 파일로 저장
-                    df_done = pd.read_excel(core_out_path)
+                    df_done = read_sheet(core_out_path)
                     
                     # ST2_JSON이 있는 행과 없는 행 분리
                     if "ST2_JSON" in df_done.columns:
@@ -3170,7 +3355,7 @@ class Stage2BatchGUI(tk.Tk):
                 processed_files.add(out_path)
             
             try:
-                df = pd.read_excel(out_path)
+                df = read_sheet(out_path)
                 if "ST2_JSON" not in df.columns: continue
                 for idx, row in df.iterrows():
                     st2 = safe_str(row.get("ST2_JSON", ""))
@@ -3612,5 +3797,6 @@ class Stage2BatchGUI(tk.Tk):
             self.after(0, lambda: messagebox.showwarning("경고", "재시도된 배치가 없습니다."))
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # exe 빌드 시 이미지 인코딩 워커 프로세스용
     app = Stage2BatchGUI()
     app.mainloop()
\ No newline at end of file
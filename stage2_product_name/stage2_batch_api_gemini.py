@@ -12,7 +12,7 @@ import sys
 import json
 import threading
 import re
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # ========================================================
@@ -63,14 +63,10 @@ try:
         create_batch_input_jsonl,
         upload_jsonl_file,
         create_batch_job,
-        get_batch_status,
-        download_batch_results,
-        parse_batch_results,
         merge_results_to_excel,
         extract_text_from_response_dict,
         extract_usage_from_response_dict,
         compute_cost_usd,
-        is_batch_completed,
         is_batch_succeeded,
         get_detail_image_cols,
         BATCH_STATE_PENDING,
@@ -99,6 +95,16 @@ except ImportError as e:
         s = safe_str(x)
         return s.replace("{", "{{").replace("}", "}}")
 
+# 다중 배치 동시 폴링 / 결과 스트리밍 (프로젝트 루트 공용 모듈)
+from gemini_batch_poller import (
+    GeminiBatchPoller,
+    MockGeminiBatchClient,
+    fetch_batch_statuses,
+    download_batch_results_streamed,
+    iter_batch_results,
+    mock_api_enabled,
+)
+
 # ========================================================
 # 메인 런처 연동용 유틸
 # ========================================================
@@ -223,6 +229,12 @@ MODEL_PRICING_USD_PER_MTOK = {
     "gemini-2.0-flash": {"input": 0.10, "output": 0.40},
 }
 
+# 폴링 간격 (초): 작업 상태/진행률에 따라 최소~최대 사이에서 자동 조절
+POLL_MIN_INTERVAL = 15
+POLL_MAX_INTERVAL = 300
+# 병합 시 결과 파일 동시 다운로드 수
+MERGE_DOWNLOAD_WORKERS = 4
+
 # UI Colors
 COLOR_BG = "#F8F9FA"
 COLOR_WHITE = "#FFFFFF"
@@ -271,6 +283,10 @@ def save_api_key_to_file(key, path=API_KEY_FILE):
 # ========================================================
 # 배치 잡 관리
 # ========================================================
+# 폴러 스레드와 병합/상태확인 스레드가 같은 JSON 파일을 읽고 쓰므로 직렬화
+_BATCH_JOBS_LOCK = threading.RLock()
+
+
 def load_batch_jobs():
     if not os.path.exists(BATCH_JOBS_FILE):
         return []
@@ -290,6 +306,11 @@ def save_batch_jobs(jobs):
 
 
 def upsert_batch_job(batch_id, **kwargs):
+    with _BATCH_JOBS_LOCK:
+        _upsert_batch_job_locked(batch_id, **kwargs)
+
+
+def _upsert_batch_job_locked(batch_id, **kwargs):
     jobs = load_batch_jobs()
     now_str = datetime.now().isoformat()
     found = False
@@ -309,19 +330,21 @@ def upsert_batch_job(batch_id, **kwargs):
 def archive_batch_job(batch_ids, archive=True):
     if isinstance(batch_ids, str):
         batch_ids = [batch_ids]
-    jobs = load_batch_jobs()
-    for j in jobs:
-        if j["batch_id"] in batch_ids:
-            j["archived"] = archive
-    save_batch_jobs(jobs)
+    with _BATCH_JOBS_LOCK:
+        jobs = load_batch_jobs()
+        for j in jobs:
+            if j["batch_id"] in batch_ids:
+                j["archived"] = archive
+        save_batch_jobs(jobs)
 
 
 def hard_delete_batch_job(batch_ids):
     if isinstance(batch_ids, str):
         batch_ids = [batch_ids]
-    jobs = load_batch_jobs()
-    jobs = [j for j in jobs if j["batch_id"] not in batch_ids]
-    save_batch_jobs(jobs)
+    with _BATCH_JOBS_LOCK:
+        jobs = load_batch_jobs()
+        jobs = [j for j in jobs if j["batch_id"] not in batch_ids]
+        save_batch_jobs(jobs)
 
 
 # ========================================================
@@ -347,8 +370,15 @@ class Stage2BatchGeminiGUI(tk.Tk):
             "row_counts": {},
         }
 
-        # 폴링 스레드 관리
-        self.polling_threads = {}
+        # 배치 상태 폴링 (모든 작업을 스레드 하나에서 동시에, 간격 자동 조절)
+        self.poller = GeminiBatchPoller(
+            self._gemini_client,
+            on_status=self._on_poll_status,
+            on_done=self._on_poll_done,
+            on_error=self._on_poll_error,
+            min_interval=POLL_MIN_INTERVAL,
+            max_interval=POLL_MAX_INTERVAL,
+        )
 
         self._configure_styles()
         self._init_ui()
@@ -685,9 +715,16 @@ class Stage2BatchGeminiGUI(tk.Tk):
                 max_width=resize_max,
                 skip_existing=skip_exist,
                 log_func=self.append_log,
+                model_name=model_name,
             )
 
             if result["written_count"] == 0:
+                # 대상 행이 모두 응답 캐시에 있으면 배치 없이 바로 병합
+                if result.get("cached_count"):
+                    out_excel = get_next_version_path(src, "text")
+                    merged_count, _, _ = merge_results_to_excel(src, [], out_excel)
+                    self.append_log(f"[Batch] 응답 캐시로 {merged_count}건 병합 완료 (API 호출 없음): {out_excel}")
+                    return
                 self.append_log("[Batch] 처리할 요청이 없습니다.")
                 return
 
@@ -707,7 +744,8 @@ class Stage2BatchGeminiGUI(tk.Tk):
                 client=client,
                 model_name=model_name,
                 src_file_name=uploaded_file_name,
-                display_name=f"stage2_{os.path.basename(src)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                display_name=f"stage2_{os.path.basename(src)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                excel_path=src,
             )
 
             batch_name = batch_info["name"]
@@ -743,58 +781,47 @@ class Stage2BatchGeminiGUI(tk.Tk):
             self.append_log(traceback.format_exc())
             messagebox.showerror("에러", str(e))
 
-    def _start_polling(self, batch_name, api_key, src_excel):
-        """배치 상태 폴링 시작"""
-        if batch_name in self.polling_threads:
-            return
-
-        def poll():
-            try:
-                client = get_gemini_client(api_key)
-                poll_interval = 30  # 30초마다 폴링
+    def _gemini_client(self, api_key):
+        """Gemini 클라이언트 (GEMINI_MOCK_API=1 이면 로컬 모의 클라이언트)"""
+        if mock_api_enabled():
+            return MockGeminiBatchClient()
+        return get_gemini_client(api_key)
 
-                while True:
-                    status = get_batch_status(client, batch_name)
-                    state = status.get("state", "")
+    def _start_polling(self, batch_name, api_key, src_excel):
+        """배치 상태 폴링 시작 (공용 폴러에 등록)"""
+        self.poller.add(batch_name, api_key)
+
+    def _on_poll_status(self, batch_name, status):
+        state = status.get("state", "")
+        self.after(0, lambda s=state: self.append_log(f"[Batch] {batch_name[:30]}... 상태: {get_state_short(s)}"))
+
+        # 로컬 DB 업데이트
+        upsert_batch_job(
+            batch_id=batch_name,
+            status=state,
+            total_count=status.get("total_count", 0),
+            succeeded_count=status.get("succeeded_count", 0),
+            failed_count=status.get("failed_count", 0),
+        )
+        self.after(0, self._load_jobs_all)
+
+    def _on_poll_done(self, batch_name, status):
+        if is_batch_succeeded(status.get("state", "")):
+            self.after(0, lambda: self.append_log(f"[Batch] ✅ 배치 완료: {batch_name[:30]}..."))
+            # 결과 파일 정보 저장
+            output_file = status.get("output_file_name", "")
+            if output_file:
+                upsert_batch_job(
+                    batch_id=batch_name,
+                    output_file_name=output_file,
+                )
+            self.after(0, self._load_jobs_all)
+        else:
+            self.after(0, lambda: self.append_log(f"[Batch] ❌ 배치 실패/취소: {batch_name[:30]}..."))
 
-                    self.after(0, lambda s=state: self.append_log(f"[Batch] {batch_name[:30]}... 상태: {get_state_short(s)}"))
-
-                    # 로컬 DB 업데이트
-                    upsert_batch_job(
-                        batch_id=batch_name,
-                        status=state,
-                        total_count=status.get("total_count", 0),
-                        succeeded_count=status.get("succeeded_count", 0),
-                        failed_count=status.get("failed_count", 0),
-                    )
-                    self.after(0, self._load_jobs_all)
-
-                    if is_batch_completed(state):
-                        if is_batch_succeeded(state):
-                            self.after(0, lambda: self.append_log(f"[Batch] ✅ 배치 완료: {batch_name[:30]}..."))
-                            # 결과 파일 정보 저장
-                            output_file = status.get("output_file_name", "")
-                            if output_file:
-                                upsert_batch_job(
-                                    batch_id=batch_name,
-                                    output_file_name=output_file,
-                                )
-                            self.after(0, self._load_jobs_all)
-                        else:
-                            self.after(0, lambda: self.append_log(f"[Batch] ❌ 배치 실패/취소: {batch_name[:30]}..."))
-                        break
-
-                    time.sleep(poll_interval)
-
-            except Exception as e:
-                self.after(0, lambda: self.append_log(f"[Batch] 폴링 오류: {e}"))
-            finally:
-                if batch_name in self.polling_threads:
-                    del self.polling_threads[batch_name]
-
-        thread = threading.Thread(target=poll, daemon=True)
-        self.polling_threads[batch_name] = thread
-        thread.start()
+    def _on_poll_error(self, batch_name, exc, gave_up):
+        suffix = " (폴링 중단)" if gave_up else ""
+        self.after(0, lambda: self.append_log(f"[Batch] 폴링 오류: {batch_name[:30]}... {exc}{suffix}"))
 
     # ----------------------------------------------------
     # Tab 2: Manage
@@ -903,10 +930,14 @@ class Stage2BatchGeminiGUI(tk.Tk):
 
     def _thread_check_status(self, batch_ids, api_key):
         try:
-            client = get_gemini_client(api_key)
+            client = self._gemini_client(api_key)
+            statuses = fetch_batch_statuses(client, batch_ids)
             for batch_name in batch_ids:
+                status = statuses.get(batch_name)
+                if isinstance(status, Exception):
+                    self.append_log(f"[상태 확인 오류] {batch_name[:30]}...: {status}")
+                    continue
                 try:
-                    status = get_batch_status(client, batch_name)
                     state = status.get("state", "")
                     self.append_log(f"[상태 확인] {batch_name[:40]}... → {get_state_short(state)}")
 
@@ -941,76 +972,105 @@ class Stage2BatchGeminiGUI(tk.Tk):
     def _run_merge(self, batch_ids, api_key):
         self.append_log(f"[병합] 시작: {len(batch_ids)}건")
         try:
-            client = get_gemini_client(api_key)
+            client = self._gemini_client(api_key)
+            jobs_by_id = {j["batch_id"]: j for j in load_batch_jobs()}
+
+            # 1. 아직 완료 기록이 없는 배치는 상태를 한 번에 동시 조회
+            to_check = [bid for bid in batch_ids
+                        if bid in jobs_by_id and jobs_by_id[bid].get("status") != "JOB_STATE_SUCCEEDED"]
+            statuses = fetch_batch_statuses(client, to_check) if to_check else {}
 
+            # 2. 병합 가능한 배치 결과는 미리 병렬 다운로드 (병합은 아래에서 순서대로)
+            ready = []
             for bid in batch_ids:
-                try:
-                    job = next((j for j in load_batch_jobs() if j["batch_id"] == bid), None)
-                    if not job:
-                        self.append_log(f"[병합] {bid[:30]}... - 작업 정보 없음")
+                job = jobs_by_id.get(bid)
+                if not job:
+                    self.append_log(f"[병합] {bid[:30]}... - 작업 정보 없음")
+                    continue
+
+                # 상태 확인
+                if bid in statuses:
+                    status = statuses[bid]
+                    if isinstance(status, Exception):
+                        self.append_log(f"[병합] ❌ {bid[:30]}... 실패: {status}")
                         continue
+                    state = status.get("state", "")
+                    upsert_batch_job(batch_id=bid, status=state, output_file_name=status.get("output_file_name", ""))
 
-                    # 상태 확인
-                    if job.get("status") != "JOB_STATE_SUCCEEDED":
-                        status = get_batch_status(client, bid)
-                        state = status.get("state", "")
-                        upsert_batch_job(batch_id=bid, status=state, output_file_name=status.get("output_file_name", ""))
+                    if state != "JOB_STATE_SUCCEEDED":
+                        self.append_log(f"[병합] {bid[:30]}... - 아직 완료되지 않음 ({get_state_short(state)})")
+                        continue
 
-                        if state != "JOB_STATE_SUCCEEDED":
-                            self.append_log(f"[병합] {bid[:30]}... - 아직 완료되지 않음 ({get_state_short(state)})")
-                            continue
+                    job["output_file_name"] = status.get("output_file_name", "")
 
-                        job["output_file_name"] = status.get("output_file_name", "")
+                output_file_name = job.get("output_file_name", "")
+                src_excel = job.get("src_excel", "")
 
-                    output_file_name = job.get("output_file_name", "")
-                    src_excel = job.get("src_excel", "")
+                if not output_file_name:
+                    self.append_log(f"[병합] {bid[:30]}... - 결과 파일 정보 없음")
+                    continue
 
-                    if not output_file_name:
-                        self.append_log(f"[병합] {bid[:30]}... - 결과 파일 정보 없음")
-                        continue
+                if not src_excel or not os.path.exists(src_excel):
+                    self.append_log(f"[병합] {bid[:30]}... - 원본 엑셀 없음")
+                    continue
 
-                    if not src_excel or not os.path.exists(src_excel):
-                        self.append_log(f"[병합] {bid[:30]}... - 원본 엑셀 없음")
-                        continue
+                ready.append((bid, job))
 
-                    # 결과 파일 다운로드
-                    base, _ = os.path.splitext(src_excel)
+            with ThreadPoolExecutor(max_workers=MERGE_DOWNLOAD_WORKERS) as pool:
+                downloads = []
+                used_paths = set()
+                for bid, job in ready:
+                    base, _ = os.path.splitext(job["src_excel"])
                     local_results_path = f"{base}_stage2_batch_results.jsonl"
-
+                    # 같은 원본 엑셀의 배치가 여러 개면 동시에 받으므로 파일명을 배치별로 구분
+                    if local_results_path in used_paths:
+                        local_results_path = f"{base}_stage2_batch_results_{bid.split('/')[-1]}.jsonl"
+                    used_paths.add(local_results_path)
                     self.append_log(f"[병합] {bid[:30]}... - 결과 다운로드 중...")
-                    download_batch_results(client, output_file_name, local_results_path)
-
-                    # 결과 파싱
-                    results = parse_batch_results(local_results_path)
-                    self.append_log(f"[병합] {bid[:30]}... - {len(results)}건 결과 파싱 완료")
-
-                    # 엑셀에 병합
-                    out_excel = get_next_version_path(src_excel, "text")
-                    cnt, total_in, total_out = merge_results_to_excel(src_excel, results, out_excel)
-
-                    # 비용 계산
-                    model = job.get("model", "gemini-2.5-flash-lite")
-                    cost_info = compute_cost_usd(model, total_in, total_out)
-                    total_cost = cost_info["total_cost"] if cost_info else 0
-
-                    self.append_log(f"[병합] ✅ {bid[:30]}... 완료: {cnt}건, 비용: ${total_cost:.4f}")
-
-                    upsert_batch_job(
-                        batch_id=bid,
-                        status="MERGED",
-                        out_excel=out_excel,
-                        total_input_tokens=total_in,
-                        total_output_tokens=total_out,
-                        total_cost_usd=total_cost,
-                    )
+                    downloads.append(pool.submit(
+                        download_batch_results_streamed, client, job["output_file_name"], local_results_path))
 
+                for (bid, job), fut in zip(ready, downloads):
                     try:
-                        JobManager.update_status(get_root_filename(src_excel), text_msg="T2(분석완료)")
-                    except:
-                        pass
-
-                except Exception as e:
-                    self.append_log(f"[병합] ❌ {bid[:30]}... 실패: {e}")
+                        local_results_path = fut.result()
+                        src_excel = job["src_excel"]
+
+                        # 결과를 한 줄씩 읽어 엑셀에 병합 (전체 결과 리스트를 만들지 않음)
+                        parsed = [0]
+
+                        def stream_results(path=local_results_path, counter=parsed):
+                            for result in iter_batch_results(path):
+                                counter[0] += 1
+                                yield result
+
+                        out_excel = get_next_version_path(src_excel, "text")
+                        cnt, total_in, total_out = merge_results_to_excel(
+                            src_excel, stream_results(), out_excel, batch_name=bid)
+                        self.append_log(f"[병합] {bid[:30]}... - {parsed[0]}건 결과 파싱 완료")
+
+                        # 비용 계산
+                        model = job.get("model", "gemini-2.5-flash-lite")
+                        cost_info = compute_cost_usd(model, total_in, total_out)
+                        total_cost = cost_info["total_cost"] if cost_info else 0
+
+                        self.append_log(f"[병합] ✅ {bid[:30]}... 완료: {cnt}건, 비용: ${total_cost:.4f}")
+
+                        upsert_batch_job(
+                            batch_id=bid,
+                            status="MERGED",
+                            out_excel=out_excel,
+                            total_input_tokens=total_in,
+                            total_output_tokens=total_out,
+                            total_cost_usd=total_cost,
+                        )
+
+                        try:
+                            JobManager.update_status(get_root_filename(src_excel), text_msg="T2(분석완료)")
+                        except:
+                            pass
+
+                    except Exception as e:
+                        self.append_log(f"[병합] ❌ {bid[:30]}... 실패: {e}")
 
             self.after(0, self._load_jobs_all)
             self.after(0, self._load_archive_list)
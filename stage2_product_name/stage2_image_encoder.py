@@ -0,0 +1,308 @@
+# stage2_image_encoder.py
+"""
+Stage2 Batch JSONL 생성용 상세이미지 인코딩 유틸 (프로세스 풀 병렬 처리)
+- encode_image_timed  : 로컬 이미지 → data URL (stage2_batch_api_기존gpt.encode_image_to_data_url 과 동일 결과)
+                        + 단계별 시간(디코딩 / 리사이즈 / 인코딩) 측정
+- encode_row_images   : 한 행의 이미지들을 한 번에 인코딩 (프로세스 풀 작업 단위)
+- DataUrlCache        : 총 바이트 수 상한이 있는 data URL LRU 캐시 (여러 행이 같은 이미지를 쓰는 경우 재사용)
+- ReorderWindow       : 작업은 병렬로 돌리되 결과는 제출 순서대로 꺼내는 작은 대기열
+                        (앞 행이 끝나지 않았으면 최대 max_pending 개까지만 쌓고 대기 → 메모리 상한)
+
+워커 프로세스에서 import 되므로 tkinter / openai / pandas 를 import 하지 않습니다.
+
+인코딩 결과 비교:
+    python stage2_image_encoder.py --check <이미지폴더> --mode B
+"""
+import os
+import io
+import time
+import base64
+import mimetypes
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# 기본 data URL 캐시 상한: 128MB (Base64 문자열 기준)
+DEFAULT_DATA_URL_CACHE_BYTES = 128 * 1024 * 1024
+
+# 단계별 시간 키 (encode_row_images 결과 / 로그 출력용)
+PHASES = ("decode", "resize", "encode")
+
+
+def resize_target_width(resize_mode: str, max_image_width: Optional[int] = None) -> Optional[int]:
+    """resize_mode → 가로 기준 px ("A"/기타: None, "B": 512, "C": 448). max_image_width가 있으면 우선"""
+    if max_image_width is not None:
+        return max_image_width
+    if resize_mode == "B":
+        return 512
+    if resize_mode == "C":
+        return 448
+    return None
+
+
+def image_cache_key(path: str, target_width: Optional[int], max_height: Optional[int],
+                    jpeg_quality: int, resize_mode: str) -> str:
+    """build_image_nodes_from_paths 와 같은 형식의 캐시 키 (리사이즈 옵션 포함)"""
+    if target_width is not None:
+        return f"{path}:w{target_width}:q{jpeg_quality}:m{resize_mode}"
+    if max_height is not None:
+        return f"{path}:h{max_height}:q{jpeg_quality}:m{resize_mode}"
+    return f"{path}:m{resize_mode}"
+
+
+def _new_timings() -> Dict[str, float]:
+    return {k: 0.0 for k in PHASES}
+
+
+def encode_image_timed(
+    path: str,
+    max_height: Optional[int] = None,
+    max_width: Optional[int] = None,
+    jpeg_quality: int = 85,
+    logs: Optional[List[str]] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> str:
+    """
+    로컬 이미지 파일 → data:[mime];base64,... 문자열.
+    - 결과/로그 문구는 encode_image_to_data_url(log_func=logs.append)와 동일
+    - timings 에 decode(파일 읽기·디코딩) / resize / encode(JPEG 저장·Base64) 시간을 누적
+    - 원본 파일 읽기 실패는 예외 그대로 올림 (호출 측에서 "이미지 인코딩 실패" 처리)
+    """
+    log = logs.append if logs is not None else None
+    if timings is None:
+        timings = _new_timings()
+
+    mime, _ = mimetypes.guess_type(path)
+    if mime is None:
+        mime = "image/jpeg"
+
+    # 가로 기준 리사이즈가 우선 (max_width가 지정된 경우)
+    if max_width is not None or max_height is not None:
+        try:
+            from PIL import Image
+
+            t0 = time.perf_counter()
+            with Image.open(path) as img:
+                original_width, original_height = img.size
+                need_resize = False
+                new_width = original_width
+                new_height = original_height
+
+                if max_width is not None:
+                    if original_width > max_width:
+                        ratio = max_width / original_width
+                        new_width = max_width
+                        new_height = round(original_height * ratio)
+                        need_resize = True
+                    # (기존 함수와 동일하게, 로그 함수가 있으면 리사이즈 여부와 관계없이 이 문구를 남김)
+                    if log and not path.startswith('http'):
+                        reduction_pct = (1 - (new_width * new_height) / (original_width * original_height)) * 100
+                        log(f"[리사이즈 적용] {os.path.basename(path)}: {original_width}x{original_height} → {new_width}x{new_height} (가로 기준 {max_width}px, 비율 유지, 면적 {reduction_pct:.1f}% 감소)")
+                elif max_height is not None:
+                    if original_height > max_height:
+                        ratio = max_height / original_height
+                        new_width = round(original_width * ratio)
+                        new_height = max_height
+                        need_resize = True
+                    else:
+                        if log and not path.startswith('http'):
+                            log(f"[리사이즈] {os.path.basename(path)}: {original_width}x{original_height} (이미 {max_height}px 이하, 리사이즈 불필요)")
+
+                if need_resize:
+                    img.load()
+                    t1 = time.perf_counter()
+                    timings["decode"] += t1 - t0
+
+                    if img.mode not in ('RGB', 'L'):
+                        img = img.convert('RGB')
+                    img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                    t2 = time.perf_counter()
+                    timings["resize"] += t2 - t1
+
+                    output = io.BytesIO()
+                    img_resized.save(output, format='JPEG', quality=jpeg_quality, optimize=True)
+                    b64 = base64.b64encode(output.getvalue()).decode("ascii")
+                    timings["encode"] += time.perf_counter() - t2
+                    return f"data:image/jpeg;base64,{b64}"
+            timings["decode"] += time.perf_counter() - t0
+        except ImportError:
+            if log and not path.startswith('http'):
+                log(f"[WARN] PIL(Pillow)이 설치되지 않아 리사이즈를 수행할 수 없습니다: {os.path.basename(path)} (원본 사용)")
+        except Exception as e:
+            error_msg = f"[WARN] 이미지 리사이징 실패 ({os.path.basename(path)}): {e}, 원본 사용"
+            if log:
+                log(error_msg)
+            else:
+                print(error_msg)
+
+    # 리사이징 없이 원본 사용
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        raw = f.read()
+    t1 = time.perf_counter()
+    timings["decode"] += t1 - t0
+    b64 = base64.b64encode(raw).decode("ascii")
+    timings["encode"] += time.perf_counter() - t1
+    return f"data:{mime};base64,{b64}"
+
+
+def encode_row_images(task: Tuple[List[Tuple[int, str]], Optional[int], Optional[int], int]):
+    """
+    프로세스 풀 작업 단위: 한 행의 로컬 이미지들을 순서대로 인코딩.
+    task = ([(slot, path), ...], max_height, max_width, jpeg_quality)
+    반환: ({slot: (data_url 또는 None, 로그 목록)}, 단계별 시간)
+    """
+    items, max_height, max_width, jpeg_quality = task
+    timings = _new_timings()
+    results: Dict[int, Tuple[Optional[str], List[str]]] = {}
+    for slot, path in items:
+        logs: List[str] = []
+        try:
+            data_url = encode_image_timed(path, max_height=max_height, max_width=max_width,
+                                          jpeg_quality=jpeg_quality, logs=logs, timings=timings)
+        except Exception as e:
+            data_url = None
+            logs.append(f"[WARN] 이미지 인코딩 실패: {path} ({e})")
+        results[slot] = (data_url, logs)
+    return results, timings
+
+
+# =========================
+# data URL LRU 캐시 (바이트 상한)
+# =========================
+
+class DataUrlCache:
+    """
+    캐시 키 → data URL. 보관 중인 문자열 길이 합이 max_bytes를 넘으면 오래 안 쓴 것부터 제거.
+    (기존 image_cache dict는 한 번 인코딩한 이미지를 끝까지 들고 있어 대량 배치에서 메모리가 계속 늘어남)
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_DATA_URL_CACHE_BYTES):
+        self.max_bytes = max(0, int(max_bytes or 0))
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        if key in self._entries or len(value) > self.max_bytes:
+            return
+        self._entries[key] = value
+        self._bytes += len(value)
+        while self._bytes > self.max_bytes and self._entries:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= len(old)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# =========================
+# 순서 유지 대기열
+# =========================
+
+class ReorderWindow:
+    """
+    executor에 작업을 넣고, 결과는 넣은 순서대로 돌려줌.
+    - put(): 작업 추가 후 맨 앞부터 끝난 것들을 반환. 대기 중인 항목이 max_pending을 넘으면 맨 앞이 끝날 때까지 대기
+    - drain(): 남은 항목을 순서대로 모두 반환
+    - executor가 None이면 put() 안에서 바로 실행 (작은 파일 / 풀 생성 실패 시)
+    - fn 없이 넣은 항목(payload만)은 결과 None으로 순서만 지켜서 나옴
+    """
+
+    def __init__(self, executor=None, max_pending: int = 32):
+        self.executor = executor
+        self.max_pending = max(1, int(max_pending or 1))
+        self._queue: deque = deque()
+
+    def put(self, payload: Any, fn=None, arg: Any = None) -> List[Tuple[Any, Any]]:
+        if fn is None:
+            job = None
+        elif self.executor is None:
+            job = ("done", fn(arg))
+        else:
+            job = ("future", self.executor.submit(fn, arg))
+        self._queue.append((payload, job))
+        return self._pop_ready(self.max_pending)
+
+    def drain(self) -> List[Tuple[Any, Any]]:
+        return self._pop_ready(0)
+
+    def _pop_ready(self, keep: int) -> List[Tuple[Any, Any]]:
+        ready = []
+        while self._queue:
+            payload, job = self._queue[0]
+            if job is not None and job[0] == "future" and not job[1].done() and len(self._queue) <= keep:
+                break
+            self._queue.popleft()
+            if job is None:
+                result = None
+            elif job[0] == "future":
+                result = job[1].result()
+            else:
+                result = job[1]
+            ready.append((payload, result))
+        return ready
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+# =========================
+# 인코딩 결과 비교 (기존 함수와 동일한지)
+# =========================
+
+def _run_check(folder: str, resize_mode: str) -> int:
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from stage2_batch_api_기존gpt import encode_image_to_data_url
+
+    exts = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp")
+    paths = sorted(os.path.join(folder, n) for n in os.listdir(folder) if n.lower().endswith(exts))
+    width = resize_target_width(resize_mode)
+
+    t0 = time.perf_counter()
+    expected = []
+    for p in paths:
+        logs: List[str] = []
+        try:
+            expected.append((encode_image_to_data_url(p, max_width=width, log_func=logs.append), logs))
+        except Exception as e:
+            expected.append((None, logs + [f"[WARN] 이미지 인코딩 실패: {p} ({e})"]))
+    t_seq = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    workers = max(1, (multiprocessing.cpu_count() or 2) - 1)
+    tasks = [([(i, p)], None, width, 85) for i, p in enumerate(paths)]
+    actual = [None] * len(paths)
+    totals = _new_timings()
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        for results, timings in ex.map(encode_row_images, tasks, chunksize=4):
+            for slot, value in results.items():
+                actual[slot] = value
+            for k in PHASES:
+                totals[k] += timings[k]
+    t_pool = time.perf_counter() - t0
+
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    print(f"images={len(paths)} mode={resize_mode} sequential={t_seq:.2f}s pool({workers})={t_pool:.2f}s "
+          f"decode={totals['decode']:.2f}s resize={totals['resize']:.2f}s encode={totals['encode']:.2f}s "
+          f"불일치={mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+    import multiprocessing
+
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Stage2 이미지 인코딩 결과 비교 (기존 함수 vs 병렬 인코더)")
+    parser.add_argument("--check", required=True, metavar="FOLDER")
+    parser.add_argument("--mode", default="B", choices=["A", "B", "C"])
+    args = parser.parse_args()
+    sys.exit(_run_check(args.check, args.mode))
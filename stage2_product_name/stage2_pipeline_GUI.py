@@ -426,12 +426,8 @@ class Stage2PipelineApp:
             except Exception as e:
                 self.log(f"[WARN] 1단계 대상 상품 수 계산 실패: {e}")
 
-            # 1단계 실행
-            run_step1_excel(excel_path, log_func=self.log)
-
-            base_dir = os.path.dirname(excel_path)
-            base_name = os.path.splitext(os.path.basename(excel_path))[0]
-            out1 = os.path.join(base_dir, f"{base_name}_with_detail_images.xlsx")
+            # 1단계 실행 (결과 파일 경로 반환)
+            out1 = run_step1_excel(excel_path, log_func=self.log)
 
             self.log(f"[DONE] 1단계 완료. 출력: {out1}")
             self.set_progress(100.0, "1단계 완료 (1/1, 100%)")
@@ -534,11 +530,7 @@ class Stage2PipelineApp:
             except Exception as e:
                 self.log(f"[WARN] 1단계 대상 상품 수 계산 실패: {e}")
 
-            run_step1_excel(excel_path, log_func=self.log)
-
-            base_dir = os.path.dirname(excel_path)
-            base_name = os.path.splitext(os.path.basename(excel_path))[0]
-            out1 = os.path.join(base_dir, f"{base_name}_with_detail_images.xlsx")
+            out1 = run_step1_excel(excel_path, log_func=self.log)
 
             self.log(f"[DONE] 1단계 완료. 출력: {out1}")
             self.set_progress(50.0, "1단계 완료 (1/2, 50%)")
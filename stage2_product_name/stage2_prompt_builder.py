@@ -1,12 +1,18 @@
 # stage2_prompt_builder.py
 import os
-import pandas as pd
+import sys
 
 from stage2_core import (
     build_stage2_request_from_row,
     safe_str,
 )
 
+# 공용 엑셀 읽기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet
+
 
 def process_excel_for_stage2(excel_path: str, log_func=print):
     """
@@ -21,7 +27,7 @@ def process_excel_for_stage2(excel_path: str, log_func=print):
     log = log_func
     log(f"[INFO] 엑셀 읽는 중: {excel_path}")
 
-    df = pd.read_excel(excel_path, header=0)
+    df = read_sheet(excel_path, header=0)
 
     required_cols = [
         "상품코드",
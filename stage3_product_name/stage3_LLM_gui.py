@@ -7,6 +7,7 @@ stage3_LLM_gui.py
 """
 
 import os
+import sys
 import re
 import time
 import threading
@@ -20,6 +21,12 @@ from tkinter.scrolledtext import ScrolledText
 
 from openai import OpenAI
 
+# 공용 엑셀 읽기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet
+
 # -----------------------------------------------------------
 # stage3_core / history 의존성 임포트
 # (사용자 환경에 해당 파일들이 존재한다고 가정)
@@ -627,7 +634,7 @@ class Stage3LLMGUI(tk.Tk):
             model_name = self.model_var.get()
             reasoning_effort = self.effort_var.get()
 
-            df = pd.read_excel(input_path)
+            df = read_sheet(input_path)
             if "ST2_JSON" not in df.columns:
                 raise ValueError("ST2_JSON 컬럼 누락")
 
@@ -26,6 +26,12 @@ from tkinter.scrolledtext import ScrolledText
 
 from openai import OpenAI
 
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet, write_sheet
+
 # ========================================================
 # 메인 런처 연동용 JobManager & 파일명 유틸 (Stage3: Text)
 # ========================================================
@@ -200,7 +206,7 @@ def safe_save_excel(df: pd.DataFrame, path: str) -> bool:
     """엑셀 파일이 열려 있어 저장이 안 될 때 재시도를 유도하는 함수"""
     while True:
         try:
-            df.to_excel(path, index=False)
+            write_sheet(df, path)
             return True
         except PermissionError:
             if not messagebox.askretrycancel(
@@ -221,7 +227,8 @@ try:
         safe_str,
         Stage3Settings,
         Stage3Request,
-        build_stage3_request_from_row,  # Row -> Request 객체(프롬프트+설정) 변환 (캐싱 최적화)
+        Stage3ColumnBuilder,            # DataFrame 컬럼 단위 일괄 변환 (행별 결과는 위와 동일)
+        STAGE3_SYSTEM_PROMPT,
     )
     CACHE_MODE_CORE = True
     from stage3_run_history import append_run_history
@@ -233,8 +240,9 @@ except ImportError:
             safe_str,
             Stage3Settings,
             Stage3Request,
-            build_stage3_request_from_row,
+            Stage3ColumnBuilder,
         )
+        STAGE3_SYSTEM_PROMPT = ""
         CACHE_MODE_CORE = False
         from stage3_run_history import append_run_history
         _HISTORY_AVAILABLE = True
@@ -250,6 +258,129 @@ except ImportError:
             # 더미 함수: 히스토리 기록 실패 시 조용히 무시
             pass
 
+
+# ============================================================
+# Batch 입력 JSONL 한 줄 생성
+# ============================================================
+def build_batch_request_obj(custom_id, model_name, reasoning_effort, system_prompt, user_prompt):
+    """
+    Batch 입력 JSONL 한 줄(요청 1건)에 해당하는 dict.
+    - 캐싱 모드: Responses API (system/user role 분리)
+    - 일반 모드: Chat Completions API (user_prompt를 단일 프롬프트로 사용, system_prompt 무시)
+    """
+    # 캐싱 최적화: system/user 프롬프트 분리
+    if CACHE_MODE_CORE:
+        # System 메시지 (텍스트만, 정적)
+        system_content = [{"type": "input_text", "text": system_prompt}]
+        
+        # User 메시지 (텍스트만, 동적)
+        user_content = [{"type": "input_text", "text": user_prompt}]
+        
+        body = {
+            "model": model_name,
+            "input": [
+                {
+                    "role": "system",
+                    "content": system_content,
+                },
+                {
+                    "role": "user",
+                    "content": user_content,
+                }
+            ],
+        }
+    else:
+        # 일반 모드: 기존 방식 유지
+        body = {
+            "model": model_name,
+            "messages": [{"role": "user", "content": user_prompt}],
+        }
+    
+    # reasoning.effort (Responses API)
+    is_reasoning = any(x in model_name for x in ["gpt-5", "o1", "o3"])
+    if is_reasoning and reasoning_effort != "none":
+        if CACHE_MODE_CORE:
+            body["reasoning"] = {"effort": reasoning_effort}
+        else:
+            body["reasoning_effort"] = reasoning_effort
+    elif not is_reasoning:
+        if not CACHE_MODE_CORE:
+            body["temperature"] = 0.7
+
+    # Prompt Caching 최적화 (캐싱 모드일 때만)
+    if CACHE_MODE_CORE:
+        # prompt_cache_key: 키 고정 전략 (모든 요청이 동일한 키 사용)
+        # 버킷 분산 대신 키를 하나로 고정하여 캐시 히트율 최대화
+        body["prompt_cache_key"] = "stage3_v1"
+        
+        # prompt_cache_retention: 모델이 지원하는 경우에만 추가
+        # Extended retention 지원 모델: gpt-5.1, gpt-5.1-codex, gpt-5.1-codex-mini, gpt-5.1-chat-latest, gpt-5, gpt-5-codex, gpt-4.1
+        # gpt-5-mini, gpt-5-nano는 prompt_cache_retention 파라미터를 지원하지 않음
+        if model_name in ["gpt-5.1", "gpt-5.1-codex", "gpt-5.1-codex-mini", "gpt-5.1-chat-latest", "gpt-5", "gpt-5-codex", "gpt-4.1"]:
+            body["prompt_cache_retention"] = "extended"  # 24시간 retention
+        elif model_name not in ["gpt-5-mini", "gpt-5-nano"]:
+            # 기타 모델은 in-memory 사용 (5~10분 inactivity, 최대 1시간)
+            body["prompt_cache_retention"] = "in_memory"
+        
+        # Responses API 사용 (system/user role)
+        url = "/v1/responses"
+    else:
+        # 일반 모드: Chat Completions API 사용
+        url = "/v1/chat/completions"
+
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": url,
+        "body": body
+    }
+
+
+# 요청마다 달라지는 값 자리표시자 (실제 텍스트에는 나올 수 없는 제어문자 포함)
+_LINE_SLOT_CUSTOM_ID = "\x00ST3_CUSTOM_ID\x00"
+_LINE_SLOT_USER_PROMPT = "\x00ST3_USER_PROMPT\x00"
+
+
+class BatchLineTemplate:
+    """
+    custom_id / user 프롬프트를 뺀 나머지(모델, system 프롬프트, 캐시 옵션 등)를
+    미리 JSON으로 직렬화해 둔 한 줄 템플릿.
+    - render() 결과는 json.dumps(build_batch_request_obj(...), ensure_ascii=False)와 바이트 단위로 동일
+    - system 프롬프트가 템플릿과 다른 요청은 전체 직렬화로 처리
+    """
+
+    def __init__(self, model_name, reasoning_effort, system_prompt=""):
+        self.model_name = model_name
+        self.reasoning_effort = reasoning_effort
+        self.system_prompt = system_prompt
+        dumped = json.dumps(
+            build_batch_request_obj(
+                _LINE_SLOT_CUSTOM_ID, model_name, reasoning_effort, system_prompt, _LINE_SLOT_USER_PROMPT
+            ),
+            ensure_ascii=False,
+        )
+        head, found_id, rest = dumped.partition(json.dumps(_LINE_SLOT_CUSTOM_ID))
+        middle, found_prompt, tail = rest.partition(json.dumps(_LINE_SLOT_USER_PROMPT))
+        self._parts = (head, middle, tail) if found_id and found_prompt else None
+
+    def render(self, custom_id, system_prompt, user_prompt):
+        if self._parts is None or system_prompt != self.system_prompt:
+            return json.dumps(
+                build_batch_request_obj(
+                    custom_id, self.model_name, self.reasoning_effort, system_prompt, user_prompt
+                ),
+                ensure_ascii=False,
+            )
+        head, middle, tail = self._parts
+        return (
+            head
+            + json.dumps(custom_id, ensure_ascii=False)
+            + middle
+            + json.dumps(user_prompt, ensure_ascii=False)
+            + tail
+        )
+
+
 # === 기본 설정 ===
 API_KEY_FILE = ".openai_api_key_stage3_batch"
 BATCH_JOBS_FILE = os.path.join(os.path.dirname(__file__), "stage3_batch_jobs.json")
@@ -613,7 +744,7 @@ class Stage3BatchGUI(tk.Tk):
         try:
             client = OpenAI(api_key=key)
             self.append_log(f"엑셀 로드 중... {os.path.basename(src)}")
-            df = pd.read_excel(src)
+            df = read_sheet(src)
             
             if "ST2_JSON" not in df.columns:
                 raise ValueError("필수 컬럼(ST2_JSON)이 누락되었습니다. Stage 2를 먼저 완료하세요.")
@@ -641,15 +772,26 @@ class Stage3BatchGUI(tk.Tk):
                 self.append_log(f"[INFO] ⚠️ 일반 모드 (stage3_core.py) - 캐싱 최적화 미적용")
 
             # 먼저 전체 대상 요청 수를 계산 (버킷 수 결정용)
+            # 행마다 Series를 만들지 않고 필요한 컬럼만 한 번에 꺼내서 처리
+            builder = Stage3ColumnBuilder(df, settings, st2_col="ST2_JSON")
+            if self.skip_exist_var.get() and "ST3_결과상품명" in df.columns:
+                done_values = df["ST3_결과상품명"].tolist()
+            else:
+                done_values = None
+
+            def is_done(pos):
+                if done_values is None:
+                    return False
+                val = str(done_values[pos]).strip()
+                return bool(val) and val != "nan"
+
             target_rows = 0
-            for idx, row in df.iterrows():
+            for pos in range(len(builder)):
                 # 스킵 로직
-                if self.skip_exist_var.get() and "ST3_결과상품명" in df.columns:
-                    val = str(row.get("ST3_결과상품명", "")).strip()
-                    if val and val != "nan":
-                        continue
+                if is_done(pos):
+                    continue
                 # ST2_JSON 확인
-                st2_json = safe_str(row.get("ST2_JSON", ""))
+                st2_json = builder.raw_json(pos)
                 if not st2_json or st2_json.strip().lower() in ("", "nan", "none", "null"):
                     continue
                 target_rows += 1
@@ -689,132 +831,89 @@ class Stage3BatchGUI(tk.Tk):
             else:
                 PROMPT_CACHE_BUCKETS = 1
 
-            jsonl_lines = []
+            base, _ = os.path.splitext(src)
+            out_path = f"{base}_stage3_batch_input.jsonl"
+            tmp_path = out_path + ".tmp"
+            line_template = BatchLineTemplate(
+                model_name, reasoning_effort, safe_str(STAGE3_SYSTEM_PROMPT) if CACHE_MODE_CORE else ""
+            )
+
+            num_lines = 0
             skipped_cnt = 0
             seen_custom_ids = set()
             duplicate_count = 0
-            
-            for idx, row in df.iterrows():
-                # 스킵 로직
-                if self.skip_exist_var.get() and "ST3_결과상품명" in df.columns:
-                    val = str(row.get("ST3_결과상품명", "")).strip()
-                    if val and val != "nan":
-                        continue
-                
-                try:
-                    req = build_stage3_request_from_row(row, settings)
-                except Exception:
-                    skipped_cnt += 1
-                    continue
+            out_f = None
 
-                # 캐싱 최적화: system/user 프롬프트 분리
-                if CACHE_MODE_CORE:
-                    system_prompt = safe_str(getattr(req, "system_prompt", ""))
-                    user_prompt = safe_str(getattr(req, "user_prompt", ""))
-                    
-                    if not system_prompt or not user_prompt:
-                        skipped_cnt += 1
+            # 요청을 모아두지 않고 한 줄씩 바로 파일에 기록 (임시 파일 → 완료 후 교체)
+            try:
+                for pos, idx in enumerate(builder.index):
+                    # 스킵 로직
+                    if is_done(pos):
                         continue
-                    
-                    # System 메시지 (텍스트만, 정적)
-                    system_content = [{"type": "input_text", "text": system_prompt}]
-                    
-                    # User 메시지 (텍스트만, 동적)
-                    user_content = [{"type": "input_text", "text": user_prompt}]
-                    
-                    body = {
-                        "model": model_name,
-                        "input": [
-                            {
-                                "role": "system",
-                                "content": system_content,
-                            },
-                            {
-                                "role": "user",
-                                "content": user_content,
-                            }
-                        ],
-                    }
-                else:
-                    # 일반 모드: 기존 방식 유지
-                    prompt = safe_str(getattr(req, "prompt", ""))
-                    if not prompt:
+
+                    try:
+                        req = builder.build(pos)
+                    except Exception:
                         skipped_cnt += 1
                         continue
-                    
-                    body = {
-                        "model": model_name,
-                        "messages": [{"role": "user", "content": prompt}],
-                    }
-                
-                # reasoning.effort (Responses API)
-                is_reasoning = any(x in model_name for x in ["gpt-5", "o1", "o3"])
-                if is_reasoning and reasoning_effort != "none":
+
+                    # 캐싱 최적화: system/user 프롬프트 분리
                     if CACHE_MODE_CORE:
-                        body["reasoning"] = {"effort": reasoning_effort}
+                        system_prompt = safe_str(getattr(req, "system_prompt", ""))
+                        user_prompt = safe_str(getattr(req, "user_prompt", ""))
+                        if not system_prompt or not user_prompt:
+                            skipped_cnt += 1
+                            continue
                     else:
-                        body["reasoning_effort"] = reasoning_effort
-                elif not is_reasoning:
-                    if not CACHE_MODE_CORE:
-                        body["temperature"] = 0.7
+                        # 일반 모드: 단일 프롬프트
+                        system_prompt = ""
+                        user_prompt = safe_str(getattr(req, "prompt", ""))
+                        if not user_prompt:
+                            skipped_cnt += 1
+                            continue
 
-                custom_id = f"row-{idx}"
-                
-                # 중복 custom_id 체크
-                if custom_id in seen_custom_ids:
-                    duplicate_count += 1
-                    continue
-                seen_custom_ids.add(custom_id)
+                    custom_id = f"row-{idx}"
+
+                    # 중복 custom_id 체크
+                    if custom_id in seen_custom_ids:
+                        duplicate_count += 1
+                        continue
+                    seen_custom_ids.add(custom_id)
+
+                    line = line_template.render(custom_id, system_prompt, user_prompt)
+                    if out_f is None:
+                        out_f = open(tmp_path, "w", encoding="utf-8")
+                    else:
+                        out_f.write("\n")
+                    out_f.write(line)
+                    num_lines += 1
+            except Exception:
+                if out_f is not None:
+                    out_f.close()
+                    out_f = None
+                    os.remove(tmp_path)
+                raise
+            finally:
+                if out_f is not None:
+                    out_f.close()
 
-                # Prompt Caching 최적화 (캐싱 모드일 때만)
-                if CACHE_MODE_CORE:
-                    # prompt_cache_key: 키 고정 전략 (모든 요청이 동일한 키 사용)
-                    # 버킷 분산 대신 키를 하나로 고정하여 캐시 히트율 최대화
-                    body["prompt_cache_key"] = "stage3_v1"
-                    
-                    # prompt_cache_retention: 모델이 지원하는 경우에만 추가
-                    # Extended retention 지원 모델: gpt-5.1, gpt-5.1-codex, gpt-5.1-codex-mini, gpt-5.1-chat-latest, gpt-5, gpt-5-codex, gpt-4.1
-                    # gpt-5-mini, gpt-5-nano는 prompt_cache_retention 파라미터를 지원하지 않음
-                    if model_name in ["gpt-5.1", "gpt-5.1-codex", "gpt-5.1-codex-mini", "gpt-5.1-chat-latest", "gpt-5", "gpt-5-codex", "gpt-4.1"]:
-                        body["prompt_cache_retention"] = "extended"  # 24시간 retention
-                    elif model_name not in ["gpt-5-mini", "gpt-5-nano"]:
-                        # 기타 모델은 in-memory 사용 (5~10분 inactivity, 최대 1시간)
-                        body["prompt_cache_retention"] = "in_memory"
-                    
-                    # Responses API 사용 (system/user role)
-                    url = "/v1/responses"
-                else:
-                    # 일반 모드: Chat Completions API 사용
-                    url = "/v1/chat/completions"
-
-                request_obj = {
-                    "custom_id": custom_id,
-                    "method": "POST",
-                    "url": url,
-                    "body": body
-                }
-                
-                jsonl_lines.append(json.dumps(request_obj, ensure_ascii=False))
-            
             if duplicate_count > 0:
                 self.append_log(f"[WARN] ⚠️ 중복 요청 {duplicate_count}개가 감지되어 제외되었습니다.")
-            
-            if not jsonl_lines:
+
+            if not num_lines:
                 self.append_log("생성할 요청 없음.")
                 return
 
-            base, _ = os.path.splitext(src)
-            jsonl_path = f"{base}_stage3_batch_input.jsonl"
-            with open(jsonl_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(jsonl_lines))
+            os.replace(tmp_path, out_path)
+            jsonl_path = out_path
             
-            self.append_log(f"JSONL 생성 완료: {len(jsonl_lines)}건 (스킵 {skipped_cnt}건)")
+            self.append_log(f"JSONL 생성 완료: {num_lines}건 (스킵 {skipped_cnt}건)")
             self.append_log(f"[INFO] JSONL 파일 저장 위치: {jsonl_path}")
             
             # 파일 크기 및 요청 수 확인
             jsonl_size_mb = os.path.getsize(jsonl_path) / (1024 * 1024)
             info = {
-                'num_requests': len(jsonl_lines),
+                'num_requests': num_lines,
                 'file_size_mb': jsonl_size_mb
             }
             self.append_log(f"[INFO] JSONL 파일 크기: {jsonl_size_mb:.2f} MB, 요청 수: {info['num_requests']}개")
@@ -2006,7 +2105,7 @@ class Stage3BatchGUI(tk.Tk):
                             results_map[cid] = ""
                 
                 if src_path and os.path.exists(src_path):
-                    df = pd.read_excel(src_path)
+                    df = read_sheet(src_path)
                     if "ST3_결과상품명" not in df.columns:
                         df["ST3_결과상품명"] = ""
                     df["ST3_결과상품명"] = df["ST3_결과상품명"].astype(str)
@@ -2035,7 +2134,7 @@ class Stage3BatchGUI(tk.Tk):
                     # Stage3 최종 파일명: *_T3_... 형식으로 버전 업
                     try:
                         final_out_path = get_next_version_path(src_path, task_type="text")
-                        df_done = pd.read_excel(out_excel)
+                        df_done = read_sheet(out_excel)
                         
                         # ST3_결과상품명이 있는 행과 없는 행 분리
                         if "ST3_결과상품명" in df_done.columns:
@@ -2316,7 +2415,7 @@ class Stage3BatchGUI(tk.Tk):
                     
                     # 출력 파일에서 행 수 확인
                     try:
-                        df_out = pd.read_excel(out_path_for_history)
+                        df_out = read_sheet(out_path_for_history)
                         total_rows = len(df_out)
                         api_rows = len(results_map) if results_map else total_rows
                         cnt = api_rows  # merged 상태에서는 성공 건수 추정
@@ -2494,7 +2593,7 @@ class Stage3BatchGUI(tk.Tk):
                 total_cost += cost_total
 
                 if src_path and os.path.exists(src_path):
-                    df = pd.read_excel(src_path)
+                    df = read_sheet(src_path)
                     if "ST3_결과상품명" not in df.columns:
                         df["ST3_결과상품명"] = ""
                     df["ST3_결과상품명"] = df["ST3_결과상품명"].astype(str)
@@ -2521,7 +2620,7 @@ class Stage3BatchGUI(tk.Tk):
                     # Stage3 최종 파일명: *_T3_... 형식으로 버전 업
                     try:
                         final_out_path = get_next_version_path(src_path, task_type="text")
-                        df_done = pd.read_excel(out_excel)
+                        df_done = read_sheet(out_excel)
                         
                         # ST3_결과상품명이 있는 행과 없는 행 분리
                         if "ST3_결과상품명" in df_done.columns:
@@ -2696,8 +2795,8 @@ class Stage3BatchGUI(tk.Tk):
                 self.append_log(f"⚠️ 파일 누락: {bid}")
                 continue
             try:
-                df_in = pd.read_excel(src)
-                df_out = pd.read_excel(out)
+                df_in = read_sheet(src)
+                df_out = read_sheet(out)
                 
                 # 원본 상품명 컬럼 찾기 (우선순위: ST1_결과상품명 > 원본상품명)
                 orig_col = None
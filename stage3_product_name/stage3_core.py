@@ -25,8 +25,10 @@ stage3_core.py
 """
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Iterator, Optional
 
 import pandas as pd
 
@@ -399,38 +401,33 @@ def _coerce_positive_int(v: Any) -> Optional[int]:
 # ============================================================
 #  Stage3 설정/프롬프트 빌더
 # ============================================================
-def build_stage3_settings_from_row(
-    row: "pd.Series",
-    default: Optional[Stage3Settings] = None,
+def _resolve_stage3_settings(
+    market_cell: Any,
+    max_len_cell: Any,
+    num_candidates_cell: Any,
+    strategy_cell: Any,
+    default: Stage3Settings,
 ) -> Stage3Settings:
     """
-    한 행(row)에서 ST3_* 관련 컬럼을 읽어 Stage3Settings를 구성.
-    - default가 주어지면, 행 단위 설정이 비어 있을 때 그 값을 사용.
-    - default가 없으면, Stage3Settings() 기본값 사용.
+    ST3_* 셀 값 4개 + 기본 설정 → Stage3Settings.
+    (행 단위 / 컬럼 단위 빌더가 같은 규칙을 쓰도록 분리)
     """
-    if default is None:
-        default = Stage3Settings()
-
     # 1) 마켓
-    market_cell = safe_str(row.get("ST3_마켓", ""))
-    market = market_cell or default.market or "네이버"
+    market = safe_str(market_cell) or default.market or "네이버"
 
     # 2) 최대글자수
-    max_len_cell = row.get("ST3_최대글자수", None)
     max_len_parsed = _coerce_positive_int(max_len_cell)
     if max_len_parsed is None:
         max_len_parsed = _coerce_positive_int(default.max_len) or 50
 
     # 3) 출력개수
-    num_candidates_cell = row.get("ST3_출력개수", None)
     num_candidates_parsed = _coerce_positive_int(num_candidates_cell)
     if num_candidates_parsed is None:
         # default.num_candidates가 None이면 그대로 None 유지 → "자동" 모드
         num_candidates_parsed = default.num_candidates
 
     # 4) 명명전략
-    strategy_cell = safe_str(row.get("ST3_명명전략", ""))
-    naming_strategy = strategy_cell or default.naming_strategy or "통합형"
+    naming_strategy = safe_str(strategy_cell) or default.naming_strategy or "통합형"
 
     return Stage3Settings(
         market=market,
@@ -440,6 +437,46 @@ def build_stage3_settings_from_row(
     )
 
 
+def build_stage3_settings_from_row(
+    row: "pd.Series",
+    default: Optional[Stage3Settings] = None,
+) -> Stage3Settings:
+    """
+    한 행(row)에서 ST3_* 관련 컬럼을 읽어 Stage3Settings를 구성.
+    - default가 주어지면, 행 단위 설정이 비어 있을 때 그 값을 사용.
+    - default가 없으면, Stage3Settings() 기본값 사용.
+    """
+    if default is None:
+        default = Stage3Settings()
+
+    return _resolve_stage3_settings(
+        row.get("ST3_마켓", ""),
+        row.get("ST3_최대글자수", None),
+        row.get("ST3_출력개수", None),
+        row.get("ST3_명명전략", ""),
+        default,
+    )
+
+
+# 프롬프트 템플릿을 json_body 앞/뒤로 나눠 둔 것
+# - 설정값(마켓/글자수/개수/전략)이 같은 행들은 앞부분 문자열을 재사용하고 JSON만 이어 붙임
+_PROMPT_TEMPLATE_HEAD, _PROMPT_TEMPLATE_TAIL = STAGE3_PROMPT_TEMPLATE.split("{json_body}")
+_PROMPT_TEMPLATE_TAIL = _PROMPT_TEMPLATE_TAIL.format()
+
+
+@lru_cache(maxsize=256, typed=True)
+def _prompt_head(market: str, max_len: int, num_candidates: Optional[int], naming_strategy: str) -> str:
+    """설정값으로 채운 프롬프트 앞부분 (json_body 직전까지)"""
+    # num_candidates는 프롬프트 상에서 비워두면 "자동" 모드로 동작
+    num_candidates_display = "" if num_candidates is None else str(num_candidates)
+    return _PROMPT_TEMPLATE_HEAD.format(
+        market=fmt_safe(market),
+        max_len=max_len if max_len > 0 else 50,
+        num_candidates=num_candidates_display,
+        naming_strategy=fmt_safe(naming_strategy),
+    )
+
+
 def build_stage3_prompt(
     json_body: str,
     settings: Stage3Settings,
@@ -451,21 +488,11 @@ def build_stage3_prompt(
     if not json_body:
         raise ValueError("Stage 3 프롬프트를 만들기 위해서는 ST2_JSON(내용)이 필요합니다.")
 
-    # num_candidates는 프롬프트 상에서 비워두면 "자동" 모드로 동작
-    if settings.num_candidates is None:
-        # 비어 있으면 프롬프트 상에서 값 없이 두어 "자동" 동작 유도
-        num_candidates_display = ""
-    else:
-        num_candidates_display = str(settings.num_candidates)
-
-    prompt = STAGE3_PROMPT_TEMPLATE.format(
-        market=fmt_safe(settings.market),
-        max_len=settings.max_len if settings.max_len > 0 else 50,
-        num_candidates=num_candidates_display,
-        naming_strategy=fmt_safe(settings.naming_strategy),
-        json_body=fmt_safe(json_body),
+    return (
+        _prompt_head(settings.market, settings.max_len, settings.num_candidates, settings.naming_strategy)
+        + fmt_safe(json_body)
+        + _PROMPT_TEMPLATE_TAIL
     )
-    return prompt
 
 
 def build_stage3_request_from_row(
@@ -505,3 +532,185 @@ def build_stage3_request_from_row(
         naming_strategy=settings.naming_strategy,
         raw_json=raw_json,
     )
+
+
+# ============================================================
+#  컬럼 단위 빌더 (대용량 시트용)
+#  - df.iterrows()로 행마다 Series를 만들지 않고, 필요한 컬럼만 list로 한 번 꺼내 사용
+#  - 같은 ST3_* 셀 조합은 Stage3Settings를 한 번만 해석
+#  - 결과는 build_stage3_request_from_row와 동일 (--bench 로 확인)
+# ============================================================
+class Stage3ColumnBuilder:
+    """
+    DataFrame 전체에 대한 Stage3Request 일괄 생성기.
+
+    사용 예)
+        builder = Stage3ColumnBuilder(df, settings_global)
+        for pos, idx, req, err in builder.iter_requests():
+            if err is not None: ...   # build_stage3_request_from_row가 던졌을 예외
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        default_settings: Optional[Stage3Settings] = None,
+        st2_col: str = "ST2_JSON",
+    ):
+        self.default = default_settings if default_settings is not None else Stage3Settings()
+        self.st2_col = st2_col
+        self.index = df.index.tolist()
+        n = len(self.index)
+
+        def column(name: str, missing: Any) -> list:
+            if name in df.columns:
+                return df[name].tolist()
+            return [missing] * n
+
+        self.st2_values = column(st2_col, "")
+        self._setting_columns = [
+            column("ST3_마켓", ""),
+            column("ST3_최대글자수", None),
+            column("ST3_출력개수", None),
+            column("ST3_명명전략", ""),
+        ]
+        self._settings_cache: dict = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def raw_json(self, pos: int) -> str:
+        return safe_str(self.st2_values[pos])
+
+    def settings_at(self, pos: int) -> Stage3Settings:
+        cells = tuple(col[pos] for col in self._setting_columns)
+        try:
+            settings = self._settings_cache.get(cells)
+        except TypeError:
+            # 해시 불가능한 셀 값 → 캐시 없이 해석
+            return _resolve_stage3_settings(*cells, self.default)
+        if settings is None:
+            settings = _resolve_stage3_settings(*cells, self.default)
+            self._settings_cache[cells] = settings
+        return settings
+
+    def build(self, pos: int) -> Stage3Request:
+        """pos번째 행(0부터)의 Stage3Request. 규칙/예외는 build_stage3_request_from_row와 동일"""
+        raw_json = self.raw_json(pos)
+        if not raw_json:
+            raise ValueError(
+                f"행에 '{self.st2_col}' 값이 비어 있습니다. "
+                "먼저 Stage 2(JSON 추출)를 완료해야 Stage 3를 실행할 수 있습니다."
+            )
+
+        settings = self.settings_at(pos)
+        prompt = build_stage3_prompt(raw_json, settings)
+
+        return Stage3Request(
+            prompt=prompt,
+            market=settings.market,
+            max_len=settings.max_len,
+            num_candidates=settings.num_candidates,
+            naming_strategy=settings.naming_strategy,
+            raw_json=raw_json,
+        )
+
+    def iter_requests(self) -> Iterator[tuple]:
+        """(pos, idx, req, err) 순서대로 생성. 실패한 행은 req=None, err=예외"""
+        for pos, idx in enumerate(self.index):
+            try:
+                yield pos, idx, self.build(pos), None
+            except Exception as e:
+                yield pos, idx, None, e
+
+
+# ============================================================
+#  처리량 측정: python stage3_core.py --bench 20000
+# ============================================================
+def _make_bench_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    import json
+    import random
+
+    rng = random.Random(seed)
+    markets = ["네이버", "쿠팡", "", None, "지마켓/옥션", 123]
+    lens = [50, "100", 45.0, "", None, 0, -3, "abc", float("nan")]
+    counts = [None, 10, "5", 0, "", 3.0]
+    strategies = ["통합형", "", None, "옵션포함형"]
+
+    json_values = []
+    for i in range(rows):
+        r = rng.random()
+        if r < 0.03:
+            json_values.append(None)
+        elif r < 0.05:
+            json_values.append("   ")
+        else:
+            payload = {
+                "core_attributes": [f"속성{rng.randint(0, 999)}" for _ in range(rng.randint(1, 8))],
+                "search_keywords": [f"키워드 {{{i}}}", "방한", "귀마개"],
+                "naming_seeds": {"seed": f"씨앗{i}"},
+            }
+            json_values.append(json.dumps(payload, ensure_ascii=False, indent=rng.choice([None, 2])))
+
+    df = pd.DataFrame({"상품코드": [f"P{i:06d}" for i in range(rows)], "ST2_JSON": json_values})
+    # 설정 컬럼은 일부 행에만 값이 있는 경우가 많음
+    df["ST3_마켓"] = [rng.choice(markets) if rng.random() < 0.3 else None for _ in range(rows)]
+    df["ST3_최대글자수"] = [rng.choice(lens) if rng.random() < 0.3 else None for _ in range(rows)]
+    df["ST3_출력개수"] = [rng.choice(counts) for _ in range(rows)]
+    df["ST3_명명전략"] = [rng.choice(strategies) for _ in range(rows)]
+    df.index = df.index * 3 + 7  # 0부터 시작하지 않는 인덱스도 확인
+    return df
+
+
+def _run_benchmark(rows: int) -> int:
+    def as_tuple(req):
+        return (req.prompt, req.market, req.max_len,
+                req.num_candidates, req.naming_strategy, req.raw_json)
+
+    df = _make_bench_frame(rows)
+    default = Stage3Settings(market="쿠팡", max_len=100, num_candidates=None, naming_strategy="통합형")
+
+    def reference_prompt(json_body: str, settings: Stage3Settings) -> str:
+        # 분할 템플릿 도입 전 방식 (전체 템플릿 .format)
+        num_display = "" if settings.num_candidates is None else str(settings.num_candidates)
+        return STAGE3_PROMPT_TEMPLATE.format(
+            market=fmt_safe(settings.market),
+            max_len=settings.max_len if settings.max_len > 0 else 50,
+            num_candidates=num_display,
+            naming_strategy=fmt_safe(settings.naming_strategy),
+            json_body=fmt_safe(json_body),
+        )
+
+    t0 = time.perf_counter()
+    expected = []
+    for idx, row in df.iterrows():
+        try:
+            raw = safe_str(row.get("ST2_JSON", ""))
+            if not raw:
+                raise ValueError("empty")
+            settings = build_stage3_settings_from_row(row, default)
+            expected.append((idx, (reference_prompt(raw, settings), settings.market,
+                                   settings.max_len, settings.num_candidates, settings.naming_strategy, raw)))
+        except Exception as e:
+            expected.append((idx, type(e)))
+    t_row = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    actual = []
+    for _pos, idx, req, err in Stage3ColumnBuilder(df, default).iter_requests():
+        actual.append((idx, as_tuple(req)) if err is None else (idx, type(err)))
+    t_col = time.perf_counter() - t0
+
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b) + abs(len(expected) - len(actual))
+    print(f"rows={rows}  iterrows={t_row:.2f}s ({rows / max(t_row, 1e-9):,.0f} rows/s)  "
+          f"columns={t_col:.2f}s ({rows / max(t_col, 1e-9):,.0f} rows/s)  불일치={mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Stage3 프롬프트 빌더 처리량 측정 (iterrows vs 컬럼 단위)")
+    parser.add_argument("--bench", type=int, default=20000, metavar="ROWS")
+    args = parser.parse_args()
+    sys.exit(_run_benchmark(args.bench))
@@ -376,6 +376,21 @@ try:
 except ImportError:
     GEMINI_AVAILABLE = False
 
+# =====================================
+# 공용 LLM 응답 캐시 (프로젝트 루트 llm_response_cache.py)
+# - 같은 요청은 배치에서 빼고, 병합 때 캐시 응답으로 채움 (stage_cache 어댑터 → 아래 RESPONSE_CACHE)
+# =====================================
+import os
+import sys
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from llm_response_cache import stage_cache
+
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+from excel_io import LONG_TEXT_FORMAT, read_sheet, write_sheet
+
 # API 키 파일 경로
 API_KEY_FILE = ".gemini_api_key_stage3_batch"
 
@@ -472,6 +487,8 @@ def create_batch_input_jsonl(
     settings: Stage3Settings,
     skip_existing: bool = True,
     st2_col: str = "ST2_JSON",
+    model_name: Optional[str] = None,
+    use_response_cache: bool = True,
 ):
     """
     엑셀 파일(ST2_JSON 컬럼) → Gemini Batch API용 JSONL 생성.
@@ -479,7 +496,7 @@ def create_batch_input_jsonl(
     import os
     import json
 
-    df = pd.read_excel(excel_path)
+    df = read_sheet(excel_path)
 
     if st2_col not in df.columns:
         raise ValueError(f"엑셀에 필수 컬럼이 없습니다: {st2_col}")
@@ -489,6 +506,9 @@ def create_batch_input_jsonl(
     skipped_rows = []
     skipped_existing = 0
 
+    cache_batch = RESPONSE_CACHE.start_batch(excel_path, model_name, enabled=use_response_cache)
+    cached_count = 0
+
     with open(jsonl_path, "w", encoding="utf-8") as f:
         for idx, row in df.iterrows():
             # 기존 결과가 있으면 스킵
@@ -536,9 +556,16 @@ def create_batch_input_jsonl(
                 }
             }
 
+            # 응답 캐시 적중 → 배치에서 제외 (병합 때 캐시 응답으로 채움)
+            if cache_batch.is_cached(request_obj["key"], request_obj["request"]):
+                cached_count += 1
+                continue
+
             f.write(json.dumps(request_obj, ensure_ascii=False) + "\n")
             written_count += 1
 
+    cache_batch.register()
+
     # 스킵된 행 저장
     skipped_path = None
     if skipped_rows:
@@ -551,6 +578,7 @@ def create_batch_input_jsonl(
         "total_rows": total_rows,
         "written_count": written_count,
         "skipped_count": len(skipped_rows),
+        "cached_count": cached_count,
         "skipped_existing": skipped_existing,
         "skipped_path": skipped_path,
     }
@@ -604,6 +632,7 @@ def create_batch_job(
     model_name: str,
     src_file_name: str,
     display_name: str = None,
+    excel_path: str = None,
 ) -> Dict[str, Any]:
     """
     Gemini Batch Job 생성.
@@ -619,6 +648,10 @@ def create_batch_job(
         config=config if config else None
     )
 
+    # 응답 캐시: JSONL 생성 때 기록한 행 ↔ fingerprint 를 이 배치 id 로 옮김
+    # (같은 엑셀로 배치를 다시 만들어도 이 배치의 병합 기록은 유지)
+    RESPONSE_CACHE.bind(excel_path, batch_job.name)
+
     return {
         "name": batch_job.name,
         "state": batch_job.state.name if hasattr(batch_job.state, 'name') else str(batch_job.state),
@@ -741,16 +774,30 @@ def extract_usage_from_response_dict(resp: Dict[str, Any]) -> tuple:
         return 0, 0, 0
 
 
+# 응답 캐시 어댑터 (병합 때 값이 채워지는 결과만 저장, 비용은 USD)
+RESPONSE_CACHE = stage_cache(
+    "stage3-gemini",
+    extract_text_from_response_dict,
+    extract_usage_from_response_dict,
+    compute_cost_usd,
+)
+
+
 def merge_results_to_excel(
     excel_path: str,
     results: list,
     output_path: str,
+    batch_name: str = None,
 ) -> tuple:
     """
     Gemini Batch 결과를 엑셀에 병합.
+    batch_name: 결과를 받은 배치 id (응답 캐시 기록 범위, 배치 없이 캐시로만 병합할 때는 None)
     Returns: (병합된 행 수, 총 입력 토큰, 총 출력 토큰)
     """
-    df = pd.read_excel(excel_path)
+    # 새 결과는 캐시에 저장, 생성 때 캐시 적중으로 빠진 행은 캐시 응답으로 이어 붙임
+    results = RESPONSE_CACHE.merge(excel_path, batch_name, results)
+
+    df = read_sheet(excel_path)
 
     if "ST3_결과상품명" not in df.columns:
         df["ST3_결과상품명"] = ""
@@ -784,7 +831,7 @@ def merge_results_to_excel(
             except Exception:
                 pass
 
-    df.to_excel(output_path, index=False)
+    write_sheet(df, output_path, column_formats={"ST3_결과상품명": LONG_TEXT_FORMAT})
     return cnt, total_input_tokens, total_output_tokens
 
 
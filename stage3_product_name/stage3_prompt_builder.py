@@ -1,4 +1,5 @@
 import os
+import sys
 import threading
 from datetime import datetime
 
@@ -13,9 +14,15 @@ from stage3_core import (
     safe_str,                      # NaN/None → "" 변환 + strip
     Stage3Settings,                # 전역/기본 설정 dataclass
     Stage3Request,                 # 한 행에 대한 Stage3 요청 정보 (프롬프트 등)
-    build_stage3_request_from_row, # (row + 기본세팅) → Stage3Request
+    Stage3ColumnBuilder,           # DataFrame 컬럼 단위 일괄 빌더 (행별 결과는 위와 동일)
 )
 
+# 공용 엑셀 읽기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet
+
 
 # =========================
 # 엑셀 처리 로직 (Stage3 프롬프트 생성)
@@ -44,7 +51,7 @@ def process_excel_for_stage3(
     log = log_func
     log(f"[INFO] 엑셀 읽는 중: {excel_path}")
 
-    df = pd.read_excel(excel_path, header=0)
+    df = read_sheet(excel_path, header=0)
 
     # ✅ ST2_JSON 컬럼 필수
     if "ST2_JSON" not in df.columns:
@@ -87,16 +94,20 @@ def process_excel_for_stage3(
             naming_strategy="통합형",
         )
 
-    for idx, row in df.iterrows():
+    # ✅ 행마다 Series를 만들지 않고 필요한 컬럼만 한 번에 꺼내서 처리
+    builder = Stage3ColumnBuilder(df, default_settings=default_settings, st2_col="ST2_JSON")
+    prompt_values = df["ST3_프롬프트"].tolist()
+    new_prompts = {}
+
+    for pos, idx in enumerate(builder.index):
         # 1) ST2_JSON 비어 있으면 스킵
-        json_payload = safe_str(row.get("ST2_JSON", ""))
-        if not json_payload:
+        if not builder.raw_json(pos):
             skipped_json_empty += 1
             log(f"[SKIP] idx={idx} : ST2_JSON 이 비어 있어 Stage3 프롬프트를 생성하지 않음.")
             continue
 
         # 2) 이미 ST3_프롬프트가 있고, skip_existing 옵션이면 스킵
-        existing_prompt = safe_str(row.get("ST3_프롬프트", ""))
+        existing_prompt = safe_str(prompt_values[pos])
         if skip_existing and existing_prompt:
             skipped_existing += 1
             log(f"[SKIP] idx={idx} : 이미 ST3_프롬프트가 있어 건너뜀.")
@@ -104,20 +115,21 @@ def process_excel_for_stage3(
 
         # 3) stage3_core의 공통 로직 사용해 요청/프롬프트 생성
         try:
-            req: Stage3Request = build_stage3_request_from_row(
-                row=row,
-                default_settings=default_settings,
-                st2_col="ST2_JSON",
-            )
+            req: Stage3Request = builder.build(pos)
         except Exception as e:
             failed += 1
             log(f"[ERROR] idx={idx} : Stage3Request 생성 중 예외 → 건너뜀. ({e})")
             continue
 
-        # 프롬프트 기록
-        df.at[idx, "ST3_프롬프트"] = req.prompt
+        new_prompts[pos] = req.prompt
         generated += 1
 
+    # 프롬프트 기록 (컬럼 한 번에 교체)
+    if new_prompts:
+        for pos, prompt in new_prompts.items():
+            prompt_values[pos] = prompt
+        df["ST3_프롬프트"] = prompt_values
+
     base_dir = os.path.dirname(excel_path)
     base_name = os.path.splitext(os.path.basename(excel_path))[0]
     out_path = os.path.join(base_dir, f"{base_name}_stage3_prompts.xlsx")
@@ -11,6 +11,12 @@ from tkinter.scrolledtext import ScrolledText
 
 import pandas as pd
 
+# 공용 엑셀 읽기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet
+
 # ========================================================
 # 메인 런처 연동용 JobManager & 파일명 유틸 (Stage4-1: 필터링)
 # ========================================================
@@ -246,12 +252,101 @@ class Stage4Config:
 # ========================================================
 # 2. 검증 로직 클래스
 # ========================================================
+# 탈락/통과 사유 코드 (컬럼 단위 검사 결과용)
+REASON_EMPTY = "EMPTY"
+REASON_WHITELIST = "WHITELIST"
+REASON_NEWLINE = "NEWLINE"
+REASON_LENGTH = "LENGTH"
+REASON_SYMBOL = "SYMBOL"
+REASON_TILDE = "TILDE"
+REASON_HYPHEN = "HYPHEN"
+REASON_KEYWORD = "KEYWORD"
+REASON_SHOP_WORD = "SHOP_WORD"
+REASON_SHOP_PATTERN = "SHOP_PATTERN"
+REASON_BRAND = "BRAND"
+REASON_SENTENCE_END = "SENTENCE_END"
+REASON_SENTENCE_MARK = "SENTENCE_MARK"
+REASON_PASS = "PASS"
+
+
+# 역참조 (\1 ~ \9, (?P=이름)) - 합치면 그룹 번호가 밀리므로 개별 검사
+_BACKREF_RE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def _combine_regex(patterns):
+    """
+    정규식 목록을 하나의 OR 패턴으로 합침 (합칠 수 없으면 None → 개별 검사)
+    - 각 패턴을 (?:...) 로 감싸서 패턴 안의 | 가 다른 패턴과 섞이지 않게 함
+    - 역참조가 있는 패턴 / 플래그가 서로 다른 패턴 / 합쳐서 컴파일 오류(그룹 이름 중복 등)면 합치지 않음
+    """
+    if not patterns:
+        return None
+    flags = {p.flags for p in patterns}
+    if len(flags) != 1 or any(_BACKREF_RE.search(p.pattern) for p in patterns):
+        return None
+    try:
+        return re.compile("|".join(f"(?:{p.pattern})" for p in patterns), flags.pop())
+    except re.error:
+        return None
+
+
+class CompiledRuleSet:
+    """
+    Stage4Config의 문자열 목록(금지 기호/키워드/상점 단어/브랜드/허용 문구/화이트리스트 포함어)을
+    하나의 정규식으로 합친 다중 패턴 매처.
+
+    - scan(text): 텍스트를 한 번만 훑어서 포함된 항목을 {분류: 포함된 항목의 목록 인덱스 집합}으로 반환
+    - 같은 위치에서 시작하는 항목들은 긴 것부터 매칭되고, 그보다 짧은 항목(접두어)은 미리 계산한
+      prefix 표로 함께 포함 처리 → 'item in text'를 목록 전체에 돌린 것과 같은 결과
+    """
+
+    def __init__(self, lists):
+        # lists: {분류: [문자열, ...]}
+        self._owners = {}           # 문자열 → [(분류, 인덱스), ...]
+        self._always = {}           # 빈 문자열 항목 (항상 포함으로 취급, 'in' 연산과 동일)
+        for cat, items in lists.items():
+            for i, item in enumerate(items):
+                item = str(item)
+                if item == "":
+                    self._always.setdefault(cat, set()).add(i)
+                    continue
+                self._owners.setdefault(item, []).append((cat, i))
+
+        literals = sorted(self._owners, key=len, reverse=True)
+        # 각 문자열의 접두어가 되는 다른 항목들 (같은 시작 위치에서 함께 포함되는 항목)
+        self._prefixes = {
+            lit: [other for other in literals if other != lit and lit.startswith(other)]
+            for lit in literals
+        }
+        self._regex = None
+        self._any = None
+        if literals:
+            alt = "|".join(re.escape(lit) for lit in literals)
+            self._any = re.compile(alt)                 # 포함 여부만 빠르게 확인 (대부분의 통과 후보)
+            self._regex = re.compile(f"(?=({alt}))")    # 겹치는 위치까지 모두 찾기
+
+    def scan(self, text: str):
+        found = {cat: set(idxs) for cat, idxs in self._always.items()}
+        if self._regex is None or self._any.search(text) is None:
+            return found
+        seen = set()
+        for m in self._regex.finditer(text):
+            lit = m.group(1)
+            if lit in seen:
+                continue
+            seen.add(lit)
+            for hit in [lit] + self._prefixes[lit]:
+                for cat, i in self._owners[hit]:
+                    found.setdefault(cat, set()).add(i)
+        return found
+
+
 class Stage4Validator:
     def __init__(self, cfg: Stage4Config):
         self.update_config(cfg)
 
     def update_config(self, cfg: Stage4Config):
-        """설정 변경 시 재로드"""
+        """설정 변경 시 재로드 (다중 패턴 매처도 이때 한 번만 생성)"""
         c = cfg.config
         self.max_length = int(c.get("max_length", 50))
         self.forbidden_symbols = c.get("forbidden_symbols", [])
@@ -271,6 +366,20 @@ class Stage4Validator:
         self.range_tilde_regex = re.compile(r'\d\s*~\s*\d')
         self.range_hyphen_regex = re.compile(r'\d\s*-\s*\d')
 
+        # ---- 컴파일된 규칙 ----
+        self._whitelist_exact_set = set(self.whitelist_exact)
+        self._rules = CompiledRuleSet({
+            "symbol": self.forbidden_symbols,
+            "keyword": self.forbidden_keywords,
+            "shop_word": self.forbidden_shop_words,
+            "brand": self.brand_hints,
+            "allowed": self.allowed_phrases,
+            "wl_contains": [w for w in self.whitelist_contains if w],
+        })
+        self._whitelist_re = _combine_regex(self.whitelist_regex)
+        self._allowed_re = _combine_regex(self.allowed_regex_patterns)
+        self._shop_re = _combine_regex(self.forbidden_shop_patterns)
+
     def _in_whitelist(self, clean_text: str) -> bool:
         if clean_text in self.whitelist_exact: return True
         for sub in self.whitelist_contains:
@@ -279,7 +388,125 @@ class Stage4Validator:
             if pat.search(clean_text): return True
         return False
 
+    @staticmethod
+    def _any_search(combined, patterns, text: str) -> bool:
+        if combined is not None:
+            return combined.search(text) is not None
+        return any(p.search(text) for p in patterns)
+
+    def validate_code(self, text):
+        """
+        후보 1개 검사 → (통과 여부, 사유 코드, 사유 문구)
+        규칙 순서와 사유 문구는 기존 순차 검사(_validate_sequential)와 동일
+        """
+        if not isinstance(text, str) or not text.strip():
+            return False, REASON_EMPTY, "빈 문자열"
+        clean_text = text.strip()
+
+        found = self._rules.scan(clean_text)
+
+        if (clean_text in self._whitelist_exact_set or found.get("wl_contains")
+                or self._any_search(self._whitelist_re, self.whitelist_regex, clean_text)):
+            return True, REASON_WHITELIST, "WHITELIST_PASS"
+
+        # Rule 0
+        if "\n" in clean_text or "\t" in clean_text:
+            return False, REASON_NEWLINE, "줄바꿈/탭 포함"
+
+        # Rule 1
+        if len(clean_text) > self.max_length:
+            return False, REASON_LENGTH, f"길이 초과 ({len(clean_text)}자)"
+
+        # Rule 2
+        if found.get("symbol"):
+            ch = self.forbidden_symbols[min(found["symbol"])]
+            return False, REASON_SYMBOL, f"금지 기호 포함 ({ch})"
+
+        if "~" in clean_text:
+            temp = self.range_tilde_regex.sub('', clean_text)
+            if "~" in temp: return False, REASON_TILDE, "금지 기호 포함 (~ : 숫자 범위 아님)"
+
+        if "-" in clean_text:
+            temp = self.range_hyphen_regex.sub('', clean_text)
+            if "-" in temp: return False, REASON_HYPHEN, "금지 기호 포함 (- : 사이즈/범위 아님)"
+
+        # Rule 3 (금지 키워드 + 예외 처리: 허용 문구/정규식이 있으면 모든 키워드 통과)
+        if found.get("keyword"):
+            is_allowed = bool(found.get("allowed")) or self._any_search(
+                self._allowed_re, self.allowed_regex_patterns, clean_text)
+            if not is_allowed:
+                kw = self.forbidden_keywords[min(found["keyword"])]
+                return False, REASON_KEYWORD, f"금지 키워드 포함 ({kw})"
+
+        if found.get("shop_word"):
+            sw = self.forbidden_shop_words[min(found["shop_word"])]
+            return False, REASON_SHOP_WORD, f"상점/몰 관련 단어 포함 ({sw})"
+
+        if self._any_search(self._shop_re, self.forbidden_shop_patterns, clean_text):
+            return False, REASON_SHOP_PATTERN, "상점/몰 관련 표현 포함"
+
+        if found.get("brand"):
+            b = self.brand_hints[min(found["brand"])]
+            return False, REASON_BRAND, f"브랜드명 포함 가능성 ({b})"
+
+        if self.sentence_endings and clean_text.endswith(self.sentence_endings):
+            for ending in self.sentence_endings:
+                if clean_text.endswith(ending):
+                    return False, REASON_SENTENCE_END, f"문장형 어미 사용 (끝: {ending})"
+
+        if "?" in clean_text or "!" in clean_text:
+            return False, REASON_SENTENCE_MARK, "문장형 기호(?,!) 사용"
+
+        return True, REASON_PASS, "PASS"
+
     def validate(self, text: str):
+        ok, _code, reason = self.validate_code(text)
+        return ok, reason
+
+    def validate_column(self, values) -> pd.DataFrame:
+        """
+        컬럼 단위 검사: 각 셀을 줄바꿈으로 나눈 후보 전체를 한 번에 검사.
+
+        Returns:
+            후보 1개당 1행인 DataFrame
+            [row(원본 행 인덱스), pos(셀 안 순번), candidate, ok, code, reason]
+            빈 셀 / 'nan' 셀은 후보가 없으므로 결과에 나오지 않음
+        """
+        rows, positions, candidates = [], [], []
+        for idx, raw in pd.Series(values).items():
+            raw = str(raw)
+            if not raw.strip() or raw == "nan":
+                continue
+            pos = 0
+            for c in raw.split('\n'):
+                c = c.strip()
+                if c:
+                    rows.append(idx)
+                    positions.append(pos)
+                    candidates.append(c)
+                    pos += 1
+
+        # 같은 후보 문자열은 한 번만 검사
+        results = {}
+        for c in candidates:
+            if c not in results:
+                results[c] = self.validate_code(c)
+        checked = [results[c] for c in candidates]
+
+        out = pd.DataFrame({
+            "row": rows,
+            "pos": positions,
+            "candidate": candidates,
+            "ok": pd.Series([r[0] for r in checked], dtype=bool),
+            "code": [r[1] for r in checked],
+            "reason": [r[2] for r in checked],
+        })
+        return out[["row", "pos", "candidate", "ok", "code", "reason"]]
+
+    # ----------------------------------------------------
+    # 기존 순차 검사 (동등성 검증용 기준 구현)
+    # ----------------------------------------------------
+    def _validate_sequential(self, text: str):
         if not isinstance(text, str) or not text.strip():
             return False, "빈 문자열"
         clean_text = text.strip()
@@ -335,6 +562,15 @@ class Stage4Validator:
 
         return True, "PASS"
 
+    def check_equivalence(self, texts):
+        """컴파일된 검사와 기존 순차 검사 결과가 다른 후보 목록 반환 [(후보, 새 결과, 기존 결과)]"""
+        mismatches = []
+        for t in texts:
+            new, old = self.validate(t), self._validate_sequential(t)
+            if new != old:
+                mismatches.append((t, new, old))
+        return mismatches
+
 
 # ========================================================
 # 3. 설정 편집기 GUI (새 창)
@@ -411,7 +647,7 @@ class ConfigEditor(tk.Toplevel):
                 except UnicodeDecodeError:
                     df = pd.read_csv(file_path, encoding='cp949')
             else:
-                df = pd.read_excel(file_path)
+                df = read_sheet(file_path)
             
             # 첫 번째 컬럼을 데이터로 가정
             raw_data = df.iloc[:, 0].dropna().astype(str).tolist()
@@ -744,7 +980,7 @@ class Stage4FilterGUI(tk.Tk):
 
         try:
             self._log("--- 검사 시작 ---")
-            df = pd.read_excel(input_path)
+            df = read_sheet(input_path)
             
             target_col = 'ST3_결과상품명'
             if target_col not in df.columns:
@@ -757,37 +993,38 @@ class Stage4FilterGUI(tk.Tk):
                     df['상품코드'] = df.index + 2
                 else: return
 
-            dropped_logs = []
-            total = 0
-            passed = 0
+            # 전체 후보를 컬럼 단위로 한 번에 검사 (후보 1개당 1행, 원래 순서 유지)
+            checked = self.validator.validate_column(df[target_col])
+            total = len(checked)
+
+            # 탈락 로그
+            rejected = checked[~checked["ok"]]
+            now_str = datetime.now().strftime("%Y-%m-%d %H:%M")
+            dropped_logs = [
+                {
+                    "입력파일": os.path.basename(input_path),
+                    "시각": now_str,
+                    "상품코드": p_code,
+                    "탈락상품명": cand,
+                    "사유": reason,
+                }
+                for p_code, cand, reason in zip(
+                    df.loc[rejected["row"], '상품코드'].tolist(),
+                    rejected["candidate"].tolist(),
+                    rejected["reason"].tolist(),
+                )
+            ]
 
-            for idx, row in df.iterrows():
-                p_code = row['상품코드']
-                raw = str(row.get(target_col, ""))
-                if not raw.strip() or raw == "nan": continue
+            # 통과 후보 (행 안에서 중복 제거, 순서 유지)
+            accepted = checked[checked["ok"]].drop_duplicates(subset=["row", "candidate"])
+            passed = len(accepted)
+            joined = accepted.groupby("row", sort=False)["candidate"].agg("\n".join)
 
-                cands = [c.strip() for c in raw.split('\n') if c.strip()]
-                total += len(cands)
-                valid = []
-                
-                for c in cands:
-                    ok, reason = self.validator.validate(c)
-                    if ok:
-                        if c not in valid: valid.append(c)
-                    else:
-                        dropped_logs.append({
-                            "입력파일": os.path.basename(input_path),
-                            "시각": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                            "상품코드": p_code,
-                            "탈락상품명": c,
-                            "사유": reason
-                        })
-                
-                if valid:
-                    df.at[idx, target_col] = "\n".join(valid)
-                    passed += len(valid)
-                else:
-                    df.at[idx, target_col] = "" 
+            checked_rows = pd.unique(checked["row"])
+            df[target_col] = df[target_col].astype(object)
+            df.loc[checked_rows, target_col] = ""
+            if len(joined):
+                df.loc[joined.index, target_col] = joined.values
 
             # T3 → T4, T4 → T4로 파일명 생성
             base_dir = os.path.dirname(input_path)
@@ -868,6 +1105,73 @@ class Stage4FilterGUI(tk.Tk):
             self._log(f"[오류] {e}")
             messagebox.showerror("에러", str(e))
 
+# 내장 검증용 후보 (규칙별 통과/탈락 + 허용 문구 예외 + 화이트리스트)
+_CHECK_CANDIDATES = [
+    "", "   ", "남성 면 반팔 티셔츠", "남성 면 반팔\n티셔츠", "가" * 80,
+    "여름 반팔 [무료배송]", "사이즈 90~110 반팔", "사이즈 90 ~ 반팔", "S-M 반팔", "3-5세 아동 반팔",
+    "무료배송 반팔", "매장 증정용 쇼핑백", "쇼핑백 증정용 무료배송", "증정용 봉투 특가",
+    "공식몰 정품 반팔", "나이키 스타일 반팔", "공식 스토어 반팔", "편하게 입는 반팔입니다", "반팔 티셔츠 추천",
+    "ㅋㅋㅋ 반팔 특가", "정품 반팔 특가", "새상품 반팔 할인", "반팔 특가 ABAB",
+]
+
+# 내장 검증용 정규식 (| 포함 패턴, 그룹, 역참조 - 합치기/개별 검사 경로를 모두 거치게 함)
+_CHECK_REGEX_CONFIG = {
+    "whitelist_regex": [r"(.)\1\1", r"^정품|^새상품"],
+    "allowed_regex_patterns": [r"(쇼핑백|봉투|포장).{0,6}증정용", r"증정용.{0,6}(쇼핑백|봉투|포장)", r"(AB)\1"],
+    "forbidden_shop_patterns": [r"공식\s*스토어|오피셜\s*스토어", r"(?P<x>몰)\s*전용"],
+}
+
+
+def _run_check(excel_path: str = None) -> int:
+    """
+    컴파일된 검사 / 기존 순차 검사 결과 비교 (GUI 없이 실행)
+    - 내장 후보 × (현재 설정, | / 역참조 정규식을 넣은 설정)
+    - excel_path 를 주면 엑셀의 ST3 상품명 후보 전체도 비교
+    """
+    cfg = Stage4Config(CONFIG_FILE)
+    failed = 0
+    for name, overrides in (("현재 설정", {}), ("정규식 조합 설정", _CHECK_REGEX_CONFIG)):
+        cfg.config = {**cfg.config, **overrides}
+        validator = Stage4Validator(cfg)
+        mismatches = validator.check_equivalence(_CHECK_CANDIDATES)
+        for pats in (validator.whitelist_regex, validator.allowed_regex_patterns, validator.forbidden_shop_patterns):
+            combined = _combine_regex(pats)
+            if combined is None:
+                continue
+            for t in _CHECK_CANDIDATES:
+                if (combined.search(t) is not None) != any(p.search(t) for p in pats):
+                    mismatches.append((t, f"합친 정규식 {combined.pattern!r}", "개별 정규식"))
+        print(f"[검증] 내장 후보 {len(_CHECK_CANDIDATES)}개 ({name}), 불일치 {len(mismatches)}건")
+        for text, new_res, old_res in mismatches[:20]:
+            print(f"  - {text!r}: 새 검사={new_res} / 기존 검사={old_res}")
+        failed += len(mismatches)
+    if not excel_path:
+        return 1 if failed else 0
+
+    validator = Stage4Validator(Stage4Config(CONFIG_FILE))
+    df = read_sheet(excel_path)
+    cols = [c for c in df.columns if "ST3" in str(c) and "상품명" in str(c)]
+    if not cols:
+        print("[검증] ST3 상품명 컬럼을 찾을 수 없습니다.")
+        return 1
+
+    checked = validator.validate_column(df[cols[0]])
+    mismatches = validator.check_equivalence(pd.unique(checked["candidate"]))
+    print(f"[검증] 후보 {len(checked)}개 (고유 {checked['candidate'].nunique()}개), 불일치 {len(mismatches)}건")
+    print(checked["code"].value_counts().to_string())
+    for text, new_res, old_res in mismatches[:20]:
+        print(f"  - {text!r}: 새 검사={new_res} / 기존 검사={old_res}")
+    return 1 if (mismatches or failed) else 0
+
+
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stage4-1 필터 (인자 없이 실행하면 GUI)")
+    parser.add_argument("--check", nargs="?", const="", default=None, metavar="EXCEL",
+                        help="컴파일된 검사와 기존 순차 검사 결과 비교 (내장 후보 + 선택: 엑셀의 ST3 상품명 후보)")
+    args = parser.parse_args()
+    if args.check is not None:
+        sys.exit(_run_check(args.check or None))
     app = Stage4FilterGUI()
     app.mainloop()
\ No newline at end of file
@@ -25,6 +25,12 @@ from tkinter.scrolledtext import ScrolledText
 
 from openai import OpenAI
 
+# 공용 엑셀 읽기/쓰기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시, 스트리밍 xlsx 저장)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet, write_sheet
+
 # ========================================================
 # 메인 런처 연동용 JobManager & 파일명 유틸 (Stage4-2: Text)
 # ========================================================
@@ -217,7 +223,7 @@ def safe_save_excel(df: pd.DataFrame, path: str) -> bool:
     """엑셀 파일이 열려 있어 저장이 안 될 때 재시도를 유도하는 함수"""
     while True:
         try:
-            df.to_excel(path, index=False)
+            write_sheet(df, path)
             return True
         except PermissionError:
             if not messagebox.askretrycancel(
@@ -579,7 +585,7 @@ class Stage4BatchGUI(tk.Tk):
         try:
             client = OpenAI(api_key=key)
             self.append_log(f"엑셀 로드 중... {os.path.basename(src)}")
-            df = pd.read_excel(src)
+            df = read_sheet(src)
             
             cand_col = 'ST3_결과상품명'
             for c in df.columns:
@@ -1811,7 +1817,7 @@ class Stage4BatchGUI(tk.Tk):
                 base, _ = os.path.splitext(src_path)
                 out_excel = f"{base}_stage4_batch_done.xlsx"
                 
-                df = pd.read_excel(src_path)
+                df = read_sheet(src_path)
                 if "ST4_최종결과" not in df.columns:
                     df["ST4_최종결과"] = ""
                 df["ST4_최종결과"] = df["ST4_최종결과"].astype(str)
@@ -1843,7 +1849,7 @@ class Stage4BatchGUI(tk.Tk):
                 # Stage4 최종 파일명: *_T4(완)_I* 형식으로 저장
                 try:
                     final_out_path = get_t4_complete_path(src_path)
-                    df_done = pd.read_excel(out_excel)
+                    df_done = read_sheet(out_excel)
                     if safe_save_excel(df_done, final_out_path):
                         out_path_for_history = final_out_path
                         self.append_log(f"  [그룹] 최종 파일 저장: {os.path.basename(final_out_path)}")
@@ -2093,7 +2099,7 @@ class Stage4BatchGUI(tk.Tk):
                 total_cost += cost_total
 
                 if src_path and os.path.exists(src_path):
-                    df = pd.read_excel(src_path)
+                    df = read_sheet(src_path)
                     if "ST4_최종결과" not in df.columns: df["ST4_최종결과"] = ""
                     df["ST4_최종결과"] = df["ST4_최종결과"].astype(str)
                     cnt = 0
@@ -2122,7 +2128,7 @@ class Stage4BatchGUI(tk.Tk):
                     # Stage4 최종 파일명: *_T4(완)_I* 형식으로 저장
                     try:
                         final_out_path = get_t4_complete_path(src_path)
-                        df_done = pd.read_excel(out_excel)
+                        df_done = read_sheet(out_excel)
                         if safe_save_excel(df_done, final_out_path):
                             out_path_for_history = final_out_path
                             self.append_log(f"[INFO] 최종 파일 저장: {os.path.basename(final_out_path)}")
@@ -2239,8 +2245,8 @@ class Stage4BatchGUI(tk.Tk):
             out = local_job.get("out_excel")
             if not src or not out or not os.path.exists(src) or not os.path.exists(out): continue
             try:
-                df_in = pd.read_excel(src)
-                df_out = pd.read_excel(out)
+                df_in = read_sheet(src)
+                df_out = read_sheet(out)
                 cand_col = 'ST3_결과상품명'
                 for c in df_in.columns:
                     if 'filtered' in c or '정제결과' in c: cand_col = c
@@ -534,6 +534,7 @@ class Stage4_2BatchGeminiGUI(tk.Tk):
                 excel_path=src,
                 jsonl_path=jsonl_path,
                 skip_existing=skip_exist,
+                model_name=model_name,
             )
 
             written_count = result["written_count"]
@@ -541,8 +542,16 @@ class Stage4_2BatchGeminiGUI(tk.Tk):
             skipped_existing = result["skipped_existing"]
 
             self.append_log(f"JSONL 생성 완료: {written_count}건 (스킵 {skipped_count}건, 기존결과 {skipped_existing}건)")
+            if result.get("cached_count"):
+                self.append_log(f"  - 응답 캐시 적중: {result['cached_count']}건 (배치에서 제외, 병합 시 캐시 결과로 채움)")
 
             if written_count == 0:
+                # 대상 행이 모두 응답 캐시에 있으면 배치 없이 바로 병합
+                if result.get("cached_count"):
+                    out_excel = get_next_version_path(src, task_type="text")
+                    merged_count, _, _ = merge_results_to_excel(src, [], out_excel)
+                    self.append_log(f"응답 캐시로 {merged_count}건 병합 완료 (API 호출 없음): {out_excel}")
+                    return
                 self.append_log("생성할 요청 없음.")
                 return
 
@@ -566,7 +575,8 @@ class Stage4_2BatchGeminiGUI(tk.Tk):
                 client=client,
                 model_name=model_name,
                 src_file_name=uploaded_file_name,
-                display_name=display_name
+                display_name=display_name,
+                excel_path=src,
             )
 
             batch_id = batch_info["name"]
@@ -894,7 +904,8 @@ class Stage4_2BatchGeminiGUI(tk.Tk):
                 cnt, total_input, total_output = merge_results_to_excel(
                     excel_path=src_excel,
                     results=results,
-                    output_path=out_excel
+                    output_path=out_excel,
+                    batch_name=bid,
                 )
 
                 # 비용 계산
@@ -7,6 +7,7 @@ Stage 4-2: LLM 최종 심사 및 정렬 GUI
 """
 
 import os
+import sys
 import re
 import threading
 import pytz
@@ -30,6 +31,12 @@ from stage4_2_core import (
 )
 from stage4_2_run_history import append_run_history
 
+# 공용 엑셀 읽기 (프로젝트 루트 excel_io.py - calamine 엔진 + 파싱 결과 캐시)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from excel_io import read_sheet
+
 # =========================================================
 # [런처 연동] JobManager & 유틸 (표준화됨)
 # =========================================================
@@ -362,8 +369,8 @@ class Stage4_2GUI(tk.Tk):
 
         try:
             self._log("--- 상세 비교 리포트 생성 중... ---")
-            df_in = pd.read_excel(input_path)
-            df_out = pd.read_excel(output_path)
+            df_in = read_sheet(input_path)
+            df_out = read_sheet(output_path)
 
             cand_col = 'ST3_결과상품명'
             for c in df_in.columns:
@@ -474,7 +481,7 @@ class Stage4_2GUI(tk.Tk):
     def _run_process(self, api_key, input_path):
         try:
             core = Stage4_2Core(api_key)
-            df = pd.read_excel(input_path)
+            df = read_sheet(input_path)
             
             cand_col = 'ST3_결과상품명'
             for c in df.columns: